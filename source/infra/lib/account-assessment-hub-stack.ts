@@ -2,7 +2,7 @@
 // SPDX-License-Identifier: Apache-2.0
 
 import * as cdk from 'aws-cdk-lib';
-import {Aspects, Aws, CfnParameter, Fn, Tags} from 'aws-cdk-lib';
+import {Aspects, Aws, CfnParameter, Duration, Fn, Tags} from 'aws-cdk-lib';
 import {Construct} from "constructs";
 import {SimpleAssessmentComponent} from "./components/simple-assessment-component";
 import {JobHistoryComponent} from "./components/job-history-component";
@@ -214,13 +214,48 @@ export class AccountAssessmentHubStack extends cdk.Stack {
       region: this.region
     });
 
-    new SimpleAssessmentComponent(this, 'ResourceBasedPolicy', {
+    const policyExplorer = new PolicyExplorerScanComponent(this, 'PolicyExplorer', {
       cognitoAuthenticationResources,
+      api: api.restApi,
+      assetCode: lambdaZip,
       tables: {jobHistory: jobHistory.jobHistoryTable},
       functions: {readJob: jobHistory.sharedFunctions.readJob},
+      apiResourcePath: 'policy-explorer',
+      componentTableConfig: {
+        partitionKeyName: 'PartitionKey',
+        sortKeyName: 'SortKey',
+      },
+      componentConfig: {
+        readHandlerPath: 'policy_explorer/read_policies.lambda_handler',
+        apiResourcePath: 'policy-explorer',
+        tableEnvVariableName: 'TABLE_POLICY_EXPLORER',
+        powertoolsServiceName: POLICY_EXPLORER_SCAN,
+        dynamoTtlInDays,
+        solutionVersion: props.solutionVersion,
+        stackId: this.stackId,
+        sendAnonymousData: mappings.findInMap("SendAnonymousData", "Data")
+      },
+      roleAssumedByApiGateway: new iam.ServicePrincipal('apigateway.amazonaws.com'),
+      dynamoDbRoleName: 'DynamoDbRole',
+      namespace,
+      region: this.region,
+      partition: this.partition,
+      accountId: this.account,
+    });
+
+    new SimpleAssessmentComponent(this, 'ResourceBasedPolicy', {
+      cognitoAuthenticationResources,
+      tables: {
+        jobHistory: jobHistory.jobHistoryTable,
+        scanSources: {TABLE_POLICY_EXPLORER: policyExplorer.componentTable}
+      },
+      functions: {readJob: jobHistory.sharedFunctions.readJob},
       api: api.restApi,
       componentConfig: {
         readHandlerPath: 'resource_based_policy/read_resource_based_policies.lambda_handler',
+        scanHandlerPath: 'resource_based_policy/step_functions_lambda/check_policy_for_organizations_dependency.lambda_handler',
+        scanTimeout: Duration.minutes(15),
+        scanInvokesItself: true,
         apiResourcePath: 'resource-based-policies',
         tableEnvVariableName: 'TABLE_RESOURCE_BASED_POLICY',
         powertoolsServiceName: RESOURCE_BASED_POLICY_SCAN,
@@ -248,35 +283,6 @@ export class AccountAssessmentHubStack extends cdk.Stack {
       stackId: this.stackId,
       sendAnonymousData: mappings.findInMap("SendAnonymousData", "Data")
     })
-    
-    new PolicyExplorerScanComponent(this, 'PolicyExplorer', {
-      cognitoAuthenticationResources,
-      api: api.restApi,
-      assetCode: lambdaZip,
-      tables: {jobHistory: jobHistory.jobHistoryTable},
-      functions: {readJob: jobHistory.sharedFunctions.readJob},
-      apiResourcePath: 'policy-explorer',
-      componentTableConfig: {
-        partitionKeyName: 'PartitionKey',
-        sortKeyName: 'SortKey',
-      },
-      componentConfig: {
-        readHandlerPath: 'policy_explorer/read_policies.lambda_handler',
-        apiResourcePath: 'policy-explorer',
-        tableEnvVariableName: 'TABLE_POLICY_EXPLORER',
-        powertoolsServiceName: POLICY_EXPLORER_SCAN,
-        dynamoTtlInDays,
-        solutionVersion: props.solutionVersion,
-        stackId: this.stackId,
-        sendAnonymousData: mappings.findInMap("SendAnonymousData", "Data")
-      },
-      roleAssumedByApiGateway: new iam.ServicePrincipal('apigateway.amazonaws.com'),
-      dynamoDbRoleName: 'DynamoDbRole',
-      namespace,
-      region: this.region,
-      partition: this.partition,
-      accountId: this.account,
-    })
 
     Aspects.of(this).add(new CfnGuardSuppressResourceList({
           "AWS::Lambda::Function": ["LAMBDA_INSIDE_VPC", "LAMBDA_CONCURRENCY_CHECK"],
@@ -51,7 +51,8 @@ export class JobHistoryComponent extends Construct {
     const jobsApiHandler = new lambda.Function(this, 'JobsHandler', {
       runtime: Runtime.PYTHON_3_12,
       tracing: lambda.Tracing.ACTIVE,
-      timeout: Duration.minutes(1),
+      timeout: Duration.seconds(29), // max timeout through API Gateway
+      memorySize: 2048, // compiles the policies of a job for the evaluate route on a cache miss
       code: assetCode,
       handler: 'assessment_runner/api_router.lambda_handler',
       environment: {
@@ -79,6 +80,10 @@ export class JobHistoryComponent extends Construct {
     jobsResource.addMethod('GET', new LambdaIntegration(jobsApiHandler), proxyOptions);
     const jobResource = jobsResource.addResource('{assessmentType}').addResource('{id}');
     jobResource.addMethod('GET', new LambdaIntegration(jobsApiHandler), proxyOptions);
+    const jobDiffResource = jobResource.addResource('diff').addResource('{otherId}');
+    jobDiffResource.addMethod('GET', new LambdaIntegration(jobsApiHandler), proxyOptions);
+    const jobEvaluateResource = jobResource.addResource('evaluate');
+    jobEvaluateResource.addMethod('POST', new LambdaIntegration(jobsApiHandler), proxyOptions);
 
     this.sharedFunctions = {
       readJob: jobsApiHandler
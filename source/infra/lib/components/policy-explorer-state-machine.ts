@@ -9,6 +9,7 @@ import {
   Pass,
   ProcessorMode,
   ProcessorType,
+  QueryLanguage,
   StateMachine,
   Succeed,
   TaskInput,
@@ -18,6 +19,27 @@ import { Construct } from "constructs";
 import * as lambda from "aws-cdk-lib/aws-lambda";
 import { CfnPolicy } from "aws-cdk-lib/aws-iam";
 import { addCfnSuppressRules } from "@aws-solutions-constructs/core";
+import { Aws } from "aws-cdk-lib";
+
+/**
+ * Map that reads its items from the JSON Lines scan manifest in S3, one item per account, see ScanManifest.
+ * The manifest keeps the account ids out of the execution input, which is limited to 256 KB.
+ */
+class ManifestAccountIterator extends Map {
+  public toStateJson(stateMachineQueryLanguage?: QueryLanguage): object {
+    return {
+      ...super.toStateJson(stateMachineQueryLanguage),
+      ItemReader: {
+        Resource: `arn:${Aws.PARTITION}:states:::s3:getObject`,
+        ReaderConfig: {InputType: "JSONL"},
+        Parameters: {
+          "Bucket.$": "$.Scan.Manifest.Bucket",
+          "Key.$": "$.Scan.Manifest.Key",
+        },
+      },
+    };
+  }
+}
 
 export function createStateMachine(
   scope: Construct,
@@ -47,7 +69,7 @@ export function createStateMachine(
   ).next(new Fail(scope, "Failed"));
 
   const definitionBody = DefinitionBody.fromChainable(
-    new Map(scope, "AccountIterator", accountIteratorProps)
+    new ManifestAccountIterator(scope, "AccountIterator", accountIteratorProps)
       .itemProcessor(
         new LambdaInvoke(
           scope,
@@ -95,10 +117,10 @@ function stateMachineTaskProps(
   const accountIteratorProps: MapProps = {
     maxConcurrency: 10,
     inputPath: "$",
-    itemsPath: JsonPath.stringAt("$.Scan.AccountIds"),
     itemSelector: {
-      "AccountId.$": "$$.Map.Item.Value",
-      "ServiceNames.$": "$.Scan.ServiceNames",
+      "AccountId.$": "$$.Map.Item.Value.AccountId",
+      "ServiceNames.$": "$$.Map.Item.Value.ServiceNames",
+      "ScanMode.$": "$$.Map.Item.Value.ScanMode",
       "JobId.$": "$.JobId",
     },
     resultPath: JsonPath.DISCARD,
@@ -108,6 +130,7 @@ function stateMachineTaskProps(
     lambdaFunction: validateAccountAccessFunction,
     resultSelector: {
       "ServicesToScanForAccount.$": "$.Payload.ServicesToScanForAccount",
+      "ServiceBatches.$": "$.Payload.ServiceBatches",
       "Status.$": "$.Payload.Validation",
       "StatusCode.$": "$.StatusCode",
       "RequestId.$": "$.SdkResponseMetadata.RequestId",
@@ -119,9 +142,10 @@ function stateMachineTaskProps(
 
   const serviceIteratorProps = {
     maxConcurrency: 10,
-    itemsPath: JsonPath.stringAt("$.ValidationResult.ServicesToScanForAccount"),
+    // one scan task per batch: a single service in PER_SERVICE mode, several services in PER_ACCOUNT mode
+    itemsPath: JsonPath.stringAt("$.ValidationResult.ServiceBatches"),
     itemSelector: {
-      "ServiceName.$": "$$.Map.Item.Value",
+      "ServiceNames.$": "$$.Map.Item.Value",
       "AccountId.$": "$.AccountId",
       "Regions.$": "$.ValidationResult.Regions",
       "JobId.$": "$.JobId",
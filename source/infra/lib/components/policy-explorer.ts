@@ -10,6 +10,7 @@ import {Runtime} from "aws-cdk-lib/aws-lambda";
 import * as events from "aws-cdk-lib/aws-events";
 import {EventbridgeToLambda, EventbridgeToLambdaProps} from "@aws-solutions-constructs/aws-eventbridge-lambda";
 import {CfnParameter, Duration} from "aws-cdk-lib";
+import {BlockPublicAccess, Bucket, BucketEncryption, CfnBucket} from "aws-cdk-lib/aws-s3";
 import {AuthorizationType, LambdaIntegration, RestApi,} from "aws-cdk-lib/aws-apigateway";
 import {CognitoAuthenticationResources} from "./cognito-authenticator";
 import {StateMachine} from "aws-cdk-lib/aws-stepfunctions";
@@ -134,6 +135,18 @@ export class PolicyExplorerScanComponent extends Construct {
   
     props.tables.jobHistory.grantReadWriteData(validateAccountAccessFunction);
 
+    // scan manifests of the jobs, read by the distributed AccountIterator of the state machine
+    const scanManifestBucket = new Bucket(this, 'ScanManifestBucket', {
+      encryption: BucketEncryption.S3_MANAGED,
+      blockPublicAccess: BlockPublicAccess.BLOCK_ALL,
+      enforceSSL: true,
+      lifecycleRules: [{expiration: Duration.days(14)}],
+    });
+    addCfnSuppressRules(scanManifestBucket.node.defaultChild as CfnBucket, [{
+      id: 'W35',
+      reason: 'The bucket only holds the temporary scan manifests of the jobs, access logging is not required.'
+    }]);
+
     const scanFunction = new lambda.Function(this, 'StartScan', {
       runtime: lambda.Runtime.PYTHON_3_12,
       tracing: lambda.Tracing.ACTIVE,
@@ -148,6 +161,7 @@ export class PolicyExplorerScanComponent extends Construct {
         ORG_MANAGEMENT_ROLE_NAME: `${props.namespace.valueAsString}-${props.region}-${ORG_MANAGEMENT_ROLE_NAME}`,
         LOG_LEVEL: 'INFO',
         POWERTOOLS_SERVICE_NAME: 'Scan' + props.componentConfig.powertoolsServiceName,
+        SCAN_MANIFEST_BUCKET: scanManifestBucket.bucketName,
         SOLUTION_VERSION: props.componentConfig.solutionVersion,
         STACK_ID: props.componentConfig.stackId,
         SEND_ANONYMOUS_DATA: props.componentConfig.sendAnonymousData
@@ -165,7 +179,7 @@ export class PolicyExplorerScanComponent extends Construct {
         COMPONENT_TABLE: this.componentTable.tableName,
         TABLE_JOBS: props.tables.jobHistory.tableName,
         TIME_TO_LIVE_IN_DAYS: props.componentConfig.dynamoTtlInDays.valueAsString,
-        POLICY_ITEM_TTL_IN_DAYS: '1',
+        POLICY_ITEM_TTL_IN_DAYS: '14',
         SPOKE_ROLE_NAME: `${props.namespace.valueAsString}-${props.region}-${SPOKE_EXECUTION_ROLE_NAME}`,
         NAMESPACE: props.namespace.valueAsString,
         ORG_MANAGEMENT_ROLE_NAME: `${props.namespace.valueAsString}-${props.region}-${ORG_MANAGEMENT_ROLE_NAME}`,
@@ -198,7 +212,7 @@ export class PolicyExplorerScanComponent extends Construct {
         COMPONENT_TABLE: this.componentTable.tableName,
         TABLE_JOBS: props.tables.jobHistory.tableName,
         TIME_TO_LIVE_IN_DAYS: props.componentConfig.dynamoTtlInDays.valueAsString,
-        POLICY_ITEM_TTL_IN_DAYS: '1',
+        POLICY_ITEM_TTL_IN_DAYS: '14',
         NAMESPACE: props.namespace.valueAsString,
         SPOKE_ROLE_NAME: `${props.namespace.valueAsString}-${props.region}-${SPOKE_EXECUTION_ROLE_NAME}`,
         ORG_MANAGEMENT_ROLE_NAME: `${props.namespace.valueAsString}-${props.region}-${ORG_MANAGEMENT_ROLE_NAME}`,
@@ -223,13 +237,15 @@ export class PolicyExplorerScanComponent extends Construct {
     const finishScan = new lambda.Function(this, 'FinishAsyncJob', {
       runtime: lambda.Runtime.PYTHON_3_12,
       tracing: lambda.Tracing.ACTIVE,
-      timeout: Duration.minutes(1),
+      timeout: Duration.minutes(5),
+      memorySize: 1024,
       code: props.assetCode,
       handler: `${componentSubDirectoryInLambdaCode}/finish_scan.lambda_handler`,
       environment: {
         COMPONENT_TABLE: this.componentTable.tableName,
         TABLE_JOBS: props.tables.jobHistory.tableName,
         TIME_TO_LIVE_IN_DAYS: props.componentConfig.dynamoTtlInDays.valueAsString,
+        POLICY_ITEM_TTL_IN_DAYS: '14',
         POWERTOOLS_SERVICE_NAME: 'FinishScanForResourceBasedPolicies',
         SOLUTION_VERSION: props.componentConfig.solutionVersion,
         STACK_ID: props.componentConfig.stackId,
@@ -242,9 +258,14 @@ export class PolicyExplorerScanComponent extends Construct {
     const stateMachineName = `${props.namespace.valueAsString}-PolicyExplorerScan-StateMachine`
     this.stateMachine = createStateMachine(this, stateMachineName, validateAccountAccessFunction, policyExplorerScanSpokeResourceFunction, finishScan);
 
+    this.stateMachine.addToRolePolicy(new PolicyStatement({
+      actions: ['s3:GetObject'],
+      resources: [scanManifestBucket.arnForObjects('scan-manifests/*')],
+    }));
+
     //This statement is required for the Default Policy generated by Step function CDK to get the policy to start execution on itself, if this is not set the DISTRIBUTED execution mode will not work.
     const stateMachineDefaultPolicy = this.stateMachine.role.node.findChild("DefaultPolicy").node.findChild("Resource") as CfnPolicy
-    stateMachineDefaultPolicy.addOverride("Properties.PolicyDocument.Statement.4", 
+    stateMachineDefaultPolicy.addOverride("Properties.PolicyDocument.Statement.5", 
       {
         "Action": "states:StartExecution",
               "Effect": "Allow",
@@ -258,6 +279,10 @@ export class PolicyExplorerScanComponent extends Construct {
       actions: ['states:StartExecution'],
       resources: [this.stateMachine.stateMachineArn],
     }));
+    scanFunction.addToRolePolicy(new PolicyStatement({
+      actions: ['s3:PutObject'],
+      resources: [scanManifestBucket.arnForObjects('scan-manifests/*')],
+    }));
 
     const startScanFunctionRole_cfn_ref = scanFunction.role?.node.defaultChild as CfnRole
     startScanFunctionRole_cfn_ref.roleName = `${props.namespace.valueAsString}-${props.region}-${props.componentConfig.powertoolsServiceName}`
@@ -6,7 +6,7 @@ import {AttributeType, BillingMode, Table, TableEncryption} from "aws-cdk-lib/aw
 import {CfnParameter, Duration} from "aws-cdk-lib";
 import * as lambda from "aws-cdk-lib/aws-lambda";
 import {AssetCode, Runtime} from "aws-cdk-lib/aws-lambda";
-import {CfnPolicy, CfnRole, PolicyStatement} from "aws-cdk-lib/aws-iam";
+import {CfnPolicy, CfnRole, Policy, PolicyStatement} from "aws-cdk-lib/aws-iam";
 import {
   AuthorizationType,
   LambdaIntegration,
@@ -23,12 +23,17 @@ export interface AssessmentComponentProps {
   cognitoAuthenticationResources: CognitoAuthenticationResources,
   tables: {
     jobHistory: Table,
+    // tables the scan function reads, by the name of the environment variable that holds the table name
+    scanSources?: { [envVariableName: string]: Table },
   },
   functions: { readJob: lambda.Function }
   api: RestApi,
   componentConfig: {
     readHandlerPath: string,
     scanHandlerPath?: string,
+    scanTimeout?: Duration,
+    // the scan function returns the new job at once and runs the scan in an asynchronous invocation of itself
+    scanInvokesItself?: boolean,
     apiResourcePath: string,
     tableEnvVariableName: string,
     powertoolsServiceName: string
@@ -127,7 +132,7 @@ export class SimpleAssessmentComponent extends Construct {
       scanFunction = new lambda.Function(this, 'StartScan', {
         runtime: Runtime.PYTHON_3_12,
         tracing: lambda.Tracing.ACTIVE,
-        timeout: Duration.minutes(2),
+        timeout: componentConfig.scanTimeout ?? Duration.minutes(2),
         code: assetCode,
         handler: scanHandlerPath,
         environment: {
@@ -164,6 +169,20 @@ export class SimpleAssessmentComponent extends Construct {
       }]);
       this.componentTable.grantReadWriteData(scanFunction);
       tables.jobHistory.grantReadWriteData(scanFunction);
+      for (const [envVariableName, sourceTable] of Object.entries(tables.scanSources ?? {})) {
+        scanFunction.addEnvironment(envVariableName, sourceTable.tableName);
+        sourceTable.grantReadData(scanFunction);
+      }
+      if (componentConfig.scanInvokesItself) {
+        // a policy of its own, the default policy of the role would make the function depend on itself
+        new Policy(this, 'StartScanInvokeItself', {
+          roles: [scanFunction.role!],
+          statements: [new PolicyStatement({
+            actions: ['lambda:InvokeFunction'],
+            resources: [scanFunction.functionArn],
+          })]
+        });
+      }
   }
 
 
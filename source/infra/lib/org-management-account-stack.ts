@@ -61,6 +61,8 @@ export class OrgManagementAccountStack extends Stack {
       actions: [
         'organizations:ListAccounts',
         'organizations:ListAccountsForParent',
+        'organizations:ListRoots',
+        'organizations:ListOrganizationalUnitsForParent',
         'organizations:ListDelegatedAdministrators',
         'organizations:ListDelegatedServicesForAccount',
         'organizations:ListAWSServiceAccessForOrganization',
@@ -15,6 +15,7 @@ from assessment_runner.job_model import JobDetails
 from assessment_runner.jobs_service import JobsService
 from utils.api_gateway_lambda_handler import ResultListWrapper, ClientException
 from utils.decimal_json_encoder import DecimalJsonEncoder
+from utils.pagination_helper import validate_max_results
 
 
 def api_response_serializer(obj) -> str:
@@ -32,6 +33,22 @@ def read_job(assessment_type: str, job_id: str) -> JobDetails:
     return JobsService().read_job(assessment_type, job_id)
 
 
+@app.get("/jobs/POLICY_EXPLORER/<job_id>/diff/<other_job_id>", cors=True)
+def diff_policy_explorer_jobs(job_id: str, other_job_id: str) -> dict:
+    uuid.UUID(job_id)
+    uuid.UUID(other_job_id)
+    parameters = app.current_event.query_string_parameters or {}
+    max_results = validate_max_results(parameters.get('maxResults') or parameters.get('limit'))
+    return JobsService().diff_jobs(job_id, other_job_id, max_results, parameters.get('nextToken'))
+
+
+@app.post("/jobs/POLICY_EXPLORER/<job_id>/evaluate", cors=True)
+def evaluate_policy_explorer_job(job_id: str) -> dict:
+    uuid.UUID(job_id)
+    body = app.current_event.json_body or {}
+    return JobsService().evaluate_policies(job_id, body.get('Requests'))
+
+
 @app.get("/jobs", cors=True)
 def read_jobs() -> ResultListWrapper:
     parameters = app.current_event.query_string_parameters
@@ -1,11 +1,13 @@
 #  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 #  SPDX-License-Identifier: Apache-2.0
 
+import functools
 import os
 import traceback
+import uuid
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Callable
 
 from aws_lambda_powertools import Logger
 from aws_lambda_powertools.utilities.data_classes import APIGatewayProxyEvent
@@ -13,6 +15,7 @@ from aws_lambda_powertools.utilities.typing import LambdaContext
 
 from assessment_runner.job_model import JobModel, JobStatus, JobTaskFailureCreateRequest
 from assessment_runner.jobs_repository import JobsRepository
+from aws.utils.api_call_metrics import api_call_metrics
 from utils.api_gateway_lambda_handler import ClientException
 
 
@@ -55,6 +58,7 @@ class AssessmentRunner:
             _context: LambdaContext,
     ) -> JobModel:
         self.logger.debug(f"Start run assessment {self.assessment_type}")
+        api_call_metrics.clear()
         self._raise_if_active_job()
         new_job: JobModel = self._create_job_entry_in_ddb(event)
         self.logger.debug(f"New job model {new_job}")
@@ -77,6 +81,8 @@ class AssessmentRunner:
                 new_job['Error'] = e.error + " " + e.message
             self._finish_job(new_job, JobStatus.FAILED)
             raise
+        finally:
+            flush_api_call_metrics(self.assessment_type, new_job['JobId'], getattr(_context, 'aws_request_id', None))
 
     def _create_job_entry_in_ddb(self, event: APIGatewayProxyEvent | None) -> JobModel:
 
@@ -106,6 +112,7 @@ class AssessmentRunner:
             job,
             FinishedAt=(datetime.now().isoformat()),
             JobStatus=str(status.value),
+            **api_call_totals(self.assessment_type, job['JobId'])
         )
 
         self.job_repository.put_job(updated_job)
@@ -139,3 +146,51 @@ def write_task_failure(job_id, assessment_type, account_id, region, service_name
         'Error': error
     }
     job_repository.create_job_task_failure(job_failure)
+
+
+def flush_api_call_metrics(assessment_type: str, job_id: Optional[str], task_id: Optional[str] = None):
+    """Writes the AWS API calls this Lambda made since the last flush to the job, as one item of the task, and to the
+    logs. Never raises, a failure to record metrics must not fail the task."""
+    metrics = api_call_metrics.snapshot_and_clear()
+    if not metrics or not job_id:
+        return
+    logger = Logger(os.getenv('LOG_LEVEL'))
+    logger.info('AWS API calls', extra={
+        'JobId': job_id,
+        'AssessmentType': assessment_type,
+        'ApiCallMetrics': [dict(counters, Service=service_name, Operation=operation_name, Region=region)
+                           for (service_name, operation_name, region), counters in metrics.items()]
+    })
+    try:
+        JobsRepository().put_api_call_metrics(assessment_type, job_id, task_id or uuid.uuid4().hex, metrics)
+    except Exception as error:
+        logger.warning(f"Failed to write API call metrics of job {job_id}: {error}")
+
+
+def api_call_totals(assessment_type: str, job_id: str) -> Dict[str, int]:
+    """Flushes the AWS API calls of this Lambda and sums up the calls of all tasks of the job. Is called once when the
+    job finishes, the totals are stored on the job item so that reading the job does not read the task items."""
+    flush_api_call_metrics(assessment_type, job_id)
+    try:
+        return JobsRepository().find_api_call_totals_by_job_id(job_id)
+    except Exception as error:
+        Logger(os.getenv('LOG_LEVEL')).warning(f"Failed to sum up API call metrics of job {job_id}: {error}")
+        return {}
+
+
+def with_api_call_metrics(assessment_type: str):
+    """Decorates the handler of a Lambda that runs a task of an async job, with the JobId in its event."""
+
+    def decorator(handler: Callable):
+        @functools.wraps(handler)
+        def wrapper(event, context):
+            api_call_metrics.clear()  # drop calls of earlier invocations in a warm execution environment
+            try:
+                return handler(event, context)
+            finally:
+                flush_api_call_metrics(assessment_type, (event or {}).get('JobId'),
+                                       getattr(context, 'aws_request_id', None))
+
+        return wrapper
+
+    return decorator
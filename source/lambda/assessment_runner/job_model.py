@@ -2,7 +2,8 @@
 #  SPDX-License-Identifier: Apache-2.0
 
 import enum
-from typing import TypedDict, List
+from decimal import Decimal
+from typing import TypedDict, List, Dict
 
 from typing_extensions import NotRequired
 
@@ -34,6 +35,13 @@ class JobModel(TypedDict):
     FinishedAt: NotRequired[str]
     ExpiresAt: int
     Error: NotRequired[str]
+    ChangedResources: NotRequired[int]
+    UnchangedResources: NotRequired[int]
+    RemovedResources: NotRequired[int]
+    ApiCalls: NotRequired[int]  # API call totals are summed up over the tasks of the job when it finishes
+    ApiCallErrors: NotRequired[int]
+    ApiCallRetries: NotRequired[int]
+    ApiCallThrottles: NotRequired[int]
 
 
 class JobCreateRequest(TypedDict):
@@ -81,3 +89,48 @@ class JobMarkerModel(TypedDict):
     JobStatus: str
     JobId: str
     ExpiresAt: int
+
+
+class ApiCallMetricsModel(TypedDict):
+    JobId: str
+    AssessmentType: str
+    Service: str
+    Operation: str
+    Region: str
+    Calls: int
+    Errors: int
+    Retries: int
+    Throttles: int
+    LatencyInMs: int  # sum of all calls, divide by Calls for the mean
+    # plus one counter per latency histogram bucket, e.g. LatencyUpTo100Ms
+
+
+class ApiCallMetricsTaskModel(TypedDict):
+    PartitionKey: str  # composed of apiCallMetrics#JobId
+    SortKey: str  # TaskId, e.g. the request id of the Lambda invocation
+    JobId: str
+    AssessmentType: str
+    ApiCallMetrics: List[Dict]  # counters of ApiCallMetricsModel with Service, Operation and Region
+    ExpiresAt: int
+
+
+class ScanDurationModel(TypedDict):
+    PartitionKey: str  # scanDurations
+    SortKey: str  # composed of AssessmentType#AccountId#Service
+    AccountId: str
+    Service: str
+    JobId: str  # job of the latest scan
+    DurationInSeconds: Decimal
+    ItemCount: int  # statements stored
+    ExpiresAt: int
+
+
+class OrganizationSnapshotModel(TypedDict):
+    PartitionKey: str  # organizationSnapshot
+    SortKey: str  # latest
+    JobId: str  # job that built the snapshot
+    BuiltAt: int  # epoch seconds
+    Accounts: int
+    OrganizationalUnits: int
+    Snapshot: bytes  # gzip compressed JSON, see OrganizationSnapshot.to_dict
+    ExpiresAt: int
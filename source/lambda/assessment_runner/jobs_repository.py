@@ -4,10 +4,14 @@
 import json
 import os
 import uuid
+from decimal import Decimal
 from logging import Logger
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple
 
-from assessment_runner.job_model import JobModel, JobCreateRequest, JobTaskFailureCreateRequest, JobMarkerModel
+from botocore.exceptions import ClientError
+
+from assessment_runner.job_model import JobModel, JobCreateRequest, JobTaskFailureCreateRequest, JobMarkerModel, \
+    ApiCallMetricsModel, ScanDurationModel, OrganizationSnapshotModel
 from aws.services.dynamodb import DynamoDB
 from utils.api_gateway_lambda_handler import ClientException
 from utils.base_repository import BaseRepository
@@ -15,14 +19,32 @@ from utils.base_repository import BaseRepository
 PARTITION_KEY_JOBS = 'jobs'
 PARTITION_KEY_JOB_MARKER = 'lastJobMarker'
 PARTITION_KEY_TASK_FAILURES = 'taskFailures'
+PARTITION_KEY_API_CALL_METRICS = 'apiCallMetrics'
+PARTITION_KEY_SCAN_DURATIONS = 'scanDurations'
+PARTITION_KEY_ORGANIZATION_SNAPSHOT = 'organizationSnapshot'
+SORT_KEY_ORGANIZATION_SNAPSHOT = 'latest'
+
+API_CALL_METRIC_DIMENSIONS = ['Service', 'Operation', 'Region']
+
+# attributes of the job with the sum of an API call counter over all tasks
+API_CALL_TOTALS = {'ApiCalls': 'Calls', 'ApiCallErrors': 'Errors', 'ApiCallRetries': 'Retries',
+                   'ApiCallThrottles': 'Throttles'}
 
 
 def sort_key_jobs(assessment_type: str, job_id: str):
     return f'{assessment_type}#{job_id}'
 
 
-def sort_key_task_failure(job_id: str):
-    return f'{job_id}#{uuid.uuid4().hex}'
+def sort_key_task_failure(job_id: str, account_id: str, service_name: str):
+    return f'{job_id}#{account_id}#{service_name}#{uuid.uuid4().hex}'
+
+
+def partition_key_api_call_metrics(job_id: str):
+    return f'{PARTITION_KEY_API_CALL_METRICS}#{job_id}'
+
+
+def sort_key_scan_duration(assessment_type: str, account_id: str, service_name: str):
+    return f'{assessment_type}#{account_id}#{service_name}'
 
 
 class JobsRepository(BaseRepository):
@@ -46,6 +68,26 @@ class JobsRepository(BaseRepository):
     def put_job(self, job: JobModel):
         self.dynamodb_jobs.put_item(job)
 
+    def add_to_job_counters(self, assessment_type: str, job_id: str, counters: Dict[str, int]):
+        """Atomically adds the given values to numeric attributes of an existing job, e.g. from parallel tasks."""
+        if not counters:
+            return
+        names = {f'#counter{index}': name for index, name in enumerate(counters)}
+        values = {f':counter{index}': value for index, value in enumerate(counters.values())}
+        try:
+            self.dynamodb_jobs.update_item({
+                'Key': {'PartitionKey': PARTITION_KEY_JOBS, 'SortKey': sort_key_jobs(assessment_type, job_id)},
+                'UpdateExpression': 'ADD ' + ', '.join(f'#counter{index} :counter{index}'
+                                                       for index in range(len(counters))),
+                'ConditionExpression': 'attribute_exists(PartitionKey)',
+                'ExpressionAttributeNames': names,
+                'ExpressionAttributeValues': values
+            })
+        except ClientError as error:
+            if error.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            self.logger.warning(f"No job with assessmentType {assessment_type}, jobId {job_id} to add counters to")
+
     def get_job(self, assessment_type: str, job_id: str) -> JobModel:
         try:
             return self.dynamodb_jobs.get_by_id(PARTITION_KEY_JOBS, assessment_type + '#' + job_id)
@@ -100,7 +142,7 @@ class JobsRepository(BaseRepository):
         new_failure = dict(
             **request,
             PartitionKey=PARTITION_KEY_TASK_FAILURES,
-            SortKey=sort_key_task_failure(request["JobId"]),
+            SortKey=sort_key_task_failure(request["JobId"], request["AccountId"], request["ServiceName"]),
             ExpiresAt=self._calculate_expires_at()
         )
         self.dynamodb_jobs.put_item(new_failure)
@@ -108,3 +150,77 @@ class JobsRepository(BaseRepository):
 
     def find_task_failures_by_job_id(self, job_id):
         return self.dynamodb_jobs.query(PARTITION_KEY_TASK_FAILURES, job_id)
+
+    def find_task_failures(self, job_id: str, account_id: str, service_name: str):
+        return self.dynamodb_jobs.query_all(PARTITION_KEY_TASK_FAILURES, f'{job_id}#{account_id}#{service_name}#')
+
+    def put_api_call_metrics(self, assessment_type: str, job_id: str, task_id: str,
+                             metrics: Dict[Tuple[str, str, str], Dict[str, int]]):
+        """Writes the API call aggregates of one task of the job, e.g. one Lambda invocation, as a single item in the
+        partition of the job. Tasks never update a shared item, the job totals are summed up once when the job
+        finishes."""
+        if not metrics:
+            return
+        self.dynamodb_jobs.put_item({
+            'PartitionKey': partition_key_api_call_metrics(job_id),
+            'SortKey': task_id,
+            'JobId': job_id,
+            'AssessmentType': assessment_type,
+            'ApiCallMetrics': [dict(counters, Service=service_name, Operation=operation_name,
+                                    Region=region or 'global')
+                               for (service_name, operation_name, region), counters in metrics.items()],
+            'ExpiresAt': self._calculate_expires_at()
+        })
+
+    def find_api_call_metrics_by_job_id(self, job_id: str) -> List[ApiCallMetricsModel]:
+        """Sums up the API call aggregates of all tasks of the job per (service, operation, region)."""
+        aggregates: Dict[Tuple[str, str, str], ApiCallMetricsModel] = {}
+        for task in self.dynamodb_jobs.query_all(partition_key_api_call_metrics(job_id)):
+            for metric in task['ApiCallMetrics']:
+                key = (metric['Service'], metric['Operation'], metric['Region'])
+                aggregate = aggregates.setdefault(key, {'JobId': job_id, 'AssessmentType': task['AssessmentType'],
+                                                        'Service': metric['Service'],
+                                                        'Operation': metric['Operation'],
+                                                        'Region': metric['Region']})
+                for name, value in metric.items():
+                    if name not in API_CALL_METRIC_DIMENSIONS:
+                        aggregate[name] = aggregate.get(name, 0) + value
+        return list(aggregates.values())
+
+    def find_api_call_totals_by_job_id(self, job_id: str) -> Dict[str, int]:
+        metrics = self.find_api_call_metrics_by_job_id(job_id)
+        if not metrics:
+            return {}
+        return {total: sum(metric.get(counter, 0) for metric in metrics)
+                for total, counter in API_CALL_TOTALS.items()}
+
+    def put_scan_duration(self, assessment_type: str, job_id: str, account_id: str, service_name: str,
+                          duration_in_seconds: float, items: int):
+        """Keeps the duration and item count of the latest scan of a service in an account, across jobs, as input
+        for scheduling the next job."""
+        self.dynamodb_jobs.put_item({
+            'PartitionKey': PARTITION_KEY_SCAN_DURATIONS,
+            'SortKey': sort_key_scan_duration(assessment_type, account_id, service_name),
+            'AccountId': account_id,
+            'Service': service_name,
+            'JobId': job_id,
+            'DurationInSeconds': Decimal(str(round(duration_in_seconds, 3))),
+            'ItemCount': items,
+            'ExpiresAt': self._calculate_expires_at()
+        })
+
+    def find_scan_durations(self, assessment_type: str) -> List[ScanDurationModel]:
+        return self.dynamodb_jobs.query_all(PARTITION_KEY_SCAN_DURATIONS, f'{assessment_type}#')
+
+    def put_organization_snapshot(self, snapshot: OrganizationSnapshotModel):
+        self.dynamodb_jobs.put_item(dict(
+            snapshot,
+            PartitionKey=PARTITION_KEY_ORGANIZATION_SNAPSHOT,
+            SortKey=SORT_KEY_ORGANIZATION_SNAPSHOT
+        ))
+
+    def get_organization_snapshot(self) -> Optional[OrganizationSnapshotModel]:
+        try:
+            return self.dynamodb_jobs.get_by_id(PARTITION_KEY_ORGANIZATION_SNAPSHOT, SORT_KEY_ORGANIZATION_SNAPSHOT)
+        except KeyError:
+            return None
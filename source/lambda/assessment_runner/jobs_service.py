@@ -2,13 +2,20 @@
 #  SPDX-License-Identifier: Apache-2.0
 
 import os
+from typing import Dict, List, Optional
 
 from aws_lambda_powertools import Logger
 
 from assessment_runner.job_model import JobModel, JobStatus, JobDetails
 from assessment_runner.jobs_repository import JobsRepository
 from aws.services.dynamodb import DynamoDB
+from policy_explorer.job_diff import JobDiff
+from policy_explorer.policy_evaluation import PolicyEvaluator
+from policy_explorer.policy_explorer_model import PolicyEvaluationRequest
 from utils.api_gateway_lambda_handler import ClientException, ResultListWrapper
+from utils.pagination_helper import decode_next_token, encode_next_token
+
+MAX_EVALUATION_REQUESTS = 1000
 
 
 class JobsService:
@@ -35,6 +42,47 @@ class JobsService:
             'TaskFailures': task_failures
         }
 
+    def diff_jobs(self, job_id: str, other_job_id: str, max_results: int, next_token: Optional[str]) -> Dict:
+        """Policy statements that were added, removed or modified from the scan of job_id to the scan of other_job_id."""
+        assessment_type = 'POLICY_EXPLORER'
+        self.repository.get_job(assessment_type, job_id)
+        self.repository.get_job(assessment_type, other_job_id)
+
+        start_key = decode_next_token(next_token)
+        job_diff = JobDiff(self._get_findings_table(assessment_type, job_id), job_id, other_job_id)
+        results, pagination = job_diff.page(max_results, start_key.get('SortKey') if start_key else None)
+        if pagination['nextToken']:
+            pagination['nextToken'] = encode_next_token({'SortKey': pagination['nextToken']})
+        return {
+            'Results': results,
+            'Pagination': pagination
+        }
+
+    def evaluate_policies(self, job_id: str, requests: List[PolicyEvaluationRequest]) -> Dict:
+        """Decides for each (principal, action, resource) whether the stored policies allow it."""
+        assessment_type = 'POLICY_EXPLORER'
+        job = self.repository.get_job(assessment_type, job_id)
+        last_job = self.repository.get_last_job_marker(assessment_type)
+        if last_job is None or last_job['JobId'] != job_id:
+            # statement items only hold the policies of the latest scan
+            raise ClientException("Bad Request", f"Policies can only be evaluated for the latest job "
+                                                 f"{last_job['JobId'] if last_job else None}")
+        if job['JobStatus'] == str(JobStatus.ACTIVE.value) or not job.get('FinishedAt'):
+            # the marker points to a job from its start, while its statements are still written
+            raise ClientException("Bad Request", f"Policies can only be evaluated when job {job_id} is finished")
+        if not isinstance(requests, list) or len(requests) > MAX_EVALUATION_REQUESTS:
+            raise ClientException("Bad Request", f"Requests must be a list of at most {MAX_EVALUATION_REQUESTS} "
+                                                 f"items with Principal, Action and Resource")
+        for request in requests:
+            if not isinstance(request, dict) or not all(
+                    isinstance(request.get(key), str) and request.get(key) for key in ['Principal', 'Action', 'Resource']):
+                raise ClientException("Bad Request", f"Principal, Action and Resource are required: {request}")
+
+        evaluator = PolicyEvaluator(self._get_findings_table(assessment_type, job_id))
+        return {
+            'Results': evaluator.evaluate(job_id, job['FinishedAt'], requests)
+        }
+
     def _get_findings_table(self, assessment_type, job_id):
         env_variable_name = 'TABLE_' + assessment_type
         findings_table_name = os.getenv(env_variable_name)
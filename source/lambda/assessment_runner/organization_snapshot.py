@@ -0,0 +1,195 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+import gzip
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from os import getenv
+from typing import Dict, List, Optional
+
+from aws_lambda_powertools import Logger
+from botocore.exceptions import ClientError
+
+from assessment_runner.job_model import OrganizationSnapshotModel
+from assessment_runner.jobs_repository import JobsRepository
+from aws.services.organizations import Organizations
+
+
+def get_snapshot_ttl_in_seconds() -> int:
+    return int(getenv('ORGANIZATION_SNAPSHOT_TTL_IN_SECONDS') or 900)
+
+
+def get_snapshot_concurrency() -> int:
+    return max(1, int(getenv('ORGANIZATION_SNAPSHOT_MAX_WORKERS') or 4))
+
+
+class OrganizationSnapshot:
+    """
+    Accounts and organizational units of the organization at one point in time, with the parent of each. Accounts
+    keep Name, Email and Status, OUs their Name, which is all the assessments need to select and label accounts.
+    """
+
+    def __init__(self, organization: Dict):
+        self.organization = organization
+        self.accounts: Dict[str, Dict] = organization['Accounts']
+        self.org_units: Dict[str, Dict] = organization['OrganizationalUnits']
+
+    @property
+    def management_account_id(self) -> str:
+        return self.organization['ManagementAccountId']
+
+    @property
+    def organization_id(self) -> str:
+        return self.organization['OrganizationId']
+
+    @property
+    def root_id(self) -> str:
+        return self.organization['RootId']
+
+    def account_ids(self) -> List[str]:
+        return list(self.accounts)
+
+    def active_account_ids(self) -> List[str]:
+        return [account_id for account_id, account in self.accounts.items() if account.get('Status') == 'ACTIVE']
+
+    def account_ids_in_org_units(self, org_unit_ids: List[str]) -> List[str]:
+        """Accounts directly in the given OUs, in the order of the OUs, like ListAccountsForParent."""
+        return [account_id
+                for org_unit_id in org_unit_ids
+                for account_id, account in self.accounts.items()
+                if account['Parent'] == org_unit_id]
+
+    def parent(self, account_or_org_unit_id: str) -> Optional[str]:
+        node = self.accounts.get(account_or_org_unit_id) or self.org_units.get(account_or_org_unit_id) or {}
+        return node.get('Parent')
+
+    def to_dict(self) -> Dict:
+        return self.organization
+
+    def compress(self) -> bytes:
+        return gzip.compress(json.dumps(self.organization, separators=(',', ':')).encode('utf-8'))
+
+    @staticmethod
+    def decompress(data: bytes) -> 'OrganizationSnapshot':
+        return OrganizationSnapshot(json.loads(gzip.decompress(bytes(data)).decode('utf-8')))
+
+
+class OrganizationSnapshotBuilder:
+    """
+    Walks the OU tree once, level by level from the root. The ListOrganizationalUnitsForParent and
+    ListAccountsForParent calls of all parents on a level run in parallel, bounded by
+    ORGANIZATION_SNAPSHOT_MAX_WORKERS to stay within the Organizations API rate.
+    """
+
+    def __init__(self, organizations: Organizations = None):
+        self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
+        self.organizations = organizations or Organizations()
+
+    def build(self) -> OrganizationSnapshot:
+        started_at = time.perf_counter()
+        description = self.organizations.organization or self.organizations.describe_organization()
+        root_id = self.organizations.list_roots()[0]['Id']
+        accounts: Dict[str, Dict] = {}
+        org_units: Dict[str, Dict] = {}
+
+        level = [root_id]
+        with ThreadPoolExecutor(max_workers=get_snapshot_concurrency(),
+                                thread_name_prefix='organization_snapshot') as executor:
+            while level:
+                children = list(executor.map(self._children, level))
+                next_level = []
+                for parent, (child_org_units, child_accounts) in zip(level, children):
+                    for org_unit in child_org_units:
+                        org_units[org_unit['Id']] = {'Name': org_unit.get('Name'), 'Parent': parent}
+                        next_level.append(org_unit['Id'])
+                    for account in child_accounts:
+                        accounts[account['Id']] = {
+                            'Name': account.get('Name'),
+                            'Email': account.get('Email'),
+                            'Status': account.get('Status'),
+                            'Parent': parent
+                        }
+                level = next_level
+
+        self.logger.info(f"Built organization snapshot with {len(accounts)} accounts and {len(org_units)} OUs in "
+                         f"{time.perf_counter() - started_at:.2f} s")
+        return OrganizationSnapshot({
+            'OrganizationId': description['Id'],
+            'ManagementAccountId': description['MasterAccountId'],
+            'RootId': root_id,
+            'Accounts': accounts,
+            'OrganizationalUnits': org_units
+        })
+
+    def _children(self, parent: str):
+        return (self.organizations.list_organizational_units_for_parent(parent),
+                self.organizations.list_accounts_for_parent(parent))
+
+
+class OrganizationSnapshots:
+    """
+    Shares the latest organization snapshot between the jobs of all assessments while it is younger than
+    ORGANIZATION_SNAPSHOT_TTL_IN_SECONDS: in the process, and in the jobs table for other Lambda functions. A job
+    that finds no fresh snapshot builds one. Storing the snapshot is best effort; without it, the snapshot is only
+    shared within the process, as it is without a jobs table.
+    """
+
+    def __init__(self):
+        self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
+        self._lock = threading.Lock()
+        self._snapshot: Optional[OrganizationSnapshot] = None
+        self._built_at = 0
+
+    def get(self, job_id: str = None) -> OrganizationSnapshot:
+        with self._lock:
+            if self._snapshot is not None and self._is_fresh(self._built_at):
+                return self._snapshot
+
+            stored = self._load()
+            if stored is not None and self._is_fresh(int(stored['BuiltAt'])):
+                self.logger.debug(f"Using organization snapshot of job {stored.get('JobId')}")
+                self._snapshot = OrganizationSnapshot.decompress(stored['Snapshot'])
+                self._built_at = int(stored['BuiltAt'])
+                return self._snapshot
+
+            self._snapshot = OrganizationSnapshotBuilder().build()
+            self._built_at = int(time.time())
+            self._store(job_id)
+            return self._snapshot
+
+    def clear(self):
+        with self._lock:
+            self._snapshot = None
+            self._built_at = 0
+
+    @staticmethod
+    def _is_fresh(built_at: int) -> bool:
+        return time.time() - built_at < get_snapshot_ttl_in_seconds()
+
+    def _load(self) -> Optional[OrganizationSnapshotModel]:
+        if not getenv('TABLE_JOBS'):
+            return None
+        try:
+            return JobsRepository().get_organization_snapshot()
+        except ClientError as err:
+            self.logger.warning(f"Unable to load the organization snapshot: {err}")
+            return None
+
+    def _store(self, job_id: Optional[str]):
+        if not getenv('TABLE_JOBS'):
+            return
+        try:
+            JobsRepository().put_organization_snapshot({
+                'JobId': job_id,
+                'BuiltAt': self._built_at,
+                'Accounts': len(self._snapshot.accounts),
+                'OrganizationalUnits': len(self._snapshot.org_units),
+                'Snapshot': self._snapshot.compress(),
+                'ExpiresAt': self._built_at + get_snapshot_ttl_in_seconds()
+            })
+        except ClientError as err:
+            self.logger.warning(f"Unable to store the organization snapshot: {err}")
+
+
+organization_snapshots = OrganizationSnapshots()
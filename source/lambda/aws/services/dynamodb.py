@@ -2,20 +2,134 @@
 #  SPDX-License-Identifier: Apache-2.0
 
 # !/bin/python
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from os import getenv
-from typing import Dict, List
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 
 from aws_lambda_powertools import Logger
-from boto3.dynamodb.conditions import Key, Attr, ConditionBase
+from boto3.dynamodb.conditions import Key, Attr, ConditionBase, ConditionExpressionBuilder
 from mypy_boto3_dynamodb.service_resource import DynamoDBServiceResource, Table
 from mypy_boto3_dynamodb.type_defs import QueryOutputTableTypeDef, ScanOutputTableTypeDef, \
     UpdateItemInputTableUpdateItemTypeDef, GetItemOutputTableTypeDef
 
 from aws.utils.boto3_session import Boto3Session
+from aws.utils.exceptions import DynamoDBWriteException, DynamoDBReadException
 from policy_explorer.policy_explorer_model import DdbPagination
 from utils.list_utils import split_list_by_batch_size
 
 MAX_BATCH_SIZE = 25
+MAX_BATCH_GET_SIZE = 100
+
+MAX_UNPROCESSED_ITEMS_RETRIES = 8
+UNPROCESSED_ITEMS_BASE_DELAY_IN_SECONDS = 0.05
+UNPROCESSED_ITEMS_MAX_DELAY_IN_SECONDS = 5
+
+
+def get_stream_flush_size() -> int:
+    return int(getenv('DYNAMODB_STREAM_FLUSH_SIZE') or 500)
+
+
+def get_writer_threads() -> int:
+    return max(1, int(getenv('DYNAMODB_WRITER_THREADS') or 4))
+
+
+def get_scan_segments() -> int:
+    return max(1, int(getenv('DYNAMODB_SCAN_SEGMENTS') or 4))
+
+
+class ParallelBatchWriter:
+    """
+    Long-lived writer for one table that sends BatchWriteItem requests of up to MAX_BATCH_SIZE items
+    from several threads in parallel. UnprocessedItems are retried with exponential backoff and full jitter.
+    """
+
+    def __init__(self, table: Table, threads: int = None):
+        self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
+        self.table_name = table.table_name
+        self.client = table.meta.client  # low-level clients are thread safe, resources are not
+        self.executor = ThreadPoolExecutor(max_workers=threads or get_writer_threads(),
+                                           thread_name_prefix=f"ddb_writer_{self.table_name}")
+        self._lock = threading.Lock()
+        self.items_written = 0
+        self.consumed_write_capacity_units = 0.0
+        self.unprocessed_retries = 0
+        self.seconds_writing = 0.0
+
+    def write(self, items: List[Dict]) -> int:
+        """Writes all items and blocks until they are persisted. Returns the number of items written."""
+        return self._send([{'PutRequest': {'Item': item}} for item in self._deduplicate_keys(items)])
+
+    def delete(self, keys: List[Dict]) -> int:
+        """Deletes the items with the given keys and blocks until they are deleted. Returns the number of keys."""
+        return self._send([{'DeleteRequest': {'Key': key}} for key in self._deduplicate_keys(keys)])
+
+    def _send(self, requests: List[Dict]) -> int:
+        started_at = time.perf_counter()
+        batches = split_list_by_batch_size(requests, MAX_BATCH_SIZE)
+        written = sum(self.executor.map(self._write_batch, batches))
+        elapsed = time.perf_counter() - started_at
+        with self._lock:
+            self.seconds_writing += elapsed
+        self.logger.debug(f"Wrote {written} items to {self.table_name} in {elapsed:.3f}s",
+                          extra={'DynamoDBWriter': self.statistics()})
+        return written
+
+    def statistics(self) -> Dict:
+        with self._lock:
+            return {
+                'TableName': self.table_name,
+                'ItemsWritten': self.items_written,
+                'ItemsPerSecond': round(self.items_written / self.seconds_writing, 1) if self.seconds_writing else 0,
+                'ConsumedWriteCapacityUnits': self.consumed_write_capacity_units,
+                'UnprocessedItemsRetries': self.unprocessed_retries
+            }
+
+    def _write_batch(self, batch: List[Dict]) -> int:
+        request_items = {self.table_name: batch}
+        for attempt in range(MAX_UNPROCESSED_ITEMS_RETRIES + 1):
+            response = self.client.batch_write_item(RequestItems=request_items, ReturnConsumedCapacity='TOTAL')
+            self._record_consumed_capacity(response)
+            request_items = response.get('UnprocessedItems') or {}
+            if not request_items:
+                with self._lock:
+                    self.items_written += len(batch)
+                return len(batch)
+            with self._lock:
+                self.unprocessed_retries += 1
+            time.sleep(random.uniform(0, min(UNPROCESSED_ITEMS_MAX_DELAY_IN_SECONDS,
+                                             UNPROCESSED_ITEMS_BASE_DELAY_IN_SECONDS * 2 ** attempt)))
+
+        unprocessed = len(request_items.get(self.table_name, []))
+        self.logger.error(f"AWS_Solution_Error: {unprocessed} items remained unprocessed in table {self.table_name}")
+        raise DynamoDBWriteException(self.table_name, unprocessed)
+
+    def _record_consumed_capacity(self, response: Dict):
+        consumed = sum(capacity.get('CapacityUnits', 0) for capacity in response.get('ConsumedCapacity', []))
+        with self._lock:
+            self.consumed_write_capacity_units += consumed
+
+    @staticmethod
+    def _deduplicate_keys(items: List[Dict]) -> List[Dict]:
+        # BatchWriteItem rejects requests containing the same key twice, the last item wins like in put_item
+        items_by_key = {(item.get('PartitionKey'), item.get('SortKey')): item for item in items}
+        return list(items_by_key.values())
+
+
+_writers: Dict[str, ParallelBatchWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_batch_writer(table: Table) -> ParallelBatchWriter:
+    with _writers_lock:
+        writer = _writers.get(table.table_name)
+        if writer is None:
+            writer = ParallelBatchWriter(table)
+            _writers[table.table_name] = writer
+        return writer
 
 
 class DynamoDB:
@@ -27,47 +141,75 @@ class DynamoDB:
         self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
         dynamodb_resource: DynamoDBServiceResource = Boto3Session('dynamodb', region=getenv('AWS_REGION')).get_resource()
         self.table: Table = dynamodb_resource.Table(table_name)
+        self._read_lock = threading.Lock()
+        self.items_read = 0
+        self.consumed_read_capacity_units = 0.0
         self.next_token_returned_msg = "Next Token Returned: {}"
         self.logger.debug("Initialized client for DynamoDB table: " + self.table.table_name)
 
     def put_items(self, items: list):
         """
-        Create items list into chunks of
-        MAX_BATCH_SIZE and put them into dynamodb table
+        Put items into the dynamodb table using the parallel batch writer of the table,
+        in batches of MAX_BATCH_SIZE items
         :param items: list of put items
         :return:
         """
-        self.logger.debug(f"Putting following items in DynamoDB in batches :"
-                          f" {items}")
-
-        list_of_chunks = split_list_by_batch_size(items, MAX_BATCH_SIZE)
-        for chunk in list_of_chunks:
-            self.logger.debug(f"Adding {len(chunk)} items to "
-                              f"DynamoDB: {chunk}")
-            self.put_batch_items(chunk)
+        self.logger.debug(f"Putting {len(items)} items in DynamoDB table {self.table.table_name}")
+        try:
+            get_batch_writer(self.table).write(items)
+        except Exception:
+            self.logger.error(f"AWS_Solution_Error: Error while putting {len(items)} items "
+                              f"in the DynamoDB table {self.table.table_name}")
+            raise
 
-    def put_batch_items(self, chunk: List):
+    def delete_items(self, keys: List[Dict]):
         """
-        Adds items in batch of 25 items.
+        Deletes items by their primary keys using the parallel batch writer of the table,
+        in batches of MAX_BATCH_SIZE keys
+        :param keys: list of {'PartitionKey': ..., 'SortKey': ...} dicts
+        :return:
         """
-        self.logger.debug(f"Putting following items in DynamoDB:"
-                          f" {chunk}")
+        self.logger.debug(f"Deleting {len(keys)} items from DynamoDB table {self.table.table_name}")
         try:
-            with self.table.batch_writer() as writer:
-                for item in chunk:
-                    writer.put_item(
-                        Item=item
-                    )
+            get_batch_writer(self.table).delete(keys)
         except Exception:
-            self.logger.error(f"AWS_Solution_Error: Error while putting the "
-                              f"items in the DynamoDB: {chunk}")
+            self.logger.error(f"AWS_Solution_Error: Error while deleting {len(keys)} items "
+                              f"from the DynamoDB table {self.table.table_name}")
             raise
-        self.logger.debug(f"Successfully entered the following items in the "
-                          f"dynamoDB: {chunk}")
+
+    def put_items_streaming(self, items: Iterable[Dict], flush_size: int = None) -> int:
+        """
+        Consumes items lazily, e.g. from a generator, and writes them every flush_size items,
+        so that at most flush_size items are held in memory.
+        :param items: iterable of put items
+        :param flush_size: number of items to buffer before writing them
+        :return: number of items written
+        """
+        flush_size = flush_size or get_stream_flush_size()
+        buffer = []
+        written = 0
+        for item in items:
+            buffer.append(item)
+            if len(buffer) >= flush_size:
+                self.put_items(buffer)
+                written += len(buffer)
+                buffer = []
+        if buffer:
+            self.put_items(buffer)
+            written += len(buffer)
+        self.logger.info(f"Streamed {written} items into table {self.table.table_name}",
+                         extra={'DynamoDBWriter': get_batch_writer(self.table).statistics()})
+        return written
+
+    def put_batch_items(self, chunk: List):
+        """
+        Adds items in batch of 25 items.
+        """
+        self.put_items(chunk)
 
     def find_items_by_partition_key(self, value: str) -> List[Dict]:
         """
-        find all items from the DynamoDB that match the given partition key
+        find all items from the DynamoDB that match the given partition key, reading all pages
         :param
             value for the partition key
         :returns
@@ -76,10 +218,7 @@ class DynamoDB:
         try:
             self.logger.debug(f"Getting following items in DynamoDB:"
                               f" {value}")
-            response: QueryOutputTableTypeDef = self.table.query(
-                KeyConditionExpression=Key('PartitionKey').eq(value)
-            )
-            return response.get('Items')
+            return self.query_all(value)
         except Exception:
             self.logger.error(f"AWS_Solution_Error: Error while getting the "
                               f"items in the DynamoDB: {value}")
@@ -112,9 +251,9 @@ class DynamoDB:
             raise
 
     def find_all(self) -> List[Dict]:
+        """Returns all items of the table, read with a parallel Scan of all pages."""
         self.logger.debug(f"Getting all items from DynamoDB table {self.table.table_name}:")
-        response: ScanOutputTableTypeDef = self.table.scan()
-        return response['Items']
+        return list(self.scan_items())
 
     def get_by_id(self, partition_key, sort_key) -> Dict:
         self.logger.debug(f"Getting item from DynamoDB table {self.table.table_name}:")
@@ -126,6 +265,205 @@ class DynamoDB:
         )
         return response['Item']
 
+    def query_pages(self, partition_key: str, sort_key_prefix: str = '', projection_expression: str = None,
+                    exclusive_start_key: Dict = None) -> Iterator[Dict]:
+        """
+        Yields the items of the partition that start with sort_key_prefix in SortKey order,
+        reading one page at a time, so that only one page is held in memory.
+        """
+        key_condition_expression = Key('PartitionKey').eq(partition_key)
+        if sort_key_prefix:
+            key_condition_expression = key_condition_expression & Key('SortKey').begins_with(sort_key_prefix)
+        query_params: dict = dict(KeyConditionExpression=key_condition_expression, ReturnConsumedCapacity='TOTAL')
+        if projection_expression:
+            query_params['ProjectionExpression'] = projection_expression
+        if exclusive_start_key:
+            query_params['ExclusiveStartKey'] = exclusive_start_key
+        while True:
+            response: QueryOutputTableTypeDef = self.table.query(**query_params)
+            self._record_read(response)
+            yield from response.get('Items', [])
+            if not response.get('LastEvaluatedKey'):
+                return
+            query_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def query_all(self, partition_key: str, sort_key_prefix: str = '', projection_expression: str = None) -> List[Dict]:
+        """
+        Returns all items in the partition that start with sort_key_prefix, reading all pages.
+        """
+        return list(self.query_pages(partition_key, sort_key_prefix, projection_expression))
+
+    def query_sort_keys(self, partition_key: str, sort_key_prefix: str = '') -> List[str]:
+        """
+        Returns the sort keys of all items in the partition that start with sort_key_prefix, reading all pages.
+        """
+        return [item['SortKey'] for item in self.query_all(partition_key, sort_key_prefix, 'SortKey')]
+
+    def batch_get_items(self, keys: List[Dict]) -> List[Dict]:
+        """
+        Gets items by their primary keys using BatchGetItem, in batches of MAX_BATCH_GET_SIZE keys.
+        UnprocessedKeys are retried with exponential backoff and full jitter. Missing items are not returned.
+        :param keys: list of {'PartitionKey': ..., 'SortKey': ...} dicts
+        :return: list of found items, in no particular order
+        """
+        client = self.table.meta.client
+        items = []
+        for batch in split_list_by_batch_size(keys, MAX_BATCH_GET_SIZE):
+            request_items = {self.table.table_name: {'Keys': batch}}
+            for attempt in range(MAX_UNPROCESSED_ITEMS_RETRIES + 1):
+                response = client.batch_get_item(RequestItems=request_items)
+                items.extend(response.get('Responses', {}).get(self.table.table_name, []))
+                request_items = response.get('UnprocessedKeys') or {}
+                if not request_items:
+                    break
+                time.sleep(random.uniform(0, min(UNPROCESSED_ITEMS_MAX_DELAY_IN_SECONDS,
+                                                 UNPROCESSED_ITEMS_BASE_DELAY_IN_SECONDS * 2 ** attempt)))
+            else:
+                self.logger.error(f"AWS_Solution_Error: keys remained unprocessed in table {self.table.table_name}")
+                raise DynamoDBReadException(self.table.table_name, len(request_items[self.table.table_name]['Keys']))
+        return items
+
+    def scan_parallel(self, filter_expression: ConditionBase = None, attributes: List[str] = None,
+                      segments: int = None) -> Iterator[List[Dict]]:
+        """
+        Yields the pages of a parallel Scan of the whole table in the order they arrive, each of the segments is
+        scanned on its own thread.
+        :param filter_expression: condition on the items, e.g. Attr('PartitionKey').is_in([...])
+        :param attributes: names of the attributes to read, all if None
+        :param segments: number of segments scanned in parallel, DYNAMODB_SCAN_SEGMENTS by default
+        """
+        segments = segments or get_scan_segments()
+        request = self._read_request(filter_expression=filter_expression, attributes=attributes)
+        requests = [dict(request, Segment=segment, TotalSegments=segments) for segment in range(segments)]
+        return self._read_parallel('scan', requests, segments)
+
+    def scan_items(self, filter_expression: ConditionBase = None, attributes: List[str] = None,
+                   segments: int = None) -> Iterator[Dict]:
+        """Yields all items of a parallel Scan, see scan_parallel."""
+        for page in self.scan_parallel(filter_expression, attributes, segments):
+            yield from page
+
+    def query_parallel(self, partition_keys: Iterable[str], sort_key_prefix: str = '', attributes: List[str] = None,
+                       threads: int = None) -> Iterator[List[Dict]]:
+        """
+        Yields the pages of the items in all given partitions that start with sort_key_prefix, in the order they
+        arrive. A partition cannot be split into segments, so the partitions are queried in parallel instead, on up to
+        DYNAMODB_SCAN_SEGMENTS threads by default.
+        """
+        requests = []
+        for partition_key in partition_keys:
+            key_condition_expression = Key('PartitionKey').eq(partition_key)
+            if sort_key_prefix:
+                key_condition_expression = key_condition_expression & Key('SortKey').begins_with(sort_key_prefix)
+            requests.append(self._read_request(key_condition_expression=key_condition_expression,
+                                               attributes=attributes))
+        return self._read_parallel('query', requests, threads or get_scan_segments())
+
+    def query_items(self, partition_keys: Iterable[str], sort_key_prefix: str = '', attributes: List[str] = None,
+                    threads: int = None) -> Iterator[Dict]:
+        """Yields all items of the given partitions, see query_parallel."""
+        for page in self.query_parallel(partition_keys, sort_key_prefix, attributes, threads):
+            yield from page
+
+    def read_statistics(self) -> Dict:
+        with self._read_lock:
+            return {
+                'TableName': self.table.table_name,
+                'ItemsRead': self.items_read,
+                'ConsumedReadCapacityUnits': self.consumed_read_capacity_units
+            }
+
+    def _read_parallel(self, operation: str, requests: List[Dict], threads: int) -> Iterator[List[Dict]]:
+        """
+        Runs each Scan or Query request with all its pages on a thread pool and yields the pages as they arrive. The
+        low-level client is used, and at most two pages per thread are buffered, so that memory stays bounded when
+        the consumer is slower than DynamoDB.
+        """
+        # low-level clients are thread safe, resources are not. The client of the resource still converts attribute
+        # values like the resource, but its condition builder is shared, so expressions are built by _read_request
+        read = getattr(self.table.meta.client, operation)
+        threads = max(1, min(threads, len(requests)))
+        pages: queue.Queue = queue.Queue(maxsize=2 * threads)
+        stopped = threading.Event()
+        started_at = time.perf_counter()
+
+        def offer(page):
+            while not stopped.is_set():
+                try:
+                    pages.put(page, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def read_all_pages(request: Dict):
+            try:
+                params = dict(request, ReturnConsumedCapacity='TOTAL')
+                while not stopped.is_set():
+                    response = read(**params)
+                    self._record_read(response)
+                    offer(response.get('Items', []))
+                    if not response.get('LastEvaluatedKey'):
+                        break
+                    params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+                offer(None)
+            except Exception as error:
+                offer(error)
+
+        if not requests:
+            return
+        executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix=f"ddb_{operation}_{self.table.table_name}")
+        try:
+            for request in requests:
+                executor.submit(read_all_pages, request)
+            finished = 0
+            while finished < len(requests):
+                page = pages.get()
+                if page is None:
+                    finished += 1
+                elif isinstance(page, Exception):
+                    self.logger.error(f"AWS_Solution_Error: Error in parallel {operation} of the DynamoDB table "
+                                      f"{self.table.table_name}")
+                    raise page
+                else:
+                    yield page
+            self.logger.debug(f"Parallel {operation} of {len(requests)} requests took "
+                              f"{time.perf_counter() - started_at:.3f}s",
+                              extra={'DynamoDBReader': self.read_statistics()})
+        finally:
+            stopped.set()
+            executor.shutdown(wait=False)
+
+    def _read_request(self, key_condition_expression: ConditionBase = None, filter_expression: ConditionBase = None,
+                      attributes: List[str] = None) -> Dict:
+        request: Dict = {'TableName': self.table.table_name}
+        names: Dict[str, str] = {}
+        values: Dict[str, object] = {}
+        builder = ConditionExpressionBuilder()  # one builder, so that placeholders of both expressions differ
+        if key_condition_expression is not None:
+            expression = builder.build_expression(key_condition_expression, is_key_condition=True)
+            request['KeyConditionExpression'] = expression.condition_expression
+            names.update(expression.attribute_name_placeholders)
+            values.update(expression.attribute_value_placeholders)
+        if filter_expression is not None:
+            expression = builder.build_expression(filter_expression)
+            request['FilterExpression'] = expression.condition_expression
+            names.update(expression.attribute_name_placeholders)
+            values.update(expression.attribute_value_placeholders)
+        if attributes:
+            projection = {f"#p{index}": attribute for index, attribute in enumerate(attributes)}
+            request['ProjectionExpression'] = ', '.join(projection)
+            names.update(projection)
+        if names:
+            request['ExpressionAttributeNames'] = names
+        if values:
+            request['ExpressionAttributeValues'] = values
+        return request
+
+    def _record_read(self, response: Dict):
+        with self._read_lock:
+            self.items_read += response.get('Count', 0)
+            self.consumed_read_capacity_units += (response.get('ConsumedCapacity') or {}).get('CapacityUnits', 0)
+
     def put_item(self, item):
         self.table.put_item(Item=item)
         self.logger.debug(f"Trying to add or replace item in table {self.table.table_name}: "
@@ -180,8 +518,13 @@ class DynamoDB:
     def query_paginated(self, partition_key,
                        sort_key_prefix='',
                        filters: Dict = dict(),
-                       pagination: DdbPagination = dict()
+                       pagination: DdbPagination = dict(),
+                       page_filter: Callable[[List[Dict]], List[Dict]] = None
                        ) -> Dict:
+        """
+        Returns up to pagination['Limit'] items that contain all filter values. page_filter is applied to every page
+        that DynamoDB returns, for conditions that a FilterExpression cannot express.
+        """
         key_condition_expression = Key('PartitionKey').eq(partition_key) & Key('SortKey').begins_with(sort_key_prefix)
 
         filter_expression = None
@@ -196,12 +539,13 @@ class DynamoDB:
         start_key = pagination.get('ExclusiveStartKey')
         
         # When filters are present, iterate through pages to collect enough filtered results
-        if filter_expression is not None:
+        if filter_expression is not None or page_filter is not None:
             return self._query_with_filter_pagination(
                 key_condition_expression,
                 filter_expression,
                 requested_limit,
-                start_key
+                start_key,
+                page_filter
             )
         
         # No filters - simple query with limit
@@ -224,9 +568,10 @@ class DynamoDB:
     def _query_with_filter_pagination(
         self,
         key_condition_expression: ConditionBase,
-        filter_expression: ConditionBase,
+        filter_expression: Optional[ConditionBase],
         requested_limit: int,
-        start_key: Dict = None
+        start_key: Dict = None,
+        page_filter: Callable[[List[Dict]], List[Dict]] = None
     ) -> Dict:
         collected_items: List[Dict] = []
         last_evaluated_key = start_key
@@ -238,15 +583,17 @@ class DynamoDB:
         while len(collected_items) < requested_limit:
             query_params: dict = dict(
                 KeyConditionExpression=key_condition_expression,
-                FilterExpression=filter_expression,
                 Limit=batch_size,
             )
+            if filter_expression is not None:
+                query_params['FilterExpression'] = filter_expression
             if last_evaluated_key:
                 query_params['ExclusiveStartKey'] = last_evaluated_key
 
             response: QueryOutputTableTypeDef = self.table.query(**query_params)
             
-            collected_items.extend(response.get('Items', []))
+            items = response.get('Items', [])
+            collected_items.extend(page_filter(items) if page_filter is not None else items)
             total_scanned += response.get('ScannedCount', 0)
             last_evaluated_key = response.get('LastEvaluatedKey')
             
@@ -280,9 +627,13 @@ class DynamoDB:
             'ScannedCount': total_scanned
         }
 
-    def delete_item(self, key):
+    def delete_item(self, key, condition: ConditionBase = None):
+        """Raises a ClientError with code ConditionalCheckFailedException if the condition is not met."""
         self.logger.debug(f"Trying to delete item from table {self.table.table_name}: {key}")
-        self.table.delete_item(Key=key)
+        if condition is None:
+            self.table.delete_item(Key=key)
+        else:
+            self.table.delete_item(Key=key, ConditionExpression=condition)
         self.logger.debug(f"Deleted item from table {self.table.table_name}: {key}")
 
     def find_items_by_secondary_index(self, index_name: str, key: str, index_value: str) -> List[Dict]:
@@ -0,0 +1,32 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+# !/bin/python
+
+import json
+from os import getenv
+
+from aws_lambda_powertools import Logger
+from mypy_boto3_lambda.type_defs import InvocationResponseTypeDef
+
+from aws.utils.boto3_session import Boto3Session
+
+
+class LambdaInvoker:
+    def __init__(self, **kwargs):
+        self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
+        boto_session = Boto3Session('lambda', **kwargs)
+        self.lambda_client = boto_session.get_client()
+
+    def invoke_async(self, function_name: str, payload: dict) -> InvocationResponseTypeDef:
+        """Queues an invocation of the function and returns without waiting for its result."""
+        try:
+            self.logger.info(f"Invoking function {function_name} asynchronously")
+            return self.lambda_client.invoke(
+                FunctionName=function_name,
+                InvocationType='Event',
+                Payload=json.dumps(payload).encode('utf-8')
+            )
+        except Exception as e:
+            self.logger.error(e)
+            raise
@@ -3,13 +3,16 @@
 
 # !/bin/python
 from os import getenv
+from typing import Optional
+
 from aws_lambda_powertools import Logger
 from botocore.exceptions import ClientError
 from mypy_boto3_organizations.client import OrganizationsClient
 from mypy_boto3_organizations.type_defs import ListDelegatedAdministratorsResponseTypeDef, \
     DelegatedAdministratorTypeDef, ListDelegatedServicesForAccountResponseTypeDef, DelegatedServiceTypeDef, \
     EnabledServicePrincipalTypeDef, AccountTypeDef, ListAccountsResponseTypeDef, PolicySummaryTypeDef, \
-    DescribePolicyResponseTypeDef, ListPoliciesResponseTypeDef
+    DescribePolicyResponseTypeDef, ListPoliciesResponseTypeDef, RootTypeDef, OrganizationalUnitTypeDef, \
+    OrganizationTypeDef
 
 from aws.services.security_token_service import SecurityTokenService
 from aws.utils.boto3_session import Boto3Session
@@ -18,9 +21,10 @@ NEXT_TOKEN_RETURNED = "Next Token Returned"
 
 
 class Organizations:
-    def __init__(self):
+    def __init__(self, management_account_id: str = None):
         self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
-        management_account_id = self._get_management_account_id()
+        self.organization: Optional[OrganizationTypeDef] = None
+        management_account_id = management_account_id or self._get_management_account_id()
         role_name = getenv('ORG_MANAGEMENT_ROLE_NAME')
         self.logger.debug(f"Assuming role {role_name} in {management_account_id}")
         management_credentials = SecurityTokenService().assume_role_by_name(management_account_id, role_name)
@@ -28,26 +32,33 @@ class Organizations:
         self.org_client: OrganizationsClient = boto_session.get_client()
 
     def _get_management_account_id(self) -> str:
+        self.organization = self.describe_organization()
+        master_account_id = self.organization.get('MasterAccountId')
+        self.logger.debug(f"Management Account Id: {master_account_id}")
+        return master_account_id
+
+    def describe_organization(self) -> OrganizationTypeDef:
+        """Describes the organization with the credentials of the hub account, which can do so as a member."""
         try:
             boto_session = Boto3Session('organizations')
             org_client: OrganizationsClient = boto_session.get_client()
             response = org_client.describe_organization()
-            master_account_id = response.get('Organization').get('MasterAccountId')
-            self.logger.debug(f"Management Account Id: {master_account_id}")
-            return master_account_id
+            return response.get('Organization')
         except ClientError as err:
             self.logger.error(err)
             raise
 
     def get_account_ids_in_org_units(self, org_unit_ids: list[str]) -> list[str]:
+        """Accounts directly in the given OUs, listed with the API. Jobs read them from
+        organization_snapshots.get(job_id).account_ids_in_org_units instead."""
         accounts_ids = list(
             account['Id']
             for org_unit in org_unit_ids
-            for account in self._get_accounts_for_parent(org_unit)
+            for account in self.list_accounts_for_parent(org_unit)
         )
         return accounts_ids
 
-    def _get_accounts_for_parent(self, parent):
+    def list_accounts_for_parent(self, parent: str) -> list[AccountTypeDef]:
         try:
             accounts = []
             response = self.org_client.list_accounts_for_parent(ParentId=parent)
@@ -68,6 +79,27 @@ class Organizations:
             self.logger.error(err)
             raise
 
+    def list_roots(self) -> list[RootTypeDef]:
+        try:
+            roots = []
+            for page in self.org_client.get_paginator('list_roots').paginate():
+                roots.extend(page.get('Roots', []))
+            return roots
+        except ClientError as err:
+            self.logger.error(err)
+            raise
+
+    def list_organizational_units_for_parent(self, parent: str) -> list[OrganizationalUnitTypeDef]:
+        try:
+            org_units = []
+            for page in self.org_client.get_paginator('list_organizational_units_for_parent').paginate(
+                    ParentId=parent):
+                org_units.extend(page.get('OrganizationalUnits', []))
+            return org_units
+        except ClientError as err:
+            self.logger.error(err)
+            raise
+
     def list_active_account_ids(self) -> list[str]:
         org_accounts = self.list_accounts()
         return list(account['Id']
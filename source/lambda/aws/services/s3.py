@@ -2,7 +2,7 @@
 #  SPDX-License-Identifier: Apache-2.0
 import json
 from os import getenv
-from typing import Dict
+from typing import Dict, Iterable
 
 from aws_lambda_powertools import Logger
 from botocore.exceptions import ClientError
@@ -102,6 +102,18 @@ class S3:
             self.logger.error(str(err))
             raise
 
+    def write_json_lines_as_file(self, bucket_name: str, qualified_file_name: str, json_objects: Iterable[Dict]):
+        try:
+            self.s3_client.put_object(
+                Bucket=bucket_name,
+                Key=qualified_file_name,
+                Body=''.join(json.dumps(json_object) + '\n' for json_object in json_objects).encode('utf-8'),
+                ContentType="application/jsonl"
+            )
+        except ClientError as err:
+            self.logger.error(str(err))
+            raise
+
 
 class Glacier:
     def __init__(self, account_id, region):
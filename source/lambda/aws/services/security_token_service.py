@@ -9,6 +9,7 @@ from mypy_boto3_sts import STSClient
 from mypy_boto3_sts.type_defs import CredentialsTypeDef, AssumeRoleResponseTypeDef, GetCallerIdentityResponseTypeDef
 
 from aws.utils.boto3_session import Boto3Session
+from aws.utils.credential_cache import credential_cache
 from aws.utils.get_partition import partition_name_for_current_region
 
 
@@ -46,6 +47,14 @@ class SecurityTokenService:
             raise
 
     def assume_role_by_arn(self, role_arn: str, session_name: str, duration: int = 900) -> CredentialsTypeDef:
+        return credential_cache.get_or_assume(
+            role_arn,
+            session_name,
+            lambda: self._assume_role(role_arn, session_name, duration),
+            duration
+        )
+
+    def _assume_role(self, role_arn: str, session_name: str, duration: int) -> CredentialsTypeDef:
         try:
             response: AssumeRoleResponseTypeDef = self.sts_client.assume_role(
                 RoleArn=role_arn,
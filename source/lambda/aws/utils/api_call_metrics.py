@@ -0,0 +1,139 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+import threading
+import time
+from os import getenv
+from typing import Dict, Tuple
+
+from aws_lambda_powertools import Logger
+
+from aws.utils.rate_limiter import THROTTLING_ERROR_CODES
+
+ApiCallKey = Tuple[str, str, str]  # (service name, operation name, region)
+
+# Upper bounds of the latency histogram buckets in milliseconds, calls above the last bound count as LatencyOver
+LATENCY_BUCKETS_IN_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+STARTED_AT = 'api_call_metrics_started_at'
+
+
+def is_api_call_metrics_enabled() -> bool:
+    return (getenv('API_CALL_METRICS_ENABLED') or 'true').lower() == 'true'
+
+
+def latency_bucket(latency_in_ms: float) -> str:
+    for upper_bound in LATENCY_BUCKETS_IN_MS:
+        if latency_in_ms <= upper_bound:
+            return f"LatencyUpTo{upper_bound}Ms"
+    return f"LatencyOver{LATENCY_BUCKETS_IN_MS[-1]}Ms"
+
+
+class ApiCallStatistics:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.throttles = 0
+        self.latency_in_ms = 0.0
+        self.histogram: Dict[str, int] = {}
+
+    def record(self, latency_in_ms: float, retries: int, failed: bool):
+        self.calls += 1
+        self.retries += retries
+        self.latency_in_ms += latency_in_ms
+        if failed:
+            self.errors += 1
+        bucket = latency_bucket(latency_in_ms)
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+    def counters(self) -> Dict[str, int]:
+        """Returns all statistics as integer counters, which can be added up across Lambda invocations."""
+        return dict({
+            'Calls': self.calls,
+            'Errors': self.errors,
+            'Retries': self.retries,
+            'Throttles': self.throttles,
+            'LatencyInMs': round(self.latency_in_ms)
+        }, **self.histogram)
+
+
+class ApiCallMetrics:
+    """Aggregates call count, latency histogram, retries and throttling responses per (service, operation, region)
+    for all clients of the process.
+
+    Attached to boto3 clients through botocore event hooks: before-call starts the clock, needs-retry counts
+    throttling responses of every attempt, after-call records the call with the retries botocore made, error
+    responses included, and after-call-error records calls that failed without a response. Latency includes retries
+    and their backoff, but not the wait of the client side rate limiter, which is attached before these hooks.
+    """
+
+    def __init__(self):
+        self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
+        self._lock = threading.Lock()
+        self._statistics: Dict[ApiCallKey, ApiCallStatistics] = {}
+
+    def attach(self, client):
+        service_name = client.meta.service_model.service_name
+        region = client.meta.region_name
+        events = client.meta.events
+
+        def before_call(context=None, **_kwargs):
+            if context is not None:
+                context[STARTED_AT] = time.perf_counter()
+
+        def needs_retry(response=None, operation=None, **_kwargs):
+            if response is None or operation is None:
+                return None
+            if response[1].get('Error', {}).get('Code') in THROTTLING_ERROR_CODES:
+                with self._lock:
+                    self._statistics_for((service_name, operation.name, region)).throttles += 1
+            return None  # leave the retry decision to the configured botocore retry mode
+
+        def after_call(parsed=None, model=None, context=None, **_kwargs):
+            parsed = parsed or {}
+            retries = parsed.get('ResponseMetadata', {}).get('RetryAttempts', 0)
+            self._record(service_name, model, region, context, retries, failed='Error' in parsed)
+
+        def after_call_error(exception=None, model=None, context=None, **_kwargs):
+            response = getattr(exception, 'response', None) or {}
+            retries = response.get('ResponseMetadata', {}).get('RetryAttempts', 0)
+            self._record(service_name, model, region, context, retries, failed=True)
+
+        events.register('before-call', before_call, unique_id='api-call-metrics-before-call')
+        events.register('needs-retry', needs_retry, unique_id='api-call-metrics-needs-retry')
+        events.register('after-call', after_call, unique_id='api-call-metrics-after-call')
+        events.register('after-call-error', after_call_error, unique_id='api-call-metrics-after-call-error')
+
+    def snapshot(self) -> Dict[ApiCallKey, Dict[str, int]]:
+        with self._lock:
+            return {key: statistics.counters() for key, statistics in self._statistics.items()}
+
+    def snapshot_and_clear(self) -> Dict[ApiCallKey, Dict[str, int]]:
+        """Returns the aggregates collected so far and starts new ones, e.g. at the end of a Lambda invocation."""
+        with self._lock:
+            snapshot = {key: statistics.counters() for key, statistics in self._statistics.items()}
+            self._statistics = {}
+            return snapshot
+
+    def clear(self):
+        with self._lock:
+            self._statistics = {}
+
+    def _record(self, service_name: str, model, region: str, context: Dict, retries: int, failed: bool):
+        if model is None:
+            return
+        started_at = (context or {}).get(STARTED_AT)
+        latency_in_ms = (time.perf_counter() - started_at) * 1000 if started_at is not None else 0.0
+        with self._lock:
+            self._statistics_for((service_name, model.name, region)).record(latency_in_ms, retries, failed)
+
+    def _statistics_for(self, key: ApiCallKey) -> ApiCallStatistics:
+        statistics = self._statistics.get(key)
+        if statistics is None:
+            statistics = ApiCallStatistics()
+            self._statistics[key] = statistics
+        return statistics
+
+
+api_call_metrics = ApiCallMetrics()
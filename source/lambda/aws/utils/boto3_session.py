@@ -6,7 +6,10 @@ from os import getenv
 from botocore.config import Config
 
 # !/bin/python
-import boto3
+from aws.utils.api_call_metrics import api_call_metrics, is_api_call_metrics_enabled
+from aws.utils.client_pool import client_pool, AMBIENT_CREDENTIALS
+from aws.utils.credential_cache import credential_cache
+from aws.utils.rate_limiter import rate_limiter, is_rate_limiter_enabled
 
 
 class Boto3Session:
@@ -50,76 +53,46 @@ class Boto3Session:
         )
 
     def get_client(self):
-        """Creates a boto3 low-level service client by name.
+        """Returns a pooled boto3 low-level service client by name.
 
         Returns: service client, type: Object
         """
+        return client_pool.get_client(
+            self.service_name,
+            region=self.region,
+            credentials=self.credentials,
+            endpoint_url=self.endpoint_url,
+            config=self.boto_config,
+            on_create=self._register_event_hooks
+        )
+
+    def _register_event_hooks(self, client):
+        if is_rate_limiter_enabled():
+            rate_limiter.attach(client, self._account_id())
+        if is_api_call_metrics_enabled():
+            api_call_metrics.attach(client)
+
+    @staticmethod
+    def _register_resource_event_hooks(client):
+        # resources are only used for DynamoDB, whose writes are paced by the batch writers, not the rate limiter
+        if is_api_call_metrics_enabled():
+            api_call_metrics.attach(client)
+
+    def _account_id(self) -> str:
         if self.credentials is None:
-            if self.endpoint_url is None:
-                return boto3.client(
-                    self.service_name,
-                    region_name=self.region,
-                    config=self.boto_config
-                )
-            else:
-                return boto3.client(
-                    self.service_name, region_name=self.region,
-                    config=self.boto_config,
-                    endpoint_url=self.endpoint_url
-                )
-        else:
-            if self.region is None:
-                return boto3.client(
-                    self.service_name,
-                    aws_access_key_id=self.credentials.get('AccessKeyId'),
-                    aws_secret_access_key=self.credentials.get('SecretAccessKey'),
-                    aws_session_token=self.credentials.get('SessionToken'),
-                    config=self.boto_config
-                )
-            else:
-                return boto3.client(
-                    self.service_name,
-                    region_name=self.region,
-                    aws_access_key_id=self.credentials.get('AccessKeyId'),
-                    aws_secret_access_key=self.credentials.get('SecretAccessKey'),
-                    aws_session_token=self.credentials.get('SessionToken'),
-                    config=self.boto_config
-                )
+            return AMBIENT_CREDENTIALS
+        return credential_cache.account_id_for(self.credentials.get('AccessKeyId')) or AMBIENT_CREDENTIALS
 
     def get_resource(self):
-        """Creates a boto3 resource service client object by name
+        """Returns a pooled boto3 resource service client object by name
 
         Returns: resource service client, type: Object
         """
-        if self.credentials is None:
-            if self.endpoint_url is None:
-                return boto3.resource(
-                    self.service_name,
-                    region_name=self.region,
-                    config=self.boto_config
-                )
-            else:
-                return boto3.resource(
-                    self.service_name,
-                    region_name=self.region,
-                    config=self.boto_config,
-                    endpoint_url=self.endpoint_url
-                )
-        else:
-            if self.region is None:
-                return boto3.resource(
-                    self.service_name,
-                    aws_access_key_id=self.credentials.get('AccessKeyId'),
-                    aws_secret_access_key=self.credentials.get('SecretAccessKey'),
-                    aws_session_token=self.credentials.get('SessionToken'),
-                    config=self.boto_config
-                )
-            else:
-                return boto3.resource(
-                    self.service_name,
-                    region_name=self.region,
-                    aws_access_key_id=self.credentials.get('AccessKeyId'),
-                    aws_secret_access_key=self.credentials.get('SecretAccessKey'),
-                    aws_session_token=self.credentials.get('SessionToken'),
-                    config=self.boto_config
-                )
+        return client_pool.get_resource(
+            self.service_name,
+            region=self.region,
+            credentials=self.credentials,
+            endpoint_url=self.endpoint_url,
+            config=self.boto_config,
+            on_create=self._register_resource_event_hooks
+        )
@@ -0,0 +1,169 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+import threading
+from collections import OrderedDict
+from os import getenv
+from typing import Callable, Dict, Optional, Tuple
+
+import boto3
+from aws_lambda_powertools import Logger
+from botocore.config import Config
+
+AMBIENT_CREDENTIALS = 'ambient'
+
+ClientPoolKey = Tuple[str, str, Optional[str], str, Optional[str], Optional[int]]
+
+
+def get_max_pool_size() -> int:
+    return int(getenv('BOTO3_CLIENT_POOL_MAX_SIZE') or 256)
+
+
+class ClientPool:
+    """Process wide pool of boto3 sessions, clients and resources.
+
+    Creating a boto3 client loads and parses the service model and builds the endpoint resolver, which takes tens of
+    milliseconds. The pool keeps one boto3.Session per credential set and one client per
+    (kind, service, region, credential identity, endpoint) and evicts the least recently used entries once the pool
+    exceeds BOTO3_CLIENT_POOL_MAX_SIZE.
+
+    Clients are thread safe and shared between threads. boto3 resources are not, therefore resources are pooled per
+    thread. The pool lock only guards the lookups and inserts, clients are created outside of it, so threads that miss
+    different keys create their clients in parallel and threads that miss the same key wait for the first one.
+    """
+
+    def __init__(self, max_size: int = None):
+        self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
+        self.max_size = max_size or get_max_pool_size()
+        self._lock = threading.RLock()
+        self._sessions: OrderedDict[str, boto3.Session] = OrderedDict()
+        self._clients: OrderedDict[ClientPoolKey, object] = OrderedDict()
+        self._in_flight: Dict[ClientPoolKey, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_client(self, service_name: str, region: Optional[str] = None, credentials: Optional[Dict] = None,
+                   endpoint_url: Optional[str] = None, config: Optional[Config] = None,
+                   on_create: Callable[[object], None] = None):
+        """on_create is called once for every newly created client, e.g. to register botocore event hooks."""
+        key = ('client', service_name, region, self._credential_identity(credentials), endpoint_url, None)
+
+        def create(session: boto3.Session):
+            client = session.client(service_name, **self._client_kwargs(region, endpoint_url, config))
+            if on_create is not None:
+                on_create(client)
+            return client
+
+        return self._get_or_create(key, credentials, create)
+
+    def get_resource(self, service_name: str, region: Optional[str] = None, credentials: Optional[Dict] = None,
+                     endpoint_url: Optional[str] = None, config: Optional[Config] = None,
+                     on_create: Callable[[object], None] = None):
+        """on_create is called with the low-level client of every newly created resource."""
+        key = ('resource', service_name, region, self._credential_identity(credentials), endpoint_url,
+               threading.get_ident())
+
+        def create(session: boto3.Session):
+            resource = session.resource(service_name, **self._client_kwargs(region, endpoint_url, config))
+            if on_create is not None:
+                on_create(resource.meta.client)
+            return resource
+
+        return self._get_or_create(key, credentials, create)
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+            self._clients.clear()
+            self._in_flight.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def statistics(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'Hits': self.hits,
+                'Misses': self.misses,
+                'Evictions': self.evictions,
+                'Sessions': len(self._sessions),
+                'Clients': len(self._clients)
+            }
+
+    def _get_or_create(self, key: ClientPoolKey, credentials: Optional[Dict], create):
+        client = self._get_pooled(key)
+        if client is not None:
+            return client
+
+        with self._in_flight_lock(key):
+            client = self._get_pooled(key)  # created by another thread while this one waited
+            if client is not None:
+                return client
+            with self._lock:
+                self.misses += 1
+                session = self._get_session(key[3], credentials)
+
+            self.logger.debug(f"Creating {key[0]} for {key[1]} in region {key[2]}")
+            client = create(session)
+            with self._lock:
+                self._clients[key] = client
+                self._in_flight.pop(key, None)
+                self._evict_least_recently_used()
+            return client
+
+    def _get_pooled(self, key: ClientPoolKey):
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                self.hits += 1
+            return client
+
+    def _in_flight_lock(self, key: ClientPoolKey) -> threading.Lock:
+        with self._lock:
+            return self._in_flight.setdefault(key, threading.Lock())
+
+    def _get_session(self, identity: str, credentials: Optional[Dict]) -> boto3.Session:
+        session = self._sessions.get(identity)
+        if session is not None:
+            self._sessions.move_to_end(identity)
+            return session
+
+        if credentials is None:
+            session = boto3.Session()
+        else:
+            session = boto3.Session(
+                aws_access_key_id=credentials.get('AccessKeyId'),
+                aws_secret_access_key=credentials.get('SecretAccessKey'),
+                aws_session_token=credentials.get('SessionToken'),
+            )
+        self._sessions[identity] = session
+        return session
+
+    def _evict_least_recently_used(self):
+        while len(self._clients) > self.max_size:
+            self._clients.popitem(last=False)
+            self.evictions += 1
+        while len(self._sessions) > self.max_size:
+            identity, _session = self._sessions.popitem(last=False)
+            for key in [key for key in self._clients if key[3] == identity]:
+                del self._clients[key]
+
+    @staticmethod
+    def _credential_identity(credentials: Optional[Dict]) -> str:
+        if credentials is None:
+            return AMBIENT_CREDENTIALS
+        return credentials.get('AccessKeyId')
+
+    @staticmethod
+    def _client_kwargs(region: Optional[str], endpoint_url: Optional[str], config: Optional[Config]) -> Dict:
+        kwargs = {'config': config}
+        if region is not None:
+            kwargs['region_name'] = region
+        if endpoint_url is not None:
+            kwargs['endpoint_url'] = endpoint_url
+        return kwargs
+
+
+client_pool = ClientPool()
@@ -0,0 +1,121 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+import threading
+from datetime import datetime, timezone, timedelta
+from os import getenv
+from typing import Callable, Dict, Optional, Tuple
+
+from aws_lambda_powertools import Logger
+from mypy_boto3_sts.type_defs import CredentialsTypeDef
+
+CredentialCacheKey = Tuple[str, str, str, int]  # (account id, role arn, session name, duration in seconds)
+
+DEFAULT_DURATION_IN_SECONDS = 900
+
+
+def get_refresh_margin_in_seconds() -> int:
+    return int(getenv('CREDENTIALS_REFRESH_MARGIN_IN_SECONDS') or 120)
+
+
+class CredentialCache:
+    """Per-process cache for temporary credentials returned by sts:AssumeRole.
+
+    Credentials are reused until they are within the refresh margin of their Expiration, so all service wrappers
+    that assume the same role in the same account share a single AssumeRole call per Lambda execution environment.
+    Threads that miss the same key at the same time wait for the AssumeRole call of the first one.
+    """
+
+    def __init__(self):
+        self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
+        self._lock = threading.Lock()
+        self._credentials: Dict[CredentialCacheKey, CredentialsTypeDef] = {}
+        self._in_flight: Dict[CredentialCacheKey, threading.Lock] = {}
+        self._account_ids_by_access_key: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    @staticmethod
+    def key(role_arn: str, session_name: str, duration: int = DEFAULT_DURATION_IN_SECONDS) -> CredentialCacheKey:
+        account_id = role_arn.split(':')[4]
+        return account_id, role_arn, session_name, duration
+
+    def get_or_assume(self, role_arn: str, session_name: str, assume_role: Callable[[], CredentialsTypeDef],
+                      duration: int = DEFAULT_DURATION_IN_SECONDS) -> CredentialsTypeDef:
+        key = self.key(role_arn, session_name, duration)
+        cached = self._get_valid(key)
+        if cached is not None:
+            return cached
+
+        with self._in_flight_lock(key):
+            cached = self._get_valid(key)  # assumed by another thread while this one waited
+            if cached is not None:
+                return cached
+            with self._lock:
+                if key in self._credentials:
+                    self.refreshes += 1
+                else:
+                    self.misses += 1
+
+            self.logger.debug(f"Assuming role {role_arn}, no valid credentials in cache")
+            credentials = assume_role()
+            with self._lock:
+                self._credentials[key] = credentials
+                self._account_ids_by_access_key[credentials.get('AccessKeyId')] = key[0]
+            return credentials
+
+    def _get_valid(self, key: CredentialCacheKey) -> Optional[CredentialsTypeDef]:
+        with self._lock:
+            cached = self._credentials.get(key)
+            if cached is None or self._expires_soon(cached):
+                return None
+            self.hits += 1
+            self.logger.debug(f"Reusing cached credentials for {key[1]}")
+            return cached
+
+    def _in_flight_lock(self, key: CredentialCacheKey) -> threading.Lock:
+        with self._lock:
+            return self._in_flight.setdefault(key, threading.Lock())
+
+    def account_id_for(self, access_key_id: str) -> Optional[str]:
+        """Returns the account of the role that the given temporary credentials were issued for."""
+        with self._lock:
+            return self._account_ids_by_access_key.get(access_key_id)
+
+    def invalidate(self, role_arn: str, session_name: str, duration: int = DEFAULT_DURATION_IN_SECONDS):
+        with self._lock:
+            self._credentials.pop(self.key(role_arn, session_name, duration), None)
+
+    def clear(self):
+        with self._lock:
+            self._credentials.clear()
+            self._in_flight.clear()
+            self._account_ids_by_access_key.clear()
+            self.hits = 0
+            self.misses = 0
+            self.refreshes = 0
+
+    def statistics(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'Hits': self.hits,
+                'Misses': self.misses,
+                'Refreshes': self.refreshes,
+                'Size': len(self._credentials)
+            }
+
+    @staticmethod
+    def _expires_soon(credentials: CredentialsTypeDef) -> bool:
+        expiration = credentials.get('Expiration')
+        if expiration is None:
+            return True
+        if isinstance(expiration, str):
+            expiration = datetime.fromisoformat(expiration.replace('Z', '+00:00'))
+        if expiration.tzinfo is None:
+            expiration = expiration.replace(tzinfo=timezone.utc)
+        refresh_at = expiration - timedelta(seconds=get_refresh_margin_in_seconds())
+        return datetime.now(timezone.utc) >= refresh_at
+
+
+credential_cache = CredentialCache()
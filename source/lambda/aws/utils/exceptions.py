@@ -8,6 +8,17 @@ from aws_lambda_powertools import Logger
 from botocore.exceptions import ClientError, EndpointConnectionError, ConnectTimeoutError
 logger = Logger(service='service_exception_handler', level=getenv('LOG_LEVEL'))
 
+RESOURCE_NOT_FOUND_ERROR_CODES = [
+    'ResourceNotFoundException',
+    'NoSuchEntityException',
+    'RepositoryPolicyNotFoundException',
+    'PolicyNotFound',
+    'NotFoundException',
+    'NoSuchBucketPolicy',
+    'PolicyNotFoundException',
+    'InvalidParameterException'
+]
+
 
 def service_exception_handler(func):
     @wraps(func)
@@ -39,17 +50,7 @@ def resource_not_found_exception_handler(func):
         try:
             response = func(self, *args, **kwargs)
         except ClientError as err:
-            exception_codes = [
-                'ResourceNotFoundException',
-                'NoSuchEntityException',
-                'RepositoryPolicyNotFoundException',
-                'PolicyNotFound',
-                'NotFoundException',
-                'NoSuchBucketPolicy',
-                'PolicyNotFoundException',
-                'InvalidParameterException'
-            ]
-            if err.response['Error']['Code'] in exception_codes:
+            if err.response['Error']['Code'] in RESOURCE_NOT_FOUND_ERROR_CODES:
                 logger.error(str(err))
                 return {'Error': str(err)}
             else:
@@ -87,5 +88,19 @@ class AccessDenied(Exception):
         super().__init__(self.message)
 
 
+class DynamoDBWriteException(Exception):
+    def __init__(self, table_name, unprocessed_items):
+        self.table_name = table_name
+        self.message = f"{unprocessed_items} items remained unprocessed after retries in table {table_name}"
+        super().__init__(self.message)
+
+
+class DynamoDBReadException(Exception):
+    def __init__(self, table_name, unprocessed_keys):
+        self.table_name = table_name
+        self.message = f"{unprocessed_keys} keys remained unprocessed after retries in table {table_name}"
+        super().__init__(self.message)
+
+
 class AccountAssessmentClientException(Exception):
     pass
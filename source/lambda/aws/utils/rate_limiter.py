@@ -0,0 +1,178 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+import threading
+import time
+from os import getenv
+from typing import Dict, Tuple
+
+from aws_lambda_powertools import Logger
+
+# Error codes of request rate limits only. Quota and conflict errors, e.g. LimitExceededException of IAM or
+# TransactionInProgressException, do not lower the request rate.
+THROTTLING_ERROR_CODES = [
+    'Throttling',
+    'ThrottlingException',
+    'ThrottledException',
+    'RequestThrottledException',
+    'TooManyRequestsException',
+    'ProvisionedThroughputExceededException',
+    'RequestLimitExceeded',
+    'BandwidthLimitExceeded',
+    'RequestThrottled',
+    'SlowDown',
+    'PriorRequestNotComplete',
+    'EC2ThrottledException'
+]
+
+DEFAULT_REQUESTS_PER_SECOND = 25.0
+
+# Client side starting rates, chosen below the documented per account API rate limits of each service
+REQUESTS_PER_SECOND_BY_SERVICE = {
+    'iam': 10.0,
+    'organizations': 5.0,
+    'kms': 20.0,
+    'sts': 20.0,
+    'account': 5.0,
+    'lambda': 15.0,
+}
+
+MINIMUM_REQUESTS_PER_SECOND = 0.5
+THROTTLE_BACKOFF_FACTOR = 0.5
+RECOVERY_STEPS = 20  # number of successful calls to recover from minimum to starting rate
+
+RateLimiterKey = Tuple[str, str, str]  # (account id, service name, region)
+
+
+def is_rate_limiter_enabled() -> bool:
+    return (getenv('RATE_LIMITER_ENABLED') or 'true').lower() == 'true'
+
+
+def get_requests_per_second(service_name: str) -> float:
+    configured = getenv(f"RATE_LIMIT_{service_name.upper().replace('-', '_')}_PER_SECOND")
+    if configured:
+        return float(configured)
+    return REQUESTS_PER_SECOND_BY_SERVICE.get(service_name, DEFAULT_REQUESTS_PER_SECOND)
+
+
+class TokenBucket:
+    """Token bucket whose refill rate adapts to throttling responses.
+
+    The rate is halved on every throttling response and increases additively on every successful call until it
+    reaches the configured maximum again (AIMD).
+    """
+
+    def __init__(self, requests_per_second: float, burst: float = None):
+        self.max_rate = requests_per_second
+        self.rate = requests_per_second
+        self.burst = burst or max(1.0, requests_per_second)
+        self.tokens = self.burst
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Takes one token, blocks until it is available. Returns the number of seconds waited."""
+        with self._lock:
+            self._refill()
+            self.tokens -= 1
+            wait_in_seconds = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait_in_seconds > 0:
+            time.sleep(wait_in_seconds)
+        return wait_in_seconds
+
+    def on_throttle(self):
+        with self._lock:
+            self._refill()
+            self.rate = max(MINIMUM_REQUESTS_PER_SECOND, self.rate * THROTTLE_BACKOFF_FACTOR)
+            self.tokens = min(self.tokens, 0.0)
+
+    def on_success(self):
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / RECOVERY_STEPS)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+
+class RateLimiter:
+    """Shares one adaptive token bucket per (account, service, region) between all clients of the process.
+
+    Buckets are attached to boto3 clients through botocore event hooks: before-call takes a token, needs-retry
+    detects throttling responses and after-call records retries spent and successful responses.
+    """
+
+    def __init__(self):
+        self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
+        self._lock = threading.Lock()
+        self._buckets: Dict[RateLimiterKey, TokenBucket] = {}
+        self._counters: Dict[str, float] = self._empty_counters()
+
+    def bucket(self, key: RateLimiterKey) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(get_requests_per_second(key[1]))
+                self._buckets[key] = bucket
+            return bucket
+
+    def attach(self, client, account_id: str):
+        service_name = client.meta.service_model.service_name
+        key: RateLimiterKey = (account_id, service_name, client.meta.region_name)
+        bucket = self.bucket(key)
+        events = client.meta.events
+
+        def before_call(**_kwargs):
+            waited = bucket.acquire()
+            if waited > 0:
+                self._increment('ThrottlesAbsorbed')
+                self._increment('WaitTimeInSeconds', waited)
+
+        def needs_retry(response=None, **_kwargs):
+            if response is None:
+                return None
+            error_code = response[1].get('Error', {}).get('Code')
+            if error_code in THROTTLING_ERROR_CODES:
+                self.logger.debug(f"Throttled by {service_name} in {key[2]} for account {account_id}")
+                bucket.on_throttle()
+                self._increment('ThrottleResponses')
+            return None  # leave the retry decision to the configured botocore retry mode
+
+        def after_call(parsed=None, **_kwargs):
+            parsed = parsed or {}
+            retry_attempts = parsed.get('ResponseMetadata', {}).get('RetryAttempts', 0)
+            if retry_attempts:
+                self._increment('RetriesSpent', retry_attempts)
+            if 'Error' not in parsed:  # after-call also receives error responses
+                bucket.on_success()
+
+        events.register('before-call', before_call, unique_id='rate-limiter-before-call')
+        events.register('needs-retry', needs_retry, unique_id='rate-limiter-needs-retry')
+        events.register('after-call', after_call, unique_id='rate-limiter-after-call')
+
+    def statistics(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._counters, Buckets=len(self._buckets))
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self._counters = self._empty_counters()
+
+    def _increment(self, counter: str, value: float = 1):
+        with self._lock:
+            self._counters[counter] += value
+
+    @staticmethod
+    def _empty_counters() -> Dict[str, float]:
+        return {
+            'ThrottlesAbsorbed': 0,
+            'WaitTimeInSeconds': 0.0,
+            'ThrottleResponses': 0,
+            'RetriesSpent': 0
+        }
+
+
+rate_limiter = RateLimiter()
@@ -2,9 +2,10 @@
 #  SPDX-License-Identifier: Apache-2.0
 import json
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 from os import getenv
-from typing import List, Iterable
+from typing import List, Iterable, Optional
 
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.utilities.typing import LambdaContext
@@ -30,7 +31,7 @@ def lambda_handler(event: dict, context: LambdaContext) -> ApiGatewayResponse:
         return GenericApiGatewayEventHandler().handle_and_create_response(
             event,
             context,
-            AssessmentRunner(DelegatedAdminsStrategy()).run_assessment
+            AssessmentRunner(DelegatedAdminsStrategy(DelegatedAdminsRepository())).run_assessment
         )
     except Exception as error:
         logger.error(f"Error: {error}")
@@ -48,30 +49,50 @@ def lambda_handler(event: dict, context: LambdaContext) -> ApiGatewayResponse:
         }
 
 
+def get_delegated_services_concurrency() -> int:
+    return max(1, int(getenv('DELEGATED_ADMIN_SCAN_MAX_WORKERS') or 4))
+
+
 class DelegatedAdminsStrategy(SynchronousScanStrategy):
     """
     Search the current account's aws organization
     for delegated admin accounts and their related service principal
+
+    The delegated services of the accounts are listed in parallel on DELEGATED_ADMIN_SCAN_MAX_WORKERS threads, which
+    share one Organizations client of the management account and therefore its rate limiter. Given a repository,
+    the services of each account are written as soon as they arrive, while the other accounts are still listed.
     """
 
-    def __init__(self):
+    def __init__(self, repository: Optional[DelegatedAdminsRepository] = None):
         self.job_id = None
         self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
-        self.organization = Organizations()
+        self.organization = None
+        self.repository = repository
+        self.findings = []
 
     def assessment_type(self) -> str: return str(AssessmentType.DELEGATED_ADMIN.value)
 
     def scan(self, job_id, request_body) -> List[DelegatedAdminCreateRequest]:
         self.job_id = job_id
+        self.organization = Organizations()
         delegated_admin_accounts: List[DelegatedAdministratorTypeDef] \
             = self.organization.list_delegated_administrators()
         self.logger.info(f"Found {len(delegated_admin_accounts)} accounts designated as delegated administrators.")
 
-        delegated_services_and_accounts: List[DelegatedAdminCreateRequest] = []
-        for account in delegated_admin_accounts:
-            enabled_services_per_account = self._find_delegated_services(account)
-            delegated_services_and_accounts.extend(enabled_services_per_account)
-
+        services_per_account: List[List[DelegatedAdminCreateRequest]] = [[] for _ in delegated_admin_accounts]
+        self.findings = []
+        with ThreadPoolExecutor(max_workers=get_delegated_services_concurrency(),
+                                thread_name_prefix='delegated_services') as executor:
+            futures = {executor.submit(self._find_delegated_services, account): index
+                       for index, account in enumerate(delegated_admin_accounts)}
+            for future in as_completed(futures):
+                services_per_account[futures[future]] = future.result()
+                if self.repository is not None:
+                    self.findings.extend(self.repository.create_all(services_per_account[futures[future]]))
+
+        delegated_services_and_accounts: List[DelegatedAdminCreateRequest] = [
+            service for services in services_per_account for service in services
+        ]
         self.logger.debug(f"Merged Delegated Admin Account and Service: "
                           f"{delegated_services_and_accounts}")
 
@@ -108,5 +129,8 @@ class DelegatedAdminsStrategy(SynchronousScanStrategy):
         return model
 
     def write(self, delegated_admins: List[DelegatedAdminCreateRequest]):
-        findings = DelegatedAdminsRepository().create_all(delegated_admins)
+        if self.repository is not None:
+            findings = self.findings  # already written during the scan
+        else:
+            findings = DelegatedAdminsRepository().create_all(delegated_admins)
         SolutionMetrics().send_scan_metrics(self.assessment_type(), findings)
@@ -7,8 +7,11 @@ from os import getenv
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.utilities.typing import LambdaContext
 
+from assessment_runner.assessment_runner import api_call_totals, with_api_call_metrics
 from assessment_runner.job_model import JobModel, JobStatus
 from assessment_runner.jobs_repository import JobsRepository
+from aws.services.dynamodb import DynamoDB
+from policy_explorer.policy_evaluation import CompiledPoliciesStore
 
 logger = Logger(getenv('LOG_LEVEL'))
 tracer = Tracer()
@@ -16,6 +19,7 @@ tracer = Tracer()
 
 @tracer.capture_lambda_handler
 @logger.inject_lambda_context(log_event=True)
+@with_api_call_metrics('POLICY_EXPLORER')
 def lambda_handler(payload: dict, context: LambdaContext):
 
     assessment_type = payload['AssessmentType']
@@ -24,9 +28,24 @@ def lambda_handler(payload: dict, context: LambdaContext):
 
     logger.info(f'Finished scan with status {result}, updating job entry')
 
+    if result != "FAILED":
+        compile_policies(job_id)
+
     return FinishScanForResourceBasedPolicies().finish(assessment_type, job_id, result)
 
 
+def compile_policies(job_id: str):
+    """
+    Stores the statements of the job for the evaluate API before the job is marked finished. The job still finishes
+    if this fails, the API then answers that the policies of the job are not compiled.
+    """
+    try:
+        statement_count = CompiledPoliciesStore(DynamoDB(getenv('COMPONENT_TABLE'))).save(job_id)
+        logger.info(f'Compiled {statement_count} statements of job {job_id}')
+    except Exception as error:
+        logger.error(f'Failed to compile the policies of job {job_id}: {error}')
+
+
 class FinishScanForResourceBasedPolicies:
     def __init__(self):
         self.job_repository = JobsRepository()
@@ -45,6 +64,7 @@ class FinishScanForResourceBasedPolicies:
             job,
             FinishedAt=(datetime.now().isoformat()),
             JobStatus=str(status.value),
+            **api_call_totals(assessment_type, job_id)
         )
 
         self.job_repository.put_job(updated_job)
@@ -0,0 +1,166 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+from os import getenv
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from aws_lambda_powertools import Logger
+
+from aws.services.dynamodb import DynamoDB
+from policy_explorer.policy_document_store import PolicyDocumentStore, resource_key
+from policy_explorer.policy_explorer_model import DynamoDBPolicyItem, PolicyResourceStateItem
+from policy_explorer.policy_search_index import PolicySearchIndex
+from utils.base_repository import Clock
+
+POLICY_RESOURCE_PARTITION_KEY_PREFIX = 'PolicyResource'
+GLOBAL_REGION = 'GLOBAL'
+
+
+def is_incremental_scan_enabled() -> bool:
+    return (getenv('POLICY_EXPLORER_INCREMENTAL_SCAN') or 'true').lower() == 'true'
+
+
+def get_policy_item_seconds_to_live() -> int:
+    return int(getenv('POLICY_ITEM_TTL_IN_DAYS') or 14) * 24 * 60 * 60
+
+
+def group_by_resource(items: Iterable[DynamoDBPolicyItem]) -> Iterator[List[DynamoDBPolicyItem]]:
+    """Groups the statements of a scan lazily by resource. Statements of one resource have to be contiguous."""
+    group: List[DynamoDBPolicyItem] = []
+    for item in items:
+        if group and resource_key(item['SortKey']) != resource_key(group[0]['SortKey']):
+            yield group
+            group = []
+        group.append(item)
+    if group:
+        yield group
+
+
+class IncrementalScan:
+    """
+    Skips writing the statements of resources whose policy did not change since the last scan.
+
+    For every scanned resource a state item in the partition PolicyResource#<ServiceName> remembers the canonical
+    ContentHash of its policy and the number of statements. Statements of new or changed resources are passed on to
+    be written. Unchanged resources are dropped, unless their items expire within half of POLICY_ITEM_TTL_IN_DAYS,
+    in which case they are written again to extend the TTL of statements, policy documents and index entries.
+    Choose POLICY_ITEM_TTL_IN_DAYS well above the scan interval to skip most writes.
+
+    commit() must be called after the statements were written. It stores the new state items and deletes the
+    statements of resources that were not returned by the scan anymore, together with their index entries and
+    document references, and the policy documents that nothing references anymore, see PolicyDocumentStore.
+    """
+
+    def __init__(self, table: DynamoDB, service_name: str, account_id: str, job_id: str):
+        self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
+        self.table = table
+        self.service_name = service_name
+        self.account_id = account_id
+        self.job_id = job_id
+        self.clock = Clock()
+        self.partition_key = f"{POLICY_RESOURCE_PARTITION_KEY_PREFIX}#{service_name}"
+        self.previous_states: Dict[str, PolicyResourceStateItem] = {
+            state['SortKey']: state for state in self.table.query_all(self.partition_key, f"{account_id}#")
+        }
+        self.new_states: List[PolicyResourceStateItem] = []
+        self.obsolete_statements: List[Tuple[PolicyResourceStateItem, int]] = []
+        self.seen: set = set()
+        self.changed = 0
+        self.unchanged = 0
+        self.removed = 0
+
+    def filter_changed(self, items: Iterable[DynamoDBPolicyItem]) -> Iterator[DynamoDBPolicyItem]:
+        for statements in group_by_resource(items):
+            yield from self._filter_resource(statements)
+
+    def commit(self, scanned_regions: List[str], failed_regions: Iterable[Optional[str]] = ()):
+        """
+        Persists the state of written resources and removes resources that disappeared from the scanned regions.
+        Resources are only removed from regions whose scan finished without any failure of the service in this
+        account. A failure without region or outside the scanned regions, e.g. of a single bucket, keeps all
+        resources, and resources of global services are kept whenever anything failed.
+        """
+        if self.new_states:
+            self.table.put_items(self.new_states)
+        statement_keys = [key for previous, first_obsolete_statement in self.obsolete_statements
+                          for key in self._statement_keys(previous, first_obsolete_statement)]
+
+        state_keys = []
+        failed_regions = set(failed_regions)
+        if None not in failed_regions and failed_regions <= set(scanned_regions):
+            scope = set(scanned_regions) - failed_regions
+            if not failed_regions:
+                scope.add(GLOBAL_REGION)
+            for state_sort_key, state in self.previous_states.items():
+                if state_sort_key in self.seen or state.get('Region') not in scope:
+                    continue
+                statement_keys.extend(self._statement_keys(state, 1))
+                state_keys.append({'PartitionKey': self.partition_key, 'SortKey': state_sort_key})
+                self.removed += 1
+        self._delete(statement_keys, state_keys)
+
+        self.logger.info(f"[{self.account_id}][{self.service_name}] Incremental scan", extra={
+            'IncrementalScan': self.statistics()})
+
+    def statistics(self) -> Dict[str, int]:
+        return {
+            'ChangedResources': self.changed,
+            'UnchangedResources': self.unchanged,
+            'RemovedResources': self.removed
+        }
+
+    def _filter_resource(self, statements: List[DynamoDBPolicyItem]) -> List[DynamoDBPolicyItem]:
+        key = resource_key(statements[0]['SortKey'])
+        state_sort_key = f"{self.account_id}#{key}"
+        self.seen.add(state_sort_key)
+        content_hash = statements[0].get('ContentHash')
+        previous = self.previous_states.get(state_sort_key)
+
+        unchanged = previous is not None and content_hash is not None \
+            and previous.get('ContentHash') == content_hash \
+            and int(previous.get('StatementCount', 0)) == len(statements)
+        if unchanged:
+            self.unchanged += 1
+            if not self._expires_soon(previous):
+                return []
+        else:
+            self.changed += 1
+            if previous is not None and int(previous.get('StatementCount', 0)) > len(statements):
+                self.obsolete_statements.append((previous, len(statements) + 1))
+
+        self.new_states.append({
+            'PartitionKey': self.partition_key,
+            'SortKey': state_sort_key,
+            'PolicyType': statements[0]['PartitionKey'],
+            'Region': statements[0].get('Region'),
+            'ContentHash': content_hash,
+            'StatementCount': len(statements),
+            'LastScannedJobId': self.job_id,
+            'ExpiresAt': statements[0].get('ExpiresAt')
+        })
+        return statements
+
+    def _expires_soon(self, state: PolicyResourceStateItem) -> bool:
+        expires_at = state.get('ExpiresAt')
+        if expires_at is None:
+            return True
+        return int(expires_at) - self.clock.current_time_in_ms() < get_policy_item_seconds_to_live() / 2
+
+    def _statement_keys(self, state: PolicyResourceStateItem, first_statement: int) -> List[Dict]:
+        prefix = state['SortKey'][len(f"{self.account_id}#"):]
+        return [{'PartitionKey': state['PolicyType'], 'SortKey': f"{prefix}#{statement_number}"}
+                for statement_number in range(first_statement, int(state.get('StatementCount', 0)) + 1)]
+
+    def _delete(self, statement_keys: List[Dict], state_keys: List[Dict]):
+        """Deletes statements with their index entries and document references in one batch, and then the documents
+        that nothing references anymore. The statements are read first, because the keys of their index entries and
+        documents depend on their content."""
+        if not statement_keys and not state_keys:
+            return
+        statements = self.table.batch_get_items(statement_keys) if statement_keys else []
+        document_store = PolicyDocumentStore(self.table)
+        reference_keys, unreferenced_documents = document_store.release(statements)
+        self.table.delete_items(statement_keys + state_keys
+                                + PolicySearchIndex(self.table).entry_keys(statements)
+                                + reference_keys)
+        document_store.delete_unreferenced(unreferenced_documents)
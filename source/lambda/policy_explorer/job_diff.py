@@ -0,0 +1,188 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+import json
+from itertools import islice
+from os import getenv
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from aws_lambda_powertools import Logger
+
+from aws.services.dynamodb import DynamoDB
+from policy_explorer.job_snapshot import job_snapshot_partition_key
+from policy_explorer.policy_document_store import PolicyDocumentStore
+from policy_explorer.policy_explorer_model import JobSnapshotItem, PolicyDiffChange, PolicyDiffItem, \
+    PaginationMetadata
+from policy_explorer.step_functions_lambda.convert_policy_into_dynamodb_items import canonical_policy_hash
+
+DOCUMENTS_PER_BATCH = 50
+
+SnapshotPair = Tuple[Optional[JobSnapshotItem], Optional[JobSnapshotItem]]
+
+
+def merge_join(before: Iterator[Dict], after: Iterator[Dict]) -> Iterator[Tuple[Optional[Dict], Optional[Dict]]]:
+    """
+    Joins two iterators that are sorted by SortKey in a single pass. Yields (before, after) pairs,
+    with None on the side that has no item with the same SortKey.
+    """
+    left, right = next(before, None), next(after, None)
+    while left is not None or right is not None:
+        if right is None or (left is not None and left['SortKey'] < right['SortKey']):
+            yield left, None
+            left = next(before, None)
+        elif left is None or right['SortKey'] < left['SortKey']:
+            yield None, right
+            right = next(after, None)
+        else:
+            yield left, right
+            left, right = next(before, None), next(after, None)
+
+
+def statements_of(document: Optional[str]) -> List[dict]:
+    if document is None:
+        return []
+    statements = json.loads(document).get('Statement', [])
+    return [statements] if isinstance(statements, dict) else statements
+
+
+def match_statements(before: List[dict], after: List[dict]) -> List[Tuple[int, Optional[dict], Optional[dict]]]:
+    """
+    Returns the changed statements of a policy as (statement number, before, after), ordered by statement number.
+    Statements are matched by their canonical content hash, so that inserting or reordering statements does not
+    report the following statements as changed. Of the remaining statements, those with the same Sid are modified,
+    all others are added or removed. Numbers refer to the after document, for removed statements to the before one.
+    """
+    unmatched_before: Dict[str, List[int]] = {}
+    for index, statement in enumerate(before):
+        unmatched_before.setdefault(canonical_policy_hash(statement), []).append(index)
+    added = []
+    for index, statement in enumerate(after):
+        same_content = unmatched_before.get(canonical_policy_hash(statement))
+        if same_content:
+            same_content.pop(0)
+        else:
+            added.append(index)
+    removed = sorted(index for indexes in unmatched_before.values() for index in indexes)
+
+    removed_by_sid = {before[index]['Sid']: index for index in removed if before[index].get('Sid')}
+    modified = set()
+    changes = []
+    for index in added:
+        before_index = removed_by_sid.pop(after[index]['Sid'], None) if after[index].get('Sid') else None
+        if before_index is None:
+            changes.append((index + 1, None, after[index]))
+        else:
+            modified.add(before_index)
+            changes.append((index + 1, before[before_index], after[index]))
+    changes.extend((index + 1, before[index], None) for index in removed if index not in modified)
+    return sorted(changes, key=lambda change: change[0])
+
+
+class JobDiff:
+    """
+    Compares the snapshots of two policy explorer jobs. Both snapshots are read page by page in SortKey order and
+    merge joined, so the diff takes a single pass over both jobs and holds only one page of each in memory.
+
+    Changed resources are expanded into statement changes using the policy documents of both scans. If a document
+    has expired already, the resource is reported as a single change without Before and After.
+    """
+
+    def __init__(self, table: DynamoDB, job_id: str, other_job_id: str):
+        self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
+        self.table = table
+        self.job_id = job_id
+        self.other_job_id = other_job_id
+        self.document_store = PolicyDocumentStore(table)
+
+    def changed_resources(self, start_after: str = None) -> Iterator[SnapshotPair]:
+        before = self._snapshot(self.job_id, start_after)
+        after = self._snapshot(self.other_job_id, start_after)
+        for pair in merge_join(before, after):
+            if self._is_changed(*pair):
+                yield pair
+
+    def changes(self, start_after: str = None) -> Iterator[Tuple[str, List[PolicyDiffItem]]]:
+        """Yields (snapshot sort key, statement changes) per changed resource, e.g. to export a complete diff."""
+        resources = self.changed_resources(start_after)
+        while True:
+            batch = list(islice(resources, DOCUMENTS_PER_BATCH))
+            if not batch:
+                return
+            documents = self.document_store.documents(
+                item['PolicyHash'] for pair in batch for item in pair if item and item.get('PolicyHash'))
+            for before, after in batch:
+                yield (before or after)['SortKey'], self._statement_changes(before, after, documents)
+
+    def page(self, max_results: int, start_after: str = None) -> Tuple[List[PolicyDiffItem], PaginationMetadata]:
+        """Returns the changes of whole resources until at least max_results statement changes are collected."""
+        results: List[PolicyDiffItem] = []
+        last_sort_key = None
+        has_more = False
+        for sort_key, statement_changes in self.changes(start_after):
+            if len(results) >= max_results:
+                has_more = True
+                break
+            results.extend(statement_changes)
+            last_sort_key = sort_key
+
+        pagination: PaginationMetadata = {
+            'nextToken': last_sort_key if has_more else None,
+            'hasMoreResults': has_more
+        }
+        return results, pagination
+
+    def _snapshot(self, job_id: str, start_after: Optional[str]) -> Iterator[JobSnapshotItem]:
+        partition_key = job_snapshot_partition_key(job_id)
+        exclusive_start_key = {'PartitionKey': partition_key, 'SortKey': start_after} if start_after else None
+        return self.table.query_pages(partition_key, exclusive_start_key=exclusive_start_key)
+
+    @staticmethod
+    def _is_changed(before: Optional[JobSnapshotItem], after: Optional[JobSnapshotItem]) -> bool:
+        if before is None or after is None:
+            return True
+        if int(before.get('StatementCount', 0)) != int(after.get('StatementCount', 0)):
+            return True
+        if before.get('ContentHash') and after.get('ContentHash'):
+            return before['ContentHash'] != after['ContentHash']
+        return before.get('PolicyHash') != after.get('PolicyHash')
+
+    def _statement_changes(self, before: Optional[JobSnapshotItem], after: Optional[JobSnapshotItem],
+                           documents: Dict[str, str]) -> List[PolicyDiffItem]:
+        resource = after or before
+        resource_sort_key = resource['SortKey'][len(resource['PolicyType']) + 1:]
+        before_document = documents.get(before.get('PolicyHash')) if before else None
+        after_document = documents.get(after.get('PolicyHash')) if after else None
+
+        if (before is not None and before_document is None) or (after is not None and after_document is None):
+            self.logger.debug(f"Policy document of {resource['SortKey']} expired, reporting the resource only")
+            return [self._diff_item(resource, self._change(before, after), resource_sort_key, None, None)]
+
+        changes = []
+        for number, before_statement, after_statement in match_statements(statements_of(before_document),
+                                                                          statements_of(after_document)):
+            changes.append(self._diff_item(resource, self._change(before_statement, after_statement),
+                                           f"{resource_sort_key}#{number}", before_statement, after_statement))
+        return changes
+
+    @staticmethod
+    def _change(before, after) -> str:
+        if before is None:
+            return PolicyDiffChange.ADDED.value
+        if after is None:
+            return PolicyDiffChange.REMOVED.value
+        return PolicyDiffChange.MODIFIED.value
+
+    @staticmethod
+    def _diff_item(resource: JobSnapshotItem, change: str, sort_key: str,
+                   before: Optional[dict], after: Optional[dict]) -> PolicyDiffItem:
+        return {
+            'Change': change,
+            'PolicyType': resource['PolicyType'],
+            'Region': resource.get('Region'),
+            'Service': resource.get('Service'),
+            'AccountId': resource.get('AccountId'),
+            'ResourceIdentifier': resource.get('ResourceIdentifier'),
+            'SortKey': sort_key,
+            'Before': before,
+            'After': after
+        }
@@ -0,0 +1,85 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+from os import getenv
+from typing import Dict, Iterable, Iterator, List, Set
+
+from aws_lambda_powertools import Logger
+
+from aws.services.dynamodb import DynamoDB, get_stream_flush_size
+from policy_explorer.incremental_scan import group_by_resource
+from policy_explorer.policy_document_store import PolicyDocumentStore, policy_hash, resource_key
+from policy_explorer.policy_explorer_model import DynamoDBPolicyItem, JobSnapshotItem
+from utils.base_repository import Clock, get_seconds_to_live
+
+JOB_SNAPSHOT_PARTITION_KEY_PREFIX = 'JobSnapshot'
+
+
+def job_snapshot_partition_key(job_id: str) -> str:
+    return f"{JOB_SNAPSHOT_PARTITION_KEY_PREFIX}#{job_id}"
+
+
+class JobSnapshot:
+    """
+    Records which resources a policy explorer job found, with the hashes of their policies.
+
+    Statement items are shared between jobs and only hold the latest scan, and incremental scans do not write
+    unchanged statements at all. Therefore each job writes one small item per resource into the partition
+    JobSnapshot#<JobId>, with sort key <PolicyType>#<Region>#<Service>#<AccountId>#<ResourceIdentifier>.
+    The snapshot lives as long as the job record (TIME_TO_LIVE_IN_DAYS) and is what JobDiff compares. The policy
+    documents of the snapshot are written with the same TTL and a reference per snapshot item, because statements
+    and their documents expire after POLICY_ITEM_TTL_IN_DAYS and unchanged resources are not written again.
+    """
+
+    def __init__(self, table: DynamoDB, job_id: str):
+        self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
+        self.table = table
+        self.job_id = job_id
+        self.expires_at = Clock().current_time_in_ms() + get_seconds_to_live()
+        self.buffer: List[JobSnapshotItem] = []
+        self.documents: Dict[str, str] = {}
+        self.documents_written: Set[str] = set()
+        self.resources = 0
+
+    def record(self, items: Iterable[DynamoDBPolicyItem]) -> Iterator[DynamoDBPolicyItem]:
+        """Passes all statements on and remembers one snapshot item per resource."""
+        for statements in group_by_resource(items):
+            self.buffer.append(self._snapshot_item(statements))
+            self.resources += 1
+            if len(self.buffer) >= get_stream_flush_size():
+                self.flush()
+            yield from statements
+
+    def commit(self):
+        """Writes the remaining snapshot items, must be called after the statements were written."""
+        self.flush()
+        self.logger.debug(f"Recorded {self.resources} resources in snapshot of job {self.job_id}")
+
+    def flush(self):
+        if self.buffer:
+            self.table.put_items(self.buffer + PolicyDocumentStore(self.table).retain(
+                self.buffer, self.documents, self.expires_at))
+            self.documents_written.update(self.documents)
+            self.buffer = []
+            self.documents = {}
+
+    def _snapshot_item(self, statements: List[DynamoDBPolicyItem]) -> JobSnapshotItem:
+        first = statements[0]
+        snapshot_item: JobSnapshotItem = {
+            'PartitionKey': job_snapshot_partition_key(self.job_id),
+            'SortKey': f"{first['PartitionKey']}#{resource_key(first['SortKey'])}",
+            'PolicyType': first['PartitionKey'],
+            'Region': first.get('Region'),
+            'Service': first.get('Service'),
+            'AccountId': first.get('AccountId'),
+            'ResourceIdentifier': first.get('ResourceIdentifier'),
+            'StatementCount': len(statements),
+            'ExpiresAt': self.expires_at
+        }
+        if first.get('ContentHash'):
+            snapshot_item['ContentHash'] = first['ContentHash']
+        if first.get('Policy'):
+            snapshot_item['PolicyHash'] = policy_hash(first['Policy'])
+            if snapshot_item['PolicyHash'] not in self.documents_written:
+                self.documents[snapshot_item['PolicyHash']] = first['Policy']
+        return snapshot_item
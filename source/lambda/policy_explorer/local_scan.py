@@ -0,0 +1,263 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+"""
+Runs a complete policy explorer scan in a single process, without the Step Functions state machine.
+
+Accounts are validated with ValidateAccountAccess, then every account x service is scanned like the state machine
+does it, with the router's scan_service, on a thread or process pool. Regions are scanned concurrently inside each
+task. Task failures are documented with write_task_failure in the jobs table, the job record is created and finished
+like for a scan that was started from the API.
+
+Against moto server as a local stand-in:
+
+    moto_server -p 5000 &
+    AWS_ENDPOINT_URL=http://localhost:5000 python -m policy_explorer.local_scan \\
+        --create-tables --accounts 111122223333 --regions us-east-1 --sink jsonl --output policies.jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, Executor
+from datetime import datetime
+from os import getenv
+from typing import Dict, List, Optional, Tuple
+
+from aws_lambda_powertools import Logger
+
+from assessment_runner.job_model import AssessmentType, JobStatus, JobModel
+from assessment_runner.jobs_repository import JobsRepository
+from assessment_runner.organization_snapshot import organization_snapshots
+from aws.utils.boto3_session import Boto3Session
+from policy_explorer.finish_scan import FinishScanForResourceBasedPolicies
+from policy_explorer.policy_explorer_model import ScanServiceRequestModel, AccountValidationRequestModel, \
+    ValidationType
+from policy_explorer.policy_sinks import PolicySink, DynamoDBPolicySink, ListPolicySink, JsonLinesPolicySink, \
+    SqlitePolicySink
+from policy_explorer.step_functions_lambda.scan_policy_all_services_router import scan_service
+from policy_explorer.step_functions_lambda.validate_account_access import ValidateAccountAccess
+from policy_explorer.supported_configuration.supported_regions_and_services import SupportedServices
+
+SINKS = ['dynamodb', 'jsonl', 'sqlite']
+EXECUTORS = ['thread', 'process']
+
+
+def get_local_scan_workers() -> int:
+    return int(getenv('LOCAL_SCAN_MAX_WORKERS') or 16)
+
+
+class FixedRegionsValidateAccountAccess(ValidateAccountAccess):
+    """Validates access to the account, but scans the given regions instead of the regions enabled in the account."""
+
+    def __init__(self, event: AccountValidationRequestModel, regions: List[str]):
+        super().__init__(event)
+        self.regions = regions
+
+    def get_regions_for_account(self, credentials, account_id: str) -> list[str]:
+        return self.regions
+
+
+def validate_account(event: AccountValidationRequestModel, regions: Optional[List[str]]) -> Tuple[str, List[str]]:
+    if regions:
+        response = FixedRegionsValidateAccountAccess(event, regions).check_account_access_permission()
+    else:
+        response = ValidateAccountAccess(event).check_account_access_permission()
+    if response['Validation'] != str(ValidationType.SUCCEEDED.value):
+        return event['AccountId'], []
+    return event['AccountId'], response['Regions']
+
+
+def scan_task_in_process(event: ScanServiceRequestModel, store_in_dynamodb: bool) -> Tuple[int, List[Dict], float]:
+    """Runs in a worker process. Statements for local sinks are returned to the parent, which owns the sink."""
+    started_at = time.perf_counter()
+    if store_in_dynamodb:
+        return scan_service(event), [], time.perf_counter() - started_at
+    sink = ListPolicySink()
+    stored = scan_service(event, sink)
+    return stored, sink.items, time.perf_counter() - started_at
+
+
+def scan_task_in_thread(event: ScanServiceRequestModel, sink: PolicySink) -> Tuple[int, List[Dict], float]:
+    started_at = time.perf_counter()
+    return scan_service(event, sink), [], time.perf_counter() - started_at
+
+
+class LocalScanEngine:
+
+    def __init__(self, sink_type: str = 'dynamodb', output: str = None, executor: str = 'thread',
+                 workers: int = None):
+        self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
+        if sink_type not in SINKS:
+            raise ValueError(f"Unknown sink {sink_type}, expected one of {SINKS}")
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor {executor}, expected one of {EXECUTORS}")
+        if sink_type != 'dynamodb' and not output:
+            raise ValueError(f"Sink {sink_type} requires an output file")
+        self.sink_type = sink_type
+        self.output = output
+        self.executor_type = executor
+        self.workers = workers or get_local_scan_workers()
+        self.jobs_repository = JobsRepository()
+
+    def run(self, account_ids: List[str] = None, service_names: List[str] = None,
+            regions: List[str] = None) -> Dict:
+        job = self._create_job()
+        job_id = job['JobId']
+        sink = self._create_sink()
+        started_at = time.perf_counter()
+        try:
+            account_ids = account_ids or organization_snapshots.get(job_id).active_account_ids()
+            service_names = service_names or SupportedServices.service_names()
+            with self._create_executor() as executor:
+                regions_by_account = self._validate_accounts(executor, job_id, account_ids, service_names, regions)
+                statements, durations = self._scan(executor, sink, job_id, regions_by_account, service_names)
+        except Exception:
+            self.logger.exception(f"Local scan {job_id} failed")
+            FinishScanForResourceBasedPolicies().finish(job['AssessmentType'], job_id, 'FAILED')
+            raise
+        finally:
+            sink.close()
+
+        status = FinishScanForResourceBasedPolicies().finish(job['AssessmentType'], job_id)['Status']
+        elapsed = time.perf_counter() - started_at
+        return {
+            'JobId': job_id,
+            'JobStatus': status,
+            'Accounts': len(account_ids),
+            'ValidatedAccounts': len(regions_by_account),
+            'Tasks': len(durations),
+            'Statements': statements,
+            'TaskFailures': len(self.jobs_repository.find_task_failures_by_job_id(job_id)),
+            'DurationInSeconds': round(elapsed, 3),
+            'StatementsPerSecond': round(statements / elapsed, 1) if elapsed else 0,
+            'SlowestTasksInSeconds': dict(sorted(durations.items(), key=lambda it: it[1], reverse=True)[:10])
+        }
+
+    def _validate_accounts(self, executor: Executor, job_id: str, account_ids: List[str], service_names: List[str],
+                           regions: Optional[List[str]]) -> Dict[str, List[str]]:
+        futures = [executor.submit(validate_account, {
+            'AccountId': account_id,
+            'JobId': job_id,
+            'ServiceNames': service_names
+        }, regions) for account_id in account_ids]
+        regions_by_account = {}
+        for future in as_completed(futures):
+            account_id, account_regions = future.result()
+            if account_regions:
+                regions_by_account[account_id] = account_regions
+        self.logger.info(f"Validated {len(regions_by_account)} of {len(account_ids)} accounts")
+        return regions_by_account
+
+    def _scan(self, executor: Executor, sink: PolicySink, job_id: str, regions_by_account: Dict[str, List[str]],
+              service_names: List[str]) -> Tuple[int, Dict[str, float]]:
+        futures = {}
+        for account_id, account_regions in regions_by_account.items():
+            for service_name in service_names:
+                event: ScanServiceRequestModel = {
+                    'AccountId': account_id,
+                    'JobId': job_id,
+                    'Regions': account_regions,
+                    'ServiceName': service_name
+                }
+                if self.executor_type == 'process':
+                    future = executor.submit(scan_task_in_process, event, self.sink_type == 'dynamodb')
+                else:
+                    future = executor.submit(scan_task_in_thread, event, sink)
+                futures[future] = f"{account_id}#{service_name}"
+
+        statements = 0
+        durations = {}
+        for future in as_completed(futures):
+            stored, items, duration = future.result()
+            if items:
+                sink.store({'JobId': job_id}, items)
+            statements += stored
+            durations[futures[future]] = round(duration, 3)
+        return statements, durations
+
+    def _create_job(self) -> JobModel:
+        job = self.jobs_repository.create_job({
+            'AssessmentType': str(AssessmentType.POLICY_EXPLORER.value),
+            'StartedAt': datetime.now().isoformat(),
+            'StartedBy': 'local-scan',
+            'JobStatus': str(JobStatus.ACTIVE.value),
+        })
+        self.jobs_repository.put_last_job_marker(job)
+        return job
+
+    def _create_sink(self) -> PolicySink:
+        if self.sink_type == 'jsonl':
+            return JsonLinesPolicySink(self.output)
+        if self.sink_type == 'sqlite':
+            return SqlitePolicySink(self.output)
+        if self.executor_type == 'process':
+            return ListPolicySink()  # not used, worker processes write to DynamoDB themselves
+        return DynamoDBPolicySink()
+
+    def _create_executor(self) -> Executor:
+        if self.executor_type == 'process':
+            return ProcessPoolExecutor(max_workers=self.workers)
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='local_scan')
+
+
+def create_table_if_missing(table_name: str):
+    """Creates a table with the key schema and JobId index of the deployed component tables."""
+    client = Boto3Session('dynamodb', region=getenv('AWS_REGION')).get_client()
+    if table_name in client.list_tables().get('TableNames', []):
+        return
+    client.create_table(
+        TableName=table_name,
+        KeySchema=[{'AttributeName': 'PartitionKey', 'KeyType': 'HASH'},
+                   {'AttributeName': 'SortKey', 'KeyType': 'RANGE'}],
+        AttributeDefinitions=[{'AttributeName': 'PartitionKey', 'AttributeType': 'S'},
+                              {'AttributeName': 'SortKey', 'AttributeType': 'S'},
+                              {'AttributeName': 'JobId', 'AttributeType': 'S'}],
+        GlobalSecondaryIndexes=[{'IndexName': 'JobId',
+                                 'KeySchema': [{'AttributeName': 'JobId', 'KeyType': 'HASH'}],
+                                 'Projection': {'ProjectionType': 'ALL'}}],
+        BillingMode='PAY_PER_REQUEST'
+    )
+
+
+def parse_arguments(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='python -m policy_explorer.local_scan', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--accounts', help='comma separated account ids, default: all active accounts of the org')
+    parser.add_argument('--services', help='comma separated service names, default: all supported services')
+    parser.add_argument('--regions', help='comma separated regions, default: the regions enabled in each account')
+    parser.add_argument('--sink', choices=SINKS, default='dynamodb')
+    parser.add_argument('--output', help='output file of the jsonl and sqlite sinks')
+    parser.add_argument('--executor', choices=EXECUTORS, default='thread')
+    parser.add_argument('--workers', type=int, help='size of the pool, default: LOCAL_SCAN_MAX_WORKERS or 16')
+    parser.add_argument('--jobs-table', default=getenv('TABLE_JOBS') or 'LocalJobHistory')
+    parser.add_argument('--policies-table', default=getenv('COMPONENT_TABLE') or 'LocalPolicyExplorer')
+    parser.add_argument('--spoke-role-name', default=getenv('SPOKE_ROLE_NAME'))
+    parser.add_argument('--create-tables', action='store_true', help='create the DynamoDB tables if missing')
+    return parser.parse_args(argv)
+
+
+def split(value: Optional[str]) -> Optional[List[str]]:
+    return [it.strip() for it in value.split(',') if it.strip()] if value else None
+
+
+def main(argv: List[str] = None) -> Dict:
+    arguments = parse_arguments(sys.argv[1:] if argv is None else argv)
+    os.environ['TABLE_JOBS'] = arguments.jobs_table
+    os.environ['COMPONENT_TABLE'] = arguments.policies_table
+    if arguments.spoke_role_name:
+        os.environ['SPOKE_ROLE_NAME'] = arguments.spoke_role_name
+    if arguments.create_tables:
+        create_table_if_missing(arguments.jobs_table)
+        if arguments.sink == 'dynamodb':
+            create_table_if_missing(arguments.policies_table)
+
+    summary = LocalScanEngine(arguments.sink, arguments.output, arguments.executor, arguments.workers).run(
+        split(arguments.accounts), split(arguments.services), split(arguments.regions))
+    print(json.dumps(summary, indent=2))
+    return summary
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,287 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+import hashlib
+import threading
+from collections import OrderedDict
+from os import getenv
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from aws_lambda_powertools import Logger
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+
+from aws.services.dynamodb import DynamoDB
+from policy_explorer.policy_explorer_model import PolicyDocumentItem, PolicyDocumentReferenceItem
+from utils.base_repository import Clock
+
+POLICY_DOCUMENT_PARTITION_KEY_PREFIX = 'PolicyDocument'
+POLICY_DOCUMENT_REFERENCE_PARTITION_KEY_PREFIX = 'PolicyDocumentReference'
+
+# Documents are spread over 16^2 partitions by the first characters of their hash
+POLICY_DOCUMENT_PARTITION_HASH_PREFIX_LENGTH = 2
+
+
+def get_policy_document_cache_size() -> int:
+    return int(getenv('POLICY_DOCUMENT_CACHE_SIZE') or 2048)
+
+
+def get_document_release_grace_in_seconds() -> int:
+    """Longer than a scan task holds a document item before it is written, i.e. the 15 minute Lambda timeout."""
+    return int(getenv('POLICY_DOCUMENT_RELEASE_GRACE_IN_SECONDS') or 3600)
+
+
+def policy_hash(policy: str) -> str:
+    return hashlib.sha256(policy.encode('utf-8')).hexdigest()
+
+
+def document_partition_key(document_hash: str) -> str:
+    return f"{POLICY_DOCUMENT_PARTITION_KEY_PREFIX}#{document_hash[:POLICY_DOCUMENT_PARTITION_HASH_PREFIX_LENGTH]}"
+
+
+def is_document_item(item: Dict) -> bool:
+    return item.get('PartitionKey', '').startswith(f"{POLICY_DOCUMENT_PARTITION_KEY_PREFIX}#")
+
+
+def document_reference_partition_key(document_hash: str) -> str:
+    return f"{POLICY_DOCUMENT_REFERENCE_PARTITION_KEY_PREFIX}#{document_hash}"
+
+
+def resource_key(statement_sort_key: str) -> str:
+    """Statement sort keys are <Region>#<Service>#<AccountId>#<ResourceIdentifier>#<StatementNumber>."""
+    return statement_sort_key.rsplit('#', 1)[0]
+
+
+def statement_referrer(statement: Dict) -> str:
+    """All statements of a resource hold one reference, <PartitionKey>#<resource key>."""
+    return f"{statement['PartitionKey']}#{resource_key(statement['SortKey'])}"
+
+
+def document_referrer(item: Dict) -> str:
+    return f"{item['PartitionKey']}#{item['SortKey']}"
+
+
+class PolicyDocumentCache:
+    """Process wide LRU cache of policy documents by content hash. Documents never change for a given hash."""
+
+    def __init__(self, max_size: int = None):
+        self.max_size = max_size or get_policy_document_cache_size()
+        self._lock = threading.Lock()
+        self._documents: OrderedDict[str, str] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, document_hash: str) -> Optional[str]:
+        with self._lock:
+            document = self._documents.get(document_hash)
+            if document is None:
+                self.misses += 1
+                return None
+            self._documents.move_to_end(document_hash)
+            self.hits += 1
+            return document
+
+    def put(self, document_hash: str, document: str):
+        with self._lock:
+            self._documents[document_hash] = document
+            self._documents.move_to_end(document_hash)
+            while len(self._documents) > self.max_size:
+                self._documents.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def statistics(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'Hits': self.hits,
+                'Misses': self.misses,
+                'Size': len(self._documents)
+            }
+
+
+policy_document_cache = PolicyDocumentCache()
+
+
+class PolicyDocumentStore:
+    """
+    Stores every policy document once per content hash in the policy explorer table, in the partition
+    PolicyDocument#<first characters of the hash> with the hash as sort key, so that parallel writers spread over
+    many partitions. Statement items reference the document by PolicyHash instead of repeating the whole policy on
+    every statement.
+
+    Documents are shared by all resources with the same policy. Every resource therefore also writes one reference
+    item into the partition PolicyDocumentReference#<PolicyHash>, with <PartitionKey>#<resource key> of its
+    statements as sort key, so that a document can be deleted once nothing references it anymore, see release.
+
+    Writers in other accounts may add a reference to a document at any time, so a document is only deleted if it was
+    not written within the release grace period. Every writer writes the document item, stamped with ReferencedAt,
+    together with its first reference to it, and the delete re-checks ReferencedAt in its condition. A document that
+    gets a new reference while it is released is kept and expires with its TTL at the latest.
+    """
+
+    def __init__(self, table: DynamoDB, cache: PolicyDocumentCache = None, document_expires_at: int = None):
+        self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
+        self.table = table
+        self.cache = cache or policy_document_cache
+        self.document_expires_at = document_expires_at
+        self.clock = Clock()
+        self.documents_written = 0
+        self.references_written = 0
+
+    def externalize(self, items: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Replaces the Policy attribute of every statement item with PolicyHash. Each distinct document is yielded once
+        as PolicyDocumentItem, before the first statement referencing it, and the first statement of every resource
+        is followed by the PolicyDocumentReferenceItem of the resource. The given items are not modified. Documents
+        expire with the statement, or at document_expires_at if that is later, e.g. with the snapshot of the job.
+        """
+        written_hashes = set()
+        last_policy, last_hash = None, None
+        last_reference = None
+        for item in items:
+            policy = item.get('Policy')
+            if policy is None:
+                yield item
+                continue
+            if policy is not last_policy:  # statements of one policy share the same string
+                last_policy, last_hash = policy, policy_hash(policy)
+            if last_hash not in written_hashes:
+                written_hashes.add(last_hash)
+                self.cache.put(last_hash, policy)
+                self.documents_written += 1
+                yield self._document_item(last_hash, policy, self._document_expiry(item.get('ExpiresAt')))
+            statement = {key: value for key, value in item.items() if key != 'Policy'}
+            statement['PolicyHash'] = last_hash
+            yield statement
+            reference = (statement_referrer(statement), last_hash)
+            if reference != last_reference:  # statements of one resource are contiguous
+                last_reference = reference
+                self.references_written += 1
+                yield self._reference_item(last_hash, reference[0], statement.get('ExpiresAt'))
+
+    def resolve(self, items: List[Dict]) -> List[Dict]:
+        """
+        Replaces PolicyHash with the referenced Policy document. Documents missing from the cache are read
+        with BatchGetItem. Items written before documents were externalized still carry Policy and are returned as is.
+        """
+        documents = self.documents({item['PolicyHash'] for item in items if item.get('PolicyHash')})
+
+        resolved = []
+        for item in items:
+            document_hash = item.get('PolicyHash')
+            if not document_hash:
+                resolved.append(item)
+                continue
+            item = {key: value for key, value in item.items() if key != 'PolicyHash'}
+            if document_hash in documents:
+                item['Policy'] = documents[document_hash]
+            else:
+                self.logger.warning(f"Policy document {document_hash} not found for {item.get('SortKey')}")
+            resolved.append(item)
+        return resolved
+
+    def documents(self, hashes: Iterable[str]) -> Dict[str, str]:
+        """Returns the documents for the given hashes that are still stored, from the cache or with BatchGetItem."""
+        documents = {}
+        missing = []
+        for document_hash in set(hashes):
+            document = self.cache.get(document_hash)
+            if document is not None:
+                documents[document_hash] = document
+            else:
+                missing.append(document_hash)
+
+        if missing:
+            keys = [{'PartitionKey': document_partition_key(document_hash), 'SortKey': document_hash}
+                    for document_hash in missing]
+            for document_item in self.table.batch_get_items(keys):
+                documents[document_item['SortKey']] = document_item['Policy']
+                self.cache.put(document_item['SortKey'], document_item['Policy'])
+        return documents
+
+    def retain(self, referrers: List[Dict], documents: Dict[str, str], expires_at: int) -> List[Dict]:
+        """
+        Returns the items that keep documents for referrers other than statements, e.g. job snapshot items with a
+        PolicyHash: the given documents by hash with expires_at, and a reference per referrer.
+        """
+        items: List[Dict] = [self._document_item(document_hash, policy, expires_at)
+                             for document_hash, policy in documents.items()]
+        items.extend(self._reference_item(referrer['PolicyHash'], document_referrer(referrer),
+                                          referrer.get('ExpiresAt'))
+                     for referrer in referrers if referrer.get('PolicyHash'))
+        return items
+
+    def release(self, statements: List[Dict]) -> Tuple[List[Dict], List[str]]:
+        """
+        Returns the keys of the references held by the resources of the given statements, to delete them together
+        with the statements, and the hashes of the documents that no other item references, to pass them to
+        delete_unreferenced afterwards. Pass all statements of a resource that no longer references the document,
+        e.g. of a removed resource or the obsolete statements of a changed one.
+        """
+        released_by_hash: Dict[str, Set[str]] = {}
+        for statement in statements:
+            if statement.get('PolicyHash'):
+                released_by_hash.setdefault(statement['PolicyHash'], set()).add(statement_referrer(statement))
+        if not released_by_hash:
+            return [], []
+
+        referenced = set()
+        hashes_by_partition_key = {document_reference_partition_key(document_hash): document_hash
+                                   for document_hash in released_by_hash}
+        for reference in self.table.query_items(hashes_by_partition_key, attributes=['PartitionKey', 'SortKey']):
+            document_hash = hashes_by_partition_key[reference['PartitionKey']]
+            if reference['SortKey'] not in released_by_hash[document_hash]:
+                referenced.add(document_hash)
+
+        keys = [{'PartitionKey': document_reference_partition_key(document_hash), 'SortKey': referrer}
+                for document_hash, referrers in released_by_hash.items() for referrer in referrers]
+        return keys, [document_hash for document_hash in released_by_hash if document_hash not in referenced]
+
+    def delete_unreferenced(self, document_hashes: List[str]) -> int:
+        """
+        Deletes the given documents unless they were written within the release grace period, i.e. possibly for a
+        reference that was added after release read the references. Returns the number of deleted documents.
+        """
+        written_before = self.clock.current_time_in_ms() - get_document_release_grace_in_seconds()
+        deleted = 0
+        for document_hash in document_hashes:
+            try:
+                self.table.delete_item(
+                    {'PartitionKey': document_partition_key(document_hash), 'SortKey': document_hash},
+                    Attr('ReferencedAt').not_exists() | Attr('ReferencedAt').lt(written_before))
+                deleted += 1
+            except ClientError as error:
+                if error.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+                self.logger.debug(f"Keeping policy document {document_hash}, it was written recently")
+        return deleted
+
+    def _document_expiry(self, statement_expires_at: Optional[int]) -> Optional[int]:
+        if statement_expires_at is None or self.document_expires_at is None:
+            return statement_expires_at
+        return max(int(statement_expires_at), self.document_expires_at)
+
+    @staticmethod
+    def _reference_item(document_hash: str, referrer: str, expires_at: Optional[int]) -> PolicyDocumentReferenceItem:
+        reference_item: PolicyDocumentReferenceItem = {
+            'PartitionKey': document_reference_partition_key(document_hash),
+            'SortKey': referrer
+        }
+        if expires_at is not None:
+            reference_item['ExpiresAt'] = expires_at
+        return reference_item
+
+    def _document_item(self, document_hash: str, policy: str, expires_at: Optional[int]) -> PolicyDocumentItem:
+        document_item: PolicyDocumentItem = {
+            'PartitionKey': document_partition_key(document_hash),
+            'SortKey': document_hash,
+            'Policy': policy,
+            'ReferencedAt': self.clock.current_time_in_ms()
+        }
+        if expires_at is not None:
+            document_item['ExpiresAt'] = expires_at
+        return document_item
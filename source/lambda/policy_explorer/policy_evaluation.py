@@ -0,0 +1,456 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+import json
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+from os import getenv
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from aws_lambda_powertools import Logger
+
+from aws.services.dynamodb import DynamoDB
+from policy_explorer.incremental_scan import get_policy_item_seconds_to_live
+from policy_explorer.policy_explorer_model import PolicyType, PolicyDecision, PolicyEvaluationRequest, \
+    PolicyEvaluationResult
+from utils.api_gateway_lambda_handler import ClientException
+from utils.base_repository import Clock
+
+ACCOUNT_ID = re.compile(r'^\d{12}$')
+WILDCARD_CHARACTERS = ('*', '?')
+ANY_SERVICE = '*'
+POLICY_TYPES = [PolicyType.RESOURCE_BASED_POLICY.value, PolicyType.SERVICE_CONTROL_POLICY.value]
+STATEMENT_ATTRIBUTES = ['PartitionKey', 'SortKey', 'AccountId', 'ResourceIdentifier', 'Effect', 'Condition', 'Action',
+                        'NotAction', 'Resource', 'NotResource', 'Principal', 'NotPrincipal']
+COMPILED_POLICIES_PARTITION_KEY_PREFIX = 'CompiledPolicies'
+COMPILED_POLICIES_SUMMARY_SORT_KEY = 'Summary'
+COMPILED_POLICIES_CHUNK_SORT_KEY_PREFIX = 'Chunk#'
+COMPILED_POLICIES_CHUNK_SIZE_IN_BYTES = 300 * 1024  # uncompressed, DynamoDB items are limited to 400 KB
+
+
+def get_compiled_policies_cache_size() -> int:
+    return int(getenv('POLICY_EVALUATION_CACHE_SIZE') or 4)
+
+
+def get_max_evaluated_statements() -> int:
+    return int(getenv('POLICY_EVALUATION_MAX_STATEMENTS') or 200000)
+
+
+def compiled_policies_partition_key(job_id: str) -> str:
+    return f"{COMPILED_POLICIES_PARTITION_KEY_PREFIX}#{job_id}"
+
+
+@lru_cache(maxsize=8192)
+def compile_glob(pattern: str, ignore_case: bool) -> re.Pattern:
+    """IAM wildcards: * matches any sequence of characters, ? any single character."""
+    expression = re.escape(pattern).replace(r'\*', '.*').replace(r'\?', '.')
+    return re.compile(expression, regex_flags(ignore_case))
+
+
+def regex_flags(ignore_case: bool) -> int:
+    return (re.IGNORECASE | re.DOTALL) if ignore_case else re.DOTALL
+
+
+def has_wildcard(pattern: str) -> bool:
+    return any(character in pattern for character in WILDCARD_CHARACTERS)
+
+
+def as_list(value) -> List:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def json_value(item: Dict, field: str):
+    """Statement elements are stored JSON formatted, see ConvertPolicyIntoDynamoDBItems."""
+    value = item.get(field)
+    if not value:
+        return None
+    try:
+        return json.loads(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def account_of(principal_or_arn: str) -> Optional[str]:
+    if ACCOUNT_ID.match(principal_or_arn):
+        return principal_or_arn
+    parts = principal_or_arn.split(':', 5)
+    if len(parts) == 6 and parts[0] == 'arn' and ACCOUNT_ID.match(parts[4]):
+        return parts[4]
+    return None
+
+
+def is_service_principal(principal: str) -> bool:
+    return principal.endswith('.amazonaws.com') or principal.endswith('.amazonaws.com.cn')
+
+
+def action_service(action: str) -> str:
+    return action.split(':', 1)[0] if ':' in action else ANY_SERVICE
+
+
+class PatternSet:
+    """
+    Action or resource patterns of a statement. Patterns without wildcards are kept in an interned set, all patterns
+    with wildcards are compiled into one regular expression.
+    """
+    __slots__ = ('ignore_case', 'matches_all', 'exact', 'wildcard', 'patterns')
+
+    def __init__(self, patterns: Iterable[str], ignore_case: bool = False):
+        self.ignore_case = ignore_case
+        self.patterns = [sys.intern(pattern.lower() if ignore_case else pattern)
+                         for pattern in patterns if isinstance(pattern, str)]
+        self.matches_all = '*' in self.patterns
+        self.exact = frozenset(pattern for pattern in self.patterns if not has_wildcard(pattern))
+        wildcards = [pattern for pattern in self.patterns if has_wildcard(pattern)]
+        self.wildcard = None
+        if len(wildcards) == 1 and not self.matches_all:
+            self.wildcard = compile_glob(wildcards[0], ignore_case)
+        elif wildcards and not self.matches_all:
+            self.wildcard = re.compile('|'.join(f"(?:{compile_glob(pattern, ignore_case).pattern})"
+                                                for pattern in sorted(wildcards)), regex_flags(ignore_case))
+
+    def matches(self, value: str) -> bool:
+        """value is expected lower case if the set ignores case."""
+        if self.matches_all or value in self.exact:
+            return True
+        return self.wildcard is not None and self.wildcard.fullmatch(value) is not None
+
+    def services(self) -> Set[str]:
+        """Service prefixes of action patterns, ANY_SERVICE if a pattern matches actions of several services."""
+        return {ANY_SERVICE if has_wildcard(action_service(pattern)) else action_service(pattern)
+                for pattern in self.patterns}
+
+
+class PrincipalSet:
+    """
+    Principal element of a statement. "*" and {"AWS": "*"} match every principal. An account id or account root
+    ARN matches every principal of that account, because the account can delegate the access to its principals.
+    """
+    __slots__ = ('matches_all', 'values', 'accounts')
+
+    def __init__(self, principal):
+        self.matches_all = principal == '*'
+        values, accounts = set(), set()
+        if isinstance(principal, dict):
+            for principal_type, principal_values in principal.items():
+                for value in as_list(principal_values):
+                    if not isinstance(value, str):
+                        continue
+                    if value == '*':
+                        self.matches_all = True
+                    elif principal_type == 'AWS' and (ACCOUNT_ID.match(value) or value.endswith(':root')):
+                        accounts.add(sys.intern(account_of(value) or value))
+                    else:
+                        values.add(sys.intern(value))
+        self.values = frozenset(values)
+        self.accounts = frozenset(accounts)
+
+    def matches(self, principal: str) -> bool:
+        if self.matches_all or principal in self.values:
+            return True
+        return bool(self.accounts) and account_of(principal) in self.accounts
+
+
+class CompiledStatement:
+    """One stored statement, parsed once. A missing Principal (SCPs) matches every principal."""
+    __slots__ = ('sort_key', 'policy_type', 'account_id', 'resource_identifier', 'allow', 'conditional',
+                 'actions', 'not_actions', 'resources', 'not_resources', 'principals', 'not_principals')
+
+    def __init__(self, item: Dict):
+        self.sort_key = sys.intern(item['SortKey'])
+        self.policy_type = item['PartitionKey']
+        self.account_id = item.get('AccountId')
+        self.resource_identifier = item.get('ResourceIdentifier')
+        self.allow = item.get('Effect') == 'Allow'
+        self.conditional = bool(json_value(item, 'Condition'))
+        self.actions = self._patterns(item, 'Action', ignore_case=True)
+        self.not_actions = self._patterns(item, 'NotAction', ignore_case=True)
+        self.resources = self._patterns(item, 'Resource')
+        self.not_resources = self._patterns(item, 'NotResource')
+        principal, not_principal = json_value(item, 'Principal'), json_value(item, 'NotPrincipal')
+        self.principals = PrincipalSet(principal) if principal is not None else None
+        self.not_principals = PrincipalSet(not_principal) if not_principal is not None else None
+
+    @staticmethod
+    def _patterns(item: Dict, field: str, ignore_case: bool = False) -> Optional[PatternSet]:
+        value = json_value(item, field)
+        return PatternSet(as_list(value), ignore_case) if value is not None else None
+
+    def services(self) -> Set[str]:
+        if self.actions is None:
+            return {ANY_SERVICE}  # NotAction matches actions of every service
+        return self.actions.services()
+
+    def matches(self, principal: str, action: str, resource: str) -> bool:
+        """action is expected lower case."""
+        if self.actions is None and self.not_actions is None:
+            return False
+        if self.actions is not None and not self.actions.matches(action):
+            return False
+        if self.not_actions is not None and self.not_actions.matches(action):
+            return False
+        if self.principals is not None and not self.principals.matches(principal):
+            return False
+        if self.not_principals is not None and self.not_principals.matches(principal):
+            return False
+        return self._matches_resource(resource)
+
+    def _matches_resource(self, resource: str) -> bool:
+        if self.policy_type == PolicyType.RESOURCE_BASED_POLICY.value and not self._is_attached_to(resource):
+            return False
+        if self.resources is not None:
+            return self.resources.matches(resource)
+        if self.not_resources is not None:
+            return not self.not_resources.matches(resource)
+        return True  # resource-based policies without Resource element, e.g. trust policies
+
+    def _is_attached_to(self, resource: str) -> bool:
+        """
+        A resource-based policy only grants access to the resource it is attached to and its sub-resources, e.g.
+        the objects of a bucket, even if its statements use Resource "*" like key policies do.
+        """
+        parts = resource.split(':', 5)
+        if len(parts) < 6:
+            return resource == self.resource_identifier
+        if parts[4] and self.account_id and parts[4] != self.account_id:
+            return False
+        resource_id = parts[5]
+        return (resource_id == self.resource_identifier
+                or resource_id.startswith(f"{self.resource_identifier}/")
+                or resource_id.startswith(f"{self.resource_identifier}:"))
+
+
+class CompiledPolicies:
+    """
+    The resource-based policies and SCPs of one policy explorer job, compiled for evaluation. Statements are indexed
+    by the service prefix of their actions, so that a request is only matched against the statements that can
+    apply to its action.
+
+    Decisions follow the IAM evaluation logic for the policies that are stored: an explicit Deny wins; SCPs apply to
+    every account but the management account and never to service principals, and then have to allow the action;
+    finally a resource-based policy has to allow it. Identity-based policies are not evaluated. Statements with
+    conditions cannot be decided without the request context, a decision that depends on them is marked Conditional.
+
+    SCPs are stored without their targets, so whether an SCP is attached to the OUs and the account of a principal
+    is unknown. Decisions that depend on the Deny or the Allow of an SCP are therefore marked Conditional as well.
+    Only an action that no SCP allows at all is certainly denied, as every account has SCPs attached.
+    """
+
+    def __init__(self, job_id: str, items: Iterable[Dict]):
+        self.job_id = job_id
+        self.statements = [CompiledStatement(item) for item in items]
+        self.management_account_ids = frozenset(statement.account_id for statement in self.statements
+                                                if statement.policy_type == PolicyType.SERVICE_CONTROL_POLICY.value)
+        self.has_service_control_policies = bool(self.management_account_ids)
+        self._index: Dict[str, List[CompiledStatement]] = {}
+        for statement in self.statements:
+            for service in statement.services():
+                self._index.setdefault(service, []).append(statement)
+
+    def candidates(self, action: str) -> List[CompiledStatement]:
+        service = action_service(action)
+        if service == ANY_SERVICE:
+            return self.statements
+        return self._index.get(service, []) + self._index.get(ANY_SERVICE, [])
+
+    def evaluate(self, requests: Iterable[PolicyEvaluationRequest]) -> List[PolicyEvaluationResult]:
+        return [self.evaluate_one(request) for request in requests]
+
+    def evaluate_one(self, request: PolicyEvaluationRequest) -> PolicyEvaluationResult:
+        principal, resource = request['Principal'], request['Resource']
+        action = request['Action'].lower()
+        scps_apply = (self.has_service_control_policies and not is_service_principal(principal)
+                      and account_of(principal) not in self.management_account_ids)
+
+        allows, scp_allows, denies = [], [], []
+        for statement in self.candidates(action):
+            is_scp = statement.policy_type == PolicyType.SERVICE_CONTROL_POLICY.value
+            if (is_scp and not scps_apply) or not statement.matches(principal, action, resource):
+                continue
+            if not statement.allow:
+                denies.append(statement)
+            elif is_scp:
+                scp_allows.append(statement)
+            else:
+                allows.append(statement)
+
+        explicit_denies = [statement for statement in denies if not statement.conditional]
+        if explicit_denies:
+            # only a Deny of the resource-based policies certainly applies, an SCP may not be attached
+            conditional = all(statement.policy_type == PolicyType.SERVICE_CONTROL_POLICY.value
+                              for statement in explicit_denies)
+            return self._result(request, PolicyDecision.DENY, conditional, explicit_denies)
+        if (scps_apply and not scp_allows) or not allows:
+            return self._result(request, PolicyDecision.IMPLICIT_DENY, False, [])
+        conditional = (bool(denies)
+                       or all(statement.conditional for statement in allows)
+                       or bool(scp_allows))  # the allowing SCPs may not be attached on every level
+        return self._result(request, PolicyDecision.ALLOW, conditional, allows + scp_allows + denies)
+
+    @staticmethod
+    def _result(request: PolicyEvaluationRequest, decision: PolicyDecision, conditional: bool,
+                statements: List[CompiledStatement]) -> PolicyEvaluationResult:
+        return {
+            'Principal': request['Principal'],
+            'Action': request['Action'],
+            'Resource': request['Resource'],
+            'Decision': decision.value,
+            'Conditional': conditional,
+            'Statements': [{'PolicyType': statement.policy_type, 'SortKey': statement.sort_key}
+                           for statement in statements]
+        }
+
+
+class CompiledPoliciesCache:
+    """
+    Process wide LRU cache of compiled policies by job id and FinishedAt of the job. Statements of a finished job do
+    not change until the next job, and a job that is finished again, e.g. after a retry, is compiled again.
+    """
+
+    def __init__(self, max_size: int = None):
+        self.max_size = max_size or get_compiled_policies_cache_size()
+        self._lock = threading.Lock()
+        self._compiled: OrderedDict[Tuple[str, str], CompiledPolicies] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, job_id: str, finished_at: str,
+            compile_policies: Callable[[], CompiledPolicies]) -> CompiledPolicies:
+        key = (job_id, finished_at)
+        with self._lock:
+            compiled = self._compiled.get(key)
+            if compiled is not None:
+                self._compiled.move_to_end(key)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+        compiled = compile_policies()
+        with self._lock:
+            self._compiled[key] = compiled
+            while len(self._compiled) > self.max_size:
+                self._compiled.popitem(last=False)
+        return compiled
+
+    def clear(self):
+        with self._lock:
+            self._compiled.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def statistics(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'Hits': self.hits,
+                'Misses': self.misses,
+                'Size': len(self._compiled)
+            }
+
+
+compiled_policies_cache = CompiledPoliciesCache()
+
+
+class CompiledPoliciesStore:
+    """
+    Persists the statements of a job that CompiledPolicies evaluates, reduced to STATEMENT_ATTRIBUTES, as zlib
+    compressed JSON chunks in the partition CompiledPolicies#<JobId>. The finish step of the job writes them once, so
+    that the API reads a few chunk items instead of every statement item of the table. The summary item is written
+    last and names the number of chunks, chunks of an earlier attempt beyond that number are ignored and expire.
+    """
+
+    def __init__(self, table: DynamoDB):
+        self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
+        self.table = table
+        self.clock = Clock()
+
+    def save(self, job_id: str) -> int:
+        """Reads the statements of the table and stores them for job_id, returns the number of statements."""
+        partition_key = compiled_policies_partition_key(job_id)
+        expires_at = self.clock.current_time_in_ms() + get_policy_item_seconds_to_live()
+        statement_count, chunks, chunk, chunk_size = 0, [], [], 0
+        for item in self.table.query_items(POLICY_TYPES, attributes=STATEMENT_ATTRIBUTES):
+            line = json.dumps(item, separators=(',', ':'))
+            chunk.append(line)
+            chunk_size += len(line)
+            statement_count += 1
+            if chunk_size >= COMPILED_POLICIES_CHUNK_SIZE_IN_BYTES:
+                chunks.append(self._chunk_item(partition_key, len(chunks), chunk, expires_at))
+                chunk, chunk_size = [], 0
+        if chunk:
+            chunks.append(self._chunk_item(partition_key, len(chunks), chunk, expires_at))
+        self.table.put_items(chunks)
+        self.table.put_item({
+            'PartitionKey': partition_key,
+            'SortKey': COMPILED_POLICIES_SUMMARY_SORT_KEY,
+            'StatementCount': statement_count,
+            'ChunkCount': len(chunks),
+            'ExpiresAt': expires_at
+        })
+        return statement_count
+
+    def load(self, job_id: str) -> List[Dict]:
+        """
+        Returns the stored statements of job_id. Raises a ClientException if the finish step of the job did not
+        store them, or if they are more than POLICY_EVALUATION_MAX_STATEMENTS.
+        """
+        items = self.table.query_all(compiled_policies_partition_key(job_id))
+        summary = next((item for item in items if item['SortKey'] == COMPILED_POLICIES_SUMMARY_SORT_KEY), None)
+        if summary is None:
+            raise ClientException("Service Unavailable", f"The policies of job {job_id} are not compiled, "
+                                                         f"run a new scan to evaluate them", status_code=503)
+        max_statements = get_max_evaluated_statements()
+        if int(summary['StatementCount']) > max_statements:
+            raise ClientException("Too Many Statements", f"Job {job_id} has {summary['StatementCount']} statements, "
+                                                         f"at most {max_statements} can be evaluated", status_code=422)
+        chunk_sort_keys = {self._chunk_sort_key(index) for index in range(int(summary['ChunkCount']))}
+        statements = []
+        for item in items:
+            if item['SortKey'] in chunk_sort_keys:
+                data = zlib.decompress(item['Statements'].value).decode('utf-8')
+                statements.extend(json.loads(line) for line in data.split('\n'))
+        return statements
+
+    @classmethod
+    def _chunk_item(cls, partition_key: str, index: int, lines: List[str], expires_at: int) -> Dict:
+        return {
+            'PartitionKey': partition_key,
+            'SortKey': cls._chunk_sort_key(index),
+            'Statements': zlib.compress('\n'.join(lines).encode('utf-8')),
+            'ExpiresAt': expires_at
+        }
+
+    @staticmethod
+    def _chunk_sort_key(index: int) -> str:
+        return f"{COMPILED_POLICIES_CHUNK_SORT_KEY_PREFIX}{index:05d}"
+
+
+class PolicyEvaluator:
+    """
+    Answers "who can do X on Y" for the statements of the latest policy explorer job, as stored by
+    CompiledPoliciesStore in the finish step of the job.
+    """
+
+    def __init__(self, table: DynamoDB, cache: CompiledPoliciesCache = None):
+        self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
+        self.store = CompiledPoliciesStore(table)
+        self.cache = cache or compiled_policies_cache
+
+    def compiled(self, job_id: str, finished_at: str) -> CompiledPolicies:
+        return self.cache.get(job_id, finished_at, lambda: self._compile(job_id))
+
+    def evaluate(self, job_id: str, finished_at: str,
+                 requests: List[PolicyEvaluationRequest]) -> List[PolicyEvaluationResult]:
+        return self.compiled(job_id, finished_at).evaluate(requests)
+
+    def _compile(self, job_id: str) -> CompiledPolicies:
+        started_at = time.perf_counter()
+        items = self.store.load(job_id)
+        compiled = CompiledPolicies(job_id, items)
+        self.logger.info(f"Compiled {len(compiled.statements)} statements of job {job_id} in "
+                         f"{time.perf_counter() - started_at:.2f} s")
+        return compiled
@@ -4,11 +4,36 @@
 from enum import Enum
 from typing import TypedDict, List
 
+from typing_extensions import NotRequired
 
-class ScanModel(TypedDict):
-    AccountIds: List[str]
-    Regions: List[str]
+
+class ScanMode(Enum):
+    PER_SERVICE = "PER_SERVICE"  # one scan task per account and service
+    PER_ACCOUNT = "PER_ACCOUNT"  # services of an account are batched into few scan tasks, see SCAN_BATCH_MAX_COST
+
+
+class ScanPlanSummaryModel(TypedDict):
+    Concurrency: int
+    AccountsWithHistory: int
+    EstimatedWorkInSeconds: float
+    EstimatedDurationInSeconds: float  # in the planned order
+    EstimatedDurationInListOrderInSeconds: float  # in the order of the account list
+
+
+class ScanManifestItemModel(TypedDict):
+    AccountId: str
     ServiceNames: List[str]
+    ScanMode: str
+
+
+class ScanManifestModel(TypedDict):
+    Bucket: str
+    Key: str
+    Items: int
+
+
+class ScanModel(TypedDict):
+    Manifest: ScanManifestModel  # one ScanManifestItemModel per account, read by the ItemReader of the AccountIterator
 
 
 class ResourceBasedPolicyRequestModel(TypedDict):
@@ -19,6 +44,7 @@ class AccountValidationRequestModel(TypedDict):
     AccountId: str
     JobId: str
     ServiceNames: list[str]
+    ScanMode: NotRequired[str]
 
 
 class ScanServiceRequestModel(TypedDict):
@@ -28,6 +54,13 @@ class ScanServiceRequestModel(TypedDict):
     ServiceName: str
 
 
+class ScanServiceBatchRequestModel(TypedDict):
+    AccountId: str
+    JobId: str
+    Regions: list[str]
+    ServiceNames: list[str]
+
+
 class ValidationType(Enum):
     SUCCEEDED = "SUCCEEDED"
     FAILED = "FAILED"
@@ -36,6 +69,7 @@ class ValidationType(Enum):
 class AccountValidationResponseModel(TypedDict):
     Validation: str
     ServicesToScanForAccount: List[str]
+    ServiceBatches: List[List[str]]
     Regions: list[str]
 
 
@@ -108,6 +142,8 @@ class DynamoDBPolicyItem(TypedDict):
     Condition: str
     Effect: str
     Policy: str
+    PolicyHash: str
+    ContentHash: str
     Principal: str
     PrincipalType: PrincipalType
     Resource: str
@@ -118,6 +154,69 @@ class DynamoDBPolicyItem(TypedDict):
     JobId: str | None
 
 
+class PolicyDocumentItem(TypedDict):
+    PartitionKey: str
+    SortKey: str
+    Policy: str
+    ReferencedAt: int
+    ExpiresAt: int
+
+
+class PolicyDocumentReferenceItem(TypedDict):
+    PartitionKey: str
+    SortKey: str
+    ExpiresAt: int
+
+
+class PolicyIndexItem(TypedDict):
+    PartitionKey: str
+    SortKey: str
+    ExpiresAt: int
+
+
+class PolicyResourceStateItem(TypedDict):
+    PartitionKey: str
+    SortKey: str
+    PolicyType: str
+    Region: str
+    ContentHash: str
+    StatementCount: int
+    LastScannedJobId: str
+    ExpiresAt: int
+
+
+class JobSnapshotItem(TypedDict):
+    PartitionKey: str
+    SortKey: str
+    PolicyType: str
+    Region: str
+    Service: str
+    AccountId: str
+    ResourceIdentifier: str
+    ContentHash: NotRequired[str]
+    PolicyHash: NotRequired[str]
+    StatementCount: int
+    ExpiresAt: int
+
+
+class PolicyDiffChange(Enum):
+    ADDED = "ADDED"
+    REMOVED = "REMOVED"
+    MODIFIED = "MODIFIED"
+
+
+class PolicyDiffItem(TypedDict):
+    Change: str
+    PolicyType: str
+    Region: str
+    Service: str
+    AccountId: str
+    ResourceIdentifier: str
+    SortKey: str
+    Before: dict | None
+    After: dict | None
+
+
 class PolicyItem(TypedDict):
     PartitionKey: str
     SortKey: str
@@ -276,6 +375,12 @@ class PolicyFilters(TypedDict):
     Effect: str | None
 
 
+class MatchMode(Enum):
+    SUBSTRING = "substring"  # filter values are contained in the statement element
+    WILDCARD = "wildcard"  # Action and Resource filters match with IAM wildcard semantics
+    EXACT = "exact"  # Principal, Action, Resource and Condition filters match whole values, read from the search index
+
+
 class DdbPagination(TypedDict):
     Limit: int
     ExclusiveStartKey: str | None
@@ -289,3 +394,29 @@ class PaginationMetadata(TypedDict):
 class PolicySearchResponse(TypedDict):
     Results: List[PolicyItem]
     Pagination: PaginationMetadata
+
+
+class PolicyDecision(Enum):
+    ALLOW = "Allow"
+    DENY = "Deny"  # explicitly denied by a statement
+    IMPLICIT_DENY = "ImplicitDeny"  # not allowed by any statement
+
+
+class PolicyEvaluationRequest(TypedDict):
+    Principal: str  # principal ARN, account id or service principal
+    Action: str
+    Resource: str  # resource ARN
+
+
+class PolicyStatementReference(TypedDict):
+    PolicyType: str
+    SortKey: str
+
+
+class PolicyEvaluationResult(TypedDict):
+    Principal: str
+    Action: str
+    Resource: str
+    Decision: str
+    Conditional: bool  # the decision depends on statements with a Condition
+    Statements: List[PolicyStatementReference]
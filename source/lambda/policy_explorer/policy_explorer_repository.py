@@ -3,12 +3,16 @@
 
 import os
 from logging import Logger
-from typing import List
+from typing import List, Iterable
 
 from botocore.exceptions import ClientError
 
 from aws.services.dynamodb import DynamoDB
-from policy_explorer.policy_explorer_model import DynamoDBPolicyItem, PolicyFilters, PolicyItem, DdbPagination, PaginationMetadata
+from policy_explorer.policy_document_store import PolicyDocumentStore
+from policy_explorer.policy_search_index import PolicySearchIndex, is_search_index_enabled
+from policy_explorer.policy_explorer_model import DynamoDBPolicyItem, PolicyFilters, PolicyItem, DdbPagination, \
+    PaginationMetadata, MatchMode
+from policy_explorer.policy_wildcard_search import WildcardPolicyFilter, substring_filters
 
 
 class PoliciesRepository:
@@ -18,18 +22,39 @@ class PoliciesRepository:
 
     def create_all(self, requests: List[DynamoDBPolicyItem]):
         try:
-            self.table.put_items(requests)
+            items = PolicyDocumentStore(self.table).externalize(requests)
+            self.table.put_items(list(PolicySearchIndex(self.table).index(items)))
             return requests
         except ClientError as error:
             self.logger.error(error)
             raise error
 
+    def create_all_streaming(self, requests: Iterable[DynamoDBPolicyItem], document_expires_at: int = None) -> int:
+        try:
+            document_store = PolicyDocumentStore(self.table, document_expires_at=document_expires_at)
+            search_index = PolicySearchIndex(self.table)
+            written = self.table.put_items_streaming(search_index.index(document_store.externalize(requests)))
+            return written - document_store.documents_written - document_store.references_written \
+                - search_index.entries_written
+        except ClientError as error:
+            self.logger.error(error)
+            raise error
+
     def find_all_by_policy_type(self, policy_type: str, region: str, filters: PolicyFilters,
-                                pagination: DdbPagination) -> tuple[List[PolicyItem], PaginationMetadata]:
+                                pagination: DdbPagination, match_mode: MatchMode = MatchMode.SUBSTRING
+                                ) -> tuple[List[PolicyItem], PaginationMetadata]:
         try:
-            query_result = self.table.query_paginated(policy_type, region, filters, pagination)
+            query_result = None
+            if match_mode == MatchMode.WILDCARD:
+                # index postings are exact tokens, wildcard matches are filtered from the pages of the partition
+                query_result = self.table.query_paginated(policy_type, region, substring_filters(filters), pagination,
+                                                          WildcardPolicyFilter(filters).filter_page)
+            elif match_mode == MatchMode.EXACT and is_search_index_enabled():
+                query_result = PolicySearchIndex(self.table).search(policy_type, region, filters, pagination)
+            if query_result is None:
+                query_result = self.table.query_paginated(policy_type, region, filters, pagination)
             
-            items = query_result.get('Items', [])
+            items = PolicyDocumentStore(self.table).resolve(query_result.get('Items', []))
             last_evaluated_key = query_result.get('LastEvaluatedKey')
             
             next_token = self._encode_next_token(last_evaluated_key) if last_evaluated_key else None
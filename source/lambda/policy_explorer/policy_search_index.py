@@ -0,0 +1,199 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+import json
+import re
+from os import getenv
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from aws_lambda_powertools import Logger
+
+from aws.services.dynamodb import DynamoDB
+from policy_explorer.policy_document_store import is_document_item
+from policy_explorer.policy_explorer_model import PolicyFilters, DdbPagination, PolicyIndexItem
+
+POLICY_INDEX_PARTITION_KEY_PREFIX = 'PolicyIndex'
+
+INDEXED_FIELDS = ['Principal', 'Action', 'Resource', 'Condition']
+
+MAX_TOKEN_LENGTH = 1024
+
+ARN_ACCOUNT_ID = re.compile(r'^arn:[^:]*:[^:]*:[^:]*:(\d{12}):')
+
+
+def is_search_index_enabled() -> bool:
+    """The index is only read in MatchMode.EXACT, so it is opt-in: it writes one item per token of every statement."""
+    return (getenv('POLICY_SEARCH_INDEX_ENABLED') or 'false').lower() == 'true'
+
+
+def index_partition_key(policy_type: str, field: str, token: str) -> str:
+    return f"{POLICY_INDEX_PARTITION_KEY_PREFIX}#{policy_type}#{field}#{token}"
+
+
+def tokens_of_value(field: str, value: str) -> Set[str]:
+    """
+    Tokens of a JSON formatted statement element: every string in it, the account id of every ARN and, for
+    Condition, also the operators and condition keys.
+    """
+    try:
+        parsed = json.loads(value)
+    except (TypeError, ValueError):
+        parsed = value
+
+    tokens = set()
+
+    def collect(element):
+        if isinstance(element, dict):
+            for key, nested in element.items():
+                if field == 'Condition':
+                    tokens.add(key)
+                collect(nested)
+        elif isinstance(element, list):
+            for nested in element:
+                collect(nested)
+        elif element is not None:
+            token = str(element)
+            tokens.add(token)
+            arn_account_id = ARN_ACCOUNT_ID.match(token)
+            if arn_account_id:
+                tokens.add(arn_account_id.group(1))
+
+    collect(parsed)
+    return {token for token in tokens if token and len(token) <= MAX_TOKEN_LENGTH}
+
+
+def search_token(filter_value: str) -> str:
+    """Search values may be entered JSON quoted, e.g. "sts:AssumeRole" to match the string exactly."""
+    return filter_value.strip().strip('"')
+
+
+class PolicySearchIndex:
+    """
+    Inverted index from statement tokens to statement sort keys, stored in the policy explorer table.
+    Each posting is an item in the partition PolicyIndex#<PolicyType>#<Field>#<Token> whose sort key equals
+    the sort key of the statement, so that postings can be narrowed by region with begins_with.
+
+    The index answers searches in MatchMode.EXACT, which match whole tokens instead of substrings, e.g. the Action
+    s3:GetObject does not match s3:GetObjectVersion. Every candidate found through the index is read and matched
+    again, so stale postings never leak into the results. Statements written before the index existed have no
+    postings and are only found by the substring search.
+
+    Entries are only written and deleted when POLICY_SEARCH_INDEX_ENABLED is true, otherwise EXACT searches fall back
+    to filtering the partition.
+    """
+
+    def __init__(self, table: DynamoDB):
+        self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
+        self.table = table
+        self.entries_written = 0
+
+    def index(self, items: Iterable[Dict]) -> Iterator[Dict]:
+        """Yields every item followed by the index entries of its statement."""
+        if not is_search_index_enabled():
+            yield from items
+            return
+        for item in items:
+            yield item
+            if is_document_item(item):
+                continue
+            for field, token in self._entries(item):
+                self.entries_written += 1
+                yield self._index_item(item, field, token)
+
+    def entry_keys(self, items: Iterable[Dict]) -> List[Dict]:
+        """Keys of the index entries of the given statements, to delete them together with the statements."""
+        if not is_search_index_enabled():
+            return []
+        return [{'PartitionKey': index_partition_key(item['PartitionKey'], field, token), 'SortKey': item['SortKey']}
+                for item in items for field, token in self._entries(item)]
+
+    def search(self, policy_type: str, region: str, filters: PolicyFilters,
+               pagination: DdbPagination) -> Optional[Dict]:
+        """
+        Returns a page of statements whose filtered elements contain the filter values as whole tokens, like
+        DynamoDB.query_paginated, or None if none of the filters is indexed and the caller has to fall back to
+        filtering the whole partition.
+        """
+        candidates = self._candidate_sort_keys(policy_type, region, filters)
+        if candidates is None:
+            return None
+
+        limit = pagination.get('Limit', 100)
+        start_key = pagination.get('ExclusiveStartKey')
+        if start_key:
+            candidates = [sort_key for sort_key in candidates if sort_key > start_key.get('SortKey')]
+
+        collected = []
+        position = 0
+        while position < len(candidates) and len(collected) < limit:
+            chunk = candidates[position:position + limit]
+            items = self.table.batch_get_items([{'PartitionKey': policy_type, 'SortKey': sort_key}
+                                                for sort_key in chunk])
+            items_by_sort_key = {item['SortKey']: item for item in items}
+            for sort_key in chunk:
+                position += 1
+                item = items_by_sort_key.get(sort_key)
+                if item is not None and self._matches(item, filters):
+                    collected.append(item)
+                    if len(collected) == limit:
+                        break
+
+        has_more = position < len(candidates)
+        last_evaluated_key = None
+        if has_more and collected:
+            last_evaluated_key = {'PartitionKey': policy_type, 'SortKey': collected[-1]['SortKey']}
+        self.logger.debug(f"Index search found {len(candidates)} candidates, returning {len(collected)}")
+        return {
+            'Items': collected,
+            'LastEvaluatedKey': last_evaluated_key,
+            'Count': len(collected),
+            'ScannedCount': position
+        }
+
+    def _candidate_sort_keys(self, policy_type: str, region: str, filters: PolicyFilters) -> Optional[List[str]]:
+        tokens_by_partition_key = {}
+        for field in INDEXED_FIELDS:
+            if filters.get(field):
+                token = search_token(filters[field])
+                tokens_by_partition_key[index_partition_key(policy_type, field, token)] = token
+        if not tokens_by_partition_key:
+            return None
+
+        # the postings of all filters are read in parallel
+        sort_keys_by_partition_key: Dict[str, Set[str]] = {key: set() for key in tokens_by_partition_key}
+        for posting in self.table.query_items(tokens_by_partition_key, region, ['PartitionKey', 'SortKey']):
+            sort_keys_by_partition_key[posting['PartitionKey']].add(posting['SortKey'])
+
+        postings = sorted(sort_keys_by_partition_key.values(), key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        return sorted(candidates)
+
+    @staticmethod
+    def _matches(item: Dict, filters: PolicyFilters) -> bool:
+        for field, value in filters.items():
+            attribute = item.get(field)
+            if not isinstance(attribute, str):
+                return False
+            if field in INDEXED_FIELDS:
+                if search_token(value) not in tokens_of_value(field, attribute):
+                    return False
+            elif value not in attribute:
+                return False
+        return True
+
+    @staticmethod
+    def _entries(item: Dict) -> Iterator[Tuple[str, str]]:
+        for field in INDEXED_FIELDS:
+            if item.get(field):
+                for token in tokens_of_value(field, item[field]):
+                    yield field, token
+
+    @staticmethod
+    def _index_item(item: Dict, field: str, token: str) -> PolicyIndexItem:
+        index_item: PolicyIndexItem = {
+            'PartitionKey': index_partition_key(item['PartitionKey'], field, token),
+            'SortKey': item['SortKey']
+        }
+        if item.get('ExpiresAt') is not None:
+            index_item['ExpiresAt'] = item['ExpiresAt']
+        return index_item
@@ -0,0 +1,123 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from os import getenv
+from typing import Iterable, Iterator, List, Optional
+
+from aws_lambda_powertools import Logger
+
+from assessment_runner.jobs_repository import JobsRepository
+from policy_explorer.incremental_scan import IncrementalScan, is_incremental_scan_enabled
+from policy_explorer.job_snapshot import JobSnapshot
+from policy_explorer.policy_explorer_model import DynamoDBPolicyItem, ScanServiceRequestModel
+from policy_explorer.policy_explorer_repository import PoliciesRepository
+from utils.decimal_json_encoder import DecimalJsonEncoder
+
+
+def with_job_id(policies: Iterable[DynamoDBPolicyItem], job_id: str) -> Iterator[DynamoDBPolicyItem]:
+    for policy in policies:
+        policy['JobId'] = job_id
+        yield policy
+
+
+def failed_regions(job_id: str, account_id: str, service_name: str) -> List[Optional[str]]:
+    return [failure.get('Region') for failure in JobsRepository().find_task_failures(job_id, account_id, service_name)]
+
+
+class PolicySink(ABC):
+    """Destination of the policy statements that the scan of one service in one account produced."""
+
+    @abstractmethod
+    def store(self, event: ScanServiceRequestModel, policies: Iterable[DynamoDBPolicyItem]) -> int:
+        """Consumes the policies lazily and returns the number of statements stored."""
+
+    def close(self):
+        pass
+
+
+class DynamoDBPolicySink(PolicySink):
+    """Stores statements in the policy explorer table, with job snapshot and incremental rescans."""
+
+    def store(self, event: ScanServiceRequestModel, policies: Iterable[DynamoDBPolicyItem]) -> int:
+        job_id = event.get('JobId')
+        repository = PoliciesRepository()
+        snapshot = JobSnapshot(repository.table, job_id)
+        policies = snapshot.record(policies)
+        incremental_scan = None
+        if is_incremental_scan_enabled():
+            incremental_scan = IncrementalScan(repository.table, event['ServiceName'], event['AccountId'], job_id)
+            policies = incremental_scan.filter_changed(policies)
+        # documents live as long as the snapshot referencing them, so that JobDiff can still expand the statements
+        saved = repository.create_all_streaming(with_job_id(policies, job_id), snapshot.expires_at)
+        snapshot.commit()
+        if incremental_scan:
+            incremental_scan.commit(event.get('Regions', []),
+                                    failed_regions(job_id, event['AccountId'], event['ServiceName']))
+            JobsRepository().add_to_job_counters('POLICY_EXPLORER', job_id, incremental_scan.statistics())
+        return saved
+
+
+class ListPolicySink(PolicySink):
+    """Keeps statements in memory, e.g. to return them from a worker process."""
+
+    def __init__(self):
+        self.items: List[DynamoDBPolicyItem] = []
+        self._lock = threading.Lock()
+
+    def store(self, event: ScanServiceRequestModel, policies: Iterable[DynamoDBPolicyItem]) -> int:
+        items = list(with_job_id(policies, event.get('JobId')))
+        with self._lock:
+            self.items.extend(items)
+        return len(items)
+
+
+class JsonLinesPolicySink(PolicySink):
+    """Appends one JSON object per statement to a local file."""
+
+    def __init__(self, path: str):
+        self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def store(self, event: ScanServiceRequestModel, policies: Iterable[DynamoDBPolicyItem]) -> int:
+        lines = [json.dumps(policy, cls=DecimalJsonEncoder) + '\n'
+                 for policy in with_job_id(policies, event.get('JobId'))]
+        with self._lock:
+            self._file.writelines(lines)
+            self._file.flush()
+        return len(lines)
+
+    def close(self):
+        self._file.close()
+
+
+class SqlitePolicySink(PolicySink):
+    """Stores statements in a local SQLite database, keyed like the DynamoDB table."""
+
+    def __init__(self, path: str):
+        self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS policies ('
+            'partition_key TEXT NOT NULL, sort_key TEXT NOT NULL, job_id TEXT, account_id TEXT, service TEXT, '
+            'region TEXT, item TEXT NOT NULL, PRIMARY KEY (partition_key, sort_key))')
+        self._connection.commit()
+
+    def store(self, event: ScanServiceRequestModel, policies: Iterable[DynamoDBPolicyItem]) -> int:
+        rows = [(policy['PartitionKey'], policy['SortKey'], policy.get('JobId'), policy.get('AccountId'),
+                 policy.get('Service'), policy.get('Region'), json.dumps(policy, cls=DecimalJsonEncoder))
+                for policy in with_job_id(policies, event.get('JobId'))]
+        with self._lock:
+            self._connection.executemany('INSERT OR REPLACE INTO policies VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+            self._connection.commit()
+        return len(rows)
+
+    def close(self):
+        self._connection.close()
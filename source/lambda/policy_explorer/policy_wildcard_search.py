@@ -0,0 +1,145 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+from fnmatch import fnmatchcase
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+
+from policy_explorer.policy_evaluation import as_list, compile_glob, has_wildcard, json_value
+from policy_explorer.policy_explorer_model import PolicyFilters
+from policy_explorer.policy_search_index import search_token
+from policy_explorer.supported_configuration.action_catalog import action_catalog, ActionCatalog
+
+# Filters that follow IAM wildcard semantics in the wildcard match mode, all others keep matching substrings
+WILDCARD_FIELDS = ['Action', 'NotAction', 'Resource', 'NotResource']
+
+
+def element_patterns(value: str) -> List[str]:
+    """The strings of a JSON formatted statement element, e.g. '["s3:Get*", "s3:List*"]'."""
+    return [pattern for pattern in as_list(json_value({'Element': value}, 'Element')) if isinstance(pattern, str)]
+
+
+def globs_overlap(first: str, second: str) -> bool:
+    """Whether some string matches both IAM globs, walking both patterns at once."""
+    end = (len(first), len(second))
+    pending, seen = [(0, 0)], set()
+    while pending:
+        state = pending.pop()
+        if state == end:
+            return True
+        if state in seen:
+            continue
+        seen.add(state)
+        i, j = state
+        a = first[i] if i < len(first) else None
+        b = second[j] if j < len(second) else None
+        if a == '*':
+            pending.append((i + 1, j))  # matches the empty string
+            if b is not None:
+                pending.append((i, j + 1))  # absorbs one character or the other pattern's *
+        if b == '*':
+            pending.append((i, j + 1))
+            if a is not None:
+                pending.append((i + 1, j))
+        if a not in (None, '*') and b not in (None, '*') and (a == b or a == '?' or b == '?'):
+            pending.append((i + 1, j + 1))
+    return False
+
+
+class PatternMatcher:
+    """
+    Matches the patterns of a statement element against a search pattern, both may contain IAM wildcards.
+    Actions ignore case and glob against glob is decided with the action catalog, so that s3:Get* matches s3:*Object
+    because of s3:GetObject. Resources are compared structurally.
+    """
+
+    def __init__(self, search: str, actions: bool, catalog: ActionCatalog = None):
+        self.actions = actions
+        self.search = search.lower() if actions else search
+        self.search_has_wildcard = has_wildcard(self.search)
+        self.search_glob = compile_glob(self.search, actions)
+        self.catalog = catalog or action_catalog
+        self._expanded: Optional[List[str]] = None
+
+    def overlaps(self, patterns: List[str]) -> bool:
+        """Some value matches the search and one of the patterns."""
+        return any(self._overlaps(pattern.lower() if self.actions else pattern) for pattern in patterns)
+
+    def covers(self, patterns: List[str]) -> bool:
+        """Every value that matches the search matches one of the patterns, e.g. to exclude NotAction statements."""
+        patterns = [pattern.lower() if self.actions else pattern for pattern in patterns]
+        expanded = self.expanded()
+        if self.search_has_wildcard and expanded:
+            return all(any(compile_glob(pattern, True).fullmatch(action) for pattern in patterns)
+                       for action in expanded)
+        return any(compile_glob(pattern, self.actions).fullmatch(self.search) for pattern in patterns)
+
+    def expanded(self) -> Optional[List[str]]:
+        """Catalog actions that match a wildcard action search, None if the catalog knows none of its services."""
+        if not self.actions or not self.search_has_wildcard:
+            return None
+        if self._expanded is None:
+            prefix_pattern = self.search.split(':', 1)[0]
+            prefixes = [prefix for prefix in self.catalog.prefixes() if fnmatchcase(prefix, prefix_pattern)]
+            self._expanded = [action for prefix in prefixes for action in self.catalog.actions(prefix)
+                              if self.search_glob.fullmatch(action)]
+        return self._expanded or None
+
+    def _overlaps(self, pattern: str) -> bool:
+        if not has_wildcard(pattern):
+            return self.search_glob.fullmatch(pattern) is not None
+        if not self.search_has_wildcard:
+            return compile_glob(pattern, self.actions).fullmatch(self.search) is not None
+        expanded = self.expanded()
+        if expanded:
+            pattern_glob = compile_glob(pattern, True)
+            return any(pattern_glob.fullmatch(action) for action in expanded)
+        return globs_overlap(pattern, self.search)
+
+
+class WildcardPolicyFilter:
+    """
+    Post-filter for pages of statements in the wildcard match mode.
+
+    An Action search finds the statements whose Action element matches any of the searched actions, or whose
+    NotAction element leaves one of them, because both grant or deny it. Resource searches work the same way with
+    Resource and NotResource. NotAction and NotResource searches only look at that element.
+
+    Statements of the same policy share their elements, so each page is filtered by deciding every distinct element
+    value once, and remembering the decision for the following pages.
+    """
+
+    def __init__(self, filters: PolicyFilters, catalog: ActionCatalog = None):
+        self.predicates: List[Callable[[Dict], bool]] = []
+        for field in WILDCARD_FIELDS:
+            if filters.get(field):
+                matcher = PatternMatcher(search_token(filters[field]), field.endswith('Action'), catalog)
+                self.predicates.append(self._predicate(field, matcher))
+
+    def filter_page(self, items: List[Dict]) -> List[Dict]:
+        return [item for item in items if all(predicate(item) for predicate in self.predicates)]
+
+    @staticmethod
+    def _predicate(field: str, matcher: PatternMatcher) -> Callable[[Dict], bool]:
+        negated_field = f"Not{field}" if not field.startswith('Not') else None
+
+        @lru_cache(maxsize=4096)
+        def element_overlaps(value: str) -> bool:
+            return matcher.overlaps(element_patterns(value))
+
+        @lru_cache(maxsize=4096)
+        def negated_element_leaves(value: str) -> bool:
+            return not matcher.covers(element_patterns(value))
+
+        def predicate(item: Dict) -> bool:
+            if item.get(field):
+                return element_overlaps(item[field])
+            if negated_field and item.get(negated_field):
+                return negated_element_leaves(item[negated_field])
+            return False
+
+        return predicate
+
+
+def substring_filters(filters: PolicyFilters) -> PolicyFilters:
+    return {field: value for field, value in filters.items() if field not in WILDCARD_FIELDS}
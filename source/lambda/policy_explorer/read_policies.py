@@ -7,7 +7,7 @@ from aws_lambda_powertools.utilities.data_classes import APIGatewayProxyEvent
 from aws_lambda_powertools.utilities.typing import LambdaContext
 
 from metrics.solution_metrics import SolutionMetrics
-from policy_explorer.policy_explorer_model import PolicyFilters, DdbPagination, PolicySearchResponse
+from policy_explorer.policy_explorer_model import PolicyFilters, DdbPagination, PolicySearchResponse, MatchMode
 from policy_explorer.policy_explorer_repository import PoliciesRepository
 from utils.api_gateway_lambda_handler import GenericApiGatewayEventHandler, ApiGatewayResponse, ClientException
 from utils.pagination_helper import validate_max_results, decode_next_token
@@ -58,6 +58,12 @@ class ReadPolicies:
         if query.get('condition'):
             filters['Condition'] = query.get('condition')
 
+        try:
+            match_mode = MatchMode(query.get('match') or MatchMode.SUBSTRING.value)
+        except ValueError:
+            raise ClientException('Bad Request', f"Query parameter \"match\" must be one of "
+                                                 f"{[mode.value for mode in MatchMode]}")
+
         max_results_param = query.get('maxResults') or query.get('limit')
         max_results = validate_max_results(max_results_param)
         exclusive_start_key = decode_next_token(query.get('nextToken'))
@@ -67,7 +73,8 @@ class ReadPolicies:
             ExclusiveStartKey=exclusive_start_key
         )
 
-        results, pagination_metadata = repository.find_all_by_policy_type(policy_type, region, filters, pagination)
+        results, pagination_metadata = repository.find_all_by_policy_type(policy_type, region, filters, pagination,
+                                                                          match_mode)
 
         SolutionMetrics().send_search_metrics(policy_type, region, filters, len(results))
 
@@ -0,0 +1,46 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+from os import getenv
+from typing import Iterable, Iterator, List
+
+from aws_lambda_powertools import Logger
+
+from aws.services.s3 import S3
+from policy_explorer.policy_explorer_model import ScanManifestItemModel, ScanManifestModel
+
+MANIFEST_PREFIX = 'scan-manifests'
+
+
+def get_manifest_bucket() -> str:
+    return getenv('SCAN_MANIFEST_BUCKET')
+
+
+class ScanManifest:
+    """
+    Work manifest of a policy explorer job in S3: one JSON line per account with the services to scan in it. The state
+    machine input only carries a pointer to the manifest instead of every account id, which keeps it below the 256 KB
+    input limit of Step Functions for organizations with thousands of accounts. The ItemReader of the distributed
+    AccountIterator reads the manifest and starts a child execution per line.
+    """
+
+    def __init__(self, job_id: str, bucket_name: str = None):
+        self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
+        self.bucket_name = bucket_name or get_manifest_bucket()
+        self.key = f"{MANIFEST_PREFIX}/{job_id}.jsonl"
+        self.s3 = S3()
+
+    @staticmethod
+    def work_items(account_ids: Iterable[str], service_names: List[str],
+                   scan_mode: str) -> Iterator[ScanManifestItemModel]:
+        for account_id in account_ids:
+            yield {'AccountId': account_id, 'ServiceNames': service_names, 'ScanMode': scan_mode}
+
+    def write(self, account_ids: List[str], service_names: List[str], scan_mode: str) -> ScanManifestModel:
+        self.s3.write_json_lines_as_file(self.bucket_name, self.key,
+                                         self.work_items(account_ids, service_names, scan_mode))
+        self.logger.info(f"Wrote scan manifest with {len(account_ids)} accounts to s3://{self.bucket_name}/{self.key}")
+        return {
+            'Bucket': self.bucket_name,
+            'Key': self.key,
+            'Items': len(account_ids)
+        }
@@ -0,0 +1,103 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+import heapq
+import statistics
+from os import getenv
+from typing import Dict, List, Tuple
+
+from aws_lambda_powertools import Logger
+
+from assessment_runner.job_model import ScanDurationModel
+from assessment_runner.jobs_repository import JobsRepository
+from policy_explorer.policy_explorer_model import ScanPlanSummaryModel
+from policy_explorer.supported_configuration.scanner_registry import scanner_registry
+
+# Estimate for a service that was never scanned in any account, per unit of the scanner cost hint
+DEFAULT_SECONDS_PER_COST = 2.0
+
+
+def get_account_concurrency() -> int:
+    """Accounts scanned in parallel, maxConcurrency of the AccountIterator."""
+    return max(1, int(getenv('SCAN_ACCOUNT_CONCURRENCY') or 10))
+
+
+def get_service_concurrency() -> int:
+    """Scan tasks of an account run in parallel, maxConcurrency of the ServiceIterator."""
+    return max(1, int(getenv('SCAN_SERVICE_CONCURRENCY') or 10))
+
+
+def makespan(durations: List[float], concurrency: int) -> float:
+    """Finish time of the last lane when the durations are started in the given order, each on the lane that becomes
+    free first."""
+    lanes = [0.0] * min(concurrency, max(len(durations), 1))
+    for duration in durations:
+        heapq.heapreplace(lanes, lanes[0] + duration)
+    return max(lanes)
+
+
+class ScanPlanner:
+    """
+    Orders the accounts of a job longest first (LPT scheduling), based on the duration that each service took in
+    each account in previous jobs. The AccountIterator starts its items in input order, so a large account that is
+    listed last would otherwise be started when all other lanes are about to finish and alone determine the job
+    duration. The services of every account are started in the job wide order of Scan.ServiceNames.
+
+    Accounts without history are estimated from the median duration of the service in all other accounts, and
+    services that were never scanned from the cost hint of their scanner.
+    """
+
+    def __init__(self, assessment_type: str = 'POLICY_EXPLORER'):
+        self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
+        self.assessment_type = assessment_type
+        self.durations: Dict[Tuple[str, str], float] = {}
+        self.service_medians: Dict[str, float] = {}
+
+    def load_history(self) -> 'ScanPlanner':
+        self.use_history(JobsRepository().find_scan_durations(self.assessment_type))
+        return self
+
+    def use_history(self, history: List[ScanDurationModel]) -> 'ScanPlanner':
+        self.durations = {(it['AccountId'], it['Service']): float(it['DurationInSeconds']) for it in history}
+        per_service: Dict[str, List[float]] = {}
+        for (_account_id, service_name), duration in self.durations.items():
+            per_service.setdefault(service_name, []).append(duration)
+        self.service_medians = {service_name: statistics.median(durations)
+                                for service_name, durations in per_service.items()}
+        return self
+
+    def estimate(self, account_id: str, service_name: str) -> float:
+        duration = self.durations.get((account_id, service_name))
+        if duration is not None:
+            return duration
+        if service_name in self.service_medians:
+            return self.service_medians[service_name]
+        registration = scanner_registry.registration(service_name)
+        return (registration.cost if registration else 1) * DEFAULT_SECONDS_PER_COST
+
+    def account_estimate(self, service_estimates: List[float]) -> float:
+        """An account takes at least as long as its slowest service, and at least its total work spread over the
+        parallel scan tasks."""
+        if not service_estimates:
+            return 0.0
+        return max(max(service_estimates), sum(service_estimates) / get_service_concurrency())
+
+    def plan(self, account_ids: List[str], service_names: List[str]) -> Tuple[List[str], ScanPlanSummaryModel]:
+        """Returns the account ids longest first and the estimated job duration."""
+        account_estimates = {account_id: self.account_estimate([self.estimate(account_id, service_name)
+                                                                for service_name in service_names])
+                             for account_id in account_ids}
+        planned_account_ids = sorted(account_ids, key=lambda it: -account_estimates[it])
+
+        concurrency = get_account_concurrency()
+        durations = [account_estimates[account_id] for account_id in planned_account_ids]
+        summary: ScanPlanSummaryModel = {
+            'Concurrency': concurrency,
+            'AccountsWithHistory': len({account_id for account_id, _service in self.durations
+                                        if account_id in account_estimates}),
+            'EstimatedWorkInSeconds': round(sum(durations), 1),
+            'EstimatedDurationInSeconds': round(makespan(durations, concurrency), 1),
+            'EstimatedDurationInListOrderInSeconds': round(makespan(
+                [account_estimates[account_id] for account_id in account_ids], concurrency), 1)
+        }
+        self.logger.info("Planned scan", extra=summary)
+        return planned_account_ids, summary
@@ -46,7 +46,7 @@ class ScanSingleServiceStrategy(SynchronousScanStrategy):
 
         scan_method = resolve_scan_method(scan_config)
 
-        policies: list[DynamoDBPolicyItem] = scan_method()
+        policies: list[DynamoDBPolicyItem] = list(scan_method())
         for policy in policies:
             policy['JobId'] = job_id
         logger.info(f"Scanned {len(policies)} policies for service {scan_config.get('ServiceName')}")
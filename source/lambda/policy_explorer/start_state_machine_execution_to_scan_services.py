@@ -10,12 +10,17 @@ from botocore.exceptions import ClientError
 
 from assessment_runner.assessment_runner import AssessmentRunner, ScanStrategy, write_task_failure
 from assessment_runner.job_model import AssessmentType
-from aws.services.organizations import Organizations
+from assessment_runner.organization_snapshot import organization_snapshots
 from aws.services.step_functions import StepFunctions
-from policy_explorer.policy_explorer_model import ScanModel, DynamoDBPolicyItem
+from policy_explorer.policy_explorer_model import ScanModel, DynamoDBPolicyItem, ScanMode
+from policy_explorer.job_snapshot import JobSnapshot
 from policy_explorer.policy_explorer_repository import PoliciesRepository
+from policy_explorer.scan_manifest import ScanManifest
+from policy_explorer.scan_planner import ScanPlanner
 from policy_explorer.step_functions_lambda.scan_organizations_policy import ServiceControlPolicy
+from policy_explorer.supported_configuration.scanner_registry import scanner_registry
 from policy_explorer.supported_configuration.supported_regions_and_services import SupportedServices
+from utils.api_gateway_lambda_handler import ClientException
 
 logger = Logger(getenv('LOG_LEVEL'))
 tracer = Tracer()
@@ -31,6 +36,16 @@ def lambda_handler(event: Dict, context: LambdaContext) -> str:
         raise error 
     return "started"
 
+
+def get_scan_mode(request_body: Dict) -> str:
+    """PER_SERVICE scans every service of an account in a task of its own, PER_ACCOUNT batches the services of an
+    account into as few tasks as their cost allows. Selected per job in the request, or by POLICY_EXPLORER_SCAN_MODE."""
+    scan_mode = request_body.get('ScanMode') or getenv('POLICY_EXPLORER_SCAN_MODE') or str(ScanMode.PER_SERVICE.value)
+    if scan_mode not in [it.value for it in ScanMode]:
+        raise ClientException('Bad Request', f"Invalid scan mode {scan_mode}")
+    return scan_mode
+
+
 class ScanAllPoliciesStrategy(ScanStrategy):
     """
     search the active accounts in aws organizations and start state machine execution to assess resource based
@@ -40,24 +55,29 @@ class ScanAllPoliciesStrategy(ScanStrategy):
     def __init__(self):
         self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
         self.state_machine_arn = getenv('SCAN_POLICIES_STATE_MACHINE_ARN')
-        self.management_account_id = Organizations()._get_management_account_id()
+        self.management_account_id = None
 
     def assessment_type(self) -> str:
         return str(AssessmentType.POLICY_EXPLORER.value)
     
-    def get_scan_config(self) -> ScanModel: 
+    def get_scan_config(self, job_id: str, request_body: Dict = None) -> ScanModel: 
+        # the Map states start their items in input order, longest first keeps them off the tail of the job
+        service_names = scanner_registry.by_cost(SupportedServices.service_names())
+        account_ids, _plan = ScanPlanner().load_history().plan(organization_snapshots.get(job_id).active_account_ids(),
+                                                               service_names)
+        # the accounts are passed in the manifest, an inline list exceeds the 256 KB input limit in large organizations
         return {
-                'AccountIds': Organizations().list_active_account_ids(),
-                'ServiceNames':  SupportedServices.service_names()
-                }
+            'Manifest': ScanManifest(job_id).write(account_ids, service_names, get_scan_mode(request_body or {}))
+        }
 
     def scan(self, job_id, request_body: Dict):
         
         self.logger.debug(f"Request body received {request_body}")
+        self.management_account_id = organization_snapshots.get(job_id).management_account_id
 
         state_machine_input = {
             'JobId': job_id,
-            'Scan': self.get_scan_config()
+            'Scan': self.get_scan_config(job_id, request_body)
         }
         self.logger.debug(state_machine_input)
         response_from_step_function = StepFunctions().start_execution(self.state_machine_arn, state_machine_input)
@@ -72,7 +92,10 @@ class ScanAllPoliciesStrategy(ScanStrategy):
                 'ServiceName': 'organizations'}).scan()
             self.logger.debug(f"Service control policies {policies}")
             if policies:
-                PoliciesRepository().create_all(policies)
+                repository = PoliciesRepository()
+                snapshot = JobSnapshot(repository.table, job_id)
+                repository.create_all(list(snapshot.record(policies)))
+                snapshot.commit()
         except ClientError as err:
             write_task_failure(
                 job_id,
@@ -1,6 +1,7 @@
 #  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 #  SPDX-License-Identifier: Apache-2.0
 
+import hashlib
 import json
 from os import getenv
 from typing import List
@@ -14,6 +15,12 @@ from utils.base_repository import Clock
 logger = Logger(service='ConvertPolicyIntoDynamoDBItems', level=getenv('LOG_LEVEL'))
 
 
+def canonical_policy_hash(policy: dict) -> str:
+    """Hash of the policy independent of key order and whitespace, to detect changed policies between scans."""
+    canonical = json.dumps(policy, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
 class ConvertPolicyIntoDynamoDBItems:
 
     def __init__(self):
@@ -22,7 +29,7 @@ class ConvertPolicyIntoDynamoDBItems:
         self.clock = Clock()
 
     def get_seconds_to_live(self):
-        days_to_live = int(getenv('POLICY_ITEM_TTL_IN_DAYS') or 2)
+        days_to_live = int(getenv('POLICY_ITEM_TTL_IN_DAYS') or 14)
         return days_to_live * 24 * 60 * 60
 
     def _calculate_expires_at(self):
@@ -52,6 +59,7 @@ class ConvertPolicyIntoDynamoDBItems:
 
             policy = self.get_policy(policy_details)
             policy_as_string = json.dumps(policy)
+            content_hash = canonical_policy_hash(policy)
 
             # The 'statement' property in IAM policies can be either a dict or an array of dicts
             statements_in_policy = policy.get('Statement', [])
@@ -69,6 +77,7 @@ class ConvertPolicyIntoDynamoDBItems:
                     'Service': policy_details.get('Service'),
                     'ResourceIdentifier': policy_details.get('ResourceIdentifier'),
                     'Policy': policy_as_string,
+                    'ContentHash': content_hash,
                     'ExpiresAt': self._calculate_expires_at()
                 }
                 if statement.get('Sid'):
@@ -8,7 +8,8 @@ from mypy_boto3_ecr.type_defs import GetRepositoryPolicyResponseTypeDef, Reposit
 
 import policy_explorer.policy_explorer_model as model
 from aws.services.ec2_container_registry import EC2ContainerRegistry
-from policy_explorer.step_functions_lambda.utils import DenormalizePolicyDetailsIntoDynamoDBItems, scan_regions
+from policy_explorer.step_functions_lambda.utils import DenormalizePolicyDetailsIntoDynamoDBItems, scan_regions, \
+    fetch_concurrently
 from policy_explorer.step_functions_lambda.split_arn_to_policy_details import get_policy_details_from_arn
 
 
@@ -47,14 +48,14 @@ class EC2ContainerRegistryRepositoryPolicy:
 
     @staticmethod
     def _get_ecr_policies(ecr_data: list[model.ECRData], ecr_client) -> list[model.PolicyAnalyzerRequest]:
-        ecr_policies = []
-        for ecr in ecr_data:
+        def get_policy_details(ecr: model.ECRData) -> model.PolicyDetails:
             resource_arn = ecr['RepositoryArn']
             policy_details: model.PolicyDetails = get_policy_details_from_arn(resource_arn)
             policy_details.update({'PolicyType': model.PolicyType.RESOURCE_BASED_POLICY})
             policy: GetRepositoryPolicyResponseTypeDef = ecr_client.get_repository_policy(
                 ecr['RepositoryName']
-            )   
+            )
             policy_details.update({"Policy": policy.get('policyText', None)})
-            ecr_policies.append(policy_details)
-        return ecr_policies
+            return policy_details
+
+        return fetch_concurrently('ecr', ecr_data, get_policy_details)
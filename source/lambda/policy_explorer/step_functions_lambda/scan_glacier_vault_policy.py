@@ -22,9 +22,9 @@ class GlacierVaultPolicy:
         return scan_regions(self.event, self.scan_single_region)
 
     def scan_single_region(self, region: str) -> Iterable[model.DynamoDBPolicyItem]:
-        self.glacier_client = Glacier(self.account_id, region)
-        vault_data = self._get_vault_data(self.glacier_client)
-        vault_names_policies = self._get_vault_policies(vault_data, glacier_client=self.glacier_client)
+        glacier_client = Glacier(self.account_id, region)
+        vault_data = self._get_vault_data(glacier_client)
+        vault_names_policies = self._get_vault_policies(vault_data, glacier_client=glacier_client)
         vault_policies_dynamodb_items = []
         for vault_name_policy in vault_names_policies:
             if vault_name_policy.get("Policy"):
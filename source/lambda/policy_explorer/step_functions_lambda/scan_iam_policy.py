@@ -1,7 +1,7 @@
 #  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 #  SPDX-License-Identifier: Apache-2.0
 from os import getenv
-from typing import Iterable
+from typing import Iterable, Iterator
 
 from aws_lambda_powertools import Logger
 from mypy_boto3_iam.type_defs import PolicyTypeDef as IAMPolicyTypeDef, PolicyVersionTypeDef, RoleTypeDef
@@ -19,26 +19,23 @@ class IAMPolicy:
         self.iam_client = IAM(event['AccountId'])
 
     def scan(self) -> Iterable[model.DynamoDBPolicyItem]:
+        return list(self.stream())
+
+    def stream(self) -> Iterator[model.DynamoDBPolicyItem]:
+        """Yields the DynamoDB items policy by policy, so that only the policy being denormalized is held in memory."""
         try:
-            iam_policies_dynamodb_items = self.scan_iam_policy()
-            role_policy_dynamodb_items = self.scan_role_policy()
-            return [
-                *iam_policies_dynamodb_items,
-                *role_policy_dynamodb_items
-            ]
+            yield from self.scan_iam_policy()
+            yield from self.scan_role_policy()
         except Exception as err:
             self.logger.error(err)
             self.logger.info(f"Error occurred while scanning IAM policies: {err}")
             raise err
 
-    def scan_iam_policy(self) -> Iterable[model.DynamoDBPolicyItem]:
+    def scan_iam_policy(self) -> Iterator[model.DynamoDBPolicyItem]:
         policy_data: list[model.IAMPolicyData] = self._get_policy_data()
-        policy_names_documents = self._get_iam_policy_names_and_documents(policy_data)
-        policy_name_dynamodb_items = []
-        for policy_name_document in policy_names_documents:
+        for policy_name_document in self._get_iam_policy_names_and_documents(policy_data):
             if policy_name_document.get('Policy'):
-                policy_name_dynamodb_items.extend(DenormalizePolicyDetailsIntoDynamoDBItems(self.event).model(policy_name_document))
-        return policy_name_dynamodb_items
+                yield from DenormalizePolicyDetailsIntoDynamoDBItems(self.event).model(policy_name_document)
 
     def _get_policy_data(self) -> list[model.IAMPolicyData]:
         iam_policy_objects: list[IAMPolicyTypeDef] = self.iam_client.list_policies()
@@ -54,8 +51,7 @@ class IAMPolicy:
         return data
 
     def _get_iam_policy_names_and_documents(
-            self, policy_data: list[model.IAMPolicyData]) -> list[model.PolicyDetails]:
-        iam_policies = []
+            self, policy_data: list[model.IAMPolicyData]) -> Iterator[model.PolicyDetails]:
         for policy in policy_data:
             resource_arn = policy.get('Arn')
             policy_details: model.PolicyDetails = get_policy_details_from_arn(resource_arn)
@@ -66,43 +62,31 @@ class IAMPolicy:
                 policy.get('DefaultVersionId')
             )
             policy_details.update({'Policy': policy_document.get('Document')})
-            iam_policies.append(policy_details)
-        return iam_policies
+            yield policy_details
 
-    def scan_role_policy(self) -> Iterable[model.DynamoDBPolicyItem]:
-        role_names_assume_role_policy_documents = self._get_role_names_and_assume_role_policy_documents()
-        self.logger.debug(f"role policy line 75 {role_names_assume_role_policy_documents}")   
-        role_names_assume_role_policy_dynamodb_items = []
-        for role_name_assume_role_policy_document in role_names_assume_role_policy_documents:
+    def scan_role_policy(self) -> Iterator[model.DynamoDBPolicyItem]:
+        for role_name_assume_role_policy_document in self._get_role_names_and_assume_role_policy_documents():
             self.logger.debug(role_name_assume_role_policy_document)
             if role_name_assume_role_policy_document.get('Policy'):
-                role_names_assume_role_policy_dynamodb_items.extend(DenormalizePolicyDetailsIntoDynamoDBItems(self.event)
-                                                                    .model(role_name_assume_role_policy_document))
-        return role_names_assume_role_policy_dynamodb_items
+                yield from DenormalizePolicyDetailsIntoDynamoDBItems(self.event).model(
+                    role_name_assume_role_policy_document)
 
-    def _get_role_names_and_assume_role_policy_documents(self) -> list[model.PolicyDetails]:
+    def _get_role_names_and_assume_role_policy_documents(self) -> Iterator[model.PolicyDetails]:
         roles: list[RoleTypeDef] = self.iam_client.list_roles()
 
-        role_names_role_policies = []
         for role in roles:
             resource_arn = f"{role.get('Arn')}/AssumeRolePolicyDocument"
             role_policies = get_policy_details_from_arn(resource_arn)
             role_policies.update({'Region': 'GLOBAL'})
             role_policies.update({'PolicyType': model.PolicyType.RESOURCE_BASED_POLICY})
             role_policies.update({'Policy': role.get('AssumeRolePolicyDocument')})
-            role_names_role_policies.append(role_policies)
-            
-            inline_policy_details = self._get_role_inline_policies(role)
-            if inline_policy_details:
-                role_names_role_policies.extend(inline_policy_details)
-            
-        return role_names_role_policies
-        
+            yield role_policies
+
+            yield from self._get_role_inline_policies(role)
 
-    def _get_role_inline_policies(self, role: RoleTypeDef) -> list[model.PolicyDetails]:
+    def _get_role_inline_policies(self, role: RoleTypeDef) -> Iterator[model.PolicyDetails]:
         # get inline role policy names
         inline_policy_names = self.iam_client.list_role_inline_policies(role_name=role.get('RoleName'))
-        inline_policy_details_list = []
         for inline_policy_name in inline_policy_names:
             # get inline policy details
             resource_arn = f"{role.get('Arn')}/inline-policy/{inline_policy_name}"
@@ -111,5 +95,4 @@ class IAMPolicy:
             inline_policy_details.update({'Region': 'GLOBAL'})
             inline_policy_details.update({'PolicyType': model.PolicyType.IDENTITY_BASED_POLICY})
             inline_policy_details.update({'Policy': get_role_policy_response.get('PolicyDocument')})
-            inline_policy_details_list.append(inline_policy_details)
-        return inline_policy_details_list
\ No newline at end of file
+            yield inline_policy_details
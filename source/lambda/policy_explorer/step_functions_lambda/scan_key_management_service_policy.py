@@ -8,7 +8,8 @@ from mypy_boto3_kms.type_defs import KeyListEntryTypeDef, GetKeyPolicyResponseTy
 
 import policy_explorer.policy_explorer_model as model
 from aws.services.key_management_service import KeyManagementService
-from policy_explorer.step_functions_lambda.utils import DenormalizePolicyDetailsIntoDynamoDBItems, scan_regions
+from policy_explorer.step_functions_lambda.utils import DenormalizePolicyDetailsIntoDynamoDBItems, scan_regions, \
+    fetch_concurrently
 from policy_explorer.step_functions_lambda.split_arn_to_policy_details import get_policy_details_from_arn
 
 
@@ -47,8 +48,7 @@ class KeyManagementServicePolicy:
 
     @staticmethod
     def _get_kms_policy(kms_keys: list[model.KMSData], kms_client) -> list[model.PolicyDetails]:
-        kms_policies = []
-        for key in kms_keys:
+        def get_policy_details(key: model.KMSData) -> model.PolicyDetails:
             resource_arn = key.get('KeyArn')
             policy_details: model.PolicyDetails = get_policy_details_from_arn(resource_arn)
             policy_details.update({'PolicyType': model.PolicyType.RESOURCE_BASED_POLICY})
@@ -56,5 +56,6 @@ class KeyManagementServicePolicy:
                 key.get('KeyId')
             )
             policy_details.update({'Policy': policy.get('Policy')})
-            kms_policies.append(policy_details)
-        return kms_policies
+            return policy_details
+
+        return fetch_concurrently('kms', kms_keys, get_policy_details)
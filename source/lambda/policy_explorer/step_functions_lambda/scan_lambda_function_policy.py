@@ -8,7 +8,8 @@ from mypy_boto3_lambda.type_defs import FunctionConfigurationTypeDef, GetPolicyR
 
 import policy_explorer.policy_explorer_model as model
 from aws.services.lambda_functions import LambdaFunctions
-from policy_explorer.step_functions_lambda.utils import DenormalizePolicyDetailsIntoDynamoDBItems, scan_regions
+from policy_explorer.step_functions_lambda.utils import DenormalizePolicyDetailsIntoDynamoDBItems, scan_regions, \
+    fetch_concurrently
 from policy_explorer.step_functions_lambda.split_arn_to_policy_details import get_policy_details_from_arn
 
 
@@ -50,15 +51,15 @@ class LambdaFunctionPolicy:
     @staticmethod
     def _get_lambda_function_policy(lambda_function_data: list[model.LambdaFunctionData],
                                     lambda_client) -> list[model.PolicyDetails]:
-        lambda_policies = []
-        for lambda_function in lambda_function_data:
+        def get_policy_details(lambda_function: model.LambdaFunctionData) -> model.PolicyDetails:
             resource_arn = lambda_function.get('FunctionArn')
             policy_details: model.PolicyDetails = get_policy_details_from_arn(resource_arn)
             policy_details.update({'PolicyType': model.PolicyType.RESOURCE_BASED_POLICY})
-            
+
             policy: GetPolicyResponseTypeDef = lambda_client.get_policy(
                 lambda_function.get('FunctionName')
             )
             policy_details.update({'Policy': policy.get('Policy')})
-            lambda_policies.append(policy_details)
-        return lambda_policies
+            return policy_details
+
+        return fetch_concurrently('lambda', lambda_function_data, get_policy_details)
@@ -18,7 +18,6 @@ class Lexv2ModelsPolicy:
         self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
         self.event = event
         self.account_id = event['AccountId']
-        self.lex_resources: list[LexResource] = []
         
     def scan(self) -> Iterable[model.DynamoDBPolicyItem]:
         return scan_regions(self.event, self.scan_single_region)
@@ -26,8 +25,8 @@ class Lexv2ModelsPolicy:
     def scan_single_region(self, region: str) -> Iterable[model.DynamoDBPolicyItem]:
         self.logger.info(f"Scanning Lex v2 Models Policies in {region}")
         lexv2_client = Lexv2Models(self.account_id, region)
-        self.lex_resources = self._get_lex_resources(lexv2_client=lexv2_client, region=region)
-        lex_resource_names_and_policies: list[model.PolicyDetails] = self._get_lex_resources_and_policies(self.lex_resources, lexv2_client)
+        lex_resources = self._get_lex_resources(lexv2_client=lexv2_client, region=region)
+        lex_resource_names_and_policies: list[model.PolicyDetails] = self._get_lex_resources_and_policies(lex_resources, lexv2_client)
         lex_resource_dynamodb_items = []
         for lex_resource in lex_resource_names_and_policies:
             if lex_resource.get('Policy'):
@@ -1,51 +1,23 @@
 #  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 #  SPDX-License-Identifier: Apache-2.0
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from os import getenv
-from typing import Iterable
+from typing import Dict, Iterable
 
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from botocore.exceptions import ClientError
 
 import policy_explorer.policy_explorer_model as model
-from assessment_runner.assessment_runner import write_task_failure
-from policy_explorer.policy_explorer_model import ScanServiceRequestModel, DynamoDBPolicyItem
-from policy_explorer.policy_explorer_repository import PoliciesRepository
-from policy_explorer.step_functions_lambda.scan_acm_pca_policy import ACMPCAPolicy
-from policy_explorer.step_functions_lambda.scan_api_gateway_service_policy import APIGatewayPolicy
-from policy_explorer.step_functions_lambda.scan_backup_vault_access_policy import BackupVaultAccessPolicy
-from policy_explorer.step_functions_lambda.scan_cloudformation_stack_policy import CloudFormationStackPolicy
-from policy_explorer.step_functions_lambda.scan_code_artifact_policy import CodeArtifactPolicy
-from policy_explorer.step_functions_lambda.scan_code_build_resource_policy import CodeBuildResourcePolicy
-from policy_explorer.step_functions_lambda.scan_config_rule_policy import ConfigRulePolicy
-from policy_explorer.step_functions_lambda.scan_ec2_container_registry_repository_policy import \
-    EC2ContainerRegistryRepositoryPolicy
-from policy_explorer.step_functions_lambda.scan_elastic_file_system_policy import ElasticFileSystemPolicy
-from policy_explorer.step_functions_lambda.scan_event_bus_policy import EventBusPolicy
-from policy_explorer.step_functions_lambda.scan_eventbridge_schemas_policy import EventBridgeSchemasPolicy
-from policy_explorer.step_functions_lambda.scan_glacier_vault_policy import GlacierVaultPolicy
-from policy_explorer.step_functions_lambda.scan_glue_resource_policy import GlueResourcePolicy
-from policy_explorer.step_functions_lambda.scan_iam_policy import IAMPolicy
-from policy_explorer.step_functions_lambda.scan_iot_policy import IoTPolicy
-from policy_explorer.step_functions_lambda.scan_key_management_service_policy import KeyManagementServicePolicy
-from policy_explorer.step_functions_lambda.scan_lambda_function_policy import LambdaFunctionPolicy
-from policy_explorer.step_functions_lambda.scan_lex_v2_models_policy import Lexv2ModelsPolicy
-from policy_explorer.step_functions_lambda.scan_media_store_policy import MediaStorePolicy
-from policy_explorer.step_functions_lambda.scan_open_search_domain_policy import OpenSearchDomainPolicy
-from policy_explorer.step_functions_lambda.scan_organizations_policy import ServiceControlPolicy
-from policy_explorer.step_functions_lambda.scan_ram_policy import RAMPolicy
-from policy_explorer.step_functions_lambda.scan_redshift_serverless_policy import RedshiftServerlessPolicy
-from policy_explorer.step_functions_lambda.scan_s3_bucket_policy import S3BucketPolicy
-from policy_explorer.step_functions_lambda.scan_secrets_manager_policy import SecretsManagerPolicy
-from policy_explorer.step_functions_lambda.scan_serverless_application_policy import ServerlessApplicationPolicy
-from policy_explorer.step_functions_lambda.scan_ses_identity_policy import SESIdentityPolicy
-from policy_explorer.step_functions_lambda.scan_sns_topic_policy import SNSTopicPolicy
-from policy_explorer.step_functions_lambda.scan_sqs_queue_policies import SQSQueuePolicy
-from policy_explorer.step_functions_lambda.scan_ssm_contacts_policy import SSMContactsPolicy
-from policy_explorer.step_functions_lambda.scan_ssm_incidents_response_plan_policy import \
-    SSMIncidentsResponsePlanPolicy
-from policy_explorer.step_functions_lambda.scan_vpc_endpoints_policy import VPCEndpointsPolicy
+from assessment_runner.assessment_runner import write_task_failure, with_api_call_metrics
+from assessment_runner.jobs_repository import JobsRepository
+from aws.services.security_token_service import SecurityTokenService
+from policy_explorer.policy_explorer_model import ScanServiceRequestModel, DynamoDBPolicyItem, \
+    ScanServiceBatchRequestModel
+from policy_explorer.policy_sinks import PolicySink, DynamoDBPolicySink
+from policy_explorer.supported_configuration.scanner_registry import scanner_registry
 from policy_explorer.supported_configuration.supported_regions_and_services import SUPPORTED_SERVICE_NAMES
 
 logger = Logger(getenv('LOG_LEVEL'))
@@ -54,7 +26,59 @@ tracer = Tracer()
 
 @tracer.capture_lambda_handler
 @logger.inject_lambda_context(log_event=True)
-def lambda_handler(event: ScanServiceRequestModel, _context: LambdaContext):
+@with_api_call_metrics('POLICY_EXPLORER')
+def lambda_handler(event: ScanServiceRequestModel | ScanServiceBatchRequestModel, _context: LambdaContext):
+    if 'ServiceNames' in event:
+        scan_services(event)
+    else:
+        scan_service(event)
+
+
+def get_batch_concurrency() -> int:
+    return max(1, int(getenv('SCAN_BATCH_MAX_WORKERS') or 4))
+
+
+def scan_services(event: ScanServiceBatchRequestModel, sink_factory=None) -> Dict[str, int]:
+    """Scans a batch of services in one account concurrently. All services share the credentials of the spoke role,
+    which are assumed once up front, and the pooled clients. Each service is isolated like a task of its own: its
+    failures are documented with write_task_failure and do not affect the other services of the batch.
+    Returns the number of statements stored per service."""
+    service_names = event['ServiceNames']
+    sink_factory = sink_factory or DynamoDBPolicySink
+    events = [{
+        'AccountId': event['AccountId'],
+        'JobId': event['JobId'],
+        'Regions': event['Regions'],
+        'ServiceName': service_name
+    } for service_name in service_names]
+
+    if len(service_names) > 1:
+        assume_spoke_role(event['AccountId'])
+    workers = min(get_batch_concurrency(), max(len(service_names), 1))
+    if workers == 1:
+        saved = [scan_service(service_event, sink_factory()) for service_event in events]
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='scan_services') as executor:
+            saved = list(executor.map(lambda service_event: scan_service(service_event, sink_factory()), events))
+
+    statements = dict(zip(service_names, saved))
+    logger.info(f"Scanned {len(service_names)} services in account {event['AccountId']} with {workers} workers",
+                extra={'StatementsPerService': statements})
+    return statements
+
+
+def assume_spoke_role(account_id: str):
+    """Puts the spoke role credentials into the credential cache, so that the concurrent scanners of a batch do not
+    each miss the cache and assume the role. A failure is left to the scanners to record per service."""
+    try:
+        SecurityTokenService().assume_role_by_name(account_id, getenv('SPOKE_ROLE_NAME'))
+    except ClientError as err:
+        logger.warning(f"Unable to assume the spoke role in account {account_id}: {err}")
+
+
+def scan_service(event: ScanServiceRequestModel, sink: PolicySink = None) -> int:
+    """Scans one service in one account and stores the statements in the sink, DynamoDB by default.
+    Failures are documented with write_task_failure. Returns the number of statements stored."""
     job_id = event.get('JobId')
     service_name = event['ServiceName']
     account_id = event['AccountId']
@@ -68,21 +92,22 @@ def lambda_handler(event: ScanServiceRequestModel, _context: LambdaContext):
             service_name,
             "Unsupported Service"
         )
-        return
+        return 0
 
     try:
         scan_method = resolve_scan_method(event)
         if not scan_method:
-            return
-        policies: list[model.DynamoDBPolicyItem] = scan_method()
-        for policy in policies:
-            policy['JobId'] = job_id
+            return 0
+        started_at = time.perf_counter()
+        policies: Iterable[model.DynamoDBPolicyItem] = scan_method()
+        saved = (sink or DynamoDBPolicySink()).store(event, policies)
         logger.info(f"Scanned policies for service {service_name}")
-        if policies:
-            logger.info('Saving {0} policies to DynamoDB'.format(str(len(policies))))
-            PoliciesRepository().create_all(policies)
+        if saved:
+            logger.info('Saved {0} policies to DynamoDB'.format(str(saved)))
         else:
             logger.info('No policies for {0} in account {1}'.format(service_name, account_id))
+        record_scan_duration(event, time.perf_counter() - started_at, saved)
+        return saved
     except ClientError as err:
         write_task_failure(
             job_id,
@@ -102,127 +127,29 @@ def lambda_handler(event: ScanServiceRequestModel, _context: LambdaContext):
             service_name,
             repr(err)
         )
+    return 0
+
+
+def record_scan_duration(event: ScanServiceRequestModel, duration_in_seconds: float, items: int):
+    """Records how long the service took in this account, for the scan planner of the next job. Best effort, a
+    failure to record does not fail the scan."""
+    try:
+        JobsRepository().put_scan_duration('POLICY_EXPLORER', event.get('JobId'), event['AccountId'],
+                                           event['ServiceName'], duration_in_seconds, items)
+    except ClientError as err:
+        logger.warning(f"Unable to record the scan duration of {event['ServiceName']}: {err}")
 
 
 def resolve_scan_method(event):
-    method_name = f"scan_{event['ServiceName']}_policy"
     logger.debug("Resolving scan method for service " + event['ServiceName'])
-    class_object = ScanPolicyStrategy(event)
-    try:
-        scan_method = getattr(
-            class_object,
-            method_name
-        )
-        return scan_method
-    except AttributeError as err:
+    scan_method = scanner_registry.scan_method(event)
+    if scan_method is None:
         write_task_failure(
             event['JobId'],
             'POLICY_EXPLORER',
             event['AccountId'],
             None,
             event['ServiceName'],
-            f"function {method_name} is not available in ScanPolicyStrategy."
+            f"No scanner registered for service {event['ServiceName']}."
         )
-        return None
-
-
-class ScanPolicyStrategy:
-    def __init__(self, event: ScanServiceRequestModel):
-        self.event = event
-        self.logger = logger
-
-    def scan_s3_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return S3BucketPolicy(self.event).scan()
-
-    def scan_glacier_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return GlacierVaultPolicy(self.event).scan()
-
-    def scan_iam_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return IAMPolicy(self.event).scan()
-
-    def scan_sns_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return SNSTopicPolicy(self.event).scan()
-
-    def scan_sqs_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return SQSQueuePolicy(self.event).scan()
-
-    def scan_lambda_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return LambdaFunctionPolicy(self.event).scan()
-
-    def scan_elasticfilesystem_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return ElasticFileSystemPolicy(self.event).scan()
-
-    def scan_secretsmanager_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return SecretsManagerPolicy(self.event).scan()
-
-    def scan_iot_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return IoTPolicy(self.event).scan()
-
-    def scan_kms_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return KeyManagementServicePolicy(self.event).scan()
-
-    def scan_apigateway_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return APIGatewayPolicy(self.event).scan()
-
-    def scan_events_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return EventBusPolicy(self.event).scan()
-
-    def scan_ses_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return SESIdentityPolicy(self.event).scan()
-
-    def scan_ecr_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return EC2ContainerRegistryRepositoryPolicy(self.event).scan()
-
-    def scan_config_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return ConfigRulePolicy(self.event).scan()
-
-    def scan_ssm_incidents_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return SSMIncidentsResponsePlanPolicy(self.event).scan()
-
-    def scan_opensearchservice_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return OpenSearchDomainPolicy(self.event).scan()
-
-    def scan_cloudformation_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return CloudFormationStackPolicy(self.event).scan()
-
-    def scan_glue_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return GlueResourcePolicy(self.event).scan()
-
-    def scan_serverlessrepo_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return ServerlessApplicationPolicy(self.event).scan()
-
-    def scan_backup_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return BackupVaultAccessPolicy(self.event).scan()
-
-    def scan_codeartifact_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return CodeArtifactPolicy(self.event).scan()
-
-    def scan_codebuild_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return CodeBuildResourcePolicy(self.event).scan()
-
-    def scan_mediastore_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return MediaStorePolicy(self.event).scan()
-
-    def scan_ec2_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return VPCEndpointsPolicy(self.event).scan()
-
-    def scan_lexv2_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return Lexv2ModelsPolicy(self.event).scan()
-
-    def scan_redshift_serverless_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return RedshiftServerlessPolicy(self.event).scan()
-
-    def scan_acm_pca_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return ACMPCAPolicy(self.event).scan()
-
-    def scan_ssm_contacts_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return SSMContactsPolicy(self.event).scan()
-
-    def scan_eventbridge_schemas_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return EventBridgeSchemasPolicy(self.event).scan()
-
-    def scan_ram_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return RAMPolicy(self.event).scan()
-
-    def scan_organizations_policy(self) -> Iterable[DynamoDBPolicyItem]:
-        return ServiceControlPolicy(self.event).scan()
+    return scan_method
@@ -12,7 +12,7 @@ from aws.services.s3 import S3
 from policy_explorer.step_functions_lambda.split_arn_to_policy_details import get_policy_details_from_arn
 from aws.utils.get_partition import partition_name_for_current_region
 from policy_explorer.supported_configuration.supported_regions_and_services import SupportedRegions
-from policy_explorer.step_functions_lambda.utils import DenormalizePolicyDetailsIntoDynamoDBItems
+from policy_explorer.step_functions_lambda.utils import DenormalizePolicyDetailsIntoDynamoDBItems, fetch_concurrently
 
 class S3BucketPolicy:
     def __init__(self, event: model.ScanServiceRequestModel):
@@ -20,6 +20,7 @@ class S3BucketPolicy:
         self.event = event
         self.s3_client = S3(event['AccountId'])
         self.account_id = event['AccountId']
+        self.regional_s3_clients: dict[str, S3] = {}
 
     def scan(self) -> Iterable[model.DynamoDBPolicyItem]:
         bucket_names = self._get_bucket_names()
@@ -65,38 +66,42 @@ class S3BucketPolicy:
         return None
 
     def _get_bucket_policy_details(self, s3_data: list[model.S3Data]) -> list[model.PolicyDetails]:
-        bucket_policies = []
-        for s3 in s3_data:
-            bucket_name: str = s3['BucketName']
-            try:
-                s3_client = self._get_s3_client_with_regional_endpoint_if_opt_in_region(s3)
-                policy: GetBucketPolicyOutputTypeDef = s3_client.get_bucket_policy(bucket_name)
-                if policy.get('Policy'):
-                    bucket_arn = f"arn:{partition_name_for_current_region()}:s3:::{s3['BucketName']}"
-                    policy_details: model.PolicyDetails = get_policy_details_from_arn(bucket_arn)
-                    policy_details.update({'Region': s3['BucketRegion']})
-                    policy_details.update({'AccountId': s3['BucketAccountId']})
-                    policy_details.update({'Policy': policy.get('Policy')})
-                    policy_details.update({'PolicyType': model.PolicyType.RESOURCE_BASED_POLICY})
-                    bucket_policies.append(policy_details)
-            except s3_client.exceptions.NoSuchBucketPolicy:
-                # This is normal - bucket exists but has no policy attached
-                self.logger.debug(f"No bucket policy exists for bucket {bucket_name}")
-            except Exception as e:
-                self.logger.error(f"Error getting bucket policy for bucket {bucket_name}: {e}")
-                write_task_failure(
-                    self.event['JobId'],
-                    'POLICY_EXPLORER',
-                    self.event['AccountId'],
-                    s3['BucketRegion'],
-                    's3',
-                    f'Unable to get_bucket_policy for bucket {bucket_name}: {e}'
-                )
-        return bucket_policies
+        bucket_policies = fetch_concurrently('s3', s3_data, self._get_bucket_policy_detail)
+        return [bucket_policy for bucket_policy in bucket_policies if bucket_policy and bucket_policy.get('Policy')]
+
+    def _get_bucket_policy_detail(self, s3: model.S3Data) -> Union[model.PolicyDetails, None]:
+        bucket_name: str = s3['BucketName']
+        try:
+            s3_client = self._get_s3_client_with_regional_endpoint_if_opt_in_region(s3)
+            policy: GetBucketPolicyOutputTypeDef = s3_client.get_bucket_policy(bucket_name)
+            if policy.get('Policy'):
+                bucket_arn = f"arn:{partition_name_for_current_region()}:s3:::{s3['BucketName']}"
+                policy_details: model.PolicyDetails = get_policy_details_from_arn(bucket_arn)
+                policy_details.update({'Region': s3['BucketRegion']})
+                policy_details.update({'AccountId': s3['BucketAccountId']})
+                policy_details.update({'Policy': policy.get('Policy')})
+                policy_details.update({'PolicyType': model.PolicyType.RESOURCE_BASED_POLICY})
+                return policy_details
+        except s3_client.exceptions.NoSuchBucketPolicy:
+            # This is normal - bucket exists but has no policy attached
+            self.logger.debug(f"No bucket policy exists for bucket {bucket_name}")
+        except Exception as e:
+            self.logger.error(f"Error getting bucket policy for bucket {bucket_name}: {e}")
+            write_task_failure(
+                self.event['JobId'],
+                'POLICY_EXPLORER',
+                self.event['AccountId'],
+                s3['BucketRegion'],
+                's3',
+                f'Unable to get_bucket_policy for bucket {bucket_name}: {e}'
+            )
+        return None
 
     def _get_s3_client_with_regional_endpoint_if_opt_in_region(self, s3):
         supported_regions = SupportedRegions().get_supported_region_objects()
         for supported in supported_regions:
             if s3['BucketRegion'] == supported['Region'] and "Opt-In" in supported['RegionName']:
-                return S3(self.account_id, s3['BucketRegion'])
+                if s3['BucketRegion'] not in self.regional_s3_clients:
+                    self.regional_s3_clients[s3['BucketRegion']] = S3(self.account_id, s3['BucketRegion'])
+                return self.regional_s3_clients[s3['BucketRegion']]
         return self.s3_client
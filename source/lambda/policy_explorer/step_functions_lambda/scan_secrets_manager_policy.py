@@ -8,7 +8,8 @@ from mypy_boto3_secretsmanager.type_defs import GetResourcePolicyResponseTypeDef
 
 import policy_explorer.policy_explorer_model as model
 from aws.services.secrets_manager import SecretsManager
-from policy_explorer.step_functions_lambda.utils import DenormalizePolicyDetailsIntoDynamoDBItems, scan_regions
+from policy_explorer.step_functions_lambda.utils import DenormalizePolicyDetailsIntoDynamoDBItems, scan_regions, \
+    fetch_concurrently
 from policy_explorer.step_functions_lambda.split_arn_to_policy_details import get_policy_details_from_arn
 
 
@@ -50,8 +51,7 @@ class SecretsManagerPolicy:
     @staticmethod
     def _get_secrets_manager_policy(secrets_manager_data: list[model.SecretsManagerData],
                                     secrets_manager_client) -> list[model.PolicyDetails]:
-        secrets_manager_policies = []
-        for secrets_manager in secrets_manager_data:
+        def get_policy_details(secrets_manager: model.SecretsManagerData) -> model.PolicyDetails:
             resource_arn = secrets_manager.get('Arn')
             policy_details = get_policy_details_from_arn(resource_arn)
             policy_details.update({'PolicyType': model.PolicyType.RESOURCE_BASED_POLICY})
@@ -59,5 +59,6 @@ class SecretsManagerPolicy:
                 secrets_manager.get('Name')
             )
             policy_details.update({'Policy': policy.get('ResourcePolicy')})
-            secrets_manager_policies.append(policy_details)
-        return secrets_manager_policies
+            return policy_details
+
+        return fetch_concurrently('secretsmanager', secrets_manager_data, get_policy_details)
@@ -8,7 +8,8 @@ from mypy_boto3_sns.type_defs import TopicTypeDef, GetTopicAttributesResponseTyp
 
 import policy_explorer.policy_explorer_model as model
 from aws.services.sns import SNS
-from policy_explorer.step_functions_lambda.utils import DenormalizePolicyDetailsIntoDynamoDBItems, scan_regions
+from policy_explorer.step_functions_lambda.utils import DenormalizePolicyDetailsIntoDynamoDBItems, scan_regions, \
+    fetch_concurrently
 from policy_explorer.step_functions_lambda.split_arn_to_policy_details import get_policy_details_from_arn
 
 
@@ -35,8 +36,8 @@ class SNSTopicPolicy:
 
     def _get_topic_names_and_policies(
             self, topic_arns: list[TopicTypeDef], sns_client) -> list[model.PolicyDetails]:
-        topic_names_and_policies = list(
-            self._get_topic_policy(topic_arn['TopicArn'], sns_client) for topic_arn in topic_arns)
+        topic_names_and_policies = fetch_concurrently(
+            'sns', topic_arns, lambda topic_arn: self._get_topic_policy(topic_arn['TopicArn'], sns_client))
         self.logger.info(topic_names_and_policies)
         return topic_names_and_policies
 
@@ -8,7 +8,8 @@ from mypy_boto3_sqs.type_defs import GetQueueAttributesResultTypeDef
 
 import policy_explorer.policy_explorer_model as model
 from aws.services.sqs import SQS
-from policy_explorer.step_functions_lambda.utils import DenormalizePolicyDetailsIntoDynamoDBItems, scan_regions
+from policy_explorer.step_functions_lambda.utils import DenormalizePolicyDetailsIntoDynamoDBItems, scan_regions, \
+    fetch_concurrently
 from policy_explorer.step_functions_lambda.split_arn_to_policy_details import get_policy_details_from_arn
 
 
@@ -34,7 +35,7 @@ class SQSQueuePolicy:
         return queue_policy_dynamodb_items
 
     def _get_queue_urls_and_policies(self, queue_urls: list[str], sqs_client) -> list[model.PolicyDetails]:
-        return list(self._get_queue_policy(queue_url, sqs_client) for queue_url in queue_urls)
+        return fetch_concurrently('sqs', queue_urls, lambda queue_url: self._get_queue_policy(queue_url, sqs_client))
 
     @staticmethod
     def _get_queue_policy(queue_url: str, sqs_client) -> model.PolicyDetails:
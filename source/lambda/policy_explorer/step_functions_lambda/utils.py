@@ -1,27 +1,57 @@
 #  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 #  SPDX-License-Identifier: Apache-2.0
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from os import getenv
-from typing import Callable, List
+from typing import Callable, Dict, List, Sequence, TypeVar
 
 from aws_lambda_powertools import Logger
+from botocore.exceptions import ClientError
 
 import policy_explorer.policy_explorer_model as model
 from assessment_runner.assessment_runner import write_task_failure
 from aws.utils.exceptions import ServiceUnavailable, RegionNotEnabled, ConnectionTimeout, \
-    AccountAssessmentClientException, AccessDenied
+    AccountAssessmentClientException, AccessDenied, RESOURCE_NOT_FOUND_ERROR_CODES
 from policy_explorer.step_functions_lambda.convert_policy_into_dynamodb_items import ConvertPolicyIntoDynamoDBItems
 
 
+T = TypeVar('T')
+R = TypeVar('R')
+
+DEFAULT_FETCH_CONCURRENCY = 8
+
+# Services with low per-account API rate limits get fewer workers to avoid trading latency for throttling
+FETCH_CONCURRENCY_BY_SERVICE = {
+    'iam': 4,
+    'kms': 6,
+    'secretsmanager': 6,
+}
+
+
+def get_region_concurrency() -> int:
+    return max(1, int(getenv('SCAN_REGIONS_MAX_WORKERS') or 8))
+
+
 def scan_regions(event: model.ScanServiceRequestModel,
-                 scan_single_region: Callable[[str], List[model.DynamoDBPolicyItem]]) -> \
+                 scan_single_region: Callable[[str], List[model.DynamoDBPolicyItem]],
+                 max_workers: int = None) -> \
         list[model.DynamoDBPolicyItem]:
+    """Scans all regions of the event on a bounded thread pool.
+
+    Results are merged in the order of event['Regions'], independent of completion order. Regions that fail with
+    one of the expected service errors are recorded via write_task_failure; any other error is raised after all
+    regions finished, the first one in region order wins.
+    """
     logger = Logger(service='scan_regions', level=getenv('LOG_LEVEL'))
-    resources_in_all_regions = []
-    for region in event['Regions']:
+    regions = event['Regions']
+    workers = min(max_workers or get_region_concurrency(), max(len(regions), 1))
+    durations: Dict[str, float] = {}
+
+    def scan_region(region: str) -> list[model.DynamoDBPolicyItem]:
+        started_at = time.perf_counter()
         try:
-            resources_for_region = scan_single_region(region)
-            resources_in_all_regions.extend(resources_for_region)
+            return list(scan_single_region(region))
         except (ServiceUnavailable, RegionNotEnabled, ConnectionTimeout,
                 AccountAssessmentClientException, AccessDenied) as err:
             logger.debug(f"[{event['AccountId']}][{event['ServiceName']}] Handling Error: {err.message}. Writing "
@@ -34,8 +64,63 @@ def scan_regions(event: model.ScanServiceRequestModel,
                 event['ServiceName'],
                 json.dumps(err.message) if hasattr(err, 'message') else json.dumps(err)
             )
+            return []
+        finally:
+            durations[region] = round(time.perf_counter() - started_at, 3)
+
+    if workers == 1:
+        results = [scan_region(region) for region in regions]
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='scan_regions') as executor:
+            futures = [executor.submit(scan_region, region) for region in regions]
+            wait(futures)
+            results = [future.result() for future in futures]
+
+    logger.info(f"[{event['AccountId']}][{event['ServiceName']}] Scanned {len(regions)} regions with {workers} "
+                f"workers", extra={'RegionDurationsInSeconds': dict(
+                    sorted(durations.items(), key=lambda duration: duration[1], reverse=True))})
+
+    resources_in_all_regions = []
+    for resources_for_region in results:
+        resources_in_all_regions.extend(resources_for_region)
     return resources_in_all_regions
 
+
+def get_fetch_concurrency(service_name: str) -> int:
+    service_setting = getenv(f"POLICY_FETCH_MAX_WORKERS_{service_name.upper()}")
+    global_setting = getenv('POLICY_FETCH_MAX_WORKERS')
+    configured = service_setting or global_setting or FETCH_CONCURRENCY_BY_SERVICE.get(
+        service_name, DEFAULT_FETCH_CONCURRENCY)
+    return max(1, int(configured))
+
+
+def fetch_concurrently(service_name: str, items: Sequence[T], fetch: Callable[[T], R],
+                       max_workers: int = None) -> list[R | dict]:
+    """Calls fetch for every item on a bounded thread pool and returns the results in input order.
+
+    Like resource_not_found_exception_handler, a resource that disappeared between listing and fetching does not
+    fail the whole fetch, its result is replaced by {'Error': str(err)}. All other errors, e.g. throttling or
+    RegionNotEnabled raised by service_exception_handler, are raised so that scan_regions can record or raise them
+    for the whole region.
+    """
+    logger = Logger(service='fetch_concurrently', level=getenv('LOG_LEVEL'))
+
+    def fetch_item(item: T) -> R | dict:
+        try:
+            return fetch(item)
+        except ClientError as err:
+            if err.response['Error']['Code'] not in RESOURCE_NOT_FOUND_ERROR_CODES:
+                raise
+            logger.error(f"[{service_name}] Failed to fetch {item}: {err}")
+            return {'Error': str(err)}
+
+    workers = min(max_workers or get_fetch_concurrency(service_name), len(items))
+    if workers <= 1:
+        return [fetch_item(item) for item in items]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"fetch_{service_name}") as executor:
+        return list(executor.map(fetch_item, items))
+
+
 class DenormalizePolicyDetailsIntoDynamoDBItems:
     def __init__(self, event):
         self.event = event
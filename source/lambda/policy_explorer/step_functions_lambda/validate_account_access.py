@@ -3,10 +3,11 @@
 from os import getenv
 
 from aws_lambda_powertools import Logger, Tracer
-from assessment_runner.assessment_runner import write_task_failure
+from assessment_runner.assessment_runner import write_task_failure, with_api_call_metrics
 from aws.services.security_token_service import SecurityTokenService
 from policy_explorer.policy_explorer_model import AccountValidationRequestModel, \
-    AccountValidationResponseModel, ValidationType
+    AccountValidationResponseModel, ValidationType, ScanMode
+from policy_explorer.supported_configuration.scanner_registry import scanner_registry
 from mypy_boto3_sts.type_defs import CredentialsTypeDef
 from aws.services.account import AccountService
 
@@ -16,11 +17,16 @@ tracer = Tracer()
 
 @tracer.capture_lambda_handler
 @logger.inject_lambda_context(log_event=True)
+@with_api_call_metrics('POLICY_EXPLORER')
 def lambda_handler(event: AccountValidationRequestModel, _context) -> AccountValidationResponseModel:
     logger.debug(event)
     return ValidateAccountAccess(event).check_account_access_permission()
 
 
+def get_scan_batch_max_cost() -> int:
+    return max(1, int(getenv('SCAN_BATCH_MAX_COST') or 200))
+
+
 class ValidateAccountAccess:
     """
     Validate accounts provided in the event. Mark them invalid to skip them in State Machine if we can't access the
@@ -33,11 +39,19 @@ class ValidateAccountAccess:
         self.service_names = event['ServiceNames']
         self.account_id = event['AccountId']
         self.job_id = event['JobId']
+        self.scan_mode = event.get('ScanMode') or str(ScanMode.PER_SERVICE.value)
     
     def get_regions_for_account(self, credentials: CredentialsTypeDef, account_id: str) -> list[str]:
         account_service: AccountService = AccountService(credentials=credentials)
         return account_service.get_regions(account_id=account_id)
-        
+
+    def service_batches(self, regions: list[str]) -> list[list[str]]:
+        """Groups the services into scan tasks for the ServiceIterator. In PER_ACCOUNT mode, small accounts are
+        scanned in a single task, while accounts with many regions are split into tasks of bounded cost."""
+        if self.scan_mode == str(ScanMode.PER_ACCOUNT.value):
+            return scanner_registry.batches(self.service_names, len(regions), get_scan_batch_max_cost())
+        return [[service_name] for service_name in self.service_names]
+
     def check_account_access_permission(self) -> AccountValidationResponseModel:
         try:
             account_credentials = SecurityTokenService().assume_role_by_name(self.account_id, self.role_name)
@@ -47,9 +61,13 @@ class ValidateAccountAccess:
                 # Get Regions for the account
                 regions = self.get_regions_for_account(credentials=account_credentials, account_id=self.account_id)
                 self.logger.debug(f"Regions for the account {self.account_id} are {regions}")
+                service_batches = self.service_batches(regions)
+                self.logger.info(f"Scanning {len(self.service_names)} services in {len(service_batches)} tasks, "
+                                 f"scan mode {self.scan_mode}")
                 return {
                     "Validation": str(ValidationType.SUCCEEDED.value),
                     "ServicesToScanForAccount": self.service_names,
+                    "ServiceBatches": service_batches,
                     "Regions": regions
                 }
             else:
@@ -63,6 +81,7 @@ class ValidateAccountAccess:
                 return {
                     "Validation": str(ValidationType.FAILED.value),
                     "ServicesToScanForAccount": [],
+                    "ServiceBatches": [],
                     "Regions": []
                 }
         except Exception as err:
@@ -77,5 +96,6 @@ class ValidateAccountAccess:
             return {
                 "Validation": str(ValidationType.FAILED.value),
                 "ServicesToScanForAccount": [],
+                "ServiceBatches": [],
                 "Regions": []
             }
@@ -0,0 +1,76 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+"""
+Catalog of IAM actions per service prefix, to expand wildcard actions like s3:Get* into the actions they match.
+
+The catalog is precomputed from the service models of botocore, because loading all models takes seconds. The action
+names are the API operation names and the prefix the signing name of each service, which equal the IAM action and
+service prefix for almost all services. Regenerate it after updating botocore:
+
+    cd source/lambda
+    python -m policy_explorer.supported_configuration.action_catalog
+"""
+
+import gzip
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+CATALOG_FILE = os.path.join(os.path.dirname(__file__), 'action_catalog.json.gz')
+
+
+def build_catalog() -> Dict[str, List[str]]:
+    import botocore.session  # only needed to generate the catalog
+
+    session = botocore.session.get_session()
+    loader = session.get_component('data_loader')
+    catalog: Dict[str, set] = {}
+    for service_name in session.get_available_services():
+        model = loader.load_service_model(service_name, 'service-2')
+        metadata = model['metadata']
+        prefix = (metadata.get('signingName') or metadata.get('endpointPrefix') or service_name).lower()
+        catalog.setdefault(prefix, set()).update(model['operations'])
+    return {prefix: sorted(actions) for prefix, actions in sorted(catalog.items())}
+
+
+class ActionCatalog:
+    """Service prefix -> action names, loaded once per process on first use."""
+
+    def __init__(self, catalog_file: str = CATALOG_FILE):
+        self.catalog_file = catalog_file
+        self._lock = threading.Lock()
+        self._actions: Optional[Dict[str, List[str]]] = None
+
+    def actions(self, prefix: str) -> Optional[List[str]]:
+        """Lower case actions of the service, e.g. ['s3:getobject', ...], None if the prefix is unknown."""
+        return self._load().get(prefix.lower())
+
+    def prefixes(self) -> List[str]:
+        return list(self._load())
+
+    def _load(self) -> Dict[str, List[str]]:
+        with self._lock:
+            if self._actions is None:
+                with gzip.open(self.catalog_file, 'rt', encoding='utf-8') as catalog_file:
+                    catalog = json.load(catalog_file)
+                self._actions = {prefix: [f"{prefix}:{action}".lower() for action in actions]
+                                 for prefix, actions in catalog.items()}
+            return self._actions
+
+
+action_catalog = ActionCatalog()
+
+
+def main():
+    catalog = build_catalog()
+    with open(CATALOG_FILE, 'wb') as catalog_file:
+        # mtime=0 keeps the file identical for identical catalogs
+        with gzip.GzipFile(fileobj=catalog_file, mode='wb', mtime=0) as compressed:
+            compressed.write(json.dumps(catalog, separators=(',', ':')).encode('utf-8'))
+    print(f"Wrote {sum(len(actions) for actions in catalog.values())} actions of {len(catalog)} services "
+          f"to {CATALOG_FILE}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+import importlib
+import threading
+import time
+from enum import Enum
+from os import getenv
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from aws_lambda_powertools import Logger
+
+from policy_explorer.policy_explorer_model import ScanServiceRequestModel, DynamoDBPolicyItem
+
+SCANNER_PACKAGE = 'policy_explorer.step_functions_lambda'
+
+
+class ScanScope(Enum):
+    REGIONAL = "REGIONAL"  # scanned in every region of the account
+    GLOBAL = "GLOBAL"  # scanned once per account, regardless of the regions
+    ORGANIZATION = "ORGANIZATION"  # scanned once per organization in the management account
+
+
+class FetchPattern(Enum):
+    LIST = "LIST"  # policies are part of the list or describe responses
+    PER_RESOURCE = "PER_RESOURCE"  # one list call, then one call per resource to read its policy
+
+
+class ScannerRegistration(NamedTuple):
+    service_name: str
+    service_principal: str
+    friendly_name: str
+    module: str  # module in SCANNER_PACKAGE
+    class_name: str
+    method: str = 'scan'
+    scope: ScanScope = ScanScope.REGIONAL
+    fetch_pattern: FetchPattern = FetchPattern.PER_RESOURCE
+    bulk_api: bool = False  # policies of several resources can be read with a single call
+    cost: int = 2  # relative effort to scan one account, from 1 (a single list call per region) to 10
+
+    def supported_service(self) -> Dict[str, str]:
+        return {
+            'ServiceName': self.service_name,
+            'ServicePrincipal': self.service_principal,
+            'FriendlyName': self.friendly_name
+        }
+
+
+SCANNERS: List[ScannerRegistration] = [
+    ScannerRegistration('iam', 'iam.amazonaws.com', 'AWS Identity and Access Management (AWS IAM)',
+                        'scan_iam_policy', 'IAMPolicy', method='stream', scope=ScanScope.GLOBAL, cost=10),
+    ScannerRegistration('s3', 's3.amazonaws.com', 'Amazon S3 (Amazon Simple Storage Service)',
+                        'scan_s3_bucket_policy', 'S3BucketPolicy', scope=ScanScope.GLOBAL, cost=8),
+    ScannerRegistration('glacier', 'glacier.amazonaws.com', 'Amazon S3 Glacier',
+                        'scan_glacier_vault_policy', 'GlacierVaultPolicy', cost=3),
+    ScannerRegistration('sns', 'sns.amazonaws.com', 'Amazon Simple Notification Service (Amazon SNS)',
+                        'scan_sns_topic_policy', 'SNSTopicPolicy', cost=4),
+    ScannerRegistration('sqs', 'sqs.amazonaws.com', 'Amazon Simple Queue Service (Amazon SQS)',
+                        'scan_sqs_queue_policies', 'SQSQueuePolicy', cost=4),
+    ScannerRegistration('lambda', 'lambda.amazonaws.com', 'AWS Lambda',
+                        'scan_lambda_function_policy', 'LambdaFunctionPolicy', cost=5),
+    ScannerRegistration('elasticfilesystem', 'elasticfilesystem.amazonaws.com',
+                        'Amazon Elastic File System (Amazon EFS)',
+                        'scan_elastic_file_system_policy', 'ElasticFileSystemPolicy', cost=3),
+    ScannerRegistration('secretsmanager', 'secretsmanager.amazonaws.com', 'AWS Secrets Manager',
+                        'scan_secrets_manager_policy', 'SecretsManagerPolicy', cost=4),
+    ScannerRegistration('iot', 'iot.amazonaws.com', 'AWS IoT',
+                        'scan_iot_policy', 'IoTPolicy', cost=3),
+    ScannerRegistration('kms', 'kms.amazonaws.com', 'AWS Key Management Service (KMS)',
+                        'scan_key_management_service_policy', 'KeyManagementServicePolicy', cost=5),
+    ScannerRegistration('apigateway', 'apigateway.amazonaws.com', 'Amazon API Gateway',
+                        'scan_api_gateway_service_policy', 'APIGatewayPolicy', fetch_pattern=FetchPattern.LIST,
+                        cost=1),
+    ScannerRegistration('events', 'events.amazonaws.com', 'Amazon EventBridge',
+                        'scan_event_bus_policy', 'EventBusPolicy', fetch_pattern=FetchPattern.LIST, cost=1),
+    ScannerRegistration('ses', 'ses.amazonaws.com', 'Amazon Simple Email Service (SES)',
+                        'scan_ses_identity_policy', 'SESIdentityPolicy', cost=3),
+    ScannerRegistration('ecr', 'ecr.amazonaws.com', 'Amazon Elastic Container Registry',
+                        'scan_ec2_container_registry_repository_policy', 'EC2ContainerRegistryRepositoryPolicy',
+                        cost=4),
+    ScannerRegistration('config', 'config.amazonaws.com', 'AWS Config',
+                        'scan_config_rule_policy', 'ConfigRulePolicy', cost=2),
+    ScannerRegistration('ssm_incidents', 'ssm-incidents.amazonaws.com', 'AWS Systems Manager Incident Manager',
+                        'scan_ssm_incidents_response_plan_policy', 'SSMIncidentsResponsePlanPolicy', cost=2),
+    ScannerRegistration('opensearchservice', 'opensearchservice.amazonaws.com', 'Amazon OpenSearch Service',
+                        'scan_open_search_domain_policy', 'OpenSearchDomainPolicy', fetch_pattern=FetchPattern.LIST,
+                        bulk_api=True, cost=2),
+    ScannerRegistration('cloudformation', 'cloudformation.amazonaws.com', 'AWS CloudFormation',
+                        'scan_cloudformation_stack_policy', 'CloudFormationStackPolicy', cost=4),
+    ScannerRegistration('glue', 'glue.amazonaws.com', 'AWS Glue',
+                        'scan_glue_resource_policy', 'GlueResourcePolicy', fetch_pattern=FetchPattern.LIST,
+                        bulk_api=True, cost=1),
+    ScannerRegistration('serverlessrepo', 'serverlessrepo.amazonaws.com', 'AWS Serverless Application Repository',
+                        'scan_serverless_application_policy', 'ServerlessApplicationPolicy', cost=2),
+    ScannerRegistration('backup', 'backup.amazonaws.com', 'AWS Backup',
+                        'scan_backup_vault_access_policy', 'BackupVaultAccessPolicy', cost=3),
+    ScannerRegistration('codeartifact', 'codeartifact.amazonaws.com', 'AWS CodeArtifact',
+                        'scan_code_artifact_policy', 'CodeArtifactPolicy', cost=4),
+    ScannerRegistration('codebuild', 'codebuild.amazonaws.com', 'AWS CodeBuild',
+                        'scan_code_build_resource_policy', 'CodeBuildResourcePolicy', bulk_api=True, cost=3),
+    ScannerRegistration('mediastore', 'mediastore.amazonaws.com', 'AWS Elemental MediaStore',
+                        'scan_media_store_policy', 'MediaStorePolicy', cost=2),
+    ScannerRegistration('ec2', 'ec2.amazonaws.com', 'Amazon VPC (VPC Endpoints)',
+                        'scan_vpc_endpoints_policy', 'VPCEndpointsPolicy', fetch_pattern=FetchPattern.LIST, cost=1),
+    ScannerRegistration('lexv2', 'lexv2.amazonaws.com', 'Amazon Lex',
+                        'scan_lex_v2_models_policy', 'Lexv2ModelsPolicy', cost=4),
+    ScannerRegistration('redshift_serverless', 'redshift.amazonaws.com', 'Amazon Redshift Serverless',
+                        'scan_redshift_serverless_policy', 'RedshiftServerlessPolicy', cost=3),
+    ScannerRegistration('eventbridge_schemas', 'events.amazonaws.com', 'Amazon EventBridge Schemas',
+                        'scan_eventbridge_schemas_policy', 'EventBridgeSchemasPolicy', cost=2),
+    ScannerRegistration('ssm_contacts', 'ssm-contacts.amazonaws.com', 'AWS Systems Manager Incident Manager Contacts',
+                        'scan_ssm_contacts_policy', 'SSMContactsPolicy', cost=2),
+    ScannerRegistration('acm_pca', 'acm-pca.amazonaws.com', 'AWS Private Certificate Authority',
+                        'scan_acm_pca_policy', 'ACMPCAPolicy', cost=2),
+    ScannerRegistration('ram', 'ram.amazonaws.com', 'AWS Resource Access Manager',
+                        'scan_ram_policy', 'RAMPolicy', cost=2),
+    ScannerRegistration('organizations', 'organizations.amazonaws.com', 'AWS Organizations',
+                        'scan_organizations_policy', 'ServiceControlPolicy', scope=ScanScope.ORGANIZATION, cost=3),
+]
+
+
+class ScannerRegistry:
+    """
+    Resolves the scanner class of a service and imports its module on first use only. A scan task scans exactly one
+    service, so importing all scanners, with their aws.services wrappers and mypy_boto3 type modules, would only add
+    to the cold start of every task. The time spent importing each scanner is recorded.
+
+    The registrations also declare what the scanner costs, so that the supported services, the task router and the
+    state machine input are all derived from the same list.
+    """
+
+    def __init__(self, scanners: List[ScannerRegistration]):
+        self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
+        self.scanners: Dict[str, ScannerRegistration] = {it.service_name: it for it in scanners}
+        self._lock = threading.Lock()
+        self._classes: Dict[str, type] = {}
+        self._import_times: Dict[str, float] = {}
+
+    def registration(self, service_name: str) -> Optional[ScannerRegistration]:
+        return self.scanners.get(service_name)
+
+    def registrations(self, scopes: Iterable[ScanScope] = None) -> List[ScannerRegistration]:
+        return [it for it in self.scanners.values() if scopes is None or it.scope in scopes]
+
+    def service_names(self, scopes: Iterable[ScanScope] = None) -> List[str]:
+        return [it.service_name for it in self.registrations(scopes)]
+
+    def by_cost(self, service_names: Iterable[str]) -> List[str]:
+        """Orders the services by descending cost hint, keeping the given order for equal cost. Started in this
+        order, the most expensive scans do not end up as the stragglers of a job. Unregistered services go last."""
+        return sorted(service_names, key=lambda it: -self.scanners[it].cost if it in self.scanners else 0)
+
+    def scan_cost(self, service_name: str, region_count: int) -> int:
+        """Cost hint of scanning the service in one account, regional scanners are scanned in every region."""
+        registration = self.scanners.get(service_name)
+        if registration is None:
+            return 1
+        if registration.scope == ScanScope.REGIONAL:
+            return registration.cost * max(region_count, 1)
+        return registration.cost
+
+    def batches(self, service_names: Iterable[str], region_count: int, max_cost: int) -> List[List[str]]:
+        """Splits the services of an account into batches with a total cost hint of at most max_cost each, most
+        expensive services first. A service that alone exceeds max_cost gets a batch of its own."""
+        batches: List[List[str]] = []
+        batch_cost = 0
+        for service_name in self.by_cost(service_names):
+            cost = self.scan_cost(service_name, region_count)
+            if not batches or batch_cost + cost > max_cost:
+                batches.append([])
+                batch_cost = 0
+            batches[-1].append(service_name)
+            batch_cost += cost
+        return batches
+
+    def scanner_class(self, service_name: str) -> Optional[type]:
+        registration = self.scanners.get(service_name)
+        if registration is None:
+            return None
+        with self._lock:
+            scanner_class = self._classes.get(service_name)
+            if scanner_class is None:
+                started_at = time.perf_counter()
+                module = importlib.import_module(f"{SCANNER_PACKAGE}.{registration.module}")
+                scanner_class = getattr(module, registration.class_name)
+                self._import_times[service_name] = time.perf_counter() - started_at
+                self._classes[service_name] = scanner_class
+                self.logger.debug(f"Imported scanner for {service_name} in "
+                                  f"{self._import_times[service_name] * 1000:.1f} ms")
+            return scanner_class
+
+    def scan_method(self, event: ScanServiceRequestModel) -> Optional[Callable[[], Iterable[DynamoDBPolicyItem]]]:
+        scanner_class = self.scanner_class(event['ServiceName'])
+        if scanner_class is None:
+            return None
+        return getattr(scanner_class(event), self.scanners[event['ServiceName']].method)
+
+    def import_all(self):
+        for service_name in self.scanners:
+            self.scanner_class(service_name)
+
+    def import_times(self) -> Dict[str, float]:
+        """Seconds spent importing each scanner module that was loaded so far, including its dependencies."""
+        with self._lock:
+            return dict(self._import_times)
+
+
+scanner_registry = ScannerRegistry(SCANNERS)
@@ -3,163 +3,11 @@
 
 from typing import Dict, List
 
-SUPPORTED_SERVICES = [
-    {
-        "ServiceName": "iam",
-        "ServicePrincipal": "iam.amazonaws.com",
-        "FriendlyName": "AWS Identity and Access Management (AWS IAM)"
-    },
-    {
-        "ServiceName": "s3",
-        "ServicePrincipal": "s3.amazonaws.com",
-        "FriendlyName": "Amazon S3 (Amazon Simple Storage Service)"
-    },
-    {
-        "ServiceName": "glacier",
-        "ServicePrincipal": "glacier.amazonaws.com",
-        "FriendlyName": "Amazon S3 Glacier"
-    },
-    {
-        "ServiceName": "sns",
-        "ServicePrincipal": "sns.amazonaws.com",
-        "FriendlyName": "Amazon Simple Notification Service (Amazon SNS)"
-    },
-    {
-        "ServiceName": "sqs",
-        "ServicePrincipal": "sqs.amazonaws.com",
-        "FriendlyName": "Amazon Simple Queue Service (Amazon SQS)"
-    },
-    {
-        "ServiceName": "lambda",
-        "ServicePrincipal": "lambda.amazonaws.com",
-        "FriendlyName": "AWS Lambda"
-    },
-    {
-        "ServiceName": "elasticfilesystem",
-        "ServicePrincipal": "elasticfilesystem.amazonaws.com",
-        "FriendlyName": "Amazon Elastic File System (Amazon EFS)"
-    },
-    {
-        "ServiceName": "secretsmanager",
-        "ServicePrincipal": "secretsmanager.amazonaws.com",
-        "FriendlyName": "AWS Secrets Manager"
-    },
-    {
-        "ServiceName": "iot",
-        "ServicePrincipal": "iot.amazonaws.com",
-        "FriendlyName": "AWS IoT"
-    },
-    {
-        "ServiceName": "kms",
-        "ServicePrincipal": "kms.amazonaws.com",
-        "FriendlyName": "AWS Key Management Service (KMS)"
-    },
-    {
-        "ServiceName": "apigateway",
-        "ServicePrincipal": "apigateway.amazonaws.com",
-        "FriendlyName": "Amazon API Gateway"
-    },
-    {
-        "ServiceName": "events",
-        "ServicePrincipal": "events.amazonaws.com",
-        "FriendlyName": "Amazon EventBridge"
-    },
-    {
-        "ServiceName": "ses",
-        "ServicePrincipal": "ses.amazonaws.com",
-        "FriendlyName": "Amazon Simple Email Service (SES)"
-    },
-    {
-        "ServiceName": "ecr",
-        "ServicePrincipal": "ecr.amazonaws.com",
-        "FriendlyName": "Amazon Elastic Container Registry"
-    },
-    {
-        "ServiceName": "config",
-        "ServicePrincipal": "config.amazonaws.com",
-        "FriendlyName": "AWS Config"
-    },
-    {
-        "ServiceName": "ssm_incidents",
-        "ServicePrincipal": "ssm-incidents.amazonaws.com",
-        "FriendlyName": "AWS Systems Manager Incident Manager"
-    },
-    {
-        "ServiceName": "opensearchservice",
-        "ServicePrincipal": "opensearchservice.amazonaws.com",
-        "FriendlyName": "Amazon OpenSearch Service"
-    },
-    {
-        "ServiceName": "cloudformation",
-        "ServicePrincipal": "cloudformation.amazonaws.com",
-        "FriendlyName": "AWS CloudFormation"
-    },
-    {
-        "ServiceName": "glue",
-        "ServicePrincipal": "glue.amazonaws.com",
-        "FriendlyName": "AWS Glue"
-    },
-    {
-        "ServiceName": "serverlessrepo",
-        "ServicePrincipal": "serverlessrepo.amazonaws.com",
-        "FriendlyName": "AWS Serverless Application Repository"
-    },
-    {
-        "ServiceName": "backup",
-        "ServicePrincipal": "backup.amazonaws.com",
-        "FriendlyName": "AWS Backup"
-    },
-    {
-        "ServiceName": "codeartifact",
-        "ServicePrincipal": "codeartifact.amazonaws.com",
-        "FriendlyName": "AWS CodeArtifact"
-    },
-    {
-        "ServiceName": "codebuild",
-        "ServicePrincipal": "codebuild.amazonaws.com",
-        "FriendlyName": "AWS CodeBuild"
-    },
-    {
-        "ServiceName": "mediastore",
-        "ServicePrincipal": "mediastore.amazonaws.com",
-        "FriendlyName": "AWS Elemental MediaStore"
-    },
-    {
-        "ServiceName": "ec2",
-        "ServicePrincipal": "ec2.amazonaws.com",
-        "FriendlyName": "Amazon VPC (VPC Endpoints)"
-    },
-    {
-        "ServiceName": "lexv2",
-        "ServicePrincipal": "lexv2.amazonaws.com",
-        "FriendlyName": "Amazon Lex"
-    },
-    {
-        "ServiceName": "redshift_serverless",
-        "ServicePrincipal": "redshift.amazonaws.com",
-        "FriendlyName": "Amazon Redshift Serverless"
-    },
-    {
-        "ServiceName": "eventbridge_schemas",
-        "ServicePrincipal": "events.amazonaws.com",
-        "FriendlyName": "Amazon EventBridge Schemas"
-    },
-     {
-        "ServiceName": "ssm_contacts",
-        "ServicePrincipal": "ssm-contacts.amazonaws.com",
-        "FriendlyName": "AWS Systems Manager Incident Manager Contacts"
-    },
-    {
-        "ServiceName": "acm_pca",
-        "ServicePrincipal": "acm-pca.amazonaws.com",
-        "FriendlyName": "AWS Private Certificate Authority"
-    },
-    {
-        "ServiceName": "ram",
-        "ServicePrincipal": "ram.amazonaws.com",
-        "FriendlyName": "AWS Resource Access Manager"
-    }
-]
+from policy_explorer.supported_configuration.scanner_registry import scanner_registry, ScanScope
+
+# The organization wide scan of the management account is not offered per account and region
+SUPPORTED_SERVICES = [registration.supported_service() for registration in
+                      scanner_registry.registrations([ScanScope.REGIONAL, ScanScope.GLOBAL])]
 SUPPORTED_SERVICE_NAMES = list(service_data['ServiceName'] for service_data in SUPPORTED_SERVICES)
 
 SUPPORTED_REGIONS = [
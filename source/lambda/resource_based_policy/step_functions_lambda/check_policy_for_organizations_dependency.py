@@ -1,3 +1,273 @@
 #  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 #  SPDX-License-Identifier: Apache-2.0
+import json
+import re
+import time
+import traceback
+from datetime import datetime, timezone
+from os import getenv
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
+from aws_lambda_powertools import Logger, Tracer
+from aws_lambda_powertools.utilities.typing import LambdaContext
+
+from assessment_runner.assessment_runner import AssessmentRunner, ScanStrategy, SynchronousScanStrategy, \
+    with_api_call_metrics
+from assessment_runner.job_model import AssessmentType, JobStatus
+from aws.services.dynamodb import DynamoDB
+from aws.services.lambda_invoker import LambdaInvoker
+from metrics.solution_metrics import SolutionMetrics
+from policy_explorer.finish_scan import FinishScanForResourceBasedPolicies
+from policy_explorer.policy_document_store import PolicyDocumentStore, policy_hash
+from policy_explorer.policy_explorer_model import PolicyAnalyzerRequest, PolicyAnalyzerResponse, PolicyType
+from resource_based_policy.resource_based_policies_repository import ResourceBasedPoliciesRepository
+from resource_based_policy.resource_based_policy_model import ResourceBasedPolicyResponseModel
+from utils.api_gateway_lambda_handler import ApiGatewayResponse, GenericApiGatewayEventHandler, default_headers
+from utils.decimal_json_encoder import DecimalJsonEncoder
+
+logger = Logger(getenv('LOG_LEVEL'))
+tracer = Tracer()
+
+ORGANIZATIONS_CONDITION_KEYS = [
+    'aws:PrincipalOrgID',
+    'aws:PrincipalOrgPaths',
+    'aws:ResourceOrgID',
+    'aws:ResourceOrgPaths',
+    'aws:SourceOrgID',
+    'aws:SourceOrgPaths',
+]
+
+# condition keys are case-insensitive, the findings use the documented spelling
+CONDITION_KEYS_BY_LOWER_CASE = {key.lower(): key for key in ORGANIZATIONS_CONDITION_KEYS}
+
+# organization, OU and account ARNs of AWS Organizations, e.g. arn:aws:organizations::111122223333:ou/o-a1b2c3/ou-a1-b2
+ORGANIZATIONS_ARN = re.compile(r'^arn:aws[a-z-]*:organizations::\d{12}:(organization|ou|account)/o-[a-z0-9]+',
+                               re.IGNORECASE)
+
+# cheap test of the raw document, policies without any match are never parsed
+MAY_DEPEND_ON_ORGANIZATIONS = re.compile(r'org(id|paths)|:organizations::', re.IGNORECASE)
+
+PRINCIPAL_ELEMENTS = ['Principal', 'NotPrincipal']
+
+ANALYZED_POLICY_TYPES = [policy_type.value for policy_type in PolicyType]
+
+# the statement attributes needed to attribute a policy to its resource, the conditions are read from the policy
+STATEMENT_ATTRIBUTES = ['PartitionKey', 'SortKey', 'Region', 'AccountId', 'Service', 'ResourceIdentifier',
+                        'PolicyHash', 'Policy']
+
+
+@tracer.capture_lambda_handler
+@logger.inject_lambda_context(log_event=False)
+def lambda_handler(event: dict, context: LambdaContext) -> ApiGatewayResponse | Dict:
+    if 'httpMethod' not in event:
+        return run_scan_task(event, context)
+    try:
+        return GenericApiGatewayEventHandler().handle_and_create_response(
+            event,
+            context,
+            AssessmentRunner(StartOrganizationsDependencyScanStrategy(context.invoked_function_arn)).run_assessment
+        )
+    except Exception as error:
+        logger.error(f"Error: {error}")
+        logger.error(traceback.format_exc())
+        error_type = type(error).__name__
+        body = {
+            "Error": error_type,
+            "Message": "An unexpected error occurred. Inspect CloudWatch logs for more information.",
+            "Timestamp": datetime.now(tz=timezone.utc).isoformat(),
+        }
+        return {
+            'statusCode': 400,
+            'body': json.dumps(body, cls=DecimalJsonEncoder),
+            'headers': default_headers,
+        }
+
+
+@with_api_call_metrics(str(AssessmentType.RESOURCE_BASED_POLICY.value))
+def run_scan_task(event: Dict, _context: LambdaContext) -> Dict:
+    """Analyzes the stored policies for the job that the API request started, and finishes the job."""
+    job_id = event['JobId']
+    strategy = OrganizationsDependencyStrategy(ResourceBasedPoliciesRepository())
+    result = str(JobStatus.SUCCEEDED.value)
+    try:
+        strategy.write(strategy.scan(job_id, event.get('RequestBody') or {}))
+    except Exception as error:
+        logger.error(f"Failed to analyze the policies of job {job_id}: {error}")
+        logger.error(traceback.format_exc())
+        result = str(JobStatus.FAILED.value)
+    return FinishScanForResourceBasedPolicies().finish(strategy.assessment_type(), job_id, result)
+
+
+class OrganizationsDependencyAnalyzer:
+    """
+    Finds the dependencies of policies on the organization: the condition keys in ORGANIZATIONS_CONDITION_KEYS and
+    organization, OU or account ARNs in Principal and NotPrincipal. Each distinct policy is parsed once, the
+    dependencies of a policy hash are remembered for all further statements and resources with the same policy.
+    """
+
+    def __init__(self):
+        self._dependencies_by_hash: Dict[str, List[Tuple[str, str]]] = {}
+        self.policies_parsed = 0
+
+    def is_known(self, document_hash: str) -> bool:
+        return document_hash in self._dependencies_by_hash
+
+    def analyze(self, request: PolicyAnalyzerRequest, document_hash: str = None) -> List[PolicyAnalyzerResponse]:
+        """One response per condition key or principal element, with all organizations resources it references."""
+        document_hash = document_hash or policy_hash(request['Policy'])
+        dependencies = self._dependencies_by_hash.get(document_hash)
+        if dependencies is None:
+            dependencies = self._find_dependencies(request['Policy'])
+            self._dependencies_by_hash[document_hash] = dependencies
+
+        resources_by_key: Dict[str, Set[str]] = {}
+        for global_context_key, organizations_resource in dependencies:
+            resources_by_key.setdefault(global_context_key, set()).add(organizations_resource)
+        return [PolicyAnalyzerResponse(ResourceName=request['ResourceName'],
+                                       GlobalContextKey=global_context_key,
+                                       OrganizationsResource=', '.join(sorted(resources)))
+                for global_context_key, resources in resources_by_key.items()]
+
+    def _find_dependencies(self, policy: Optional[str]) -> List[Tuple[str, str]]:
+        if not policy or not MAY_DEPEND_ON_ORGANIZATIONS.search(policy):
+            return []
+        self.policies_parsed += 1
+        try:
+            document = json.loads(policy)
+        except ValueError:
+            return []
+        statements = document.get('Statement', []) if isinstance(document, dict) else []
+        if isinstance(statements, dict):
+            statements = [statements]
+
+        dependencies = []
+        for statement in statements:
+            if not isinstance(statement, dict):
+                continue
+            for operator_values in (statement.get('Condition') or {}).values():
+                if not isinstance(operator_values, dict):
+                    continue
+                for condition_key, values in operator_values.items():
+                    key = CONDITION_KEYS_BY_LOWER_CASE.get(condition_key.lower())
+                    if key:
+                        dependencies.extend((key, str(value)) for value in _strings(values))
+            for element in PRINCIPAL_ELEMENTS:
+                dependencies.extend((element, value) for value in _strings(statement.get(element))
+                                    if ORGANIZATIONS_ARN.match(value))
+        return dependencies
+
+
+def _strings(element) -> Iterable[str]:
+    if isinstance(element, str):
+        yield element
+    elif isinstance(element, dict):
+        for nested in element.values():
+            yield from _strings(nested)
+    elif isinstance(element, list):
+        for nested in element:
+            yield from _strings(nested)
+    elif element is not None:
+        yield str(element)
+
+
+class StartOrganizationsDependencyScanStrategy(ScanStrategy):
+    """
+    Starts the analysis of the stored policies as an asynchronous invocation of the function itself, so that the
+    API request returns the new job at once instead of running into the timeout of the API Gateway.
+    """
+
+    def __init__(self, function_name: str):
+        self.function_name = function_name
+
+    def assessment_type(self) -> str: return str(AssessmentType.RESOURCE_BASED_POLICY.value)
+
+    def scan(self, job_id, request_body) -> List[Dict]:
+        LambdaInvoker().invoke_async(self.function_name, {'JobId': job_id, 'RequestBody': request_body})
+        return []
+
+
+class OrganizationsDependencyStrategy(SynchronousScanStrategy):
+    """
+    Analyzes all policies stored by the latest policy explorer scan for dependencies on the organization, e.g. to
+    find every aws:PrincipalOrgID before moving accounts to another organization.
+
+    The statements are read with parallel Queries of the partitions of the analyzed policy types, projected to the
+    attributes that identify the resource and its policy document. Documents are read once per hash, and only
+    parsed when they may reference the organization at all. Given a repository, the findings of every page are
+    written while the following pages are still read.
+    """
+
+    def __init__(self, repository: Optional[ResourceBasedPoliciesRepository] = None,
+                 analyzer: OrganizationsDependencyAnalyzer = None):
+        self.job_id = None
+        self.logger = Logger(service=self.__class__.__name__, level=getenv('LOG_LEVEL'))
+        self.repository = repository
+        self.analyzer = analyzer or OrganizationsDependencyAnalyzer()
+        self.findings = []
+
+    def assessment_type(self) -> str: return str(AssessmentType.RESOURCE_BASED_POLICY.value)
+
+    def scan(self, job_id, request_body) -> List[ResourceBasedPolicyResponseModel]:
+        self.job_id = job_id
+        started_at = time.perf_counter()
+        table = DynamoDB(getenv('TABLE_POLICY_EXPLORER'))
+        document_store = PolicyDocumentStore(table)
+        reported: Set[Tuple[str, str, str, str, str]] = set()
+        dependencies: List[ResourceBasedPolicyResponseModel] = []
+        self.findings = []
+        statements = 0
+
+        for page in table.query_parallel(ANALYZED_POLICY_TYPES, attributes=STATEMENT_ATTRIBUTES):
+            statements += len(page)
+            documents = document_store.documents({item['PolicyHash'] for item in page if item.get('PolicyHash')
+                                                  and not self.analyzer.is_known(item['PolicyHash'])})
+            page_dependencies = []
+            for item in page:
+                for dependency in self._analyze_statement(item, documents):
+                    key = (dependency['ServiceName'], dependency['AccountId'], dependency['Region'],
+                           dependency['ResourceName'], dependency['DependencyType'])
+                    if key not in reported:  # all statements of a policy report the same dependencies
+                        reported.add(key)
+                        page_dependencies.append(dependency)
+            dependencies.extend(page_dependencies)
+            if self.repository is not None and page_dependencies:
+                self.findings.extend(self.repository.create_all(page_dependencies))
+
+        self.logger.info(f"Found {len(dependencies)} organizations dependencies in {statements} statements, "
+                         f"parsed {self.analyzer.policies_parsed} policies in {time.perf_counter() - started_at:.1f} s")
+        return dependencies
+
+    def _analyze_statement(self, item: Dict, documents: Dict[str, str]) -> List[ResourceBasedPolicyResponseModel]:
+        document_hash = item.get('PolicyHash')
+        policy = documents.get(document_hash) if document_hash else item.get('Policy')
+        if not document_hash and not policy:
+            return []
+        request = PolicyAnalyzerRequest(ResourceName=item.get('ResourceIdentifier'), Policy=policy)
+        if document_hash and policy is None and not self.analyzer.is_known(document_hash):
+            self.logger.warning(f"Policy document {document_hash} not found for {item.get('SortKey')}")
+            return []
+        return [self._denormalize_to_resource_based_policy_model(item, response)
+                for response in self.analyzer.analyze(request, document_hash)]
+
+    def _denormalize_to_resource_based_policy_model(
+            self,
+            item: Dict,
+            response: PolicyAnalyzerResponse
+    ) -> ResourceBasedPolicyResponseModel:
+        return {
+            'AccountId': item.get('AccountId'),
+            'ServiceName': item.get('Service'),
+            'ResourceName': response['ResourceName'],
+            'DependencyType': response['GlobalContextKey'],
+            'DependencyOn': response['OrganizationsResource'],
+            'JobId': self.job_id,
+            'AssessedAt': datetime.now().isoformat(),
+            'Region': item.get('Region')
+        }
+
+    def write(self, dependencies: List[ResourceBasedPolicyResponseModel]):
+        if self.repository is not None:
+            findings = self.findings  # already written during the scan
+        else:
+            findings = ResourceBasedPoliciesRepository().create_all(dependencies)
+        SolutionMetrics().send_scan_metrics(self.assessment_type(), findings)
@@ -0,0 +1,83 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+"""
+Measures the init time of the scan task Lambda, in a fresh interpreter per sample like a cold start.
+
+Each sample imports the handler module and then loads the scanners, either lazily (only the scanner of one service,
+as the handler does now) or eagerly (all scanners, as the handler did when it imported them at module level). The
+median of all samples is written as JSON:
+
+    cd source/lambda
+    python -m tests.benchmark.cold_start_benchmark --samples 10 --service s3 --output cold-start.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+LAMBDA_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SAMPLE = '''
+import json, sys, time
+started_at = time.perf_counter()
+import policy_explorer.step_functions_lambda.scan_policy_all_services_router
+handler_import = time.perf_counter() - started_at
+from policy_explorer.supported_configuration.scanner_registry import scanner_registry
+started_at = time.perf_counter()
+if sys.argv[1] == 'eager':
+    scanner_registry.import_all()
+else:
+    scanner_registry.scanner_class(sys.argv[2])
+scanner_import = time.perf_counter() - started_at
+print(json.dumps({
+    'HandlerImportSeconds': handler_import,
+    'ScannerImportSeconds': scanner_import,
+    'InitSeconds': handler_import + scanner_import,
+    'Modules': len(sys.modules)
+}))
+'''
+
+
+def sample(mode: str, service_name: str) -> Dict:
+    environment = dict(os.environ, AWS_REGION=os.getenv('AWS_REGION') or 'us-east-1', POWERTOOLS_TRACE_DISABLED='1')
+    output = subprocess.run([sys.executable, '-c', SAMPLE, mode, service_name], cwd=LAMBDA_ROOT, env=environment,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_cold_start_benchmark(samples: int, service_name: str) -> Dict:
+    results = {}
+    for mode in ['lazy', 'eager']:
+        runs: List[Dict] = [sample(mode, service_name) for _ in range(samples)]
+        results[mode] = {metric: round(statistics.median(run[metric] for run in runs), 4)
+                         for metric in runs[0]}
+    results['InitSecondsSaved'] = round(results['eager']['InitSeconds'] - results['lazy']['InitSeconds'], 4)
+    return {
+        'Service': service_name,
+        'Samples': samples,
+        'Python': sys.version.split()[0],
+        'Results': results
+    }
+
+
+def main(argv: List[str] = None) -> Dict:
+    parser = argparse.ArgumentParser(prog='python -m tests.benchmark.cold_start_benchmark', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--samples', type=int, default=5)
+    parser.add_argument('--service', default='s3', help='service scanned by the simulated task')
+    parser.add_argument('--output', default='cold-start-results.json')
+    arguments = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    results = run_cold_start_benchmark(arguments.samples, arguments.service)
+    with open(arguments.output, 'w', encoding='utf-8') as output:
+        json.dump(results, output, indent=2)
+    print(json.dumps(results['Results'], indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+"""
+Benchmarks every registered scanner against a synthetic organization in moto.
+
+For each scanner the results contain wall time, AWS API calls per operation, statements stored, DynamoDB write
+requests, task failures and the peak RSS of the process after the scanner ran. Results are written as JSON, so that
+they can be kept per release and compared with --baseline:
+
+    cd source/lambda
+    export AWS_REGION=us-east-1
+    python -m tests.benchmark.scan_benchmark --accounts 5 --resources-per-service 20 --output benchmark.json
+    python -m tests.benchmark.scan_benchmark --accounts 5 --resources-per-service 20 --baseline benchmark.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from importlib.metadata import version
+from typing import Dict, Iterator, List
+
+from botocore.client import BaseClient
+from moto import mock_aws
+
+from assessment_runner.jobs_repository import JobsRepository
+from policy_explorer.local_scan import create_table_if_missing
+from policy_explorer.policy_sinks import DynamoDBPolicySink
+from policy_explorer.step_functions_lambda.scan_policy_all_services_router import scan_service
+from policy_explorer.supported_configuration.scanner_registry import scanner_registry
+from tests.benchmark.synthetic_organization import SyntheticOrganization, SyntheticOrganizationSpec
+
+DYNAMODB_WRITE_OPERATIONS = ['PutItem', 'UpdateItem', 'DeleteItem']
+
+
+class ApiCallCounter:
+    """Counts AWS API calls per <service>.<operation> and DynamoDB write requests, across all threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls: Counter = Counter()
+        self.dynamodb_write_requests = 0
+
+    def record(self, client: BaseClient, operation_name: str, api_params: Dict):
+        service = client.meta.service_model.service_id.hyphenize()
+        with self._lock:
+            self.calls[f"{service}.{operation_name}"] += 1
+            if service == 'dynamodb':
+                self.dynamodb_write_requests += self._write_requests(operation_name, api_params)
+
+    def reset(self) -> Dict:
+        with self._lock:
+            counts = {
+                'ApiCalls': dict(sorted(self.calls.items())),
+                'DynamoDBWriteRequests': self.dynamodb_write_requests
+            }
+            self.calls = Counter()
+            self.dynamodb_write_requests = 0
+            return counts
+
+    @staticmethod
+    def _write_requests(operation_name: str, api_params: Dict) -> int:
+        if operation_name == 'BatchWriteItem':
+            return sum(len(requests) for requests in api_params.get('RequestItems', {}).values())
+        return 1 if operation_name in DYNAMODB_WRITE_OPERATIONS else 0
+
+
+@contextmanager
+def counting_api_calls() -> Iterator[ApiCallCounter]:
+    counter = ApiCallCounter()
+    make_api_call = BaseClient._make_api_call
+
+    def counting_make_api_call(client, operation_name, api_params):
+        counter.record(client, operation_name, api_params)
+        return make_api_call(client, operation_name, api_params)
+
+    BaseClient._make_api_call = counting_make_api_call
+    try:
+        yield counter
+    finally:
+        BaseClient._make_api_call = make_api_call
+
+
+def peak_rss_kib() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak  # bytes on macOS, KiB on Linux
+
+
+def scanner_service_names() -> List[str]:
+    return scanner_registry.service_names()
+
+
+def run_benchmark(spec: SyntheticOrganizationSpec, service_names: List[str] = None) -> Dict:
+    """Builds the synthetic organization and runs each scanner over all of its accounts, one account at a time."""
+    os.environ.setdefault('SPOKE_ROLE_NAME', 'AccountAssessment-Spoke-ExecutionRole')
+    os.environ.setdefault('TABLE_JOBS', 'BenchmarkJobHistory')
+    os.environ.setdefault('COMPONENT_TABLE', 'BenchmarkPolicyExplorer')
+
+    with mock_aws():
+        create_table_if_missing(os.environ['TABLE_JOBS'])
+        create_table_if_missing(os.environ['COMPONENT_TABLE'])
+        organization = SyntheticOrganization(spec)
+        setup_started_at = time.perf_counter()
+        account_ids = organization.create()
+        setup_duration = time.perf_counter() - setup_started_at
+
+        jobs_repository = JobsRepository()
+        job = jobs_repository.create_job({
+            'AssessmentType': 'POLICY_EXPLORER',
+            'StartedAt': datetime.now().isoformat(),
+            'StartedBy': 'benchmark',
+            'JobStatus': 'ACTIVE',
+        })
+
+        scanners = {}
+        with counting_api_calls() as counter:
+            for service_name in service_names or scanner_service_names():
+                failures_before = len(jobs_repository.find_task_failures_by_job_id(job['JobId']))
+                counter.reset()
+                started_at = time.perf_counter()
+                statements = 0
+                for account_id in account_ids:
+                    statements += scan_service({
+                        'AccountId': account_id,
+                        'JobId': job['JobId'],
+                        'Regions': spec.regions,
+                        'ServiceName': service_name
+                    }, DynamoDBPolicySink())
+                wall_time = time.perf_counter() - started_at
+                counts = counter.reset()
+                failures = len(jobs_repository.find_task_failures_by_job_id(job['JobId'])) - failures_before
+                scanners[service_name] = {
+                    'WallTimeSeconds': round(wall_time, 4),
+                    'Statements': statements,
+                    'StatementsPerSecond': round(statements / wall_time, 1) if wall_time else 0,
+                    'DynamoDBWriteRequests': counts['DynamoDBWriteRequests'],
+                    'ApiCalls': counts['ApiCalls'],
+                    'TaskFailures': failures,
+                    'PeakRssKiB': peak_rss_kib()
+                }
+
+    return {
+        'Timestamp': datetime.now(timezone.utc).isoformat(),
+        'Environment': {
+            'SolutionVersion': os.getenv('SOLUTION_VERSION'),
+            'Python': platform.python_version(),
+            'Platform': platform.platform(),
+            'boto3': version('boto3'),
+            'moto': version('moto'),
+        },
+        'Organization': dict(spec.to_dict(), Resources=organization.resources),
+        'SetupSeconds': round(setup_duration, 4),
+        'Totals': {
+            'WallTimeSeconds': round(sum(it['WallTimeSeconds'] for it in scanners.values()), 4),
+            'Statements': sum(it['Statements'] for it in scanners.values()),
+            'ApiCalls': sum(sum(it['ApiCalls'].values()) for it in scanners.values()),
+            'DynamoDBWriteRequests': sum(it['DynamoDBWriteRequests'] for it in scanners.values()),
+            'TaskFailures': sum(it['TaskFailures'] for it in scanners.values()),
+            'PeakRssKiB': peak_rss_kib()
+        },
+        'Scanners': scanners
+    }
+
+
+def compare(baseline: Dict, results: Dict, max_slowdown: float) -> List[str]:
+    """Returns the regressions of results against a baseline of the same organization spec. API call and
+    statement counts are deterministic and compared exactly, wall time is allowed to grow by max_slowdown."""
+    regressions = []
+    for service_name, scanner in results['Scanners'].items():
+        before = baseline['Scanners'].get(service_name)
+        if before is None:
+            continue
+        api_calls, api_calls_before = sum(scanner['ApiCalls'].values()), sum(before['ApiCalls'].values())
+        if api_calls > api_calls_before:
+            regressions.append(f"{service_name}: {api_calls} API calls, baseline {api_calls_before}")
+        if scanner['Statements'] != before['Statements']:
+            regressions.append(f"{service_name}: {scanner['Statements']} statements, baseline {before['Statements']}")
+        if before['WallTimeSeconds'] and scanner['WallTimeSeconds'] > before['WallTimeSeconds'] * max_slowdown:
+            regressions.append(f"{service_name}: {scanner['WallTimeSeconds']}s, baseline {before['WallTimeSeconds']}s")
+    return regressions
+
+
+def parse_arguments(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='python -m tests.benchmark.scan_benchmark', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--accounts', type=int, default=2)
+    parser.add_argument('--resources-per-service', type=int, default=5)
+    parser.add_argument('--statements-per-policy', type=int, default=3)
+    parser.add_argument('--actions-per-statement', type=int, default=2, help='controls the policy size')
+    parser.add_argument('--regions', default='us-east-1', help='comma separated regions')
+    parser.add_argument('--services', help='comma separated service names, default: all scanners')
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--baseline', help='results of an earlier run to compare with')
+    parser.add_argument('--max-slowdown', type=float, default=1.5,
+                        help='factor by which wall time may exceed the baseline, default 1.5')
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None) -> int:
+    arguments = parse_arguments(sys.argv[1:] if argv is None else argv)
+    spec = SyntheticOrganizationSpec(
+        accounts=arguments.accounts,
+        resources_per_service=arguments.resources_per_service,
+        statements_per_policy=arguments.statements_per_policy,
+        actions_per_statement=arguments.actions_per_statement,
+        regions=arguments.regions.split(',')
+    )
+    results = run_benchmark(spec, arguments.services.split(',') if arguments.services else None)
+    with open(arguments.output, 'w', encoding='utf-8') as output:
+        json.dump(results, output, indent=2)
+    print(json.dumps(results['Totals'], indent=2))
+
+    if arguments.baseline:
+        with open(arguments.baseline, encoding='utf-8') as baseline_file:
+            regressions = compare(json.load(baseline_file), results, arguments.max_slowdown)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
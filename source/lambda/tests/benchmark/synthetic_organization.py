@@ -0,0 +1,168 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+"""
+Builds a synthetic organization in moto: N member accounts, each with M resources per service, every resource with a
+policy of configurable statement count and size. Must run inside mock_aws.
+"""
+
+import io
+import json
+import zipfile
+from os import getenv
+from typing import Callable, Dict, List
+
+import boto3
+from aws_lambda_powertools import Logger
+
+logger = Logger(service='SyntheticOrganization', level=getenv('LOG_LEVEL'))
+
+
+class SyntheticOrganizationSpec:
+    def __init__(self, accounts: int = 2, resources_per_service: int = 5, statements_per_policy: int = 3,
+                 actions_per_statement: int = 2, regions: List[str] = None):
+        self.accounts = accounts
+        self.resources_per_service = resources_per_service
+        self.statements_per_policy = statements_per_policy
+        self.actions_per_statement = actions_per_statement
+        self.regions = regions or ['us-east-1']
+
+    def to_dict(self) -> Dict:
+        return dict(vars(self))
+
+
+def synthetic_policy(spec: SyntheticOrganizationSpec, service: str, resource_arn: str, account_ids: List[str]) -> str:
+    statements = []
+    for index in range(spec.statements_per_policy):
+        principal_account = account_ids[index % len(account_ids)]
+        statements.append({
+            'Sid': f"Statement{index}",
+            'Effect': 'Deny' if index % 4 == 3 else 'Allow',
+            'Principal': {'AWS': f"arn:aws:iam::{principal_account}:root"},
+            'Action': [f"{service}:Action{index}x{action}" for action in range(spec.actions_per_statement)],
+            'Resource': resource_arn,
+            'Condition': {'StringEquals': {'aws:PrincipalOrgID': 'o-synthetic'}}
+        })
+    return json.dumps({'Version': '2012-10-17', 'Statement': statements})
+
+
+class SyntheticOrganization:
+    """Creates the accounts with Organizations and the resources with credentials of the spoke role in each account,
+    so that the scanners find them exactly where they look in a real organization."""
+
+    def __init__(self, spec: SyntheticOrganizationSpec):
+        self.spec = spec
+        self.account_ids: List[str] = []
+        self.resources: Dict[str, int] = {}
+        self.builders: Dict[str, Callable[[boto3.Session, str, str, int], None]] = {
+            's3': self._s3_bucket,
+            'sqs': self._sqs_queue,
+            'sns': self._sns_topic,
+            'kms': self._kms_key,
+            'secretsmanager': self._secret,
+            'ecr': self._ecr_repository,
+            'lambda': self._lambda_function,
+            'iam': self._iam_policy,
+        }
+
+    def create(self) -> List[str]:
+        organizations = boto3.client('organizations', region_name='us-east-1')
+        organizations.create_organization(FeatureSet='ALL')
+        for index in range(self.spec.accounts):
+            organizations.create_account(AccountName=f"synthetic-{index}", Email=f"synthetic-{index}@example.com")
+        management_account_id = organizations.describe_organization()['Organization']['MasterAccountId']
+        self.account_ids = [account['Id'] for account in organizations.list_accounts()['Accounts']
+                            if account['Id'] != management_account_id]
+
+        for account_id in self.account_ids:
+            session = self._spoke_session(account_id)
+            for region in self.spec.regions:
+                for service, builder in self.builders.items():
+                    if service == 'iam' and region != self.spec.regions[0]:
+                        continue  # IAM is global
+                    for index in range(self.spec.resources_per_service):
+                        builder(session, account_id, region, index)
+                        self.resources[service] = self.resources.get(service, 0) + 1
+        logger.info(f"Created synthetic organization with {len(self.account_ids)} accounts: {self.resources}")
+        return self.account_ids
+
+    @staticmethod
+    def _spoke_session(account_id: str) -> boto3.Session:
+        role_arn = f"arn:aws:iam::{account_id}:role/{getenv('SPOKE_ROLE_NAME')}"
+        credentials = boto3.client('sts', region_name='us-east-1').assume_role(
+            RoleArn=role_arn, RoleSessionName='synthetic-organization')['Credentials']
+        return boto3.Session(aws_access_key_id=credentials['AccessKeyId'],
+                             aws_secret_access_key=credentials['SecretAccessKey'],
+                             aws_session_token=credentials['SessionToken'])
+
+    def _policy(self, service: str, resource_arn: str) -> str:
+        return synthetic_policy(self.spec, service, resource_arn, self.account_ids)
+
+    def _s3_bucket(self, session: boto3.Session, account_id: str, region: str, index: int):
+        s3 = session.client('s3', region_name=region)
+        name = f"synthetic-{account_id}-{region}-{index}"
+        if region == 'us-east-1':
+            s3.create_bucket(Bucket=name)
+        else:
+            s3.create_bucket(Bucket=name, CreateBucketConfiguration={'LocationConstraint': region})
+        s3.put_bucket_policy(Bucket=name, Policy=self._policy('s3', f"arn:aws:s3:::{name}/*"))
+
+    def _sqs_queue(self, session: boto3.Session, account_id: str, region: str, index: int):
+        arn = f"arn:aws:sqs:{region}:{account_id}:synthetic-{index}"
+        session.client('sqs', region_name=region).create_queue(
+            QueueName=f"synthetic-{index}", Attributes={'Policy': self._policy('sqs', arn)})
+
+    def _sns_topic(self, session: boto3.Session, account_id: str, region: str, index: int):
+        sns = session.client('sns', region_name=region)
+        arn = sns.create_topic(Name=f"synthetic-{index}")['TopicArn']
+        sns.set_topic_attributes(TopicArn=arn, AttributeName='Policy', AttributeValue=self._policy('sns', arn))
+
+    def _kms_key(self, session: boto3.Session, account_id: str, region: str, index: int):
+        session.client('kms', region_name=region).create_key(Policy=self._policy('kms', '*'))
+
+    def _secret(self, session: boto3.Session, account_id: str, region: str, index: int):
+        secretsmanager = session.client('secretsmanager', region_name=region)
+        arn = secretsmanager.create_secret(Name=f"synthetic-{index}", SecretString='synthetic')['ARN']
+        secretsmanager.put_resource_policy(SecretId=arn, ResourcePolicy=self._policy('secretsmanager', arn))
+
+    def _ecr_repository(self, session: boto3.Session, account_id: str, region: str, index: int):
+        ecr = session.client('ecr', region_name=region)
+        ecr.create_repository(repositoryName=f"synthetic-{index}")
+        ecr.set_repository_policy(repositoryName=f"synthetic-{index}", policyText=self._policy('ecr', '*'))
+
+    def _lambda_function(self, session: boto3.Session, account_id: str, region: str, index: int):
+        aws_lambda = session.client('lambda', region_name=region)
+        role_arn = self._lambda_role(session, account_id)
+        aws_lambda.create_function(FunctionName=f"synthetic-{index}", Runtime='python3.12', Role=role_arn,
+                                   Handler='index.handler', Code={'ZipFile': self._lambda_code()})
+        for statement in range(self.spec.statements_per_policy):
+            aws_lambda.add_permission(FunctionName=f"synthetic-{index}", StatementId=f"Statement{statement}",
+                                      Action='lambda:InvokeFunction', Principal='events.amazonaws.com')
+
+    def _iam_policy(self, session: boto3.Session, account_id: str, region: str, index: int):
+        session.client('iam').create_policy(PolicyName=f"synthetic-{index}",
+                                            PolicyDocument=self._identity_policy())
+
+    def _identity_policy(self) -> str:
+        policy = json.loads(self._policy('iam', '*'))
+        for statement in policy['Statement']:
+            del statement['Principal']
+        return json.dumps(policy)
+
+    @staticmethod
+    def _lambda_role(session: boto3.Session, account_id: str) -> str:
+        iam = session.client('iam')
+        try:
+            return iam.get_role(RoleName='synthetic-lambda')['Role']['Arn']
+        except iam.exceptions.NoSuchEntityException:
+            return iam.create_role(RoleName='synthetic-lambda', AssumeRolePolicyDocument=json.dumps({
+                'Version': '2012-10-17',
+                'Statement': [{'Effect': 'Allow', 'Principal': {'Service': 'lambda.amazonaws.com'},
+                               'Action': 'sts:AssumeRole'}]
+            }))['Role']['Arn']
+
+    @staticmethod
+    def _lambda_code() -> bytes:
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('index.py', 'def handler(event, context):\n    return event\n')
+        return buffer.getvalue()
@@ -0,0 +1,62 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+import json
+
+from tests.benchmark.scan_benchmark import run_benchmark, compare, main, scanner_service_names
+from tests.benchmark.synthetic_organization import SyntheticOrganizationSpec
+
+
+def describe_scan_benchmark():
+
+    def test_that_it_reports_metrics_per_scanner():
+        # ARRANGE
+        spec = SyntheticOrganizationSpec(accounts=2, resources_per_service=2, statements_per_policy=2)
+
+        # ACT
+        results = run_benchmark(spec, ['sqs', 'no-service'])
+
+        # ASSERT
+        sqs = results['Scanners']['sqs']
+        assert sqs['Statements'] == 2 * 2 * 2
+        assert sqs['ApiCalls']['sqs.ListQueues'] == 2
+        assert sqs['ApiCalls']['sqs.GetQueueAttributes'] == 2 * 2
+        assert sqs['DynamoDBWriteRequests'] >= sqs['Statements']
+        assert sqs['TaskFailures'] == 0
+        assert sqs['PeakRssKiB'] > 0
+        assert results['Scanners']['no-service']['TaskFailures'] == 2
+        assert results['Totals']['Statements'] == 8
+
+    def test_that_every_registered_scanner_is_benchmarked():
+        assert {'s3', 'iam', 'sqs', 'organizations'} <= set(scanner_service_names())
+
+    def test_that_it_writes_results_and_fails_on_regressions(tmp_path):
+        # ARRANGE
+        output = tmp_path / 'results.json'
+        baseline = tmp_path / 'baseline.json'
+        arguments = ['--accounts', '1', '--resources-per-service', '1', '--services', 'sns']
+        assert main(arguments + ['--output', str(baseline)]) == 0
+        results = json.loads(baseline.read_text())
+        results['Scanners']['sns']['ApiCalls'] = {'sns.ListTopics': 0}
+        baseline.write_text(json.dumps(results))
+
+        # ACT
+        exit_code = main(arguments + ['--output', str(output), '--baseline', str(baseline)])
+
+        # ASSERT
+        assert exit_code == 1
+        assert json.loads(output.read_text())['Scanners']['sns']['Statements'] == 3
+
+
+def describe_compare():
+
+    def test_that_it_tolerates_wall_time_within_the_allowed_slowdown():
+        # ARRANGE
+        baseline = {'Scanners': {'s3': {'WallTimeSeconds': 1.0, 'Statements': 3, 'ApiCalls': {'s3.ListBuckets': 1}}}}
+        results = {'Scanners': {'s3': {'WallTimeSeconds': 1.4, 'Statements': 3, 'ApiCalls': {'s3.ListBuckets': 1}}}}
+
+        # ACT
+        regressions = compare(baseline, results, 1.5)
+
+        # ASSERT
+        assert regressions == []
+        assert compare(baseline, results, 1.2) == ['s3: 1.4s, baseline 1.0s']
@@ -0,0 +1,87 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+import os
+
+from moto import mock_aws
+
+from assessment_runner.jobs_repository import JobsRepository
+from assessment_runner.organization_snapshot import OrganizationSnapshot, OrganizationSnapshotBuilder, \
+    OrganizationSnapshots
+from aws.services.organizations import Organizations
+
+
+def snapshot_of_two_accounts() -> OrganizationSnapshot:
+    return OrganizationSnapshot({
+        'OrganizationId': 'o-example',
+        'ManagementAccountId': '111111111111',
+        'RootId': 'r-root',
+        'Accounts': {
+            '111111111111': {'Name': 'Management', 'Status': 'ACTIVE', 'Parent': 'r-root'},
+            '222222222222': {'Name': 'Suspended', 'Status': 'SUSPENDED', 'Parent': 'ou-dev'}
+        },
+        'OrganizationalUnits': {'ou-dev': {'Name': 'Dev', 'Parent': 'r-root'}}
+    })
+
+
+@mock_aws
+def test_that_the_snapshot_contains_all_accounts_and_org_units(organizations_setup):
+    # ACT
+    snapshot = OrganizationSnapshotBuilder().build()
+
+    # ASSERT
+    dev_ou_id = organizations_setup['dev_ou_id']
+    assert snapshot.management_account_id in snapshot.account_ids()
+    assert len(snapshot.account_ids()) == 5
+    assert len(snapshot.org_units) == 3
+    assert snapshot.org_units[dev_ou_id] == {'Name': 'Dev', 'Parent': snapshot.root_id}
+    assert snapshot.parent(organizations_setup['dev_account_id']) == dev_ou_id
+    assert sorted(snapshot.account_ids_in_org_units([dev_ou_id])) == sorted(
+        [organizations_setup['dev_account_id'], organizations_setup['dev_account_id_2']])
+    assert Organizations(snapshot.management_account_id).get_account_ids_in_org_units(
+        [dev_ou_id]) == snapshot.account_ids_in_org_units([dev_ou_id])
+
+
+def test_that_the_snapshot_survives_compression():
+    # ARRANGE
+    snapshot = snapshot_of_two_accounts()
+
+    # ACT
+    restored = OrganizationSnapshot.decompress(snapshot.compress())
+
+    # ASSERT
+    assert restored.to_dict() == snapshot.to_dict()
+    assert restored.active_account_ids() == ['111111111111']
+    assert restored.parent('ou-dev') == 'r-root'
+
+
+@mock_aws
+def test_that_a_fresh_snapshot_is_shared_through_the_jobs_table(mocker, job_history_table):
+    # ARRANGE
+    mocker.patch.dict(os.environ, {'ORGANIZATION_SNAPSHOT_TTL_IN_SECONDS': '900'})
+    build = mocker.patch.object(OrganizationSnapshotBuilder, 'build', return_value=snapshot_of_two_accounts())
+    mocker.patch.object(Organizations, '_get_management_account_id', return_value='111111111111')
+
+    # ACT
+    built = OrganizationSnapshots().get('first-job')
+    loaded = OrganizationSnapshots().get('second-job')
+
+    # ASSERT
+    assert build.call_count == 1
+    assert loaded.to_dict() == built.to_dict()
+    assert JobsRepository().get_organization_snapshot()['JobId'] == 'first-job'
+
+
+@mock_aws
+def test_that_an_expired_snapshot_is_rebuilt(mocker, job_history_table):
+    # ARRANGE
+    mocker.patch.dict(os.environ, {'ORGANIZATION_SNAPSHOT_TTL_IN_SECONDS': '0'})
+    build = mocker.patch.object(OrganizationSnapshotBuilder, 'build', return_value=snapshot_of_two_accounts())
+    mocker.patch.object(Organizations, '_get_management_account_id', return_value='111111111111')
+    snapshots = OrganizationSnapshots()
+
+    # ACT
+    snapshots.get('first-job')
+    snapshots.get('second-job')
+
+    # ASSERT
+    assert build.call_count == 2
@@ -0,0 +1,154 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+import boto3
+import pytest
+from botocore.awsrequest import AWSResponse
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+from assessment_runner.assessment_runner import with_api_call_metrics
+from assessment_runner.jobs_repository import JobsRepository, partition_key_api_call_metrics
+from assessment_runner.jobs_service import JobsService
+from policy_explorer.finish_scan import FinishScanForResourceBasedPolicies
+from aws.utils.api_call_metrics import ApiCallMetrics, api_call_metrics, latency_bucket
+from aws.utils.boto3_session import Boto3Session
+from aws.utils.client_pool import client_pool
+from tests.test_utils.testdata_factory import job_create_request
+
+
+def test_latency_bucket():
+    assert latency_bucket(0.5) == 'LatencyUpTo10Ms'
+    assert latency_bucket(100) == 'LatencyUpTo100Ms'
+    assert latency_bucket(100.1) == 'LatencyUpTo250Ms'
+    assert latency_bucket(60000) == 'LatencyOver10000Ms'
+
+
+def describe_api_call_metrics():
+
+    @mock_aws
+    def test_counts_calls_per_service_operation_and_region():
+        # ARRANGE
+        metrics = ApiCallMetrics()
+        client = boto3.client('sqs', region_name='eu-west-1')
+        metrics.attach(client)
+
+        # ACT
+        client.list_queues()
+        client.list_queues()
+        client.create_queue(QueueName='queue')
+
+        # ASSERT
+        snapshot = metrics.snapshot()
+        assert snapshot[('sqs', 'ListQueues', 'eu-west-1')]['Calls'] == 2
+        assert snapshot[('sqs', 'CreateQueue', 'eu-west-1')]['Calls'] == 1
+        assert sum(value for key, value in snapshot[('sqs', 'ListQueues', 'eu-west-1')].items()
+                   if key.startswith('Latency') and key != 'LatencyInMs') == 2
+
+    @mock_aws
+    def test_counts_failed_calls_as_errors():
+        # ARRANGE
+        metrics = ApiCallMetrics()
+        client = boto3.client('sqs', region_name='us-east-1')
+        metrics.attach(client)
+
+        # ACT
+        with pytest.raises(ClientError):
+            client.get_queue_url(QueueName='does-not-exist')
+
+        # ASSERT
+        counters = metrics.snapshot()[('sqs', 'GetQueueUrl', 'us-east-1')]
+        assert counters['Calls'] == 1
+        assert counters['Errors'] == 1
+
+    @mock_aws
+    def test_counts_throttling_responses_and_retries():
+        # ARRANGE
+        metrics = ApiCallMetrics()
+        client = boto3.client('iam', region_name='us-east-1')
+        metrics.attach(client)
+        operation = client.meta.service_model.operation_model('ListRoles')
+
+        # ACT
+        client.meta.events.emit(
+            'needs-retry.iam.ListRoles',
+            response=(AWSResponse('https://iam.amazonaws.com', 400, {}, None), {'Error': {'Code': 'Throttling'}}),
+            attempts=5,  # max attempts reached, so the botocore retry handler does not sleep
+            caught_exception=None,
+            request_dict={'context': {}},
+            operation=operation
+        )
+        client.meta.events.emit('after-call.iam.ListRoles', model=operation, context={},
+                                parsed={'ResponseMetadata': {'RetryAttempts': 1}})
+
+        # ASSERT
+        counters = metrics.snapshot()[('iam', 'ListRoles', 'aws-global')]
+        assert counters['Throttles'] == 1
+        assert counters['Retries'] == 1
+        assert counters['Calls'] == 1
+
+    @mock_aws
+    def test_snapshot_and_clear_starts_new_aggregates():
+        # ARRANGE
+        metrics = ApiCallMetrics()
+        client = boto3.client('sqs', region_name='us-east-1')
+        metrics.attach(client)
+        client.list_queues()
+
+        # ACT
+        snapshot = metrics.snapshot_and_clear()
+
+        # ASSERT
+        assert snapshot[('sqs', 'ListQueues', 'us-east-1')]['Calls'] == 1
+        assert metrics.snapshot() == {}
+
+
+def describe_with_api_call_metrics():
+
+    @mock_aws
+    def test_flushes_metrics_to_the_job(job_history_table):
+        # ARRANGE
+        client_pool.clear()
+        job = JobsRepository().create_job(job_create_request(assessment_type='POLICY_EXPLORER'))
+
+        @with_api_call_metrics('POLICY_EXPLORER')
+        def handler(event, _context):
+            Boto3Session('sqs', region='us-east-1').get_client().list_queues()
+            Boto3Session('sqs', region='us-east-1').get_client().list_queues()
+
+        # ACT
+        handler({'JobId': job['JobId']}, None)
+        handler({'JobId': job['JobId']}, None)
+
+        # ASSERT
+        repository = JobsRepository()
+        metrics = {(item['Service'], item['Operation'], item['Region']): item
+                   for item in repository.find_api_call_metrics_by_job_id(job['JobId'])}
+        assert metrics[('sqs', 'ListQueues', 'us-east-1')]['Calls'] == 4
+        assert len(repository.dynamodb_jobs.query_all(partition_key_api_call_metrics(job['JobId']))) == 2
+        assert 'ApiCalls' not in repository.get_job('POLICY_EXPLORER', job['JobId'])
+        assert ('sqs', 'ListQueues', 'us-east-1') not in api_call_metrics.snapshot()
+
+    @mock_aws
+    def test_finishing_the_job_stores_the_totals_on_the_job(job_history_table, mocker):
+        # ARRANGE
+        client_pool.clear()
+        job = JobsRepository().create_job(job_create_request(assessment_type='POLICY_EXPLORER'))
+
+        @with_api_call_metrics('POLICY_EXPLORER')
+        def handler(event, _context):
+            Boto3Session('sqs', region='us-east-1').get_client().list_queues()
+
+        handler({'JobId': job['JobId']}, None)
+        handler({'JobId': job['JobId']}, None)
+
+        # ACT
+        FinishScanForResourceBasedPolicies().finish('POLICY_EXPLORER', job['JobId'])
+        find_api_call_metrics = mocker.spy(JobsRepository, 'find_api_call_metrics_by_job_id')
+        finished_job = JobsService().read_job('POLICY_EXPLORER', job['JobId'])['Job']
+
+        # ASSERT
+        find_api_call_metrics.assert_not_called()
+        metrics = JobsRepository().find_api_call_metrics_by_job_id(job['JobId'])
+        assert [item['Calls'] for item in metrics if item['Service'] == 'sqs'] == [2]
+        assert finished_job['ApiCalls'] == sum(item['Calls'] for item in metrics)  # includes the finish step
+        assert finished_job['ApiCallErrors'] == 0
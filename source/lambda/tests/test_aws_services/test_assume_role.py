@@ -1,10 +1,16 @@
 #  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 #  SPDX-License-Identifier: Apache-2.0
 
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+
 from aws_lambda_powertools import Logger
 from moto import mock_aws
 
 from aws.services.security_token_service import SecurityTokenService
+from aws.utils.credential_cache import credential_cache
 
 logger = Logger(level="info")
 
@@ -41,6 +47,91 @@ def test_assume_role_in_different_account(org_client, organizations_setup):
     assert "Expiration" in credentials.keys()
 
 
+@mock_aws
+def test_assume_role_reuses_cached_credentials(organizations_setup):
+    # ARRANGE
+    credential_cache.clear()
+    sts = SecurityTokenService()
+    current_account_id = sts.get_caller_identity().get('Account')
+
+    # ACT
+    first_credentials = sts.assume_role_by_name(current_account_id, 'SomeRole')
+    second_credentials = SecurityTokenService().assume_role_by_name(current_account_id, 'SomeRole')
+
+    # ASSERT
+    assert first_credentials is second_credentials
+    assert credential_cache.statistics()['Hits'] == 1
+    assert credential_cache.statistics()['Misses'] == 1
+
+
+@mock_aws
+def test_assume_role_refreshes_credentials_close_to_expiration(organizations_setup):
+    # ARRANGE
+    credential_cache.clear()
+    sts = SecurityTokenService()
+    current_account_id = sts.get_caller_identity().get('Account')
+    expiring_credentials = {
+        'AccessKeyId': 'expiring',
+        'SecretAccessKey': 'expiring',
+        'SessionToken': 'expiring',
+        'Expiration': datetime.now(timezone.utc) + timedelta(seconds=30)
+    }
+    credential_cache.get_or_assume(
+        f"arn:aws:iam::{current_account_id}:role/SomeRole",
+        "account-assessment-session",
+        lambda: expiring_credentials
+    )
+
+    # ACT
+    credentials = sts.assume_role_by_name(current_account_id, 'SomeRole')
+
+    # ASSERT
+    assert credentials['AccessKeyId'] != 'expiring'
+    assert credential_cache.statistics()['Refreshes'] == 1
+
+
+def test_concurrent_misses_assume_the_role_once():
+    # ARRANGE
+    credential_cache.clear()
+    calls = []
+    calls_lock = threading.Lock()
+
+    def assume_role():
+        with calls_lock:
+            calls.append(1)
+        time.sleep(0.05)
+        return {'AccessKeyId': f"key-{len(calls)}", 'SecretAccessKey': 'secret', 'SessionToken': 'token',
+                'Expiration': datetime.now(timezone.utc) + timedelta(hours=1)}
+
+    # ACT
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        credentials = list(executor.map(
+            lambda _: credential_cache.get_or_assume("arn:aws:iam::111122223333:role/SomeRole", "session",
+                                                     assume_role),
+            range(8)))
+
+    # ASSERT
+    assert len(calls) == 1
+    assert all(it is credentials[0] for it in credentials)
+    assert credential_cache.statistics()['Misses'] == 1
+
+
+def test_credentials_of_different_durations_are_cached_separately():
+    # ARRANGE
+    credential_cache.clear()
+
+    def assume_role():
+        return {'AccessKeyId': 'key', 'SecretAccessKey': 'secret', 'SessionToken': 'token',
+                'Expiration': datetime.now(timezone.utc) + timedelta(hours=1)}
+
+    # ACT
+    credential_cache.get_or_assume("arn:aws:iam::111122223333:role/SomeRole", "session", assume_role, 900)
+    credential_cache.get_or_assume("arn:aws:iam::111122223333:role/SomeRole", "session", assume_role, 3600)
+
+    # ASSERT
+    assert credential_cache.statistics()['Misses'] == 2
+
+
 def get_member_account_id(org_client):
     accounts_response = org_client.list_accounts().get("Accounts")
     for account in accounts_response:
@@ -0,0 +1,114 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from moto import mock_aws
+
+from aws.utils.boto3_session import Boto3Session
+from aws.utils.client_pool import ClientPool
+
+credentials_a = {'AccessKeyId': 'key-a', 'SecretAccessKey': 'secret', 'SessionToken': 'token'}
+credentials_b = {'AccessKeyId': 'key-b', 'SecretAccessKey': 'secret', 'SessionToken': 'token'}
+
+
+def describe_client_pool():
+
+    @mock_aws
+    def test_reuses_client_for_same_key():
+        # ARRANGE
+        pool = ClientPool()
+
+        # ACT
+        first = pool.get_client('sqs', region='us-east-1', credentials=credentials_a)
+        second = pool.get_client('sqs', region='us-east-1', credentials=credentials_a)
+
+        # ASSERT
+        assert first is second
+        assert pool.statistics()['Hits'] == 1
+        assert pool.statistics()['Misses'] == 1
+
+    @mock_aws
+    def test_separates_clients_by_region_and_credentials():
+        # ARRANGE
+        pool = ClientPool()
+
+        # ACT
+        client = pool.get_client('sqs', region='us-east-1', credentials=credentials_a)
+        other_region = pool.get_client('sqs', region='eu-west-1', credentials=credentials_a)
+        other_credentials = pool.get_client('sqs', region='us-east-1', credentials=credentials_b)
+
+        # ASSERT
+        assert client is not other_region
+        assert client is not other_credentials
+        assert other_region.meta.region_name == 'eu-west-1'
+        assert pool.statistics()['Sessions'] == 2
+
+    @mock_aws
+    def test_evicts_least_recently_used_client():
+        # ARRANGE
+        pool = ClientPool(max_size=2)
+        first = pool.get_client('sqs', region='us-east-1')
+        pool.get_client('sqs', region='us-east-2')
+
+        # ACT
+        pool.get_client('sqs', region='us-east-1')  # mark first as recently used
+        pool.get_client('sqs', region='us-west-1')
+
+        # ASSERT
+        assert pool.statistics()['Clients'] == 2
+        assert pool.statistics()['Evictions'] == 1
+        assert pool.get_client('sqs', region='us-east-1') is first
+
+    def test_concurrent_misses_create_the_client_once():
+        # ARRANGE
+        pool = ClientPool()
+        created = []
+
+        def create(_session):
+            created.append(1)
+            time.sleep(0.05)
+            return object()
+
+        # ACT
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            clients = list(executor.map(
+                lambda _: pool._get_or_create(('client', 'sqs', 'us-east-1', 'key-a', None, None), credentials_a,
+                                              create),
+                range(8)))
+
+        # ASSERT
+        assert len(created) == 1
+        assert all(it is clients[0] for it in clients)
+        assert pool.statistics()['Misses'] == 1
+
+    def test_misses_of_different_keys_create_clients_in_parallel():
+        # ARRANGE
+        pool = ClientPool()
+        creating = threading.Barrier(2, timeout=5)
+
+        def create(_session):
+            creating.wait()  # fails if the second client is only created after the first one
+            return object()
+
+        # ACT
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            clients = list(executor.map(
+                lambda region: pool._get_or_create(('client', 'sqs', region, 'key-a', None, None), credentials_a,
+                                                   create),
+                ['us-east-1', 'eu-west-1']))
+
+        # ASSERT
+        assert clients[0] is not clients[1]
+        assert pool.statistics()['Clients'] == 2
+
+    @mock_aws
+    def test_boto3_session_returns_pooled_client():
+        # ACT
+        first = Boto3Session('sns', region='us-east-1').get_client()
+        second = Boto3Session('sns', region='us-east-1').get_client()
+
+        # ASSERT
+        assert first is second
@@ -4,9 +4,12 @@
 import os
 import uuid
 
+import pytest
+from boto3.dynamodb.conditions import Attr
 from mypy_boto3_dynamodb.service_resource import Table
 
-from aws.services.dynamodb import DynamoDB
+from aws.services.dynamodb import DynamoDB, ParallelBatchWriter
+from aws.utils.exceptions import DynamoDBWriteException
 from delegated_admins.delegated_admin_model import DelegatedAdminModel
 from delegated_admins.delegated_admins_repository import PARTITION_KEY_DELEGATED_ADMINS, sort_key_delegated_admins
 from tests.test_utils.testdata_factory import delegated_admin_create_request
@@ -55,3 +58,176 @@ def describe_put_items():
         # ASSERT
         all_items = ddb.find_all()
         assert len(all_items) == number_of_items
+
+
+def describe_put_items_streaming():
+    create_request = delegated_admin_create_request('ssm.amazonaws.com', 'dev-account-id')
+
+    def test_writes_items_from_generator_in_flushes(delegated_admin_table: Table, mocker):
+        # ARRANGE
+        ddb = DynamoDB(os.getenv("COMPONENT_TABLE"))
+        put_items_spy = mocker.spy(ddb, 'put_items')
+        consumed = []
+
+        def generate_items():
+            for _ in range(0, 23):
+                item = dict(
+                    create_request,
+                    PartitionKey=PARTITION_KEY_DELEGATED_ADMINS,
+                    SortKey=sort_key_delegated_admins(create_request['ServicePrincipal'], uuid.uuid4().hex)
+                )
+                consumed.append(item)
+                yield item
+
+        # ACT
+        written = ddb.put_items_streaming(generate_items(), flush_size=10)
+
+        # ASSERT
+        assert written == 23
+        assert [len(call.args[0]) for call in put_items_spy.call_args_list] == [10, 10, 3]
+        assert len(ddb.find_all()) == 23
+
+
+def describe_parallel_batch_writer():
+    create_request = delegated_admin_create_request('ssm.amazonaws.com', 'dev-account-id')
+
+    def _items(count):
+        return [dict(
+            create_request,
+            PartitionKey=PARTITION_KEY_DELEGATED_ADMINS,
+            SortKey=sort_key_delegated_admins(create_request['ServicePrincipal'], uuid.uuid4().hex)
+        ) for _ in range(count)]
+
+    def test_writes_batches_in_parallel_and_reports_statistics(delegated_admin_table: Table):
+        # ARRANGE
+        ddb = DynamoDB(os.getenv("COMPONENT_TABLE"))
+        writer = ParallelBatchWriter(ddb.table, threads=4)
+
+        # ACT
+        written = writer.write(_items(110))
+
+        # ASSERT
+        assert written == 110
+        assert len(ddb.find_all()) == 110
+        statistics = writer.statistics()
+        assert statistics['ItemsWritten'] == 110
+        assert statistics['ItemsPerSecond'] > 0
+
+    def test_retries_unprocessed_items(delegated_admin_table: Table, mocker):
+        # ARRANGE
+        ddb = DynamoDB(os.getenv("COMPONENT_TABLE"))
+        writer = ParallelBatchWriter(ddb.table, threads=1)
+        items = _items(3)
+        mocker.patch.object(writer.client, 'batch_write_item', side_effect=[
+            {'UnprocessedItems': {writer.table_name: [{'PutRequest': {'Item': items[2]}}]},
+             'ConsumedCapacity': [{'CapacityUnits': 2.0}]},
+            {'UnprocessedItems': {}, 'ConsumedCapacity': [{'CapacityUnits': 1.0}]},
+        ])
+
+        # ACT
+        written = writer.write(items)
+
+        # ASSERT
+        assert written == 3
+        assert writer.statistics()['UnprocessedItemsRetries'] == 1
+        assert writer.statistics()['ConsumedWriteCapacityUnits'] == 3.0
+        retried_request = writer.client.batch_write_item.call_args_list[1].kwargs['RequestItems']
+        assert retried_request[writer.table_name] == [{'PutRequest': {'Item': items[2]}}]
+
+    def test_raises_when_items_stay_unprocessed(delegated_admin_table: Table, mocker):
+        # ARRANGE
+        ddb = DynamoDB(os.getenv("COMPONENT_TABLE"))
+        writer = ParallelBatchWriter(ddb.table, threads=1)
+        items = _items(1)
+        mocker.patch('aws.services.dynamodb.time.sleep')
+        mocker.patch.object(writer.client, 'batch_write_item', return_value={
+            'UnprocessedItems': {writer.table_name: [{'PutRequest': {'Item': items[0]}}]}
+        })
+
+        # ACT
+        with pytest.raises(DynamoDBWriteException):
+            writer.write(items)
+
+    def test_keeps_last_item_for_duplicate_keys(delegated_admin_table: Table):
+        # ARRANGE
+        ddb = DynamoDB(os.getenv("COMPONENT_TABLE"))
+        item = _items(1)[0]
+
+        # ACT
+        ddb.put_items([dict(item, Name='first'), dict(item, Name='second')])
+
+        # ASSERT
+        items = ddb.find_all()
+        assert len(items) == 1
+        assert items[0]['Name'] == 'second'
+
+
+def describe_scan_parallel():
+
+    def test_reads_every_matching_item_once_from_all_segments(delegated_admin_table: Table):
+        # ARRANGE
+        ddb = DynamoDB(os.getenv("COMPONENT_TABLE"))
+        ddb.put_items([{'PartitionKey': partition_key, 'SortKey': str(index), 'Name': f"name-{index}"}
+                       for partition_key in ['Included', 'Excluded'] for index in range(120)])
+
+        # ACT
+        pages = list(ddb.scan_parallel(Attr('PartitionKey').eq('Included'), ['SortKey', 'Name'], segments=3))
+
+        # ASSERT
+        items = [item for page in pages for item in page]
+        assert sorted(int(item['SortKey']) for item in items) == list(range(120))
+        assert all(item == {'SortKey': item['SortKey'], 'Name': f"name-{item['SortKey']}"} for item in items)
+
+    def test_raises_errors_of_the_segments(delegated_admin_table: Table, mocker):
+        # ARRANGE
+        ddb = DynamoDB(os.getenv("COMPONENT_TABLE"))
+        mocker.patch.object(ddb.table.meta.client, 'scan', side_effect=ValueError('segment failed'))
+
+        # ACT
+        with pytest.raises(ValueError):
+            list(ddb.scan_parallel(segments=2))
+
+
+def describe_bulk_reads():
+    large_value = 'x' * 100_000  # pages of Scan and Query end after 1 MB
+
+    def _large_items(partition_key: str, count: int):
+        return [{'PartitionKey': partition_key, 'SortKey': f"{index:03}", 'Value': large_value}
+                for index in range(count)]
+
+    def test_find_all_reads_all_pages(delegated_admin_table: Table):
+        # ARRANGE
+        ddb = DynamoDB(os.getenv("COMPONENT_TABLE"))
+        ddb.put_items(_large_items('Large', 25))
+
+        # ACT
+        items = ddb.find_all()
+
+        # ASSERT
+        assert len(items) == 25
+
+    def test_find_items_by_partition_key_reads_all_pages(delegated_admin_table: Table):
+        # ARRANGE
+        ddb = DynamoDB(os.getenv("COMPONENT_TABLE"))
+        ddb.put_items(_large_items('Large', 25) + _large_items('Other', 1))
+
+        # ACT
+        items = ddb.find_items_by_partition_key('Large')
+
+        # ASSERT
+        assert [item['SortKey'] for item in items] == [f"{index:03}" for index in range(25)]
+
+    def test_query_items_reads_partitions_in_parallel_and_reports_capacity(delegated_admin_table: Table):
+        # ARRANGE
+        ddb = DynamoDB(os.getenv("COMPONENT_TABLE"))
+        ddb.put_items(_large_items('First', 15) + _large_items('Second', 15) + _large_items('Other', 1))
+
+        # ACT
+        items = list(ddb.query_items(['First', 'Second', 'Missing'], '01', ['PartitionKey', 'SortKey'], threads=2))
+
+        # ASSERT
+        assert sorted((item['PartitionKey'], item['SortKey']) for item in items) == \
+               [(partition_key, f"{index:03}") for partition_key in ['First', 'Second'] for index in range(10, 15)]
+        statistics = ddb.read_statistics()
+        assert statistics['ItemsRead'] == 10
+        assert statistics['ConsumedReadCapacityUnits'] > 0
@@ -0,0 +1,147 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+import boto3
+from botocore.awsrequest import AWSResponse
+from botocore.config import Config
+from moto import mock_aws
+
+from aws.utils.rate_limiter import TokenBucket, RateLimiter, MINIMUM_REQUESTS_PER_SECOND, get_requests_per_second
+
+
+def describe_token_bucket():
+
+    def test_allows_burst_without_waiting():
+        # ARRANGE
+        bucket = TokenBucket(requests_per_second=100, burst=5)
+
+        # ACT
+        waited = [bucket.acquire() for _ in range(5)]
+
+        # ASSERT
+        assert sum(waited) == 0
+
+    def test_waits_when_bucket_is_empty():
+        # ARRANGE
+        bucket = TokenBucket(requests_per_second=50, burst=1)
+        bucket.acquire()
+
+        # ACT
+        waited = bucket.acquire()
+
+        # ASSERT
+        assert waited > 0
+
+    def test_halves_rate_on_throttle_and_recovers_on_success():
+        # ARRANGE
+        bucket = TokenBucket(requests_per_second=10)
+
+        # ACT
+        bucket.on_throttle()
+        throttled_rate = bucket.rate
+        for _ in range(100):
+            bucket.on_success()
+
+        # ASSERT
+        assert throttled_rate == 5
+        assert bucket.rate == 10
+
+    def test_never_drops_below_minimum_rate():
+        # ARRANGE
+        bucket = TokenBucket(requests_per_second=1)
+
+        # ACT
+        for _ in range(10):
+            bucket.on_throttle()
+
+        # ASSERT
+        assert bucket.rate == MINIMUM_REQUESTS_PER_SECOND
+
+
+def describe_rate_limiter():
+
+    @mock_aws
+    def test_shares_bucket_per_account_service_and_region():
+        # ARRANGE
+        limiter = RateLimiter()
+        client = boto3.client('sqs', region_name='us-east-1')
+        other_client = boto3.client('sqs', region_name='us-east-1')
+
+        # ACT
+        limiter.attach(client, '111111111111')
+        limiter.attach(other_client, '111111111111')
+
+        # ASSERT
+        assert limiter.statistics()['Buckets'] == 1
+        assert limiter.bucket(('111111111111', 'sqs', 'us-east-1')).max_rate == get_requests_per_second('sqs')
+
+    @mock_aws
+    def test_adapts_to_throttling_responses():
+        # ARRANGE
+        limiter = RateLimiter()
+        client = boto3.client('iam', region_name='us-east-1', config=Config(retries={'mode': 'standard'}))
+        limiter.attach(client, '111111111111')
+        bucket = limiter.bucket(('111111111111', 'iam', 'aws-global'))
+
+        # ACT
+        client.meta.events.emit(
+            'needs-retry.iam.ListRoles',
+            response=(AWSResponse('https://iam.amazonaws.com', 400, {}, None), {'Error': {'Code': 'Throttling'}}),
+            attempts=5,  # max attempts reached, so the botocore retry handler does not sleep
+            caught_exception=None,
+            request_dict={'context': {}},
+            operation=client.meta.service_model.operation_model('ListRoles')
+        )
+
+        # ASSERT
+        assert bucket.rate == bucket.max_rate / 2
+        assert limiter.statistics()['ThrottleResponses'] == 1
+
+    @mock_aws
+    def test_counts_retries_spent():
+        # ARRANGE
+        limiter = RateLimiter()
+        client = boto3.client('sqs', region_name='us-east-1')
+        limiter.attach(client, '111111111111')
+
+        # ACT
+        client.meta.events.emit(
+            'after-call.sqs.ListQueues',
+            parsed={'ResponseMetadata': {'RetryAttempts': 2}}
+        )
+        client.list_queues()
+
+        # ASSERT
+        assert limiter.statistics()['RetriesSpent'] == 2
+
+    @mock_aws
+    def test_ignores_quota_errors_and_error_responses_for_the_rate():
+        # ARRANGE
+        limiter = RateLimiter()
+        client = boto3.client('iam', region_name='us-east-1', config=Config(retries={'mode': 'standard'}))
+        limiter.attach(client, '111111111111')
+        bucket = limiter.bucket(('111111111111', 'iam', 'aws-global'))
+        bucket.on_throttle()
+        throttled_rate = bucket.rate
+        limit_exceeded = {'Error': {'Code': 'LimitExceeded'}, 'ResponseMetadata': {'RetryAttempts': 0}}
+
+        # ACT
+        client.meta.events.emit(
+            'needs-retry.iam.CreateRole',
+            response=(AWSResponse('https://iam.amazonaws.com', 409, {}, None), limit_exceeded),
+            attempts=5,
+            caught_exception=None,
+            request_dict={'context': {}},
+            operation=client.meta.service_model.operation_model('CreateRole')
+        )
+        client.meta.events.emit(
+            'after-call.iam.CreateRole',
+            parsed=limit_exceeded,
+            http_response=AWSResponse('https://iam.amazonaws.com', 409, {}, None),
+            context={},
+            model=client.meta.service_model.operation_model('CreateRole')
+        )
+
+        # ASSERT
+        assert bucket.rate == throttled_rate
+        assert limiter.statistics()['ThrottleResponses'] == 0
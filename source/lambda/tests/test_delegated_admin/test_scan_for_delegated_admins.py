@@ -1,10 +1,12 @@
 #  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 #  SPDX-License-Identifier: Apache-2.0
+import os
 import uuid
 
 from aws_lambda_powertools import Logger
 from moto import mock_aws
 
+from delegated_admins.delegated_admins_repository import DelegatedAdminsRepository
 from delegated_admins.scan_for_delegated_admins import \
     DelegatedAdminsStrategy
 
@@ -53,3 +55,25 @@ def test_delegated_admin_account_scan(org_client, organizations_setup):
         assert "JobId" in account.keys()
         assert "AssessedAt" in account.keys()
         assert type(account.get("AssessedAt")) == str
+
+
+@mock_aws
+def test_that_delegated_services_are_written_as_they_arrive(mocker, org_client, organizations_setup,
+                                                           delegated_admin_table):
+    # ARRANGE
+    mocker.patch.dict(os.environ, {'DELEGATED_ADMIN_SCAN_MAX_WORKERS': '2'})
+    account_ids = [organizations_setup['dev_account_id'], organizations_setup['test_account_id'],
+                   organizations_setup['prod_account_id']]
+    for account_id in account_ids:
+        org_client.register_delegated_administrator(AccountId=account_id, ServicePrincipal="ssm.amazonaws.com")
+    strategy = DelegatedAdminsStrategy(DelegatedAdminsRepository())
+
+    # ACT
+    delegated_admin_accounts = strategy.scan(str(uuid.uuid4()), {})
+
+    # ASSERT
+    stored = DelegatedAdminsRepository().find_all_delegated_admins()
+    assert sorted(item['AccountId'] for item in stored) == sorted(account_ids)
+    assert len(strategy.findings) == 3
+    assert [account['AccountId'] for account in delegated_admin_accounts] == [
+        account['Id'] for account in org_client.list_delegated_administrators()['DelegatedAdministrators']]
@@ -0,0 +1,99 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+import os
+import threading
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+from aws.utils.exceptions import RegionNotEnabled
+from policy_explorer.step_functions_lambda.utils import fetch_concurrently, get_fetch_concurrency
+
+
+def describe_fetch_concurrently():
+
+    def test_keeps_input_order():
+        # ARRANGE
+        items = list(range(20))
+
+        def fetch(item):
+            time.sleep(0.001 * (20 - item))  # first items finish last
+            return item * 2
+
+        # ACT
+        results = fetch_concurrently('lambda', items, fetch, max_workers=8)
+
+        # ASSERT
+        assert results == [item * 2 for item in items]
+
+    def test_fetches_on_multiple_threads():
+        # ARRANGE
+        fetching_threads = set()
+
+        def fetch(item):
+            fetching_threads.add(threading.get_ident())
+            time.sleep(0.02)
+            return item
+
+        # ACT
+        fetch_concurrently('lambda', list(range(8)), fetch, max_workers=4)
+
+        # ASSERT
+        assert len(fetching_threads) > 1
+
+    def test_isolates_resource_not_found_error_of_single_item():
+        # ARRANGE
+        def fetch(item):
+            if item == 'broken':
+                raise ClientError({'Error': {'Code': 'ResourceNotFoundException', 'Message': 'gone'}}, 'GetPolicy')
+            return {'Policy': item}
+
+        # ACT
+        results = fetch_concurrently('lambda', ['a', 'broken', 'b'], fetch, max_workers=2)
+
+        # ASSERT
+        assert results[0] == {'Policy': 'a'}
+        assert 'Error' in results[1]
+        assert results[2] == {'Policy': 'b'}
+
+    def test_raises_other_client_errors():
+        # ARRANGE
+        def fetch(item):
+            if item == 'throttled':
+                raise ClientError({'Error': {'Code': 'ThrottlingException', 'Message': 'slow down'}}, 'GetPolicy')
+            return {'Policy': item}
+
+        # ACT
+        with pytest.raises(ClientError):
+            fetch_concurrently('lambda', ['a', 'throttled', 'b'], fetch, max_workers=2)
+
+    def test_raises_region_level_errors():
+        # ARRANGE
+        def fetch(item):
+            raise RegionNotEnabled('eu-south-1')
+
+        # ACT
+        with pytest.raises(RegionNotEnabled):
+            fetch_concurrently('lambda', ['a', 'b'], fetch, max_workers=2)
+
+    def test_returns_empty_list_for_no_items():
+        assert fetch_concurrently('lambda', [], lambda item: item) == []
+
+
+def describe_get_fetch_concurrency():
+
+    def test_uses_service_default():
+        assert get_fetch_concurrency('iam') == 4
+        assert get_fetch_concurrency('lambda') == 8
+
+    def test_service_setting_overrides_global_setting(mocker):
+        # ARRANGE
+        mocker.patch.dict(os.environ, {
+            'POLICY_FETCH_MAX_WORKERS': '3',
+            'POLICY_FETCH_MAX_WORKERS_KMS': '2'
+        })
+
+        # ASSERT
+        assert get_fetch_concurrency('kms') == 2
+        assert get_fetch_concurrency('lambda') == 3
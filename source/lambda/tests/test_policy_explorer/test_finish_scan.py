@@ -55,3 +55,21 @@ def describe_finish_scan():
 
         # ASSERT
         assert response["Status"] == 'SUCCEEDED_WITH_FAILED_TASKS'
+
+    def test_that_it_keeps_counters_added_by_the_scan_tasks(job_history_table, resource_based_policies_table):
+        # ARRANGE
+        repository = JobsRepository()
+        job = repository.create_job(request1)
+        repository.add_to_job_counters(job['AssessmentType'], job['JobId'],
+                                       {'ChangedResources': 2, 'UnchangedResources': 5, 'RemovedResources': 0})
+        repository.add_to_job_counters(job['AssessmentType'], job['JobId'],
+                                       {'ChangedResources': 1, 'UnchangedResources': 3, 'RemovedResources': 1})
+
+        # ACT
+        FinishScanForResourceBasedPolicies().finish(job['AssessmentType'], job['JobId'])
+
+        # ASSERT
+        finished_job = repository.get_job(job['AssessmentType'], job['JobId'])
+        assert finished_job['ChangedResources'] == 3
+        assert finished_job['UnchangedResources'] == 8
+        assert finished_job['RemovedResources'] == 1
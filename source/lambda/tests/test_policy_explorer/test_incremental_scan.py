@@ -0,0 +1,191 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+import os
+
+from assessment_runner.assessment_runner import write_task_failure
+from aws.services.dynamodb import DynamoDB
+from policy_explorer.incremental_scan import IncrementalScan
+from policy_explorer.policy_document_store import document_partition_key, document_reference_partition_key, \
+    policy_hash
+from policy_explorer.policy_explorer_repository import PoliciesRepository
+from policy_explorer.policy_explorer_model import PolicyDetails, PolicyType
+from policy_explorer.policy_search_index import index_partition_key
+from policy_explorer.policy_sinks import failed_regions
+from policy_explorer.step_functions_lambda.convert_policy_into_dynamodb_items import ConvertPolicyIntoDynamoDBItems
+
+ACCOUNT_ID = '111122223333'
+
+
+def statements(resource_identifier: str, actions: list, region: str = 'us-east-1') -> list:
+    policy = {'Version': '2012-10-17', 'Statement': [
+        {'Effect': 'Allow', 'Principal': {'AWS': '*'}, 'Action': action, 'Resource': '*'} for action in actions]}
+    return ConvertPolicyIntoDynamoDBItems().create_items(PolicyDetails(
+        PolicyType=PolicyType.RESOURCE_BASED_POLICY,
+        Region=region,
+        AccountId=ACCOUNT_ID,
+        Service='sqs',
+        ResourceIdentifier=resource_identifier,
+        Policy=policy
+    ))
+
+
+def run_scan(job_id: str, items: list, regions=('us-east-1',), failed_regions=()) -> IncrementalScan:
+    repository = PoliciesRepository()
+    scan = IncrementalScan(repository.table, 'sqs', ACCOUNT_ID, job_id)
+    repository.create_all_streaming(scan.filter_changed(items))
+    scan.commit(list(regions), failed_regions)
+    return scan
+
+
+def stored_sort_keys() -> list:
+    return sorted(DynamoDB(os.getenv('COMPONENT_TABLE')).query_sort_keys('ResourceBasedPolicy'))
+
+
+def describe_incremental_scan():
+
+    def test_that_the_first_scan_writes_all_resources(policy_explorer_table):
+        # ACT
+        scan = run_scan('job-1', statements('queue-a', ['sqs:SendMessage']) + statements('queue-b', ['sqs:*']))
+
+        # ASSERT
+        assert scan.statistics() == {'ChangedResources': 2, 'UnchangedResources': 0, 'RemovedResources': 0}
+        assert stored_sort_keys() == ['us-east-1#sqs#111122223333#queue-a#1', 'us-east-1#sqs#111122223333#queue-b#1']
+
+    def test_that_unchanged_resources_are_not_written_again(policy_explorer_table, mocker):
+        # ARRANGE
+        run_scan('job-1', statements('queue-a', ['sqs:SendMessage']))
+        put_items = mocker.spy(DynamoDB, 'put_items')
+
+        # ACT
+        scan = run_scan('job-2', statements('queue-a', ['sqs:SendMessage']))
+
+        # ASSERT
+        assert scan.statistics() == {'ChangedResources': 0, 'UnchangedResources': 1, 'RemovedResources': 0}
+        put_items.assert_not_called()
+
+    def test_that_unchanged_resources_are_written_when_their_ttl_runs_out(policy_explorer_table, mocker):
+        # ARRANGE
+        run_scan('job-1', statements('queue-a', ['sqs:SendMessage']))
+        mocker.patch('policy_explorer.incremental_scan.get_policy_item_seconds_to_live', return_value=10 ** 9)
+        put_items = mocker.spy(DynamoDB, 'put_items')
+
+        # ACT
+        scan = run_scan('job-2', statements('queue-a', ['sqs:SendMessage']))
+
+        # ASSERT
+        assert scan.statistics()['UnchangedResources'] == 1
+        put_items.assert_called()
+
+    def test_that_changed_resources_are_rewritten_and_obsolete_statements_deleted(policy_explorer_table):
+        # ARRANGE
+        run_scan('job-1', statements('queue-a', ['sqs:SendMessage', 'sqs:ReceiveMessage']))
+
+        # ACT
+        scan = run_scan('job-2', statements('queue-a', ['sqs:DeleteMessage']))
+
+        # ASSERT
+        assert scan.statistics() == {'ChangedResources': 1, 'UnchangedResources': 0, 'RemovedResources': 0}
+        assert stored_sort_keys() == ['us-east-1#sqs#111122223333#queue-a#1']
+
+    def test_that_resources_missing_from_the_scan_are_removed(policy_explorer_table):
+        # ARRANGE
+        run_scan('job-1', statements('queue-a', ['sqs:SendMessage']) + statements('queue-b', ['sqs:*']))
+
+        # ACT
+        scan = run_scan('job-2', statements('queue-a', ['sqs:SendMessage']))
+
+        # ASSERT
+        assert scan.statistics() == {'ChangedResources': 0, 'UnchangedResources': 1, 'RemovedResources': 1}
+        assert stored_sort_keys() == ['us-east-1#sqs#111122223333#queue-a#1']
+
+    def test_that_resources_of_failed_regions_are_kept(policy_explorer_table):
+        # ARRANGE
+        run_scan('job-1', statements('queue-a', ['sqs:SendMessage'], region='eu-west-1'),
+                 regions=['eu-west-1'])
+
+        # ACT
+        scan = run_scan('job-2', [], regions=['eu-west-1'], failed_regions=['eu-west-1'])
+
+        # ASSERT
+        assert scan.statistics()['RemovedResources'] == 0
+        assert stored_sort_keys() == ['eu-west-1#sqs#111122223333#queue-a#1']
+
+    def test_that_resources_are_kept_when_a_failure_is_outside_the_scanned_regions(policy_explorer_table):
+        # ARRANGE
+        run_scan('job-1', statements('queue-a', ['sqs:SendMessage']))
+
+        # ACT
+        scan = run_scan('job-2', [], failed_regions=['n/a'])
+
+        # ASSERT
+        assert scan.statistics()['RemovedResources'] == 0
+        assert stored_sort_keys() == ['us-east-1#sqs#111122223333#queue-a#1']
+
+    def test_that_global_resources_are_kept_when_a_region_failed(policy_explorer_table):
+        # ARRANGE
+        run_scan('job-1', statements('queue-a', ['sqs:SendMessage'], region='GLOBAL')
+                 + statements('queue-b', ['sqs:SendMessage'], region='eu-west-1'), regions=['eu-west-1', 'us-east-1'])
+
+        # ACT
+        scan = run_scan('job-2', [], regions=['eu-west-1', 'us-east-1'], failed_regions=['us-east-1'])
+
+        # ASSERT
+        assert scan.statistics()['RemovedResources'] == 1
+        assert stored_sort_keys() == ['GLOBAL#sqs#111122223333#queue-a#1']
+
+    def test_that_removed_resources_take_their_index_entries_and_unreferenced_documents(policy_explorer_table,
+                                                                                         monkeypatch, mocker):
+        # ARRANGE
+        monkeypatch.setenv('POLICY_SEARCH_INDEX_ENABLED', 'true')
+        table = DynamoDB(os.getenv('COMPONENT_TABLE'))
+        shared = statements('queue-a', ['sqs:SendMessage'])
+        removed = statements('queue-b', ['sqs:PurgeQueue'])
+        run_scan('job-1', shared + removed)
+        PoliciesRepository().create_all([dict(item, PartitionKey='IdentityBasedPolicy') for item in shared])
+        # all documents were written before the grace period
+        mocker.patch('policy_explorer.policy_document_store.get_document_release_grace_in_seconds', return_value=-1)
+
+        # ACT
+        run_scan('job-2', [])
+
+        # ASSERT
+        assert stored_sort_keys() == []
+        assert table.query_sort_keys(index_partition_key('ResourceBasedPolicy', 'Action', 'sqs:PurgeQueue')) == []
+        assert table.query_sort_keys(index_partition_key('ResourceBasedPolicy', 'Action', 'sqs:SendMessage')) == []
+        # the document of queue-a is still referenced by the identity based copy of its statement
+        shared_hash = policy_hash(shared[0]['Policy'])
+        assert table.query_sort_keys(document_partition_key(shared_hash)) == [shared_hash]
+        removed_hash = policy_hash(removed[0]['Policy'])
+        assert removed_hash not in table.query_sort_keys(document_partition_key(removed_hash))
+        assert table.query_sort_keys(document_reference_partition_key(removed_hash)) == []
+
+    def test_that_documents_written_within_the_grace_period_are_kept(policy_explorer_table):
+        # ARRANGE
+        table = DynamoDB(os.getenv('COMPONENT_TABLE'))
+        removed = statements('queue-b', ['sqs:PurgeQueue'])
+        run_scan('job-1', removed)
+
+        # ACT
+        run_scan('job-2', [])
+
+        # ASSERT
+        # another account may have referenced the document after the references were read, it expires with its TTL
+        removed_hash = policy_hash(removed[0]['Policy'])
+        assert stored_sort_keys() == []
+        assert table.query_sort_keys(document_reference_partition_key(removed_hash)) == []
+        assert table.query_sort_keys(document_partition_key(removed_hash)) == [removed_hash]
+
+
+def describe_failed_regions():
+
+    def test_that_it_reads_the_failures_of_the_account_and_service(job_history_table):
+        # ARRANGE
+        write_task_failure('job-1', 'POLICY_EXPLORER', ACCOUNT_ID, 'eu-west-1', 'sqs', 'error')
+        write_task_failure('job-1', 'POLICY_EXPLORER', ACCOUNT_ID, 'us-east-1', 'sns', 'error')
+        write_task_failure('job-1', 'POLICY_EXPLORER', '444455556666', 'us-east-1', 'sqs', 'error')
+
+        # ACT
+        regions = failed_regions('job-1', ACCOUNT_ID, 'sqs')
+
+        # ASSERT
+        assert regions == ['eu-west-1']
@@ -0,0 +1,162 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+import json
+
+from assessment_runner import api_router
+from assessment_runner.jobs_repository import JobsRepository
+from aws.services.dynamodb import DynamoDB
+from policy_explorer.job_diff import merge_join, match_statements
+from policy_explorer.job_snapshot import JobSnapshot, job_snapshot_partition_key
+from policy_explorer.policy_document_store import document_partition_key, document_reference_partition_key, \
+    resource_key
+from policy_explorer.policy_explorer_model import PolicyDetails, PolicyType
+from policy_explorer.policy_explorer_repository import PoliciesRepository
+from policy_explorer.policy_sinks import DynamoDBPolicySink
+from policy_explorer.step_functions_lambda.convert_policy_into_dynamodb_items import ConvertPolicyIntoDynamoDBItems
+from tests.test_utils.testdata_factory import TestLambdaContext, job_create_request
+
+
+def statements(resource_identifier: str, actions: list) -> list:
+    policy = {'Version': '2012-10-17', 'Statement': [
+        {'Effect': 'Allow', 'Principal': {'AWS': '*'}, 'Action': action, 'Resource': '*'} for action in actions]}
+    return ConvertPolicyIntoDynamoDBItems().create_items(PolicyDetails(
+        PolicyType=PolicyType.RESOURCE_BASED_POLICY,
+        Region='us-east-1',
+        AccountId='111122223333',
+        Service='sqs',
+        ResourceIdentifier=resource_identifier,
+        Policy=policy
+    ))
+
+
+def scan(items: list) -> str:
+    job = JobsRepository().create_job(job_create_request(assessment_type='POLICY_EXPLORER'))
+    repository = PoliciesRepository()
+    snapshot = JobSnapshot(repository.table, job['JobId'])
+    repository.create_all(list(snapshot.record(items)))
+    snapshot.commit()
+    return job['JobId']
+
+
+def read_diff(job_id: str, other_job_id: str, query: dict = None) -> dict:
+    result = api_router.lambda_handler({
+        "path": f"/jobs/POLICY_EXPLORER/{job_id}/diff/{other_job_id}",
+        "httpMethod": "GET",
+        "queryStringParameters": query
+    }, TestLambdaContext())
+    assert result['statusCode'] == 200
+    return json.loads(result['body'])
+
+
+def describe_merge_join():
+
+    def test_that_it_pairs_items_with_the_same_sort_key():
+        # ARRANGE
+        before = iter([{'SortKey': 'a'}, {'SortKey': 'b'}, {'SortKey': 'd'}])
+        after = iter([{'SortKey': 'b'}, {'SortKey': 'c'}, {'SortKey': 'd'}, {'SortKey': 'e'}])
+
+        # ACT
+        pairs = [(left and left['SortKey'], right and right['SortKey']) for left, right in merge_join(before, after)]
+
+        # ASSERT
+        assert pairs == [('a', None), ('b', 'b'), (None, 'c'), ('d', 'd'), (None, 'e')]
+
+
+def describe_match_statements():
+    send = {'Effect': 'Allow', 'Action': 'sqs:SendMessage', 'Resource': '*'}
+    receive = {'Effect': 'Allow', 'Action': 'sqs:ReceiveMessage', 'Resource': '*'}
+    purge = {'Effect': 'Allow', 'Action': 'sqs:PurgeQueue', 'Resource': '*'}
+
+    def test_that_inserted_statements_do_not_change_the_following_statements():
+        # ACT
+        changes = match_statements([send, receive], [purge, dict(reversed(list(receive.items()))), send])
+
+        # ASSERT
+        assert changes == [(1, None, purge)]
+
+    def test_that_statements_with_the_same_sid_are_modified():
+        # ARRANGE
+        before = [dict(send, Sid='Producer'), receive]
+        after = [receive, dict(send, Sid='Producer', Resource='arn:aws:sqs:us-east-1:111122223333:queue')]
+
+        # ACT
+        changes = match_statements(before, after)
+
+        # ASSERT
+        assert changes == [(2, before[0], after[1])]
+
+
+def describe_job_diff():
+
+    def test_that_it_returns_added_removed_and_modified_statements(job_history_table, policy_explorer_table,
+                                                                   monkeypatch):
+        # ARRANGE
+        monkeypatch.setenv('TABLE_POLICY_EXPLORER', policy_explorer_table.table_name)
+        last_week = scan(statements('queue-a', ['sqs:SendMessage', 'sqs:ReceiveMessage'])
+                         + statements('queue-b', ['sqs:*'])
+                         + statements('queue-c', ['sqs:GetQueueUrl']))
+        this_week = scan(statements('queue-a', ['sqs:SendMessage', 'sqs:DeleteMessage'])
+                         + statements('queue-c', ['sqs:GetQueueUrl'])
+                         + statements('queue-d', ['sqs:PurgeQueue']))
+
+        # ACT
+        body = read_diff(last_week, this_week)
+
+        # ASSERT
+        changes = [(change['Change'], change['SortKey']) for change in body['Results']]
+        assert changes == [
+            ('ADDED', 'us-east-1#sqs#111122223333#queue-a#2'),
+            ('REMOVED', 'us-east-1#sqs#111122223333#queue-a#2'),
+            ('REMOVED', 'us-east-1#sqs#111122223333#queue-b#1'),
+            ('ADDED', 'us-east-1#sqs#111122223333#queue-d#1'),
+        ]
+        assert body['Results'][0]['After']['Action'] == 'sqs:DeleteMessage'
+        assert body['Results'][1]['Before']['Action'] == 'sqs:ReceiveMessage'
+        assert body['Pagination']['hasMoreResults'] is False
+
+    def test_that_it_paginates_by_resource(job_history_table, policy_explorer_table, monkeypatch):
+        # ARRANGE
+        monkeypatch.setenv('TABLE_POLICY_EXPLORER', policy_explorer_table.table_name)
+        last_week = scan(statements('queue-a', ['sqs:SendMessage']))
+        this_week = scan(statements('queue-b', ['sqs:SendMessage']) + statements('queue-c', ['sqs:SendMessage']))
+
+        # ACT
+        first_page = read_diff(last_week, this_week, {'maxResults': '2'})
+        second_page = read_diff(last_week, this_week,
+                                {'maxResults': '2', 'nextToken': first_page['Pagination']['nextToken']})
+
+        # ASSERT
+        assert [change['Change'] for change in first_page['Results']] == ['REMOVED', 'ADDED']
+        assert first_page['Pagination']['hasMoreResults'] is True
+        assert [change['SortKey'] for change in second_page['Results']] == ['us-east-1#sqs#111122223333#queue-c#1']
+        assert second_page['Pagination']['hasMoreResults'] is False
+
+    def test_that_it_reports_no_changes_for_identical_scans(job_history_table, policy_explorer_table, monkeypatch):
+        # ARRANGE
+        monkeypatch.setenv('TABLE_POLICY_EXPLORER', policy_explorer_table.table_name)
+        last_week = scan(statements('queue-a', ['sqs:SendMessage']))
+        this_week = scan(statements('queue-a', ['sqs:SendMessage']))
+
+        # ACT
+        body = read_diff(last_week, this_week)
+
+        # ASSERT
+        assert body['Results'] == []
+
+    def test_that_documents_live_as_long_as_the_snapshot(job_history_table, policy_explorer_table):
+        # ARRANGE
+        event = {'JobId': 'job-1', 'AccountId': '111122223333', 'ServiceName': 'sqs', 'Regions': ['us-east-1']}
+        table = DynamoDB(policy_explorer_table.table_name)
+
+        # ACT
+        DynamoDBPolicySink().store(event, statements('queue-a', ['sqs:SendMessage']))
+
+        # ASSERT
+        snapshot_item = table.query_all(job_snapshot_partition_key('job-1'))[0]
+        statement = table.query_all('ResourceBasedPolicy')[0]
+        document = table.query_all(document_partition_key(statement['PolicyHash']))[0]
+        assert int(document['ExpiresAt']) == int(snapshot_item['ExpiresAt']) > int(statement['ExpiresAt'])
+        assert table.query_sort_keys(document_reference_partition_key(document['SortKey'])) == [
+            f"{snapshot_item['PartitionKey']}#{snapshot_item['SortKey']}",
+            f"ResourceBasedPolicy#{resource_key(statement['SortKey'])}"
+        ]
@@ -0,0 +1,110 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+import json
+import sqlite3
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from assessment_runner.jobs_repository import JobsRepository
+from policy_explorer.local_scan import LocalScanEngine, main
+from policy_explorer.policy_explorer_repository import PoliciesRepository
+
+ACCOUNT_ID = '123456789012'
+
+
+def create_queue_with_policy():
+    sqs = boto3.client('sqs', region_name='us-east-1')
+    queue_url = sqs.create_queue(QueueName='local-scan-queue')['QueueUrl']
+    queue_arn = f"arn:aws:sqs:us-east-1:{ACCOUNT_ID}:local-scan-queue"
+    sqs.set_queue_attributes(QueueUrl=queue_url, Attributes={'Policy': json.dumps({
+        'Version': '2012-10-17',
+        'Statement': [
+            {'Effect': 'Allow', 'Principal': {'AWS': '*'}, 'Action': 'sqs:SendMessage', 'Resource': queue_arn},
+            {'Effect': 'Deny', 'Principal': {'AWS': '*'}, 'Action': 'sqs:DeleteQueue', 'Resource': queue_arn}
+        ]
+    })})
+
+
+def describe_local_scan_engine():
+
+    @mock_aws
+    def test_that_it_writes_statements_to_a_json_lines_file(job_history_table, tmp_path):
+        # ARRANGE
+        create_queue_with_policy()
+        output = tmp_path / 'policies.jsonl'
+
+        # ACT
+        summary = LocalScanEngine('jsonl', str(output), workers=4).run([ACCOUNT_ID], ['sqs'], ['us-east-1'])
+
+        # ASSERT
+        lines = [json.loads(line) for line in output.read_text().splitlines()]
+        assert [json.loads(line['Action']) for line in lines] == ['sqs:SendMessage', 'sqs:DeleteQueue']
+        assert {line['JobId'] for line in lines} == {summary['JobId']}
+        assert summary['Statements'] == 2
+        assert summary['Tasks'] == 1
+        assert summary['JobStatus'] == 'SUCCEEDED'
+        assert JobsRepository().get_job('POLICY_EXPLORER', summary['JobId'])['StartedBy'] == 'local-scan'
+
+    @mock_aws
+    def test_that_it_writes_statements_to_sqlite(job_history_table, tmp_path):
+        # ARRANGE
+        create_queue_with_policy()
+        output = tmp_path / 'policies.db'
+
+        # ACT
+        summary = LocalScanEngine('sqlite', str(output)).run([ACCOUNT_ID], ['sqs'], ['us-east-1'])
+
+        # ASSERT
+        connection = sqlite3.connect(output)
+        rows = connection.execute('SELECT account_id, service, region, job_id FROM policies').fetchall()
+        connection.close()
+        assert rows == [(ACCOUNT_ID, 'sqs', 'us-east-1', summary['JobId'])] * 2
+
+    @mock_aws
+    def test_that_it_writes_statements_to_dynamodb(job_history_table, policy_explorer_table):
+        # ARRANGE
+        create_queue_with_policy()
+
+        # ACT
+        summary = LocalScanEngine('dynamodb').run([ACCOUNT_ID], ['sqs'], ['us-east-1'])
+
+        # ASSERT
+        items, _ = PoliciesRepository().find_all_by_policy_type('ResourceBasedPolicy', 'us-east-1', {},
+                                                                {'Limit': 100, 'ExclusiveStartKey': None})
+        assert len(items) == 2
+        assert summary['Statements'] == 2
+
+    @mock_aws
+    def test_that_failed_tasks_are_documented_in_the_job(job_history_table, tmp_path):
+        # ACT
+        summary = LocalScanEngine('jsonl', str(tmp_path / 'policies.jsonl')).run(
+            [ACCOUNT_ID], ['no-service'], ['us-east-1'])
+
+        # ASSERT
+        assert summary['TaskFailures'] == 1
+        assert summary['JobStatus'] == 'SUCCEEDED_WITH_FAILED_TASKS'
+        failure = JobsRepository().find_task_failures_by_job_id(summary['JobId'])[0]
+        assert failure['Error'] == 'Unsupported Service'
+
+    def test_that_local_sinks_require_an_output_file():
+        with pytest.raises(ValueError):
+            LocalScanEngine('sqlite')
+
+
+def describe_main():
+
+    @mock_aws
+    def test_that_it_creates_the_tables_and_prints_a_summary(tmp_path, monkeypatch, capsys):
+        # ARRANGE
+        monkeypatch.setenv('TABLE_JOBS', 'LocalJobHistory')
+        create_queue_with_policy()
+
+        # ACT
+        summary = main(['--create-tables', '--accounts', ACCOUNT_ID, '--services', 'sqs', '--regions', 'us-east-1',
+                        '--sink', 'jsonl', '--output', str(tmp_path / 'policies.jsonl')])
+
+        # ASSERT
+        assert json.loads(capsys.readouterr().out) == summary
+        assert summary['Statements'] == 2
@@ -0,0 +1,124 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+import os
+
+from mypy_boto3_dynamodb.service_resource import Table
+
+from aws.services.dynamodb import DynamoDB
+from policy_explorer.policy_document_store import PolicyDocumentStore, document_partition_key, \
+    document_reference_partition_key, policy_document_cache, policy_hash, resource_key
+from policy_explorer.policy_explorer_repository import PoliciesRepository
+from tests.test_utils.testdata_factory import policy_create_request
+
+
+policy = '{"Version": "2012-10-17", "Statement": [{"Effect": "Allow"}, {"Effect": "Deny"}]}'
+
+
+def statements_of_one_policy():
+    first = policy_create_request('ResourceBasedPolicy', 'kms', 'dev-account-id')
+    second = policy_create_request('ResourceBasedPolicy', 'kms', 'dev-account-id')
+    first['Policy'] = policy
+    second['Policy'] = policy
+    return [first, second]
+
+
+def describe_policy_document_store():
+
+    def test_that_it_stores_each_policy_document_once(policy_explorer_table: Table):
+        # ARRANGE
+        statements = statements_of_one_policy()
+
+        # ACT
+        PoliciesRepository().create_all(statements)
+
+        # ASSERT
+        documents = policy_explorer_table.query(
+            KeyConditionExpression='PartitionKey = :pk',
+            ExpressionAttributeValues={':pk': document_partition_key(policy_hash(policy))})['Items']
+        assert len(documents) == 1
+        assert documents[0]['SortKey'] == policy_hash(policy)
+        assert documents[0]['Policy'] == policy
+
+        statement_items = policy_explorer_table.query(
+            KeyConditionExpression='PartitionKey = :pk',
+            ExpressionAttributeValues={':pk': 'ResourceBasedPolicy'})['Items']
+        assert len(statement_items) == 2
+        for statement_item in statement_items:
+            assert 'Policy' not in statement_item
+            assert statement_item['PolicyHash'] == policy_hash(policy)
+
+    def test_that_it_writes_one_reference_per_resource(policy_explorer_table):
+        # ARRANGE
+        statements = statements_of_one_policy()
+
+        # ACT
+        PoliciesRepository().create_all(statements)
+
+        # ASSERT
+        table = DynamoDB(os.getenv('COMPONENT_TABLE'))
+        assert table.query_sort_keys(document_reference_partition_key(policy_hash(policy))) == [
+            f"ResourceBasedPolicy#{resource_key(statements[0]['SortKey'])}"
+        ]
+
+    def test_that_it_does_not_modify_the_given_items(policy_explorer_table):
+        # ARRANGE
+        statements = statements_of_one_policy()
+
+        # ACT
+        PoliciesRepository().create_all(statements)
+
+        # ASSERT
+        assert statements[0]['Policy'] == policy
+        assert 'PolicyHash' not in statements[0]
+
+    def test_that_streaming_returns_the_number_of_statements(policy_explorer_table):
+        # ARRANGE
+        statements = statements_of_one_policy()
+
+        # ACT
+        written = PoliciesRepository().create_all_streaming(iter(statements))
+
+        # ASSERT
+        assert written == 2
+
+    def test_that_it_resolves_documents_from_the_table_when_not_cached(policy_explorer_table):
+        # ARRANGE
+        statements = statements_of_one_policy()
+        PoliciesRepository().create_all(statements)
+        policy_document_cache.clear()
+        stored = policy_explorer_table.query(
+            KeyConditionExpression='PartitionKey = :pk',
+            ExpressionAttributeValues={':pk': 'ResourceBasedPolicy'})['Items']
+
+        # ACT
+        resolved = PolicyDocumentStore(DynamoDB(os.getenv('COMPONENT_TABLE'))).resolve(stored)
+
+        # ASSERT
+        assert len(resolved) == 2
+        for item in resolved:
+            assert item['Policy'] == policy
+            assert 'PolicyHash' not in item
+        assert policy_document_cache.statistics()['Size'] == 1
+
+    def test_that_it_resolves_documents_from_the_cache(policy_explorer_table, mocker):
+        # ARRANGE
+        table = DynamoDB(os.getenv('COMPONENT_TABLE'))
+        policy_document_cache.put(policy_hash(policy), policy)
+        batch_get_items = mocker.spy(table, 'batch_get_items')
+
+        # ACT
+        resolved = PolicyDocumentStore(table).resolve([{'SortKey': 'a', 'PolicyHash': policy_hash(policy)}])
+
+        # ASSERT
+        assert resolved == [{'SortKey': 'a', 'Policy': policy}]
+        batch_get_items.assert_not_called()
+
+    def test_that_items_with_inline_policy_are_returned_unchanged(policy_explorer_table):
+        # ARRANGE
+        legacy_item = {'SortKey': 'a', 'Policy': policy}
+
+        # ACT
+        resolved = PolicyDocumentStore(DynamoDB(os.getenv('COMPONENT_TABLE'))).resolve([legacy_item])
+
+        # ASSERT
+        assert resolved == [legacy_item]
@@ -0,0 +1,287 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+import json
+
+from assessment_runner import api_router
+from assessment_runner.jobs_repository import JobsRepository
+from aws.services.dynamodb import DynamoDB
+from policy_explorer.finish_scan import compile_policies
+from policy_explorer.policy_evaluation import CompiledPolicies, CompiledPoliciesStore, PatternSet, \
+    compiled_policies_cache
+from policy_explorer.policy_explorer_model import PolicyDetails, PolicyType
+from policy_explorer.policy_explorer_repository import PoliciesRepository
+from policy_explorer.step_functions_lambda.convert_policy_into_dynamodb_items import ConvertPolicyIntoDynamoDBItems
+from tests.test_utils.testdata_factory import TestLambdaContext, job_create_request
+
+KEY_ARN = 'arn:aws:kms:us-east-1:111122223333:key/1234abcd'
+ROLE_ARN = 'arn:aws:iam::444455556666:role/Reader'
+MANAGEMENT_ACCOUNT_ID = '999999999999'
+
+
+def statements(policy_type: PolicyType, account_id: str, resource_identifier: str, statement: list) -> list:
+    return ConvertPolicyIntoDynamoDBItems().create_items(PolicyDetails(
+        PolicyType=policy_type,
+        Region='us-east-1' if policy_type == PolicyType.RESOURCE_BASED_POLICY else 'GLOBAL',
+        AccountId=account_id,
+        Service='kms' if policy_type == PolicyType.RESOURCE_BASED_POLICY else 'organizations',
+        ResourceIdentifier=resource_identifier,
+        Policy={'Version': '2012-10-17', 'Statement': statement}
+    ))
+
+
+def key_policy(*statement) -> list:
+    return statements(PolicyType.RESOURCE_BASED_POLICY, '111122223333', 'key/1234abcd', list(statement))
+
+
+def scp(*statement) -> list:
+    return statements(PolicyType.SERVICE_CONTROL_POLICY, MANAGEMENT_ACCOUNT_ID,
+                      'policy/o-example/service_control_policy/p-1', list(statement))
+
+
+def decide(compiled: CompiledPolicies, principal: str, action: str, resource: str = KEY_ARN) -> dict:
+    return compiled.evaluate_one({'Principal': principal, 'Action': action, 'Resource': resource})
+
+
+def describe_pattern_set():
+
+    def test_that_it_matches_iam_wildcards():
+        # ARRANGE
+        actions = PatternSet(['kms:Decrypt', 'kms:Describe*', 's3:Get?bject'], ignore_case=True)
+
+        # ACT / ASSERT
+        assert actions.matches('kms:decrypt')
+        assert actions.matches('kms:describekey')
+        assert actions.matches('s3:getobject')
+        assert not actions.matches('kms:encrypt')
+        assert not actions.matches('s3:getobjectacl')
+        assert actions.services() == {'kms', 's3'}
+
+
+def describe_compiled_policies():
+
+    def test_that_it_allows_what_a_key_policy_grants():
+        # ARRANGE
+        compiled = CompiledPolicies('job', key_policy(
+            {'Effect': 'Allow', 'Principal': {'AWS': 'arn:aws:iam::444455556666:root'},
+             'Action': ['kms:Decrypt', 'kms:Describe*'], 'Resource': '*'}))
+
+        # ACT
+        allowed = decide(compiled, ROLE_ARN, 'kms:Decrypt')
+        other_account = decide(compiled, 'arn:aws:iam::777788889999:role/Reader', 'kms:Decrypt')
+        other_action = decide(compiled, ROLE_ARN, 'kms:Encrypt')
+        other_key = decide(compiled, ROLE_ARN, 'kms:Decrypt', 'arn:aws:kms:us-east-1:111122223333:key/other')
+
+        # ASSERT
+        assert allowed['Decision'] == 'Allow'
+        assert allowed['Conditional'] is False
+        assert allowed['Statements'] == [{'PolicyType': 'ResourceBasedPolicy',
+                                          'SortKey': 'us-east-1#kms#111122223333#key/1234abcd#1'}]
+        assert other_account['Decision'] == 'ImplicitDeny'
+        assert other_action['Decision'] == 'ImplicitDeny'
+        assert other_key['Decision'] == 'ImplicitDeny'
+
+    def test_that_explicit_denies_win_and_conditions_are_reported():
+        # ARRANGE
+        compiled = CompiledPolicies('job', key_policy(
+            {'Effect': 'Allow', 'Principal': '*', 'Action': 'kms:*', 'Resource': '*'},
+            {'Effect': 'Deny', 'Principal': '*', 'NotAction': 'kms:Decrypt', 'Resource': '*',
+             'Condition': {'Bool': {'aws:SecureTransport': 'false'}}},
+            {'Effect': 'Deny', 'Principal': {'AWS': ROLE_ARN}, 'Action': 'kms:ScheduleKeyDeletion',
+             'Resource': '*'}))
+
+        # ACT
+        decrypt = decide(compiled, ROLE_ARN, 'kms:Decrypt')
+        encrypt = decide(compiled, ROLE_ARN, 'kms:Encrypt')
+        delete = decide(compiled, ROLE_ARN, 'kms:ScheduleKeyDeletion')
+
+        # ASSERT
+        assert (decrypt['Decision'], decrypt['Conditional']) == ('Allow', False)
+        assert (encrypt['Decision'], encrypt['Conditional']) == ('Allow', True)
+        assert (delete['Decision'], delete['Conditional']) == ('Deny', False)
+
+    def test_that_service_control_policies_restrict_member_accounts():
+        # ARRANGE
+        compiled = CompiledPolicies('job', key_policy(
+            {'Effect': 'Allow', 'Principal': '*', 'Action': 'kms:*', 'Resource': '*'}
+        ) + scp(
+            {'Effect': 'Allow', 'Action': '*', 'Resource': '*'},
+            {'Effect': 'Deny', 'Action': 'kms:Decrypt', 'Resource': '*'}))
+
+        # ACT
+        member = decide(compiled, ROLE_ARN, 'kms:Decrypt')
+        management = decide(compiled, f"arn:aws:iam::{MANAGEMENT_ACCOUNT_ID}:role/Admin", 'kms:Decrypt')
+        service = decide(compiled, 'cloudtrail.amazonaws.com', 'kms:Decrypt')
+        encrypt = decide(compiled, ROLE_ARN, 'kms:Encrypt')
+
+        # ASSERT
+        assert (member['Decision'], member['Conditional']) == ('Deny', True)
+        assert member['Statements'][0]['PolicyType'] == 'ServiceControlPolicy'
+        assert (management['Decision'], management['Conditional']) == ('Allow', False)
+        assert (service['Decision'], service['Conditional']) == ('Allow', False)
+        assert (encrypt['Decision'], encrypt['Conditional']) == ('Allow', True)
+
+    def test_that_an_action_no_service_control_policy_allows_is_denied():
+        # ARRANGE
+        compiled = CompiledPolicies('job', key_policy(
+            {'Effect': 'Allow', 'Principal': '*', 'Action': 'kms:*', 'Resource': '*'}
+        ) + scp(
+            {'Effect': 'Allow', 'Action': 's3:*', 'Resource': '*'}))
+
+        # ACT
+        member = decide(compiled, ROLE_ARN, 'kms:Decrypt')
+
+        # ASSERT
+        assert (member['Decision'], member['Conditional']) == ('ImplicitDeny', False)
+
+
+def finished_job() -> dict:
+    repository = JobsRepository()
+    job = dict(repository.create_job(job_create_request(assessment_type='POLICY_EXPLORER')),
+               JobStatus='SUCCEEDED', FinishedAt='2026-01-01T00:00:00')
+    repository.put_job(job)
+    repository.put_last_job_marker(job)
+    return job
+
+
+def evaluate(job: dict) -> dict:
+    return api_router.lambda_handler({
+        "path": f"/jobs/POLICY_EXPLORER/{job['JobId']}/evaluate",
+        "httpMethod": "POST",
+        "body": json.dumps({'Requests': [{'Principal': ROLE_ARN, 'Action': 'kms:Decrypt', 'Resource': KEY_ARN}]})
+    }, TestLambdaContext())
+
+
+def describe_compiled_policies_store():
+
+    def test_that_it_loads_the_statements_it_saved_in_chunks(policy_explorer_table, monkeypatch):
+        # ARRANGE
+        monkeypatch.setattr('policy_explorer.policy_evaluation.COMPILED_POLICIES_CHUNK_SIZE_IN_BYTES', 100)
+        PoliciesRepository().create_all(key_policy(
+            {'Effect': 'Allow', 'Principal': {'AWS': ROLE_ARN}, 'Action': 'kms:Decrypt', 'Resource': '*'},
+            {'Effect': 'Deny', 'Principal': '*', 'Action': 'kms:Encrypt', 'Resource': '*'}))
+        store = CompiledPoliciesStore(DynamoDB(policy_explorer_table.table_name))
+
+        # ACT
+        statement_count = store.save('job')
+        statements = store.load('job')
+
+        # ASSERT
+        assert statement_count == 2
+        assert sorted(statement['Effect'] for statement in statements) == ['Allow', 'Deny']
+        assert 'Policy' not in statements[0]
+        chunks = DynamoDB(policy_explorer_table.table_name).query_all('CompiledPolicies#job', 'Chunk#')
+        assert len(chunks) == 2
+
+    def test_that_chunks_of_an_earlier_attempt_are_ignored(policy_explorer_table, monkeypatch):
+        # ARRANGE
+        monkeypatch.setattr('policy_explorer.policy_evaluation.COMPILED_POLICIES_CHUNK_SIZE_IN_BYTES', 100)
+        repository = PoliciesRepository()
+        items = key_policy(
+            {'Effect': 'Allow', 'Principal': {'AWS': ROLE_ARN}, 'Action': 'kms:Decrypt', 'Resource': '*'},
+            {'Effect': 'Deny', 'Principal': '*', 'Action': 'kms:Encrypt', 'Resource': '*'})
+        repository.create_all(items)
+        store = CompiledPoliciesStore(DynamoDB(policy_explorer_table.table_name))
+        store.save('job')
+        policy_explorer_table.delete_item(Key={'PartitionKey': items[1]['PartitionKey'],
+                                               'SortKey': items[1]['SortKey']})
+
+        # ACT
+        store.save('job')
+
+        # ASSERT
+        assert [statement['Effect'] for statement in store.load('job')] == ['Allow']
+
+
+def describe_evaluate_api():
+
+    def test_that_it_evaluates_a_batch_for_the_latest_job(job_history_table, policy_explorer_table, monkeypatch):
+        # ARRANGE
+        monkeypatch.setenv('TABLE_POLICY_EXPLORER', policy_explorer_table.table_name)
+        compiled_policies_cache.clear()
+        PoliciesRepository().create_all(key_policy(
+            {'Effect': 'Allow', 'Principal': {'AWS': ROLE_ARN}, 'Action': 'kms:Decrypt', 'Resource': '*'}))
+        job = finished_job()
+        compile_policies(job['JobId'])
+        event = {
+            "path": f"/jobs/POLICY_EXPLORER/{job['JobId']}/evaluate",
+            "httpMethod": "POST",
+            "body": json.dumps({'Requests': [
+                {'Principal': ROLE_ARN, 'Action': 'kms:Decrypt', 'Resource': KEY_ARN},
+                {'Principal': ROLE_ARN, 'Action': 'kms:Encrypt', 'Resource': KEY_ARN}
+            ]})
+        }
+
+        # ACT
+        first = api_router.lambda_handler(event, TestLambdaContext())
+        second = api_router.lambda_handler(event, TestLambdaContext())
+
+        # ASSERT
+        assert first['statusCode'] == 200
+        assert [result['Decision'] for result in json.loads(first['body'])['Results']] == ['Allow', 'ImplicitDeny']
+        assert second['body'] == first['body']
+        assert compiled_policies_cache.statistics() == {'Hits': 1, 'Misses': 1, 'Size': 1}
+
+    def test_that_it_rejects_unfinished_jobs(job_history_table, policy_explorer_table, monkeypatch):
+        # ARRANGE
+        monkeypatch.setenv('TABLE_POLICY_EXPLORER', policy_explorer_table.table_name)
+        repository = JobsRepository()
+        job = repository.create_job(job_create_request(assessment_type='POLICY_EXPLORER'))
+        repository.put_last_job_marker(job)
+
+        # ACT
+        result = api_router.lambda_handler({
+            "path": f"/jobs/POLICY_EXPLORER/{job['JobId']}/evaluate",
+            "httpMethod": "POST",
+            "body": json.dumps({'Requests': [{'Principal': ROLE_ARN, 'Action': 'kms:Decrypt', 'Resource': KEY_ARN}]})
+        }, TestLambdaContext())
+
+        # ASSERT
+        assert result['statusCode'] == 400
+        assert 'finished' in result['body']
+
+    def test_that_it_rejects_requests_without_resource(job_history_table, policy_explorer_table, monkeypatch):
+        # ARRANGE
+        monkeypatch.setenv('TABLE_POLICY_EXPLORER', policy_explorer_table.table_name)
+        job = finished_job()
+
+        # ACT
+        result = api_router.lambda_handler({
+            "path": f"/jobs/POLICY_EXPLORER/{job['JobId']}/evaluate",
+            "httpMethod": "POST",
+            "body": json.dumps({'Requests': [{'Principal': ROLE_ARN, 'Action': 'kms:Decrypt'}]})
+        }, TestLambdaContext())
+
+        # ASSERT
+        assert result['statusCode'] == 400
+
+    def test_that_it_answers_503_for_jobs_without_compiled_policies(job_history_table, policy_explorer_table,
+                                                                    monkeypatch):
+        # ARRANGE
+        monkeypatch.setenv('TABLE_POLICY_EXPLORER', policy_explorer_table.table_name)
+        compiled_policies_cache.clear()
+        job = finished_job()
+
+        # ACT
+        result = evaluate(job)
+
+        # ASSERT
+        assert result['statusCode'] == 503
+        assert 'not compiled' in result['body']
+
+    def test_that_it_rejects_jobs_with_too_many_statements(job_history_table, policy_explorer_table, monkeypatch):
+        # ARRANGE
+        monkeypatch.setenv('TABLE_POLICY_EXPLORER', policy_explorer_table.table_name)
+        monkeypatch.setenv('POLICY_EVALUATION_MAX_STATEMENTS', '1')
+        compiled_policies_cache.clear()
+        PoliciesRepository().create_all(key_policy(
+            {'Effect': 'Allow', 'Principal': {'AWS': ROLE_ARN}, 'Action': 'kms:Decrypt', 'Resource': '*'},
+            {'Effect': 'Deny', 'Principal': '*', 'Action': 'kms:Encrypt', 'Resource': '*'}))
+        job = finished_job()
+        compile_policies(job['JobId'])
+
+        # ACT
+        result = evaluate(job)
+
+        # ASSERT
+        assert result['statusCode'] == 422
+        assert 'at most 1 can be evaluated' in result['body']
@@ -0,0 +1,162 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+import json
+
+import pytest
+from mypy_boto3_dynamodb.service_resource import Table
+
+from aws.services.dynamodb import DynamoDB
+from policy_explorer import read_policies
+from policy_explorer.policy_explorer_repository import PoliciesRepository
+from policy_explorer.policy_search_index import tokens_of_value, index_partition_key
+from tests.test_utils.testdata_factory import policy_create_request, TestLambdaContext
+
+
+def read(filters: dict, max_results: int = 100) -> dict:
+    result = read_policies.lambda_handler({
+        "path": "/policy-explorer/ResourceBasedPolicy",
+        'pathParameters': {'partitionKey': 'ResourceBasedPolicy'},
+        'queryStringParameters': {'region': 'GLOBAL', 'maxResults': str(max_results), **filters},
+        "httpMethod": "GET"
+    }, TestLambdaContext())
+    return json.loads(result['body'])
+
+
+def describe_tokens_of_value():
+
+    def test_that_it_extracts_strings_and_arn_account_ids():
+        # ACT
+        tokens = tokens_of_value('Principal', '{"AWS": ["arn:aws:iam::111122223333:root", "444455556666"]}')
+
+        # ASSERT
+        assert tokens == {'arn:aws:iam::111122223333:root', '111122223333', '444455556666'}
+
+    def test_that_it_extracts_condition_operators_and_keys():
+        # ACT
+        tokens = tokens_of_value('Condition', '{"StringEquals": {"aws:PrincipalOrgID": "o-a1b2c3d4e5"}}')
+
+        # ASSERT
+        assert tokens == {'StringEquals', 'aws:PrincipalOrgID', 'o-a1b2c3d4e5'}
+
+    def test_that_it_accepts_plain_strings():
+        # ACT
+        tokens = tokens_of_value('Resource', '*')
+
+        # ASSERT
+        assert tokens == {'*'}
+
+
+def describe_policy_search_index():
+    external = policy_create_request('ResourceBasedPolicy', principal='{"AWS": "arn:aws:iam::111122223333:root"}')
+    internal = policy_create_request('ResourceBasedPolicy', principal='{"AWS": "arn:aws:iam::444455556666:root"}',
+                                     action='"sts:AssumeRole"')
+
+    @pytest.fixture(autouse=True)
+    def search_index_enabled(monkeypatch):
+        monkeypatch.setenv('POLICY_SEARCH_INDEX_ENABLED', 'true')
+
+    def test_that_it_writes_index_entries_for_statements(policy_explorer_table: Table):
+        # ACT
+        PoliciesRepository().create_all([external])
+
+        # ASSERT
+        postings = DynamoDB(policy_explorer_table.table_name).query_sort_keys(
+            index_partition_key('ResourceBasedPolicy', 'Principal', '111122223333'))
+        assert postings == [external['SortKey']]
+
+    def test_that_it_finds_statements_by_account_id_without_filtering_the_partition(policy_explorer_table, mocker):
+        # ARRANGE
+        PoliciesRepository().create_all([external, internal])
+        query_paginated = mocker.spy(DynamoDB, 'query_paginated')
+
+        # ACT
+        body = read({'principal': '111122223333', 'match': 'exact'})
+
+        # ASSERT
+        assert body['Results'] == [external]
+        query_paginated.assert_not_called()
+
+    def test_that_an_unknown_account_id_returns_no_results(policy_explorer_table, mocker):
+        # ARRANGE
+        PoliciesRepository().create_all([external, internal])
+        query_paginated = mocker.spy(DynamoDB, 'query_paginated')
+
+        # ACT
+        body = read({'principal': '999999999999', 'match': 'exact'})
+
+        # ASSERT
+        assert body['Results'] == []
+        query_paginated.assert_not_called()
+
+    def test_that_it_intersects_postings_of_several_filters(policy_explorer_table):
+        # ARRANGE
+        PoliciesRepository().create_all([external, internal])
+
+        # ACT
+        body = read({'principal': '444455556666', 'action': '"sts:AssumeRole"', 'match': 'exact'})
+
+        # ASSERT
+        assert body['Results'] == [internal]
+
+    def test_that_substring_search_is_the_default(policy_explorer_table, mocker):
+        # ARRANGE
+        PoliciesRepository().create_all([external, internal])
+        query_paginated = mocker.spy(DynamoDB, 'query_paginated')
+
+        # ACT
+        body = read({'action': 'AssumeRo'})
+
+        # ASSERT
+        assert body['Results'] == [internal]
+        query_paginated.assert_called_once()
+
+    def test_that_exact_search_does_not_match_longer_values(policy_explorer_table):
+        # ARRANGE
+        get_object = policy_create_request('ResourceBasedPolicy', service='s3', action='"s3:GetObject"')
+        get_object_version = policy_create_request('ResourceBasedPolicy', service='s3-versions',
+                                                   action='"s3:GetObjectVersion"')
+        PoliciesRepository().create_all([get_object, get_object_version])
+
+        # ACT
+        substring = read({'action': 's3:GetObject'})
+        exact = read({'action': 's3:GetObject', 'match': 'exact'})
+
+        # ASSERT
+        assert sorted(item['SortKey'] for item in substring['Results']) == sorted(
+            [get_object['SortKey'], get_object_version['SortKey']])
+        assert exact['Results'] == [get_object]
+
+    def test_that_it_paginates_index_results(policy_explorer_table):
+        # ARRANGE
+        statements = [policy_create_request('ResourceBasedPolicy', service=f'service-{i}',
+                                            principal='{"AWS": "arn:aws:iam::111122223333:root"}')
+                      for i in range(5)]
+        PoliciesRepository().create_all(statements)
+
+        # ACT
+        first_page = read({'principal': '111122223333', 'match': 'exact'}, max_results=3)
+        second_page = read({'principal': '111122223333', 'match': 'exact',
+                            'nextToken': first_page['Pagination']['nextToken']}, max_results=3)
+
+        # ASSERT
+        assert len(first_page['Results']) == 3
+        assert first_page['Pagination']['hasMoreResults']
+        assert len(second_page['Results']) == 2
+        assert not second_page['Pagination']['hasMoreResults']
+        returned = first_page['Results'] + second_page['Results']
+        assert sorted(item['SortKey'] for item in returned) == sorted(item['SortKey'] for item in statements)
+
+
+def describe_disabled_policy_search_index():
+
+    def test_that_no_index_entries_are_written_by_default(policy_explorer_table: Table):
+        # ARRANGE
+        statement = policy_create_request('ResourceBasedPolicy', principal='{"AWS": "arn:aws:iam::111122223333:root"}')
+
+        # ACT
+        PoliciesRepository().create_all([statement])
+
+        # ASSERT
+        postings = DynamoDB(policy_explorer_table.table_name).query_sort_keys(
+            index_partition_key('ResourceBasedPolicy', 'Principal', '111122223333'))
+        assert postings == []
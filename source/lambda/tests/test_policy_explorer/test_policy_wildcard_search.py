@@ -0,0 +1,118 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+import json
+
+from policy_explorer import read_policies
+from policy_explorer.policy_explorer_model import PolicyDetails, PolicyType
+from policy_explorer.policy_explorer_repository import PoliciesRepository
+from policy_explorer.policy_wildcard_search import PatternMatcher, WildcardPolicyFilter, globs_overlap
+from policy_explorer.step_functions_lambda.convert_policy_into_dynamodb_items import ConvertPolicyIntoDynamoDBItems
+from policy_explorer.supported_configuration.action_catalog import action_catalog
+from tests.test_utils.testdata_factory import TestLambdaContext
+
+
+def bucket_policy(bucket: str, *statement) -> list:
+    return ConvertPolicyIntoDynamoDBItems().create_items(PolicyDetails(
+        PolicyType=PolicyType.RESOURCE_BASED_POLICY,
+        Region='us-east-1',
+        AccountId='111122223333',
+        Service='s3',
+        ResourceIdentifier=bucket,
+        Policy={'Version': '2012-10-17', 'Statement': list(statement)}
+    ))
+
+
+def search(query: dict) -> dict:
+    return read_policies.lambda_handler({
+        "path": "/policy-explorer/ResourceBasedPolicy",
+        'pathParameters': {'partitionKey': 'ResourceBasedPolicy'},
+        'queryStringParameters': dict(query, region='us-east-1'),
+        "httpMethod": "GET"
+    }, TestLambdaContext())
+
+
+def describe_action_catalog():
+
+    def test_that_it_contains_the_actions_of_botocore_services():
+        # ACT
+        s3_actions = action_catalog.actions('s3')
+
+        # ASSERT
+        assert 's3:getobject' in s3_actions
+        assert action_catalog.actions('no-such-service') is None
+
+
+def describe_pattern_matcher():
+
+    def test_that_a_concrete_action_matches_wildcard_statements():
+        # ARRANGE
+        matcher = PatternMatcher('s3:GetObject', actions=True)
+
+        # ACT / ASSERT
+        assert matcher.overlaps(['s3:Get*'])
+        assert matcher.overlaps(['*'])
+        assert not matcher.overlaps(['s3:*Acl'])
+
+    def test_that_a_wildcard_action_is_expanded_with_the_catalog():
+        # ARRANGE
+        matcher = PatternMatcher('s3:Get*', actions=True)
+
+        # ACT / ASSERT
+        assert matcher.overlaps(['s3:GetObject'])
+        assert matcher.overlaps(['s3:*Object'])
+        assert not matcher.overlaps(['s3:Put*'])
+        assert not matcher.overlaps(['s3:Get*NoSuchAction'])
+        assert matcher.covers(['s3:*'])
+        assert not matcher.covers(['s3:GetObject'])
+
+    def test_that_resource_globs_overlap_structurally():
+        # ACT / ASSERT
+        assert globs_overlap('arn:aws:s3:::bucket/*', 'arn:aws:s3:::*/logs/*')
+        assert globs_overlap('arn:aws:s3:::bucket?', 'arn:aws:s3:::bucket1')
+        assert not globs_overlap('arn:aws:s3:::bucket/*', 'arn:aws:s3:::other/*')
+
+
+def describe_wildcard_policy_filter():
+
+    def test_that_not_action_statements_match_the_actions_they_leave():
+        # ARRANGE
+        items = bucket_policy('bucket',
+                              {'Effect': 'Deny', 'Principal': '*', 'NotAction': 's3:Get*', 'Resource': '*'},
+                              {'Effect': 'Deny', 'Principal': '*', 'NotAction': 'iam:*', 'Resource': '*'})
+
+        # ACT
+        found = WildcardPolicyFilter({'Action': 's3:GetObject'}).filter_page(items)
+
+        # ASSERT
+        assert [item['NotAction'] for item in found] == ['"iam:*"']
+
+
+def describe_wildcard_search():
+
+    def test_that_it_finds_statements_granting_the_action_through_wildcards(policy_explorer_table):
+        # ARRANGE
+        PoliciesRepository().create_all(
+            bucket_policy('bucket-a', {'Effect': 'Allow', 'Principal': '*', 'Action': 's3:Get*',
+                                       'Resource': 'arn:aws:s3:::bucket-a/*'})
+            + bucket_policy('bucket-b', {'Effect': 'Allow', 'Principal': '*', 'Action': '*',
+                                         'Resource': 'arn:aws:s3:::bucket-b/*'})
+            + bucket_policy('bucket-c', {'Effect': 'Allow', 'Principal': '*', 'Action': 's3:PutObject',
+                                         'Resource': 'arn:aws:s3:::bucket-c/*'}))
+
+        # ACT
+        substring = json.loads(search({'action': 's3:GetObject'})['body'])['Results']
+        wildcard = json.loads(search({'action': 's3:GetObject', 'match': 'wildcard'})['body'])['Results']
+        on_bucket = json.loads(search({'action': 's3:GetObject', 'resource': 'arn:aws:s3:::bucket-b/key',
+                                       'match': 'wildcard'})['body'])['Results']
+
+        # ASSERT
+        assert substring == []
+        assert sorted(item['ResourceIdentifier'] for item in wildcard) == ['bucket-a', 'bucket-b']
+        assert [item['ResourceIdentifier'] for item in on_bucket] == ['bucket-b']
+
+    def test_that_it_rejects_unknown_match_modes(policy_explorer_table):
+        # ACT
+        result = search({'action': 's3:GetObject', 'match': 'regex'})
+
+        # ASSERT
+        assert result['statusCode'] == 400
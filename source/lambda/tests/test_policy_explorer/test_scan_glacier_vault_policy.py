@@ -1,5 +1,7 @@
 #  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 #  SPDX-License-Identifier: Apache-2.0
+import threading
+
 from aws_lambda_powertools import Logger
 from moto import mock_aws
 from mypy_boto3_glacier.type_defs import DescribeVaultOutputTypeDef, VaultAccessPolicyTypeDef
@@ -55,6 +57,42 @@ def test_mock_glacier_scan_policy(mocker):
     for resource in response:
         assert resource.get("PartitionKey") == PolicyType.RESOURCE_BASED_POLICY.value
 
+@mock_aws
+def test_regions_scanned_concurrently_read_policies_with_their_own_client(mocker):
+    # ARRANGE
+    both_regions_listed = threading.Barrier(2, timeout=5)
+
+    def mock_list_vaults(self):
+        both_regions_listed.wait()  # both regions created their client before any policy is read
+        return [{"VaultARN": f"arn:aws:glacier:{self.region}:111111111111:vaults/vault-{self.region}",
+                 "VaultName": f"vault-{self.region}"}]
+
+    def mock_get_vault_access_policy(self, vault_name):
+        assert vault_name == f"vault-{self.region}"
+        return {"Policy": "{\"Version\":\"2012-10-17\",\"Statement\":[{\"Effect\":\"Allow\",\"Principal\":\"*\","
+                          "\"Action\":\"glacier:Get*\"}]}"}
+
+    mocker.patch("aws.services.s3.Glacier.list_vaults", mock_list_vaults)
+    mocker.patch("aws.services.s3.Glacier.get_vault_access_policy", mock_get_vault_access_policy)
+    scanner = GlacierVaultPolicy(event)
+    results = {}
+
+    def scan(region):
+        results[region] = scanner.scan_single_region(region)
+
+    # ACT
+    threads = [threading.Thread(target=scan, args=(region,)) for region in ['us-east-1', 'eu-west-1']]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # ASSERT
+    assert sorted(results) == ['eu-west-1', 'us-east-1']
+    for region, items in results.items():
+        assert [item['Region'] for item in items] == [region]
+
+
 def mock_glacier_vault(mocker,
                        list_vaults_response=None,
                        get_vault_access_policy_response=None):
@@ -0,0 +1,66 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+from decimal import Decimal
+
+from moto import mock_aws
+
+from assessment_runner.jobs_repository import JobsRepository
+from policy_explorer.scan_planner import ScanPlanner, makespan
+
+
+def history(account_id: str, service_name: str, duration: float):
+    return {'AccountId': account_id, 'Service': service_name, 'DurationInSeconds': Decimal(str(duration))}
+
+
+def describe_scan_planner():
+
+    def test_that_makespan_assigns_each_duration_to_the_first_free_lane():
+        assert makespan([1, 1, 1, 10], 2) == 11
+        assert makespan([10, 1, 1, 1], 2) == 10
+        assert makespan([], 2) == 0
+
+    def test_that_it_schedules_the_longest_account_first(mocker):
+        # ARRANGE
+        mocker.patch.dict('os.environ', {'SCAN_ACCOUNT_CONCURRENCY': '2', 'SCAN_SERVICE_CONCURRENCY': '1'})
+        planner = ScanPlanner().use_history([
+            history('111111111111', 'sqs', 1),
+            history('222222222222', 'sqs', 1),
+            history('333333333333', 'sqs', 1),
+            history('444444444444', 'sqs', 100),
+            history('444444444444', 'iam', 5),
+        ])
+
+        # ACT
+        account_ids, summary = planner.plan(['111111111111', '222222222222', '333333333333', '444444444444'],
+                                            ['iam', 'sqs'])
+
+        # ASSERT
+        assert account_ids == ['444444444444', '111111111111', '222222222222', '333333333333']
+        assert summary['AccountsWithHistory'] == 4
+        assert summary['EstimatedDurationInSeconds'] < summary['EstimatedDurationInListOrderInSeconds']
+
+    def test_that_it_estimates_accounts_without_history():
+        # ARRANGE
+        planner = ScanPlanner().use_history([
+            history('111111111111', 'sqs', 2),
+            history('222222222222', 'sqs', 4),
+            history('333333333333', 'sqs', 30),
+        ])
+
+        # ACT & ASSERT
+        assert planner.estimate('111111111111', 'sqs') == 2
+        assert planner.estimate('999999999999', 'sqs') == 4  # median of the service in all accounts
+        assert planner.estimate('999999999999', 'iam') == 20  # cost hint of the scanner
+
+    @mock_aws
+    def test_that_it_loads_the_durations_of_previous_jobs(job_history_table):
+        # ARRANGE
+        repository = JobsRepository()
+        repository.put_scan_duration('POLICY_EXPLORER', 'job-1', '111111111111', 'sqs', 3.5, 10)
+        repository.put_scan_duration('POLICY_EXPLORER', 'job-2', '111111111111', 'sqs', 1.25, 12)
+
+        # ACT
+        planner = ScanPlanner().load_history()
+
+        # ASSERT
+        assert planner.estimate('111111111111', 'sqs') == 1.25
@@ -1,11 +1,16 @@
 #  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 #  SPDX-License-Identifier: Apache-2.0
+import json
 from unittest.mock import patch
 
+import boto3
 from aws_lambda_powertools import Logger
 from moto import mock_aws
 
-from policy_explorer.step_functions_lambda.scan_policy_all_services_router import lambda_handler
+from assessment_runner.jobs_repository import JobsRepository
+from aws.utils.credential_cache import credential_cache
+from policy_explorer.policy_sinks import ListPolicySink
+from policy_explorer.step_functions_lambda.scan_policy_all_services_router import lambda_handler, scan_services
 from tests.test_policy_explorer.mock_data import event
 from tests.test_utils.testdata_factory import TestLambdaContext
 
@@ -14,7 +19,7 @@ event['ServiceName'] = 's3'
 
 
 @mock_aws
-def test_lambda_function():
+def test_lambda_function(policy_explorer_table, job_history_table):
     # ACT
     response = lambda_handler(event, TestLambdaContext())
     logger.info(response)
@@ -41,4 +46,46 @@ def test_service_with_no_scan_policy():
     response = lambda_handler(event, TestLambdaContext())
     logger.info(type(response))
     
-    assert response is None
\ No newline at end of file
+    assert response is None
+
+
+def create_topic_and_queue_with_policies():
+    sns = boto3.client('sns', region_name='us-east-1')
+    topic_arn = sns.create_topic(Name='batch-topic')['TopicArn']
+    sns.set_topic_attributes(TopicArn=topic_arn, AttributeName='Policy', AttributeValue=json.dumps({
+        'Version': '2012-10-17',
+        'Statement': [{'Effect': 'Allow', 'Principal': {'AWS': '*'}, 'Action': 'sns:Publish', 'Resource': topic_arn}]
+    }))
+    sqs = boto3.client('sqs', region_name='us-east-1')
+    queue_url = sqs.create_queue(QueueName='batch-queue')['QueueUrl']
+    sqs.set_queue_attributes(QueueUrl=queue_url, Attributes={'Policy': json.dumps({
+        'Version': '2012-10-17',
+        'Statement': [{'Effect': 'Allow', 'Principal': {'AWS': '*'}, 'Action': 'sqs:SendMessage',
+                       'Resource': 'arn:aws:sqs:us-east-1:123456789012:batch-queue'}]
+    })})
+
+
+@mock_aws
+def test_that_a_batch_scans_all_services_with_shared_credentials(job_history_table):
+    # ARRANGE
+    create_topic_and_queue_with_policies()
+    credential_cache.clear()
+    sink = ListPolicySink()
+    batch = {
+        'AccountId': '123456789012',
+        'JobId': 'batch-job',
+        'Regions': ['us-east-1'],
+        'ServiceNames': ['sns', 'sqs', 'no-service']
+    }
+
+    # ACT
+    statements = scan_services(batch, lambda: sink)
+
+    # ASSERT
+    assert statements == {'sns': 1, 'sqs': 1, 'no-service': 0}
+    assert sorted(item['Service'] for item in sink.items) == ['sns', 'sqs']
+    assert credential_cache.statistics()['Misses'] == 1
+    failures = JobsRepository().find_task_failures_by_job_id('batch-job')
+    assert [failure['ServiceName'] for failure in failures] == ['no-service']
+    durations = JobsRepository().find_scan_durations('POLICY_EXPLORER')
+    assert sorted((it['Service'], it['ItemCount']) for it in durations) == [('sns', 1), ('sqs', 1)]
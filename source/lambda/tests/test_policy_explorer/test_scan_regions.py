@@ -0,0 +1,93 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+import threading
+import time
+
+import pytest
+
+from aws.utils.exceptions import RegionNotEnabled
+from policy_explorer.step_functions_lambda.utils import scan_regions
+
+regions = ['us-east-1', 'us-east-2', 'eu-west-1', 'ap-south-1']
+event = {
+    'AccountId': '123456789012',
+    'JobId': 'job-id',
+    'ServiceName': 'sqs',
+    'Regions': regions
+}
+
+
+def describe_scan_regions():
+
+    def test_merges_results_in_region_order():
+        # ARRANGE
+        def scan_single_region(region):
+            time.sleep(0.05 * (len(regions) - regions.index(region)))  # first region finishes last
+            return [f"{region}-1", f"{region}-2"]
+
+        # ACT
+        resources = scan_regions(event, scan_single_region, max_workers=4)
+
+        # ASSERT
+        assert resources == [f"{region}-{i}" for region in regions for i in (1, 2)]
+
+    def test_scans_regions_concurrently():
+        # ARRANGE
+        scanning_threads = set()
+
+        def scan_single_region(region):
+            scanning_threads.add(threading.get_ident())
+            time.sleep(0.05)
+            return [region]
+
+        # ACT
+        scan_regions(event, scan_single_region, max_workers=4)
+
+        # ASSERT
+        assert len(scanning_threads) > 1
+
+    def test_writes_task_failure_for_failed_region(mocker):
+        # ARRANGE
+        write_task_failure = mocker.patch('policy_explorer.step_functions_lambda.utils.write_task_failure')
+
+        def scan_single_region(region):
+            if region == 'eu-west-1':
+                raise RegionNotEnabled(region)
+            return [region]
+
+        # ACT
+        resources = scan_regions(event, scan_single_region, max_workers=4)
+
+        # ASSERT
+        assert resources == ['us-east-1', 'us-east-2', 'ap-south-1']
+        write_task_failure.assert_called_once()
+        assert write_task_failure.call_args.args[3] == 'eu-west-1'
+
+    def test_raises_unexpected_errors(mocker):
+        # ARRANGE
+        mocker.patch('policy_explorer.step_functions_lambda.utils.write_task_failure')
+
+        def scan_single_region(region):
+            raise ValueError(region)
+
+        # ACT
+        with pytest.raises(ValueError) as exc_info:
+            scan_regions(event, scan_single_region, max_workers=4)
+
+        # ASSERT
+        assert exc_info.value.args[0] == 'us-east-1'
+
+    def test_scans_sequentially_with_single_worker():
+        # ARRANGE
+        scanning_threads = set()
+
+        def scan_single_region(region):
+            scanning_threads.add(threading.get_ident())
+            return [region]
+
+        # ACT
+        resources = scan_regions(event, scan_single_region, max_workers=1)
+
+        # ASSERT
+        assert resources == regions
+        assert scanning_threads == {threading.get_ident()}
@@ -0,0 +1,62 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+import sys
+
+from policy_explorer.supported_configuration.scanner_registry import ScannerRegistry, SCANNERS, scanner_registry, \
+    ScanScope
+from policy_explorer.supported_configuration.supported_regions_and_services import SUPPORTED_SERVICE_NAMES
+from tests.benchmark.cold_start_benchmark import sample
+
+
+def describe_scanner_registry():
+
+    def test_that_the_supported_services_are_the_account_scoped_scanners():
+        assert SUPPORTED_SERVICE_NAMES == scanner_registry.service_names([ScanScope.REGIONAL, ScanScope.GLOBAL])
+        assert 'organizations' not in SUPPORTED_SERVICE_NAMES
+        assert scanner_registry.registration('organizations').scope == ScanScope.ORGANIZATION
+
+    def test_that_every_registration_declares_its_capabilities():
+        for registration in SCANNERS:
+            assert 1 <= registration.cost <= 10
+            assert registration.service_principal.endswith('.amazonaws.com')
+        assert scanner_registry.registration('iam').scope == ScanScope.GLOBAL
+        assert scanner_registry.registration('s3').scope == ScanScope.GLOBAL
+
+    def test_that_it_orders_services_by_descending_cost():
+        # ACT
+        ordered = scanner_registry.by_cost(['config', 'ec2', 'no-service', 'sqs', 'iam', 'sns'])
+
+        # ASSERT
+        assert ordered == ['iam', 'sqs', 'sns', 'config', 'ec2', 'no-service']
+
+    def test_that_it_batches_services_up_to_the_maximum_cost():
+        # ACT
+        batches = scanner_registry.batches(['config', 'ec2', 'sqs', 'iam', 'sns'], region_count=2, max_cost=12)
+
+        # ASSERT
+        assert batches == [['iam'], ['sqs'], ['sns', 'config'], ['ec2']]
+
+    def test_that_every_registered_scanner_resolves():
+        # ARRANGE
+        registry = ScannerRegistry(SCANNERS)
+
+        # ACT
+        registry.import_all()
+
+        # ASSERT
+        for registration in SCANNERS:
+            assert callable(getattr(registry.scanner_class(registration.service_name), registration.method))
+        assert set(registry.import_times()) == set(registry.service_names())
+
+    def test_that_it_returns_none_for_unknown_services():
+        assert scanner_registry.scan_method({'ServiceName': 'no-service', 'AccountId': '', 'JobId': '',
+                                             'Regions': []}) is None
+
+    def test_that_it_imports_only_the_scanner_of_the_requested_service():
+        # ACT
+        lazy = sample('lazy', 'sqs')
+        eager = sample('eager', 'sqs')
+
+        # ASSERT
+        assert lazy['Modules'] < eager['Modules']
+        assert 'policy_explorer.step_functions_lambda.scan_sqs_queue_policies' in sys.modules
@@ -1,30 +1,38 @@
 #  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 #  SPDX-License-Identifier: Apache-2.0
+import json
 import os
 import uuid
 
+import boto3
+import pytest
 from aws_lambda_powertools import Logger
 from moto import mock_aws
 
-from aws.services.organizations import Organizations
+from assessment_runner.organization_snapshot import OrganizationSnapshot
 from aws.services.step_functions import StepFunctions
 from policy_explorer.start_state_machine_execution_to_scan_services import \
-    ScanAllPoliciesStrategy
+    ScanAllPoliciesStrategy, get_scan_mode
 from policy_explorer.supported_configuration.supported_regions_and_services import SupportedRegions, \
     SupportedServices
+from utils.api_gateway_lambda_handler import ClientException
 
 logger = Logger(level="info")
 
+MANIFEST_BUCKET = 'scan-manifest-bucket'
+
 
 @mock_aws
-def test_start_scan(mocker, freeze_clock, organizations_setup, policy_explorer_table):
+def test_start_scan(mocker, freeze_clock, organizations_setup, policy_explorer_table, job_history_table):
     # ARRANGE
     active_account_ids: list[str] = ['123456789012', '111122223333', '444455556666', '777788889999', '000000000000']
     mocker.patch.object(SupportedRegions, 'regions', return_value=['eu-central-1', 'us-east-1'])
     mocker.patch.object(SupportedServices, 'service_names', return_value=['config', 'cloudformation', 's3'])
-    mocker.patch.object(Organizations, 'list_active_account_ids', return_value=active_account_ids)
-
-    os.environ['SCAN_POLICIES_STATE_MACHINE_ARN'] = 'some-arn'
+    mocker.patch.object(OrganizationSnapshot, 'active_account_ids', return_value=active_account_ids)
+    mocker.patch.dict(os.environ, {'SCAN_POLICIES_STATE_MACHINE_ARN': 'some-arn',
+                                   'SCAN_MANIFEST_BUCKET': MANIFEST_BUCKET})
+    s3 = boto3.client('s3')
+    s3.create_bucket(Bucket=MANIFEST_BUCKET)
     start = mocker.patch.object(StepFunctions, 'start_execution', return_value=None)
 
     job_id = str(uuid.uuid4())
@@ -36,8 +44,48 @@ def test_start_scan(mocker, freeze_clock, organizations_setup, policy_explorer_t
     start.assert_called_once_with('some-arn', {
         'JobId': job_id,
         'Scan': {
-            "AccountIds": active_account_ids,
-            "ServiceNames": ['config', 'cloudformation', 's3']
+            'Manifest': {
+                'Bucket': MANIFEST_BUCKET,
+                'Key': f"scan-manifests/{job_id}.jsonl",
+                'Items': 5
+            }
         }
     })
+    manifest = s3.get_object(Bucket=MANIFEST_BUCKET, Key=f"scan-manifests/{job_id}.jsonl")['Body'].read()
+    assert [json.loads(line) for line in manifest.decode('utf-8').splitlines()] == [
+        {'AccountId': account_id, 'ServiceNames': ['s3', 'cloudformation', 'config'], 'ScanMode': 'PER_SERVICE'}
+        for account_id in active_account_ids
+    ]
+
+
+@mock_aws
+def test_scan_config_does_not_grow_with_the_accounts(mocker, job_history_table):
+    # ARRANGE
+    active_account_ids: list[str] = [f"{index:012d}" for index in range(5000)]
+    mocker.patch.object(SupportedServices, 'service_names', return_value=['config', 's3'])
+    mocker.patch.object(OrganizationSnapshot, 'active_account_ids', return_value=active_account_ids)
+    mocker.patch.dict(os.environ, {'SCAN_MANIFEST_BUCKET': MANIFEST_BUCKET})
+    boto3.client('s3').create_bucket(Bucket=MANIFEST_BUCKET)
+
+    # ACT
+    scan = ScanAllPoliciesStrategy().get_scan_config(str(uuid.uuid4()), {})
+
+    # ASSERT
+    assert scan['Manifest']['Items'] == 5000
+    assert len(json.dumps(scan)) < 1024
+
+
+def test_scan_mode_is_selected_per_job(mocker):
+    # ARRANGE
+    mocker.patch.dict(os.environ, {'POLICY_EXPLORER_SCAN_MODE': 'PER_ACCOUNT'})
+
+    # ACT
+    from_environment = get_scan_mode({})
+    from_request = get_scan_mode({'ScanMode': 'PER_SERVICE'})
+
+    # ASSERT
+    assert from_environment == 'PER_ACCOUNT'
+    assert from_request == 'PER_SERVICE'
+    with pytest.raises(ClientException):
+        get_scan_mode({'ScanMode': 'PER_REGION'})
 
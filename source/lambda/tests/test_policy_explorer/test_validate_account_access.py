@@ -36,6 +36,26 @@ def test_valid_account(organizations_setup, mocker):
 
     # ASSERT
     assert status.get('Validation') == str(ValidationType.SUCCEEDED.value)
+    assert status.get('ServiceBatches') == [['s3'], ['config']]
+
+
+def test_that_per_account_scan_mode_batches_services_by_cost(mocker):
+    # ARRANGE
+    mocker.patch.dict('os.environ', {'SCAN_BATCH_MAX_COST': '20'})
+    event = {
+        "AccountId": '999999999999',
+        "ServiceNames": ['config', 's3', 'sqs', 'iam'],
+        "ScanMode": 'PER_ACCOUNT',
+        "JobId": str(uuid.uuid4())
+    }
+
+    # ACT
+    one_region = ValidateAccountAccess(event).service_batches(['us-east-1'])
+    four_regions = ValidateAccountAccess(event).service_batches(['us-east-1', 'us-east-2', 'eu-west-1', 'eu-west-2'])
+
+    # ASSERT
+    assert one_region == [['iam', 's3'], ['sqs', 'config']]
+    assert four_regions == [['iam', 's3'], ['sqs'], ['config']]
 
 
 @mock_aws
@@ -0,0 +1,143 @@
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+import json
+
+from assessment_runner.jobs_repository import JobsRepository
+from aws.services.lambda_invoker import LambdaInvoker
+from policy_explorer.policy_explorer_model import PolicyDetails, PolicyType
+from policy_explorer.policy_explorer_repository import PoliciesRepository
+from policy_explorer.step_functions_lambda.convert_policy_into_dynamodb_items import ConvertPolicyIntoDynamoDBItems
+from resource_based_policy.resource_based_policies_repository import ResourceBasedPoliciesRepository
+from resource_based_policy.step_functions_lambda import check_policy_for_organizations_dependency
+from resource_based_policy.step_functions_lambda.check_policy_for_organizations_dependency import \
+    OrganizationsDependencyAnalyzer, OrganizationsDependencyStrategy
+from tests.test_utils.testdata_factory import TestLambdaContext, job_create_request
+
+ORG_ID_CONDITION = {'StringEquals': {'aws:principalorgid': 'o-a1b2c3d4e5'}}
+OU_PATH_CONDITION = {'ForAnyValue:StringLike': {'aws:PrincipalOrgPaths': ['o-a1b2c3d4e5/r-ab12/ou-ab12-11111111/*']}}
+
+
+def bucket_policy(bucket: str, *statement) -> list:
+    return ConvertPolicyIntoDynamoDBItems().create_items(PolicyDetails(
+        PolicyType=PolicyType.RESOURCE_BASED_POLICY,
+        Region='us-east-1',
+        AccountId='111122223333',
+        Service='s3',
+        ResourceIdentifier=bucket,
+        Policy={'Version': '2012-10-17', 'Statement': list(statement)}
+    ))
+
+
+def describe_organizations_dependency_analyzer():
+
+    def test_that_it_finds_condition_keys_and_organizations_principals():
+        # ARRANGE
+        analyzer = OrganizationsDependencyAnalyzer()
+        policy = json.dumps({'Statement': [
+            {'Effect': 'Allow', 'Principal': '*', 'Action': 's3:GetObject', 'Condition': ORG_ID_CONDITION},
+            {'Effect': 'Allow', 'Principal': '*', 'Action': 's3:GetObject', 'Condition': OU_PATH_CONDITION},
+            {'Effect': 'Allow', 'Principal': {'AWS': 'arn:aws:organizations::999999999999:ou/o-a1b2c3d4e5/ou-ab12-11111111'},
+             'Action': 's3:PutObject'},
+            {'Effect': 'Allow', 'Principal': {'AWS': 'arn:aws:iam::444455556666:root'}, 'Action': 's3:*'}
+        ]})
+
+        # ACT
+        responses = analyzer.analyze({'ResourceName': 'bucket', 'Policy': policy})
+
+        # ASSERT
+        assert sorted((response['GlobalContextKey'], response['OrganizationsResource']) for response in responses) == [
+            ('Principal', 'arn:aws:organizations::999999999999:ou/o-a1b2c3d4e5/ou-ab12-11111111'),
+            ('aws:PrincipalOrgID', 'o-a1b2c3d4e5'),
+            ('aws:PrincipalOrgPaths', 'o-a1b2c3d4e5/r-ab12/ou-ab12-11111111/*')
+        ]
+        assert all(response['ResourceName'] == 'bucket' for response in responses)
+
+    def test_that_it_parses_each_policy_once_and_skips_unrelated_policies():
+        # ARRANGE
+        analyzer = OrganizationsDependencyAnalyzer()
+        related = json.dumps({'Statement': {'Effect': 'Deny', 'Principal': '*', 'Action': '*',
+                                            'Condition': {'StringNotEquals': {'aws:SourceOrgID': 'o-a1b2c3d4e5'}}}})
+        unrelated = json.dumps({'Statement': {'Effect': 'Allow', 'Principal': '*', 'Action': 's3:GetObject'}})
+
+        # ACT
+        first = analyzer.analyze({'ResourceName': 'first', 'Policy': related}, 'hash-related')
+        second = analyzer.analyze({'ResourceName': 'second', 'Policy': None}, 'hash-related')
+        none = analyzer.analyze({'ResourceName': 'third', 'Policy': unrelated})
+
+        # ASSERT
+        assert [response['GlobalContextKey'] for response in first] == ['aws:SourceOrgID']
+        assert [response['ResourceName'] for response in second] == ['second']
+        assert none == []
+        assert analyzer.policies_parsed == 1
+
+
+def describe_organizations_dependency_strategy():
+
+    def test_that_it_writes_the_dependencies_of_all_stored_policies(policy_explorer_table,
+                                                                   resource_based_policies_table, monkeypatch):
+        # ARRANGE
+        monkeypatch.setenv('COMPONENT_TABLE', policy_explorer_table.table_name)
+        monkeypatch.setenv('TABLE_POLICY_EXPLORER', policy_explorer_table.table_name)
+        shared_statement = {'Effect': 'Allow', 'Principal': '*', 'Action': 's3:GetObject', 'Resource': '*',
+                            'Condition': ORG_ID_CONDITION}
+        PoliciesRepository().create_all(
+            bucket_policy('bucket-a', shared_statement, dict(shared_statement, Condition=OU_PATH_CONDITION))
+            + bucket_policy('bucket-b', shared_statement)
+            + bucket_policy('bucket-c', dict(shared_statement, Condition=None)))
+        monkeypatch.setenv('COMPONENT_TABLE', resource_based_policies_table.table_name)
+        strategy = OrganizationsDependencyStrategy(ResourceBasedPoliciesRepository())
+
+        # ACT
+        dependencies = strategy.scan('job-id', {})
+
+        # ASSERT
+        assert sorted((item['ResourceName'], item['DependencyType'], item['DependencyOn'])
+                      for item in ResourceBasedPoliciesRepository().find_all_policies()) == [
+            ('bucket-a', 'aws:PrincipalOrgID', 'o-a1b2c3d4e5'),
+            ('bucket-a', 'aws:PrincipalOrgPaths', 'o-a1b2c3d4e5/r-ab12/ou-ab12-11111111/*'),
+            ('bucket-b', 'aws:PrincipalOrgID', 'o-a1b2c3d4e5')
+        ]
+        assert len(dependencies) == len(strategy.findings) == 3
+        assert all(item['JobId'] == 'job-id' and item['ServiceName'] == 's3' for item in dependencies)
+
+
+def describe_organizations_dependency_job():
+
+    def test_that_the_api_request_starts_the_analysis_asynchronously(job_history_table, mocker):
+        # ARRANGE
+        invoke_async = mocker.patch.object(LambdaInvoker, 'invoke_async')
+
+        # ACT
+        response = check_policy_for_organizations_dependency.lambda_handler({
+            'path': '/resource-based-policies',
+            'httpMethod': 'POST',
+            'body': None,
+            'requestContext': {'authorizer': {'claims': {'email': 'user@example.com'}}}
+        }, TestLambdaContext())
+
+        # ASSERT
+        job = json.loads(response['body'])
+        assert response['statusCode'] == 200
+        assert job['JobStatus'] == 'ACTIVE'
+        invoke_async.assert_called_once_with('foo', {'JobId': job['JobId'], 'RequestBody': {}})
+
+    def test_that_the_scan_task_analyzes_the_policies_and_finishes_the_job(policy_explorer_table,
+                                                                           resource_based_policies_table,
+                                                                           job_history_table, monkeypatch):
+        # ARRANGE
+        monkeypatch.setenv('COMPONENT_TABLE', policy_explorer_table.table_name)
+        monkeypatch.setenv('TABLE_POLICY_EXPLORER', policy_explorer_table.table_name)
+        PoliciesRepository().create_all(bucket_policy('bucket-a', {'Effect': 'Allow', 'Principal': '*',
+                                                                   'Action': 's3:GetObject', 'Resource': '*',
+                                                                   'Condition': ORG_ID_CONDITION}))
+        monkeypatch.setenv('COMPONENT_TABLE', resource_based_policies_table.table_name)
+        job = JobsRepository().create_job(job_create_request(assessment_type='RESOURCE_BASED_POLICY'))
+
+        # ACT
+        check_policy_for_organizations_dependency.lambda_handler({'JobId': job['JobId'], 'RequestBody': {}},
+                                                                 TestLambdaContext())
+
+        # ASSERT
+        assert JobsRepository().get_job('RESOURCE_BASED_POLICY', job['JobId'])['JobStatus'] == 'SUCCEEDED'
+        assert [(item['ResourceName'], item['JobId'])
+                for item in ResourceBasedPoliciesRepository().find_all_policies()] == [('bucket-a', job['JobId'])]